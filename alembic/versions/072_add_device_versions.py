@@ -0,0 +1,66 @@
+"""Add per-device version counters for HTTP ETags
+
+Revision ID: 072
+Revises: 071
+Create Date: 2026-10-18
+
+Creates device_versions plus triggers on devices, iodd_assets, eds_files and
+pqa_quality_metrics that bump a device's version whenever it is imported,
+updated, deleted or re-analyzed. Device detail endpoints derive their ETag
+from this version.
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '072'
+down_revision = '071'
+branch_labels = None
+depends_on = None
+
+
+NOW_MS = "CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)"
+
+# (trigger name, table, event, device type expression, device id expression)
+TRIGGERS = [
+    ('trg_devices_version_insert', 'devices', 'INSERT', "'iodd'", 'NEW.id'),
+    ('trg_devices_version_update', 'devices', 'UPDATE', "'iodd'", 'NEW.id'),
+    ('trg_devices_version_delete', 'devices', 'DELETE', "'iodd'", 'OLD.id'),
+    ('trg_iodd_assets_version_insert', 'iodd_assets', 'INSERT', "'iodd'", 'NEW.device_id'),
+    ('trg_eds_files_version_insert', 'eds_files', 'INSERT', "'eds'", 'NEW.id'),
+    ('trg_eds_files_version_update', 'eds_files', 'UPDATE', "'eds'", 'NEW.id'),
+    ('trg_eds_files_version_delete', 'eds_files', 'DELETE', "'eds'", 'OLD.id'),
+    ('trg_pqa_metrics_version_insert', 'pqa_quality_metrics', 'INSERT', 'lower(NEW.file_type)', 'NEW.device_id'),
+]
+
+
+def upgrade():
+    """Create device_versions and its bump triggers"""
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS device_versions (
+            device_type TEXT NOT NULL,
+            device_id INTEGER NOT NULL,
+            version INTEGER NOT NULL,
+            PRIMARY KEY (device_type, device_id)
+        ) WITHOUT ROWID
+    """)
+
+    for name, table, event, type_expr, id_expr in TRIGGERS:
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name}
+            AFTER {event} ON {table}
+            BEGIN
+                INSERT INTO device_versions (device_type, device_id, version)
+                VALUES ({type_expr}, {id_expr}, {NOW_MS})
+                ON CONFLICT (device_type, device_id)
+                DO UPDATE SET version = MAX(device_versions.version + 1, excluded.version);
+            END
+        """)
+
+
+def downgrade():
+    """Drop the bump triggers and device_versions"""
+    for name, *_ in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.execute("DROP TABLE IF EXISTS device_versions")
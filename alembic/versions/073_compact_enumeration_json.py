@@ -0,0 +1,40 @@
+"""Store parameter enumeration values as compact, valid JSON
+
+Revision ID: 073
+Revises: 072
+Create Date: 2026-10-18
+
+The parameters endpoint embeds parameters.enumeration_values in responses
+verbatim instead of decoding and re-encoding it, so every stored value must
+be valid JSON. Re-encode existing values compactly with SQLite's json() and
+clear the (unreadable) invalid ones.
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '073'
+down_revision = '072'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Minify valid enumeration JSON and null out invalid values"""
+    op.execute("""
+        UPDATE parameters
+        SET enumeration_values = NULL
+        WHERE enumeration_values IS NOT NULL
+          AND (enumeration_values = '' OR NOT json_valid(enumeration_values))
+    """)
+    op.execute("""
+        UPDATE parameters
+        SET enumeration_values = json(enumeration_values)
+        WHERE enumeration_values IS NOT NULL
+    """)
+
+
+def downgrade():
+    """Compact JSON is still valid JSON; nothing to undo"""
+    pass
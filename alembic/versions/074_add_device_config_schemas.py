@@ -0,0 +1,38 @@
+"""Add materialized config-page schemas per device and role
+
+Revision ID: 074
+Revises: 073
+Create Date: 2026-10-18
+
+Stores the resolved menu -> parameter schema served by
+/api/iodd/{id}/config-schema. Rows carry the device version they were built
+from (device_versions, migration 072) and are rebuilt when it changes.
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '074'
+down_revision = '073'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create device_config_schemas"""
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS device_config_schemas (
+            device_id INTEGER NOT NULL,
+            role TEXT NOT NULL,
+            device_version INTEGER NOT NULL,
+            schema_json TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (device_id, role)
+        )
+    """)
+
+
+def downgrade():
+    """Drop device_config_schemas"""
+    op.execute("DROP TABLE IF EXISTS device_config_schemas")
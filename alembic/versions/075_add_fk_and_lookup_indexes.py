@@ -0,0 +1,73 @@
+"""Add missing foreign-key and lookup indexes
+
+Generated by scripts/audit_indexes.py: every foreign key column and every
+equality lookup used by the routes and reconstructors gets an index (covering
+for narrow lookups). Tables or columns absent from a database are skipped.
+
+Revision ID: 075
+Revises: 074
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = '075'
+down_revision = '074'
+branch_labels = None
+depends_on = None
+
+# (table, index name, columns)
+INDEXES = [
+    # foreign key -> devices (+2 more)
+    ('communication_profile', 'idx_communication_profile_device_id', ('device_id',)),
+    # foreign key -> devices (+2 more)
+    ('device_features', 'idx_device_features_device_id', ('device_id',)),
+    # lookup at src/greenstack.py:2657 (+2 more)
+    ('devices', 'idx_devices_vendor_id_device_id_checksum', ('vendor_id', 'device_id', 'checksum')),
+    # foreign key -> devices (+2 more)
+    ('document_info', 'idx_document_info_device_id', ('device_id',)),
+    # foreign key -> process_data_record_items (+2 more)
+    ('process_data_single_values', 'idx_process_data_single_values_record_item_id', ('record_item_id',)),
+    # foreign key -> eds_packages (+1 more)
+    ('eds_package_files', 'idx_eds_package_files_package_id', ('package_id',)),
+    # lookup at src/routes/pqa_routes.py:143 (+1 more)
+    ('pqa_file_archive', 'idx_pqa_file_archive_device_id_file_type', ('device_id', 'file_type')),
+    # lookup at src/routes/eds_routes.py:1461
+    ('eds_files', 'idx_eds_files_vendor_code_product_code', ('vendor_code', 'product_code')),
+    # foreign key -> eds_files
+    ('eds_package_files', 'idx_eds_package_files_eds_file_id', ('eds_file_id',)),
+    # lookup at src/api.py:2498
+    ('generated_adapters', 'idx_generated_adapters_device_id_target_platform', ('device_id', 'target_platform')),
+    # lookup at src/greenstack.py:3147
+    ('iodd_assets', 'idx_iodd_assets_device_id_file_name', ('device_id', 'file_name')),
+    # foreign key -> pqa_file_archive
+    ('pqa_analysis_queue', 'idx_pqa_analysis_queue_archive_id', ('archive_id',)),
+    # foreign key -> pqa_quality_metrics
+    ('pqa_analysis_queue', 'idx_pqa_analysis_queue_metric_id', ('metric_id',)),
+    # lookup at src/routes/pqa_routes.py:530
+    ('pqa_diff_details', 'idx_pqa_diff_details_metric_id_severity', ('metric_id', 'severity')),
+    # lookup at src/utils/pqa_orchestrator.py:556
+    ('tickets', 'idx_tickets_device_id', ('device_id',)),
+    # lookup at src/utils/forensic_reconstruction_v2.py:1305
+    ('ui_menu_roles', 'idx_ui_menu_roles_device_id_role_type', ('device_id', 'role_type')),
+]
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(text(f'PRAGMA table_info("{table}")'))}
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    for table, name, columns in INDEXES:
+        if not set(columns) <= _columns(conn, table):
+            continue
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({', '.join(columns)})")
+    op.execute("ANALYZE")
+
+
+def downgrade() -> None:
+    for _, name, _ in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
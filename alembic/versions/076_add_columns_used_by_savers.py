@@ -0,0 +1,61 @@
+"""Add tables and columns the storage savers write but no migration created
+
+src/storage writes StdRecordItemRef children to std_record_item_refs, the
+ValueRange type/name of parameters and the texts of menu buttons; databases
+built from the migrations alone failed to store any device using them.
+Existing tables and columns are skipped.
+
+Revision ID: 076
+Revises: 075
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = '076'
+down_revision = '075'
+branch_labels = None
+depends_on = None
+
+# (table, column, type)
+COLUMNS = [
+    ('parameters', 'value_range_xsi_type', 'TEXT'),
+    ('parameters', 'value_range_name_text_id', 'TEXT'),
+    ('ui_menu_buttons', 'description_text_id', 'TEXT'),
+    ('ui_menu_buttons', 'action_started_message_text_id', 'TEXT'),
+]
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(text(f'PRAGMA table_info("{table}")'))}
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS std_record_item_refs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            std_variable_ref_id INTEGER NOT NULL,
+            subindex INTEGER NOT NULL,
+            default_value TEXT,
+            order_index INTEGER NOT NULL,
+            FOREIGN KEY (std_variable_ref_id) REFERENCES std_variable_refs(id) ON DELETE CASCADE
+        )
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_std_record_item_refs_std_variable_ref_id"
+        " ON std_record_item_refs(std_variable_ref_id)"
+    )
+    for table, column, type_ in COLUMNS:
+        existing = _columns(conn, table)
+        if existing and column not in existing:
+            op.execute(f"ALTER TABLE {table} ADD COLUMN {column} {type_}")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS std_record_item_refs")
+    for table, column, _ in COLUMNS:
+        if column in _columns(op.get_bind(), table):
+            op.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
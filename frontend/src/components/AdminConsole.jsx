@@ -110,7 +110,7 @@ const AdminConsole = ({ API_BASE, toast, onNavigate }) => {
       const response = await axios.post(`${API_BASE}/api/admin/database/backup`);
       toast({
         title: 'Success',
-        description: `Backup created: ${response.data.backup_file}`
+        description: `Backup started: ${response.data.backup_file}`
       });
     } catch (error) {
       toast({
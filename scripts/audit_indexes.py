@@ -0,0 +1,77 @@
+"""
+Foreign-Key and Lookup Index Audit
+
+Introspects a database and the SQL used by the application (src/), then
+reports:
+- foreign key columns and equality lookups without an index
+- EXPLAIN QUERY PLAN full table scans of the extracted statements, most
+  frequent first
+
+Optionally writes the missing indexes as an Alembic migration.
+
+Usage:
+    python scripts/audit_indexes.py [--db greenstack.db] [--top 20]
+    python scripts/audit_indexes.py --write-migration alembic/versions/076_add_more_indexes.py \\
+        --revision 076 --down-revision 075
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+from datetime import date
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.utils.index_audit import extract_queries, full_scans, missing_indexes, render_migration
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit missing foreign-key and lookup indexes")
+    parser.add_argument("--db", default=os.getenv("IODD_DB_PATH", "greenstack.db"), help="SQLite database to audit")
+    parser.add_argument("--source", default=str(ROOT / "src"), help="Source tree to extract queries from")
+    parser.add_argument("--top", type=int, default=20, help="Full scans to report")
+    parser.add_argument("--write-migration", metavar="PATH", help="Write the missing indexes as a migration")
+    parser.add_argument("--revision", help="Revision ID of the generated migration")
+    parser.add_argument("--down-revision", help="Revision the generated migration follows")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        parser.error(f"database not found: {args.db}")
+    if args.write_migration and not (args.revision and args.down_revision):
+        parser.error("--write-migration needs --revision and --down-revision")
+
+    queries = extract_queries(sorted(Path(args.source).resolve().rglob("*.py")), root=ROOT)
+    conn = sqlite3.connect(args.db)
+    try:
+        candidates = missing_indexes(conn, queries)
+        scans = full_scans(conn, queries)
+    finally:
+        conn.close()
+
+    print(f"Extracted {len(queries)} SQL statements from {args.source}")
+    print(f"\nMissing indexes ({len(candidates)}):")
+    for candidate in candidates:
+        reasons = sorted(candidate.reasons)
+        print(f"  {candidate.sql}")
+        print(f"      uses: {candidate.uses}  ({reasons[0]}{f' +{len(reasons) - 1} more' if len(reasons) > 1 else ''})")
+
+    print(f"\nFull table scans (top {args.top} of {len(scans)}):")
+    for occurrences, query, details in scans[:args.top]:
+        print(f"  [{occurrences}x] {query.location}")
+        print(f"      {query.sql[:140]}")
+        for detail in details:
+            print(f"      -> {detail}")
+
+    if args.write_migration:
+        Path(args.write_migration).write_text(
+            render_migration(candidates, args.revision, args.down_revision, date.today().isoformat()),
+            encoding="utf-8",
+        )
+        print(f"\nWrote {args.write_migration}")
+
+
+if __name__ == "__main__":
+    main()
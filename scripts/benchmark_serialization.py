@@ -0,0 +1,317 @@
+"""
+Serialization Benchmarks for the Largest API Payloads
+
+Compares FastAPI's default response path (response_model validation,
+jsonable_encoder, stdlib json) with the orjson fast path
+(src/utils/fast_json.py) on synthetic payloads shaped like the ten largest
+endpoints. Payload sizes match a large real device (several hundred
+parameters, big EDS files).
+
+Usage:
+    python scripts/benchmark_serialization.py [--repeat 20] [--scale 1.0]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, TypeAdapter
+
+from src.utils.fast_json import FRAGMENT_AVAILABLE, ORJSON_AVAILABLE, dumps, raw_json
+
+
+# Mirrors of the src/api.py response models (importing src.api would start
+# the whole application)
+class ParameterInfo(BaseModel):
+    index: int
+    name: str
+    data_type: str
+    access_rights: str
+    default_value: Optional[str] = None
+    min_value: Optional[str] = None
+    max_value: Optional[str] = None
+    unit: Optional[str] = None
+    description: Optional[str] = None
+    enumeration_values: Optional[Dict[str, str]] = None
+    bit_length: Optional[int] = None
+    dynamic: Optional[bool] = False
+    excluded_from_data_storage: Optional[bool] = False
+    modifies_other_variables: Optional[bool] = False
+    unit_code: Optional[str] = None
+    value_range_name: Optional[str] = None
+
+
+class SingleValueModel(BaseModel):
+    value: str
+    name: str
+    description: Optional[str] = None
+
+
+class RecordItemInfo(BaseModel):
+    subindex: int
+    name: str
+    bit_offset: int
+    bit_length: int
+    data_type: str
+    default_value: Optional[str] = None
+    single_values: List[SingleValueModel] = []
+
+
+class ProcessDataInfo(BaseModel):
+    id: int
+    pd_id: str
+    name: str
+    direction: str
+    bit_length: int
+    data_type: str
+    description: Optional[str] = None
+    record_items: List[RecordItemInfo] = []
+
+
+class DeviceInfo(BaseModel):
+    id: int
+    vendor_id: int
+    device_id: int
+    product_name: str
+    manufacturer: str
+    iodd_version: str
+    import_date: datetime
+    parameter_count: Optional[int] = 0
+
+
+# ============================================================================
+# Synthetic payloads
+# ============================================================================
+
+def _enum_json(i: int) -> Optional[str]:
+    if i % 3:
+        return None
+    return json.dumps({str(v): f"Option {v} for parameter {i}" for v in range(12)}, separators=(",", ":"))
+
+
+def parameter_rows(n: int) -> List[Dict[str, Any]]:
+    """Rows as returned by storage.get_device()['parameters']"""
+    return [
+        {
+            'param_index': i, 'name': f"Parameter {i}", 'data_type': 'UIntegerT',
+            'access_rights': 'rw', 'default_value': '0', 'min_value': '0', 'max_value': '65535',
+            'unit': 'ms', 'description': f"Description of parameter {i} " * 4,
+            'enumeration_values': _enum_json(i), 'bit_length': 16, 'dynamic': 0,
+            'excluded_from_data_storage': 0, 'modifies_other_variables': 0,
+            'unit_code': '1056', 'value_range_name': None,
+        }
+        for i in range(n)
+    ]
+
+
+def parameters_fast(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            'index': p['param_index'], 'name': p['name'], 'data_type': p['data_type'],
+            'access_rights': p['access_rights'], 'default_value': p['default_value'],
+            'min_value': p['min_value'], 'max_value': p['max_value'], 'unit': p['unit'],
+            'description': p['description'],
+            'enumeration_values': raw_json(p.get('enumeration_values')),
+            'bit_length': p.get('bit_length'), 'dynamic': bool(p.get('dynamic', 0)),
+            'excluded_from_data_storage': bool(p.get('excluded_from_data_storage', 0)),
+            'modifies_other_variables': bool(p.get('modifies_other_variables', 0)),
+            'unit_code': p.get('unit_code'), 'value_range_name': p.get('value_range_name'),
+        }
+        for p in rows
+    ]
+
+
+def parameters_models(rows: List[Dict[str, Any]]) -> List[ParameterInfo]:
+    return [
+        ParameterInfo(
+            index=p['param_index'], name=p['name'], data_type=p['data_type'],
+            access_rights=p['access_rights'], default_value=p['default_value'],
+            min_value=p['min_value'], max_value=p['max_value'], unit=p['unit'],
+            description=p['description'],
+            enumeration_values=json.loads(p['enumeration_values']) if p.get('enumeration_values') else None,
+            bit_length=p.get('bit_length'), dynamic=bool(p.get('dynamic', 0)),
+            excluded_from_data_storage=bool(p.get('excluded_from_data_storage', 0)),
+            modifies_other_variables=bool(p.get('modifies_other_variables', 0)),
+            unit_code=p.get('unit_code'), value_range_name=p.get('value_range_name'),
+        )
+        for p in rows
+    ]
+
+
+def process_data(n: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            'id': i, 'pd_id': f"PD_{i}", 'name': f"Process data {i}",
+            'direction': 'input' if i % 2 else 'output', 'bit_length': 128, 'data_type': 'RecordT',
+            'description': f"Process data record {i}",
+            'record_items': [
+                {
+                    'subindex': s, 'name': f"Item {s}", 'bit_offset': s * 8, 'bit_length': 8,
+                    'data_type': 'UIntegerT', 'default_value': None,
+                    'single_values': [
+                        {'value': str(v), 'name': f"State {v}", 'description': None} for v in range(4)
+                    ],
+                }
+                for s in range(16)
+            ],
+        }
+        for i in range(n)
+    ]
+
+
+def menu_tree(menus: int, items: int, with_parameters: bool) -> Dict[str, Any]:
+    def parameter(i: int) -> Dict[str, Any]:
+        return {
+            'id': i, 'name': f"Parameter {i}", 'data_type': 'UIntegerT', 'access_rights': 'rw',
+            'default_value': '0', 'min_value': '0', 'max_value': '255', 'unit': None,
+            'description': f"Parameter {i} " * 6,
+            'enumeration_values': {str(v): f"Option {v}" for v in range(8)}, 'bit_length': 8,
+        }
+
+    return {
+        'menus': [
+            {
+                'id': f"M_{m}", 'name': f"Menu {m}",
+                'items': [
+                    {
+                        'variable_id': f"V_{m}_{i}", 'record_item_ref': None, 'subindex': None,
+                        'access_right_restriction': None, 'display_format': 'Dec', 'unit_code': None,
+                        'button_value': None, 'menu_ref': None,
+                        'parameter': parameter(m * items + i) if with_parameters else None,
+                    }
+                    for i in range(items)
+                ],
+            }
+            for m in range(menus)
+        ],
+        'role_mappings': {'observer': {'main': 'M_0'}, 'maintenance': {'main': 'M_1'}, 'specialist': {'main': 'M_2'}},
+    }
+
+
+def device_detail(n: int) -> Dict[str, Any]:
+    return {
+        'id': 1, 'vendor_id': 310, 'device_id': 1234, 'product_name': 'Large Sensor',
+        'manufacturer': 'ACME', 'iodd_version': '1.1', 'import_date': datetime(2025, 1, 1),
+        'parameters': parameter_rows(n),
+    }
+
+
+def eds_file(content_kb: int, parameters: int) -> Dict[str, Any]:
+    return {
+        'id': 1, 'vendor_code': 1, 'vendor_name': 'ACME', 'product_name': 'Large Drive',
+        'catalog_number': 'ABC-123', 'major_revision': 1, 'minor_revision': 2,
+        'description': 'EDS file ' * 20,
+        'parameters': [
+            {'param_number': i, 'param_name': f"Param {i}", 'data_type': 'UINT', 'units': 'ms',
+             'help_string_1': f"Help {i} " * 5, 'enum_values': None}
+            for i in range(parameters)
+        ],
+        'connections': [{'connection_number': i, 'connection_name': f"Conn {i}"} for i in range(20)],
+        'eds_content': ('$ EDS line with key = value; "quoted text" and more\n' * (content_kb * 20)),
+    }
+
+
+def eds_assemblies(n: int) -> Dict[str, Any]:
+    return {
+        'fixed_assemblies': [
+            {'id': i, 'assembly_number': 100 + i, 'assembly_name': f"Assembly {i}", 'size': 64,
+             'path': '20 04 24 64 30 03', 'help_string': f"Help text {i} " * 4,
+             'members': [{'name': f"Member {m}", 'size': 16} for m in range(16)]}
+            for i in range(n)
+        ],
+        'variable_assemblies': [],
+    }
+
+
+def search_results(per_category: int) -> Dict[str, Any]:
+    return {
+        'query': 'sensor',
+        'eds_devices': [{'id': i, 'vendor_name': 'ACME', 'product_name': f"Sensor {i}",
+                         'description': 'Sensor ' * 10, 'device_type': 'EDS'} for i in range(per_category)],
+        'iodd_devices': [{'id': i, 'vendor_name': 'ACME', 'product_name': f"Sensor {i}",
+                          'description': 'Sensor ' * 10, 'device_type': 'IODD'} for i in range(per_category)],
+        'parameters': [{'id': i, 'param_name': f"Sensor param {i}", 'description': 'Param ' * 10,
+                        'device_name': f"Sensor {i}"} for i in range(per_category)],
+        'total_results': per_category * 3, 'has_more': False, 'next_cursor': None,
+    }
+
+
+def device_list(n: int) -> List[Dict[str, Any]]:
+    return [
+        {'id': i, 'vendor_id': 310, 'device_id': i, 'product_name': f"Device {i}",
+         'manufacturer': 'ACME', 'iodd_version': '1.1', 'import_date': datetime(2025, 1, 1), 'parameter_count': 0}
+        for i in range(n)
+    ]
+
+
+# ============================================================================
+# Benchmark runner
+# ============================================================================
+
+def default_path(payload: Any, adapter: Optional[TypeAdapter] = None) -> bytes:
+    """FastAPI default: validate against response_model, jsonable_encoder, stdlib json"""
+    if adapter is not None:
+        payload = adapter.dump_python(adapter.validate_python(payload), mode="json")
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def build_cases(scale: float) -> List[Tuple[str, Callable[[], bytes], Callable[[], bytes]]]:
+    def n(value: int) -> int:
+        return max(1, int(value * scale))
+
+    param_rows = parameter_rows(n(800))
+    pd = process_data(n(40))
+    menus = menu_tree(n(30), 25, with_parameters=False)
+    schema = menu_tree(n(30), 25, with_parameters=True)
+    detail = device_detail(n(800))
+    eds = eds_file(n(400), n(600))
+    assemblies = eds_assemblies(n(200))
+    search = search_results(n(500))
+    devices = device_list(n(5000))
+    custom = {'datatypes': process_data(n(60))}
+
+    pd_adapter = TypeAdapter(List[ProcessDataInfo])
+    device_adapter = TypeAdapter(List[DeviceInfo])
+
+    return [
+        ("GET /api/iodd/{id}/parameters",
+         lambda: default_path(parameters_models(param_rows), TypeAdapter(List[ParameterInfo])),
+         lambda: dumps(parameters_fast(param_rows))),
+        ("GET /api/iodd/{id}", lambda: default_path(detail), lambda: dumps(detail)),
+        ("GET /api/iodd/{id}/processdata", lambda: default_path(pd, pd_adapter), lambda: dumps(pd)),
+        ("GET /api/iodd/{id}/menus", lambda: default_path(menus), lambda: dumps(menus)),
+        ("GET /api/iodd/{id}/config-schema", lambda: default_path(schema), lambda: dumps(schema)),
+        ("GET /api/iodd/{id}/custom-datatypes", lambda: default_path(custom), lambda: dumps(custom)),
+        ("GET /api/eds/{id}", lambda: default_path(eds), lambda: dumps(eds)),
+        ("GET /api/eds/{id}/assemblies", lambda: default_path(assemblies), lambda: dumps(assemblies)),
+        ("GET /api/search", lambda: default_path(search), lambda: dumps(search)),
+        ("GET /api/iodd", lambda: default_path(devices, device_adapter), lambda: dumps(devices)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API response serialization")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per case")
+    parser.add_argument("--scale", type=float, default=1.0, help="Payload size multiplier")
+    args = parser.parse_args()
+
+    print(f"orjson: {'yes' if ORJSON_AVAILABLE else 'no'}, "
+          f"Fragment: {'yes' if FRAGMENT_AVAILABLE else 'no'}, repeat={args.repeat}, scale={args.scale}")
+    print(f"{'Endpoint':<38} {'Size':>10} {'Default ms':>11} {'Fast ms':>9} {'Speedup':>8}")
+
+    for name, default, fast in build_cases(args.scale):
+        size = len(fast())
+        default_ms = min(timeit.repeat(default, number=1, repeat=args.repeat)) * 1000
+        fast_ms = min(timeit.repeat(fast, number=1, repeat=args.repeat)) * 1000
+        print(f"{name:<38} {size / 1024:>8.0f}KB {default_ms:>11.2f} {fast_ms:>9.2f} {default_ms / fast_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
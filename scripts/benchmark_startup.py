@@ -0,0 +1,148 @@
+"""
+API Cold-Start Benchmark
+
+Measures how long a fresh process takes to import src.api (and optionally to
+answer /api/health/ready under uvicorn), prints the slowest imports from
+``python -X importtime`` and checks that optional subsystems stay unloaded
+until used.
+
+Each run uses a fresh interpreter in an empty working directory, so the
+numbers include creating the SQLite schema.
+
+Usage:
+    python scripts/benchmark_startup.py [--runs 5] [--top 25] [--ready]
+    python scripts/benchmark_startup.py --budget 2.5   # exit 1 on regression
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Imported on first use only; loading any of them at startup is a regression
+DEFERRED_MODULES = (
+    "sqlalchemy",
+    "pyarrow",
+    "sentry_sdk",
+    "opentelemetry.exporter",
+    "opentelemetry.instrumentation",
+    "paho.mqtt",
+    "psutil",
+    "redis",
+)
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+    for name in ("OTEL_ENABLED", "SENTRY_DSN"):
+        env.pop(name, None)
+    return env
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self us, cumulative us) per line of -X importtime output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            modules.append((name.rstrip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return modules
+
+
+def time_import(workdir: str) -> Tuple[float, List[Tuple[str, int, int]]]:
+    """Wall time of ``import src.api`` in a fresh interpreter, with its import profile"""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.api"],
+        cwd=workdir, env=_env(), capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        sys.exit(f"import src.api failed:\n{proc.stderr[-2000:]}")
+    return elapsed, parse_importtime(proc.stderr)
+
+
+def time_ready(workdir: str, timeout: float = 60) -> float:
+    """Seconds from launching uvicorn until /api/health/ready answers 200"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api:app", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health/ready", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.05)
+        sys.exit(f"API not ready after {timeout}s")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API cold start")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time")
+    parser.add_argument("--top", type=int, default=25, help="Slowest imports to list")
+    parser.add_argument("--ready", action="store_true", help="Also time uvicorn start to /api/health/ready")
+    parser.add_argument("--budget", type=float, help="Fail if the median import time exceeds this (seconds)")
+    args = parser.parse_args()
+
+    timings = []
+    profile: List[Tuple[str, int, int]] = []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as workdir:
+            elapsed, profile = time_import(workdir)
+            timings.append(elapsed)
+
+    median = statistics.median(timings)
+    print(f"import src.api: median {median:.3f}s, min {min(timings):.3f}s over {args.runs} runs")
+
+    if args.ready:
+        with tempfile.TemporaryDirectory() as workdir:
+            print(f"uvicorn start -> /api/health/ready: {time_ready(workdir):.3f}s")
+
+    print("\nSlowest imports (cumulative, last run):")
+    print(f"{'Module':<60} {'Self ms':>9} {'Total ms':>9}")
+    for name, self_us, cumulative_us in sorted(profile, key=lambda m: -m[2])[:args.top]:
+        print(f"{name:<60} {self_us / 1000:>9.1f} {cumulative_us / 1000:>9.1f}")
+
+    loaded = {name.strip() for name, _, _ in profile}
+    eager = sorted(
+        name for name in loaded
+        if any(name == deferred or name.startswith(deferred + ".") for deferred in DEFERRED_MODULES)
+    )
+    failed = False
+    if eager:
+        roots = sorted({next(d for d in DEFERRED_MODULES if n == d or n.startswith(d + ".")) for n in eager})
+        print(f"\nFAIL: deferred subsystems imported at startup: {', '.join(roots)}")
+        failed = True
+    if args.budget is not None and median > args.budget:
+        print(f"\nFAIL: median import time {median:.3f}s exceeds budget {args.budget:.3f}s")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
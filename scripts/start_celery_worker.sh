@@ -1,15 +1,35 @@
 #!/bin/bash
 # Start Celery worker for GreenStack background tasks
+#
+# Usage: scripts/start_celery_worker.sh [interactive|bulk|dlq|all]
+#
+# Run one worker per profile to keep interactive uploads isolated from
+# PQA runs and large exports (see WORKER_PROFILES in src/celery_app.py).
 
-echo "Starting Celery worker..."
+PROFILE="${1:-${CELERY_WORKER_PROFILE:-all}}"
+
+case "$PROFILE" in
+    interactive) QUEUES="ingest,default" ;;
+    bulk)        QUEUES="generation,export,pqa" ;;
+    dlq)         QUEUES="celery_dlq" ;;
+    all)         QUEUES="ingest,default,generation,export,pqa,celery_dlq" ;;
+    *)
+        echo "Unknown worker profile: $PROFILE (expected interactive, bulk, dlq or all)"
+        exit 1
+        ;;
+esac
+
+echo "Starting Celery worker (profile: $PROFILE, queues: $QUEUES)..."
 
 # Set environment
 export PYTHONPATH="${PYTHONPATH}:$(pwd)"
+# Selects prefetch multiplier and acks_late in src/celery_app.py
+export CELERY_WORKER_PROFILE="$PROFILE"
 
 # Start Celery worker with:
 # - Loglevel: info
 # - Concurrency: 4 workers
-# - Queue: default (can be changed)
+# - Queues: selected by profile
 # - Autoscale: min 2, max 8 workers
 celery -A src.celery_app worker \
     --loglevel=info \
@@ -18,7 +38,8 @@ celery -A src.celery_app worker \
     --max-tasks-per-child=1000 \
     --time-limit=600 \
     --soft-time-limit=300 \
-    --queues=default,celery_dlq
+    --hostname="${PROFILE}@%h" \
+    --queues="$QUEUES"
 
 # Alternative: Start with beat scheduler for periodic tasks
 # celery -A src.celery_app worker --beat --loglevel=info
@@ -7,7 +7,8 @@ from .circuit_breaker import (
     CircuitState,
     get_circuit_breaker,
     get_all_circuit_breakers,
-    get_all_stats
+    get_all_stats,
+    register_prometheus_collector
 )
 
 __all__ = [
@@ -17,4 +18,5 @@ __all__ = [
     'get_circuit_breaker',
     'get_all_circuit_breakers',
     'get_all_stats',
+    'register_prometheus_collector',
 ]
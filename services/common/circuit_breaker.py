@@ -4,6 +4,7 @@ Prevents cascading failures by failing fast when a service is unavailable
 """
 import time
 import logging
+from bisect import bisect_left
 from enum import Enum
 from typing import Callable, Any, Optional
 from functools import wraps
@@ -12,6 +13,19 @@ from threading import Lock
 
 logger = logging.getLogger(__name__)
 
+# Prometheus is optional - breakers keep their own counters and are exported
+# through a collector at scrape time, so the hot path never touches it
+try:
+    from prometheus_client import REGISTRY
+    from prometheus_client.core import (
+        CounterMetricFamily,
+        GaugeMetricFamily,
+        HistogramMetricFamily,
+    )
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
 
 class CircuitState(Enum):
     """Circuit breaker states"""
@@ -20,19 +34,80 @@ class CircuitState(Enum):
     HALF_OPEN = "half_open"  # Testing if service recovered
 
 
+_STATE_VALUES = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+# Call latency histogram buckets (seconds)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
 @dataclass
 class CircuitBreakerConfig:
     """Circuit breaker configuration"""
-    failure_threshold: int = 5          # Failures before opening circuit
+    failure_threshold: int = 5          # Consecutive failures before opening circuit
     success_threshold: int = 2          # Successes in half-open to close
     timeout: float = 60.0               # Seconds to wait before half-open
     expected_exception: type = Exception  # Exception type to catch
+    failure_rate_threshold: Optional[float] = None  # Failure ratio (0-1) in the window that opens the circuit
+    window_seconds: float = 60.0        # Sliding window length for failure-rate tripping
+    minimum_calls: int = 20             # Calls required in the window before the rate is evaluated
+    window_buckets: int = 10            # Window resolution
+
+
+class SlidingWindow:
+    """
+    Time-bucketed success/failure counts over the last ``window_seconds``.
+
+    Each bucket is ``[epoch, successes, failures]``; a bucket whose epoch is
+    stale is reset on first use. Success increments happen without a lock and
+    may under-count slightly under heavy contention, which is acceptable for
+    a failure *rate*.
+    """
+
+    def __init__(self, window_seconds: float, buckets: int):
+        self.width = window_seconds / buckets
+        self.buckets = [[-1, 0, 0] for _ in range(buckets)]
+
+    def _bucket(self, now: float) -> list:
+        epoch = int(now / self.width)
+        bucket = self.buckets[epoch % len(self.buckets)]
+        if bucket[0] != epoch:
+            bucket[0], bucket[1], bucket[2] = epoch, 0, 0
+        return bucket
+
+    def record_success(self, now: float):
+        self._bucket(now)[1] += 1
+
+    def record_failure(self, now: float):
+        self._bucket(now)[2] += 1
+
+    def totals(self, now: float) -> tuple:
+        """Return (calls, failures) in the window"""
+        oldest = int(now / self.width) - len(self.buckets) + 1
+        calls = failures = 0
+        for epoch, ok, failed in self.buckets:
+            if epoch >= oldest:
+                calls += ok + failed
+                failures += failed
+        return calls, failures
+
+    def clear(self):
+        for bucket in self.buckets:
+            bucket[0], bucket[1], bucket[2] = -1, 0, 0
 
 
 class CircuitBreaker:
     """
     Circuit Breaker implementation for protecting against cascading failures.
 
+    While CLOSED with no outstanding failures, ``call`` takes no lock at all:
+    the state is read as a plain attribute and success bookkeeping is a few
+    integer increments. The lock is only taken on failures and in the
+    OPEN/HALF_OPEN states.
+
+    The circuit opens after ``failure_threshold`` consecutive failures, or -
+    if ``failure_rate_threshold`` is set - when the failure ratio over the
+    sliding window exceeds it (after at least ``minimum_calls`` calls).
+
     Usage:
         breaker = CircuitBreaker(name="redis", failure_threshold=3, timeout=30)
 
@@ -47,14 +122,22 @@ class CircuitBreaker:
         failure_threshold: int = 5,
         success_threshold: int = 2,
         timeout: float = 60.0,
-        expected_exception: type = Exception
+        expected_exception: type = Exception,
+        failure_rate_threshold: Optional[float] = None,
+        window_seconds: float = 60.0,
+        minimum_calls: int = 20,
+        window_buckets: int = 10
     ):
         self.name = name
         self.config = CircuitBreakerConfig(
             failure_threshold=failure_threshold,
             success_threshold=success_threshold,
             timeout=timeout,
-            expected_exception=expected_exception
+            expected_exception=expected_exception,
+            failure_rate_threshold=failure_rate_threshold,
+            window_seconds=window_seconds,
+            minimum_calls=minimum_calls,
+            window_buckets=window_buckets
         )
 
         self._state = CircuitState.CLOSED
@@ -62,10 +145,20 @@ class CircuitBreaker:
         self._success_count = 0
         self._last_failure_time: Optional[float] = None
         self._lock = Lock()
+        self._window = SlidingWindow(window_seconds, window_buckets)
+
+        # Metrics (exported by CircuitBreakerCollector)
+        self.calls_succeeded = 0
+        self.calls_failed = 0
+        self.calls_rejected = 0
+        self.transitions: dict[tuple[str, str], int] = {}
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
 
         logger.info(
             f"Circuit breaker '{name}' initialized: "
             f"failure_threshold={failure_threshold}, timeout={timeout}s"
+            + (f", failure_rate_threshold={failure_rate_threshold}" if failure_rate_threshold else "")
         )
 
     @property
@@ -79,15 +172,31 @@ class CircuitBreaker:
                 and time.time() - self._last_failure_time >= self.config.timeout
             ):
                 logger.info(f"Circuit '{self.name}' transitioning OPEN → HALF_OPEN (timeout expired)")
-                self._state = CircuitState.HALF_OPEN
+                self._transition(CircuitState.HALF_OPEN)
                 self._success_count = 0
 
             return self._state
 
-    def _on_success(self):
+    def _transition(self, new_state: CircuitState):
+        """Record a state change (caller holds the lock)"""
+        key = (self._state.value, new_state.value)
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        self._state = new_state
+
+    def _observe_latency(self, seconds: float):
+        self.latency_buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.latency_sum += seconds
+
+    def _on_success(self, now: float):
         """Handle successful operation"""
+        # Fast path: healthy circuit, nothing to reset
+        if self._state is CircuitState.CLOSED and self._failure_count == 0:
+            self._window.record_success(now)
+            return
+
         with self._lock:
             self._failure_count = 0
+            self._window.record_success(now)
 
             if self._state == CircuitState.HALF_OPEN:
                 self._success_count += 1
@@ -98,20 +207,22 @@ class CircuitBreaker:
 
                 if self._success_count >= self.config.success_threshold:
                     logger.info(f"Circuit '{self.name}' transitioning HALF_OPEN → CLOSED (recovered)")
-                    self._state = CircuitState.CLOSED
+                    self._transition(CircuitState.CLOSED)
                     self._success_count = 0
+                    self._window.clear()
 
-    def _on_failure(self, exception: Exception):
+    def _on_failure(self, exception: Exception, now: float):
         """Handle failed operation"""
         with self._lock:
             self._failure_count += 1
             self._last_failure_time = time.time()
+            self._window.record_failure(now)
 
             if self._state == CircuitState.HALF_OPEN:
                 logger.warning(
                     f"Circuit '{self.name}' failed in HALF_OPEN, transitioning → OPEN: {exception}"
                 )
-                self._state = CircuitState.OPEN
+                self._transition(CircuitState.OPEN)
                 self._success_count = 0
                 self._failure_count = 0
 
@@ -126,7 +237,20 @@ class CircuitBreaker:
                         f"Circuit '{self.name}' transitioning CLOSED → OPEN "
                         f"(threshold reached: {self._failure_count} failures)"
                     )
-                    self._state = CircuitState.OPEN
+                    self._transition(CircuitState.OPEN)
+                    return
+
+                if self.config.failure_rate_threshold is not None:
+                    calls, failures = self._window.totals(now)
+                    if (
+                        calls >= self.config.minimum_calls
+                        and failures / calls >= self.config.failure_rate_threshold
+                    ):
+                        logger.error(
+                            f"Circuit '{self.name}' transitioning CLOSED → OPEN "
+                            f"(failure rate {failures}/{calls} over {self.config.window_seconds}s)"
+                        )
+                        self._transition(CircuitState.OPEN)
 
     def __call__(self, func: Callable) -> Callable:
         """Decorator for protecting function calls"""
@@ -142,44 +266,67 @@ class CircuitBreaker:
         Raises:
             CircuitBreakerOpenException: If circuit is open
         """
-        current_state = self.state  # This may trigger OPEN → HALF_OPEN transition
-
-        if current_state == CircuitState.OPEN:
-            raise CircuitBreakerOpenException(
-                f"Circuit breaker '{self.name}' is OPEN (service unavailable)"
-            )
+        # Only leave the lock-free path when the circuit isn't CLOSED
+        if self._state is not CircuitState.CLOSED:
+            if self.state == CircuitState.OPEN:  # May trigger OPEN → HALF_OPEN transition
+                self.calls_rejected += 1
+                raise CircuitBreakerOpenException(
+                    f"Circuit breaker '{self.name}' is OPEN (service unavailable)"
+                )
 
+        start = time.perf_counter()
         try:
             result = func(*args, **kwargs)
-            self._on_success()
-            return result
-
         except self.config.expected_exception as e:
-            self._on_failure(e)
+            end = time.perf_counter()
+            self.calls_failed += 1
+            self._observe_latency(end - start)
+            self._on_failure(e, end)
             raise
 
+        end = time.perf_counter()
+        self.calls_succeeded += 1
+        self._observe_latency(end - start)
+        self._on_success(end)
+        return result
+
     def reset(self):
         """Manually reset circuit breaker to CLOSED state"""
         with self._lock:
             logger.info(f"Circuit '{self.name}' manually reset to CLOSED")
-            self._state = CircuitState.CLOSED
+            if self._state != CircuitState.CLOSED:
+                self._transition(CircuitState.CLOSED)
             self._failure_count = 0
             self._success_count = 0
             self._last_failure_time = None
+            self._window.clear()
 
     def get_stats(self) -> dict:
         """Get circuit breaker statistics"""
         with self._lock:
+            window_calls, window_failures = self._window.totals(time.perf_counter())
             return {
                 "name": self.name,
                 "state": self._state.value,
                 "failure_count": self._failure_count,
                 "success_count": self._success_count,
                 "last_failure_time": self._last_failure_time,
+                "window": {
+                    "calls": window_calls,
+                    "failures": window_failures,
+                },
+                "calls": {
+                    "succeeded": self.calls_succeeded,
+                    "failed": self.calls_failed,
+                    "rejected": self.calls_rejected,
+                },
                 "config": {
                     "failure_threshold": self.config.failure_threshold,
                     "success_threshold": self.config.success_threshold,
                     "timeout": self.config.timeout,
+                    "failure_rate_threshold": self.config.failure_rate_threshold,
+                    "window_seconds": self.config.window_seconds,
+                    "minimum_calls": self.config.minimum_calls,
                 }
             }
 
@@ -198,7 +345,10 @@ def get_circuit_breaker(
     failure_threshold: int = 5,
     success_threshold: int = 2,
     timeout: float = 60.0,
-    expected_exception: type = Exception
+    expected_exception: type = Exception,
+    failure_rate_threshold: Optional[float] = None,
+    window_seconds: float = 60.0,
+    minimum_calls: int = 20
 ) -> CircuitBreaker:
     """
     Get or create a circuit breaker by name.
@@ -210,7 +360,10 @@ def get_circuit_breaker(
             failure_threshold=failure_threshold,
             success_threshold=success_threshold,
             timeout=timeout,
-            expected_exception=expected_exception
+            expected_exception=expected_exception,
+            failure_rate_threshold=failure_rate_threshold,
+            window_seconds=window_seconds,
+            minimum_calls=minimum_calls
         )
 
     return _circuit_breakers[name]
@@ -224,3 +377,70 @@ def get_all_circuit_breakers() -> dict[str, CircuitBreaker]:
 def get_all_stats() -> list[dict]:
     """Get statistics for all circuit breakers"""
     return [breaker.get_stats() for breaker in _circuit_breakers.values()]
+
+
+# ============================================================================
+# Prometheus Export
+# ============================================================================
+
+class CircuitBreakerCollector:
+    """Prometheus collector reading every breaker from get_all_circuit_breakers() at scrape time"""
+
+    def collect(self):
+        breakers = get_all_circuit_breakers().values()
+
+        state = GaugeMetricFamily(
+            'circuit_breaker_state',
+            'Circuit breaker state (0=closed, 1=half_open, 2=open)',
+            labels=['name']
+        )
+        calls = CounterMetricFamily(
+            'circuit_breaker_calls',
+            'Calls through the circuit breaker by result',
+            labels=['name', 'result']
+        )
+        transitions = CounterMetricFamily(
+            'circuit_breaker_state_transitions',
+            'Circuit breaker state transitions',
+            labels=['name', 'from_state', 'to_state']
+        )
+        latency = HistogramMetricFamily(
+            'circuit_breaker_call_duration_seconds',
+            'Latency of calls through the circuit breaker',
+            labels=['name']
+        )
+
+        for breaker in breakers:
+            state.add_metric([breaker.name], _STATE_VALUES[breaker._state])
+            calls.add_metric([breaker.name, 'success'], breaker.calls_succeeded)
+            calls.add_metric([breaker.name, 'failure'], breaker.calls_failed)
+            calls.add_metric([breaker.name, 'rejected'], breaker.calls_rejected)
+            for (from_state, to_state), count in list(breaker.transitions.items()):
+                transitions.add_metric([breaker.name, from_state, to_state], count)
+
+            cumulative = 0
+            buckets = []
+            for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), breaker.latency_buckets):
+                cumulative += count
+                buckets.append(('+Inf' if bound == float('inf') else str(bound), cumulative))
+            latency.add_metric([breaker.name], buckets, breaker.latency_sum)
+
+        yield state
+        yield calls
+        yield transitions
+        yield latency
+
+
+_collector_registered = False
+
+
+def register_prometheus_collector(registry=None) -> bool:
+    """Register the circuit breaker collector (once). Returns False if prometheus_client is missing."""
+    global _collector_registered
+
+    if not PROMETHEUS_AVAILABLE:
+        return False
+    if not _collector_registered:
+        (registry or REGISTRY).register(CircuitBreakerCollector())
+        _collector_registered = True
+    return True
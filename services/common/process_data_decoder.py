@@ -0,0 +1,411 @@
+"""
+IODD-aware Process Data Decoder
+Compiles ProcessData / RecordItem definitions into a precomputed unpack plan
+and decodes batches of raw IO-Link process data frames with NumPy
+"""
+import time
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FramesInput = Union[bytes, bytearray, memoryview, Sequence[bytes], np.ndarray]
+
+# IODD datatype → decode kind
+_KINDS = {
+    'BooleanT': 'bool',
+    'UIntegerT': 'uint',
+    'IntegerT': 'int',
+    'Float32T': 'float',
+    'StringT': 'string',
+    'OctetStringT': 'bytes',
+    'TimeT': 'uint',
+    'TimeSpanT': 'uint',
+}
+
+# Byte-aligned fields of these widths are decoded with a zero-copy dtype view
+_ALIGNED_DTYPES = {
+    ('uint', 8): '>u1', ('uint', 16): '>u2', ('uint', 32): '>u4', ('uint', 64): '>u8',
+    ('int', 8): '>i1', ('int', 16): '>i2', ('int', 32): '>i4', ('int', 64): '>i8',
+    ('float', 32): '>f4',
+}
+
+_U8 = np.uint64(8)
+
+
+@dataclass(frozen=True)
+class FieldPlan:
+    """Precomputed extraction step for one record item"""
+    name: str
+    subindex: Optional[int]
+    data_type: str
+    kind: str
+    bit_offset: int
+    bit_length: int
+    byte_start: int          # First frame byte covering the field (inclusive)
+    byte_end: int            # Last frame byte covering the field (exclusive)
+    shift: int               # Right shift applied to the big-endian byte span
+    view_dtype: Optional[str] = None  # Set when the field can be read as a dtype view
+
+    @property
+    def vectorized(self) -> bool:
+        """Whether the field fits the uint64 accumulator path"""
+        return self.kind in ('bool', 'uint', 'int', 'float') and self.byte_end - self.byte_start <= 8
+
+
+@dataclass
+class DecodePlan:
+    """Compiled decoder for one ProcessData definition (device + direction + variant)"""
+    pd_id: Optional[str]
+    name: Optional[str]
+    direction: str
+    bit_length: int
+    frame_bytes: int
+    fields: List[FieldPlan] = field(default_factory=list)
+
+    def to_frames(self, frames: FramesInput) -> np.ndarray:
+        """Normalize input into an (N, frame_bytes) uint8 array"""
+        if isinstance(frames, np.ndarray):
+            arr = frames.astype(np.uint8, copy=False)
+            if arr.ndim == 1:
+                arr = arr.reshape(-1, self.frame_bytes) if arr.size % self.frame_bytes == 0 else arr
+        else:
+            if not isinstance(frames, (bytes, bytearray, memoryview)):
+                frames = b''.join(frames)
+            arr = np.frombuffer(frames, dtype=np.uint8)
+            if self.frame_bytes and arr.size % self.frame_bytes == 0:
+                arr = arr.reshape(-1, self.frame_bytes)
+
+        if arr.ndim != 2 or arr.shape[1] != self.frame_bytes:
+            raise ValueError(
+                f"Process data '{self.pd_id}' expects frames of {self.frame_bytes} bytes, "
+                f"got {arr.size} bytes"
+            )
+        return arr
+
+    def decode(self, frames: FramesInput) -> Dict[str, np.ndarray]:
+        """
+        Decode a batch of frames into named field arrays (one entry per frame).
+
+        Numeric fields come back as NumPy arrays; StringT/OctetStringT fields as
+        object arrays of str/bytes.
+        """
+        arr = self.to_frames(frames)
+        return {fp.name: _decode_field(arr, fp) for fp in self.fields}
+
+    def decode_records(self, frames: FramesInput) -> List[Dict[str, Any]]:
+        """Decode frames into one plain dict per frame"""
+        columns = self.decode(frames)
+        count = len(next(iter(columns.values()))) if columns else 0
+        return [{name: values[i].item() if hasattr(values[i], 'item') else values[i]
+                 for name, values in columns.items()} for i in range(count)]
+
+
+# ============================================================================
+# Plan Compilation
+# ============================================================================
+
+def _compile_field(name: str, subindex: Optional[int], data_type: Optional[str],
+                   bit_offset: int, bit_length: int, frame_bytes: int) -> FieldPlan:
+    kind = _KINDS.get(data_type or '', 'uint')
+    if kind == 'float' and bit_length != 32:
+        kind = 'uint'
+
+    # IO-Link bit offsets count from the LSB of the last octet of the frame
+    byte_end = frame_bytes - bit_offset // 8
+    byte_start = frame_bytes - 1 - (bit_offset + bit_length - 1) // 8
+    if byte_start < 0:
+        raise ValueError(
+            f"Record item '{name}' (offset {bit_offset}, length {bit_length}) "
+            f"exceeds {frame_bytes}-byte frame"
+        )
+    shift = bit_offset % 8
+
+    view_dtype = None
+    if shift == 0 and (byte_end - byte_start) * 8 == bit_length:
+        view_dtype = _ALIGNED_DTYPES.get((kind, bit_length))
+
+    return FieldPlan(
+        name=name,
+        subindex=subindex,
+        data_type=data_type or 'UIntegerT',
+        kind=kind,
+        bit_offset=bit_offset,
+        bit_length=bit_length,
+        byte_start=byte_start,
+        byte_end=byte_end,
+        shift=shift,
+        view_dtype=view_dtype,
+    )
+
+
+def compile_plan(definition: Dict[str, Any]) -> DecodePlan:
+    """
+    Compile a ProcessData definition into a DecodePlan.
+
+    ``definition`` uses the shape returned by ``GET /api/iodd/{id}/processdata``:
+    ``pd_id``, ``name``, ``direction``, ``bit_length``, ``data_type`` and
+    ``record_items`` (each with ``name``, ``subindex``, ``bit_offset``,
+    ``bit_length``, ``data_type``). Process data without record items is
+    decoded as a single field named after the process data itself.
+    """
+    bit_length = int(definition.get('bit_length') or 0)
+    frame_bytes = (bit_length + 7) // 8
+    plan = DecodePlan(
+        pd_id=definition.get('pd_id'),
+        name=definition.get('name'),
+        direction=definition.get('direction') or 'input',
+        bit_length=bit_length,
+        frame_bytes=frame_bytes,
+    )
+
+    items = definition.get('record_items') or []
+    if not items:
+        if definition.get('data_type') != 'RecordT' and bit_length:
+            plan.fields.append(_compile_field(
+                definition.get('name') or definition.get('pd_id') or 'value',
+                None, definition.get('data_type'), 0, bit_length, frame_bytes
+            ))
+        return plan
+
+    seen = set()
+    for item in items:
+        if item.get('bit_offset') is None or not item.get('bit_length'):
+            continue
+        name = item.get('name') or f"subindex_{item.get('subindex')}"
+        if name in seen:
+            name = f"{name}_{item.get('subindex')}"
+        seen.add(name)
+        plan.fields.append(_compile_field(
+            name, item.get('subindex'), item.get('data_type'),
+            int(item['bit_offset']), int(item['bit_length']), frame_bytes
+        ))
+
+    return plan
+
+
+def select_definition(
+    definitions: List[Dict[str, Any]],
+    direction: str = 'input',
+    variant: Optional[str] = None,
+    conditions: Optional[List[Dict[str, Any]]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Pick the ProcessData definition for a direction and (conditional) variant.
+
+    ``conditions`` uses the shape of ``GET /api/iodd/{id}/processdata/conditions``.
+    Without a variant the unconditional definition wins, falling back to the
+    first one for the direction.
+    """
+    candidates = [d for d in definitions if (d.get('direction') or 'input') == direction]
+    if not candidates:
+        return None
+
+    condition_by_pd = {c.get('pd_id'): str(c.get('condition_value')) for c in (conditions or [])}
+    if variant is not None:
+        for d in candidates:
+            if condition_by_pd.get(d.get('pd_id')) == str(variant):
+                return d
+    for d in candidates:
+        if d.get('pd_id') not in condition_by_pd:
+            return d
+    return candidates[0]
+
+
+# ============================================================================
+# Field Decoding
+# ============================================================================
+
+def _decode_field(frames: np.ndarray, fp: FieldPlan) -> np.ndarray:
+    if fp.view_dtype:
+        span = np.ascontiguousarray(frames[:, fp.byte_start:fp.byte_end])
+        return span.view(fp.view_dtype).ravel().astype(fp.view_dtype[1:])
+
+    if not fp.vectorized:
+        return _decode_field_slow(frames, fp)
+
+    acc = np.zeros(frames.shape[0], dtype=np.uint64)
+    for col in range(fp.byte_start, fp.byte_end):
+        acc = (acc << _U8) | frames[:, col].astype(np.uint64)
+    if fp.shift:
+        acc >>= np.uint64(fp.shift)
+    if fp.bit_length < 64:
+        acc &= np.uint64((1 << fp.bit_length) - 1)
+
+    if fp.kind == 'bool':
+        return acc.astype(bool)
+    if fp.kind == 'float':
+        return acc.astype(np.uint32).view(np.float32)
+    if fp.kind == 'int':
+        # Sign-extend: move the sign bit to bit 63, then arithmetic-shift back
+        pad = 64 - fp.bit_length
+        return (acc << np.uint64(pad)).view(np.int64) >> np.int64(pad)
+    return acc
+
+
+def _decode_field_slow(frames: np.ndarray, fp: FieldPlan) -> np.ndarray:
+    """Per-frame fallback for strings, octet strings and >64-bit spans"""
+    mask = (1 << fp.bit_length) - 1
+    out = np.empty(frames.shape[0], dtype=object)
+    for i, row in enumerate(frames[:, fp.byte_start:fp.byte_end]):
+        raw = row.tobytes()
+        if fp.shift or fp.bit_length % 8:
+            value = (int.from_bytes(raw, 'big') >> fp.shift) & mask
+            raw = value.to_bytes((fp.bit_length + 7) // 8, 'big')
+            if fp.kind not in ('string', 'bytes'):
+                out[i] = _python_value(value, fp)
+                continue
+        if fp.kind == 'string':
+            out[i] = raw.rstrip(b'\x00').decode('utf-8', errors='replace')
+        elif fp.kind == 'bytes':
+            out[i] = raw
+        else:
+            out[i] = _python_value(int.from_bytes(raw, 'big'), fp)
+    return out
+
+
+def _python_value(value: int, fp: FieldPlan) -> Any:
+    if fp.kind == 'int' and value >= 1 << (fp.bit_length - 1):
+        return value - (1 << fp.bit_length)
+    if fp.kind == 'bool':
+        return bool(value)
+    return value
+
+
+# ============================================================================
+# Plan Cache
+# ============================================================================
+
+DefinitionLoader = Callable[[Any], Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]
+
+
+class DecoderCache:
+    """
+    LRU cache of compiled plans keyed by (device, direction, variant).
+
+    ``loader(device_id)`` returns ``(definitions, conditions)`` and is called at
+    most once per device per ``ttl`` seconds, so the ingest path never goes
+    back to the catalog for a device it has already seen. Failed loads are
+    cached for ``negative_ttl`` seconds to avoid hammering the source.
+
+    Callers that must not block (e.g. an MQTT network thread) use
+    ``get(..., wait=False)``: a miss schedules the load on a background
+    thread and returns None, and an expired plan keeps being served while
+    it is reloaded.
+    """
+
+    def __init__(self, loader: DefinitionLoader, ttl: float = 3600.0,
+                 negative_ttl: float = 60.0, max_devices: int = 1024, load_workers: int = 2):
+        self._loader = loader
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_devices = max_devices
+        self.load_workers = load_workers
+        self._lock = Lock()
+        # device_id -> (expires_at, definitions, conditions, {(direction, variant): plan})
+        self._devices: "OrderedDict[Any, tuple]" = OrderedDict()
+        # Devices with a background load queued or running
+        self._loading: set = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def get(self, device_id: Any, direction: str = 'input',
+            variant: Optional[str] = None, wait: bool = True) -> Optional[DecodePlan]:
+        """
+        Get (compiling on first use) the plan for a device/direction/variant
+
+        With ``wait=False`` the loader is never called on the calling thread;
+        returns None until a background load has finished.
+        """
+        now = time.monotonic()
+        key = (direction, variant)
+        with self._lock:
+            entry = self._devices.get(device_id)
+            fresh = entry is not None and entry[0] > now
+            if entry and (fresh or not wait):
+                self._devices.move_to_end(device_id)
+                plans = entry[3]
+                if key not in plans:
+                    plans[key] = self._compile(entry[1], entry[2], direction, variant)
+                if fresh:
+                    return plans[key]
+
+        if not wait:
+            # Serve the expired plan (if any) while it is reloaded
+            self.prefetch(device_id)
+            return entry[3][key] if entry else None
+
+        entry = self._load(device_id)
+        with self._lock:
+            plans = entry[3]
+            if key not in plans:
+                plans[key] = self._compile(entry[1], entry[2], direction, variant)
+            return plans[key]
+
+    def prefetch(self, device_id: Any) -> bool:
+        """Load a device's definitions in the background unless cached or already loading"""
+        with self._lock:
+            entry = self._devices.get(device_id)
+            if (entry and entry[0] > time.monotonic()) or device_id in self._loading:
+                return False
+            self._loading.add(device_id)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.load_workers, thread_name_prefix="pd-definitions"
+                )
+            executor = self._executor
+        executor.submit(self._load, device_id)
+        return True
+
+    def is_loading(self, device_id: Any) -> bool:
+        with self._lock:
+            return device_id in self._loading
+
+    def _load(self, device_id: Any) -> tuple:
+        now = time.monotonic()
+        try:
+            definitions, conditions = self._loader(device_id)
+            expires = now + self.ttl
+        except Exception as e:
+            logger.warning(f"Failed to load process data definitions for device {device_id}: {e}")
+            definitions, conditions = [], []
+            expires = now + self.negative_ttl
+
+        with self._lock:
+            self._loading.discard(device_id)
+            entry = self._devices[device_id] = (expires, definitions, conditions, {})
+            self._devices.move_to_end(device_id)
+            while len(self._devices) > self.max_devices:
+                self._devices.popitem(last=False)
+            return entry
+
+    def _compile(self, definitions, conditions, direction, variant) -> Optional[DecodePlan]:
+        definition = select_definition(definitions, direction, variant, conditions)
+        if definition is None:
+            return None
+        try:
+            return compile_plan(definition)
+        except ValueError as e:
+            logger.error(f"Invalid process data definition '{definition.get('pd_id')}': {e}")
+            return None
+
+    def invalidate(self, device_id: Any = None):
+        """Drop cached plans for one device (or all devices)"""
+        with self._lock:
+            if device_id is None:
+                self._devices.clear()
+            else:
+                self._devices.pop(device_id, None)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "devices": len(self._devices),
+                "plans": sum(len(entry[3]) for entry in self._devices.values()),
+                "loading": len(self._loading),
+            }
@@ -0,0 +1,24 @@
+"""
+Telemetry Key Layout
+Redis keys for device telemetry, shared by the IoT services and the API
+
+Layout:
+    telemetry:stream             - Global log of all telemetry (consumer groups read from here)
+    telemetry:{device_id}:stream - Per-device history, queried by time range via stream IDs
+    telemetry:{device_id}:latest - Latest telemetry message of a device
+
+Only the standard library is used, so the API can import the layout without
+the services' dependencies.
+"""
+
+TELEMETRY_STREAM = "telemetry:stream"
+
+
+def device_stream_key(device_id: str) -> str:
+    """Per-device telemetry history stream key"""
+    return f"telemetry:{device_id}:stream"
+
+
+def device_latest_key(device_id: str) -> str:
+    """Latest telemetry message key of a device"""
+    return f"telemetry:{device_id}:latest"
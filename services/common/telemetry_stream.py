@@ -0,0 +1,134 @@
+"""
+Telemetry Stream Helpers
+Redis Streams for device telemetry history and the shared telemetry log
+
+Appends to the global telemetry log and the per-device history streams (key
+layout in telemetry_keys) and reads the log through consumer groups.
+
+Both streams are capped with approximate (``MAXLEN ~``) trimming, which lets
+Redis trim whole macro-nodes instead of doing exact work on every XADD.
+
+Payloads are the device's telemetry plus ``device_id`` and ``timestamp``
+(the bridge's receive time). A timestamp sent by the device is kept as
+``device_timestamp``.
+"""
+import json
+import logging
+import os
+import socket
+from threading import Event
+from typing import Any, Callable, Dict, Optional
+
+import redis
+
+from .telemetry_keys import TELEMETRY_STREAM, device_latest_key, device_stream_key  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_LOG_MAXLEN = int(os.getenv('TELEMETRY_LOG_MAXLEN', '1000000'))
+TELEMETRY_DEVICE_MAXLEN = int(os.getenv('TELEMETRY_DEVICE_MAXLEN', '10000'))
+
+
+def append_telemetry(pipe, device_id: str, data: Dict[str, Any]) -> None:
+    """
+    Queue XADDs for one telemetry message on a Redis pipeline.
+
+    The payload is stored as a single JSON field so entries can be replayed
+    verbatim; the stream ID encodes the receive time in milliseconds.
+    """
+    fields = {"device_id": device_id, "data": json.dumps(data)}
+    pipe.xadd(TELEMETRY_STREAM, fields, maxlen=TELEMETRY_LOG_MAXLEN, approximate=True)
+    pipe.xadd(device_stream_key(device_id), fields, maxlen=TELEMETRY_DEVICE_MAXLEN, approximate=True)
+
+
+def decode_entry(fields: Dict[str, str]) -> tuple:
+    """Decode a stream entry into (device_id, payload)"""
+    return fields.get("device_id"), json.loads(fields.get("data") or "{}")
+
+
+class StreamConsumer:
+    """
+    Consumer-group reader for the shared telemetry log.
+
+    Each service uses its own group so every service sees every message,
+    while multiple replicas of one service share the work. Entries are
+    acknowledged after the handler ran; on restart, entries this consumer
+    had read but not acknowledged are processed first.
+
+    Usage:
+        consumer = StreamConsumer(redis_client, group="device-shadow")
+        consumer.run(lambda device_id, payload: ...)
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        group: str,
+        consumer: Optional[str] = None,
+        stream: str = TELEMETRY_STREAM,
+        count: int = 500,
+        block_ms: int = 5000
+    ):
+        self.client = client
+        self.group = group
+        self.consumer = consumer or f"{group}-{socket.gethostname()}"
+        self.stream = stream
+        self.count = count
+        self.block_ms = block_ms
+        self.processed = 0
+
+    def ensure_group(self, start_id: str = "$"):
+        """Create the consumer group (and the stream) if missing"""
+        try:
+            self.client.xgroup_create(self.stream, self.group, id=start_id, mkstream=True)
+            logger.info(f"Created consumer group '{self.group}' on {self.stream}")
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def _handle(self, entries, handler: Callable[[str, Dict[str, Any]], None]) -> int:
+        ids = []
+        for entry_id, fields in entries:
+            try:
+                device_id, payload = decode_entry(fields)
+                handler(device_id, payload)
+            except Exception as e:
+                # Poison entries are logged and acknowledged rather than retried forever
+                logger.error(f"Error processing {self.stream} entry {entry_id}: {e}", exc_info=True)
+            ids.append(entry_id)
+        if ids:
+            self.client.xack(self.stream, self.group, *ids)
+            self.processed += len(ids)
+        return len(ids)
+
+    def run(self, handler: Callable[[str, Dict[str, Any]], None], stop: Optional[Event] = None):
+        """Consume until ``stop`` is set, reconnecting on Redis errors"""
+        stop = stop or Event()
+        pending_first = True
+
+        while not stop.is_set():
+            try:
+                if pending_first:
+                    self.ensure_group()
+                # "0" re-reads our own unacknowledged entries, ">" reads new ones
+                start = "0" if pending_first else ">"
+                response = self.client.xreadgroup(
+                    self.group, self.consumer, {self.stream: start},
+                    count=self.count, block=None if pending_first else self.block_ms
+                )
+                entries = response[0][1] if response else []
+                handled = self._handle(entries, handler)
+                if pending_first and handled == 0:
+                    pending_first = False
+            except redis.RedisError as e:
+                logger.warning(f"Telemetry stream read failed, retrying in 5 seconds... ({e})")
+                pending_first = True
+                stop.wait(5)
+
+    def get_stats(self) -> dict:
+        return {
+            "stream": self.stream,
+            "group": self.group,
+            "consumer": self.consumer,
+            "processed": self.processed,
+        }
@@ -3,9 +3,11 @@ Device Shadow Service
 Maintains digital twin of devices in Redis
 """
 import os
+import sys
 import json
 import logging
 import time
+from threading import Thread
 import paho.mqtt.client as mqtt
 import redis
 from datetime import datetime
@@ -15,6 +17,9 @@ MQTT_BROKER = os.getenv('MQTT_BROKER', 'localhost:1883')
 MQTT_USERNAME = os.getenv('MQTT_USERNAME', 'iodd')
 MQTT_PASSWORD = os.getenv('MQTT_PASSWORD', 'mqtt123')
 REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/1')
+# 'stream' consumes telemetry from the bridge's Redis stream, 'mqtt' subscribes directly
+TELEMETRY_SOURCE = os.getenv('TELEMETRY_SOURCE', 'mqtt').lower()
+TELEMETRY_REDIS_URL = os.getenv('TELEMETRY_REDIS_URL', REDIS_URL)
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 
 # Setup logging
@@ -37,7 +42,8 @@ def on_connect(client, userdata, flags, rc):
     """Callback when connected"""
     if rc == 0:
         logger.info("Device Shadow Service connected to MQTT")
-        client.subscribe("devices/+/telemetry", 0)
+        if TELEMETRY_SOURCE != 'stream':
+            client.subscribe("devices/+/telemetry", 0)
         client.subscribe("devices/+/status", 1)
         client.subscribe("devices/+/config/reported", 1)
         client.subscribe("devices/+/config/desired", 1)
@@ -50,6 +56,46 @@ def on_disconnect(client, userdata, rc):
     if rc != 0:
         logger.warning(f"Unexpected disconnect. Return code: {rc}")
 
+def update_telemetry_shadow(device_id: str, payload: dict, timestamp: str = None):
+    """Update the latest telemetry and per-parameter values in a device shadow"""
+    shadow_key = f"device:shadow:{device_id}"
+    timestamp = timestamp or datetime.utcnow().isoformat()
+
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hset(shadow_key, "last_telemetry", json.dumps(payload))
+    pipe.hset(shadow_key, "last_update", timestamp)
+
+    # Store individual parameters for quick access
+    for param_name, value in payload.items():
+        if param_name not in ['timestamp', 'device_timestamp', 'device_id']:
+            param_data = {
+                'value': value,
+                'timestamp': timestamp
+            }
+            pipe.hset(shadow_key, f"param:{param_name}", json.dumps(param_data))
+
+    pipe.expire(shadow_key, 86400)
+    pipe.execute()
+
+
+def start_stream_consumer():
+    """Consume telemetry from the shared Redis stream in a background thread"""
+    # Only needed in stream mode; next to the service in the image, one level up in the repo
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+    from common.telemetry_stream import StreamConsumer
+
+    stream_client = redis.from_url(TELEMETRY_REDIS_URL, decode_responses=True)
+    consumer = StreamConsumer(stream_client, group="device-shadow")
+
+    def handle(device_id, payload):
+        update_telemetry_shadow(device_id, payload, payload.get('timestamp'))
+
+    thread = Thread(target=consumer.run, args=(handle,), daemon=True)
+    thread.start()
+    logger.info(f"Consuming telemetry from Redis stream at {TELEMETRY_REDIS_URL}")
+    return consumer
+
+
 def on_message(client, userdata, msg):
     """Handle incoming messages"""
     try:
@@ -66,18 +112,8 @@ def on_message(client, userdata, msg):
         timestamp = datetime.utcnow().isoformat()
 
         if message_type == 'telemetry':
-            # Update latest telemetry in shadow
-            redis_client.hset(shadow_key, "last_telemetry", json.dumps(payload))
-            redis_client.hset(shadow_key, "last_update", timestamp)
-
-            # Store individual parameters for quick access
-            for param_name, value in payload.items():
-                if param_name not in ['timestamp', 'device_id']:
-                    param_data = {
-                        'value': value,
-                        'timestamp': timestamp
-                    }
-                    redis_client.hset(shadow_key, f"param:{param_name}", json.dumps(param_data))
+            update_telemetry_shadow(device_id, payload, timestamp)
+            return
 
         elif message_type == 'status':
             state = payload.get('state', 'unknown')
@@ -110,6 +146,10 @@ def main():
     logger.info("Starting Device Shadow Service...")
     logger.info(f"MQTT Broker: {MQTT_BROKER}")
     logger.info(f"Redis URL: {REDIS_URL}")
+    logger.info(f"Telemetry source: {TELEMETRY_SOURCE}")
+
+    if TELEMETRY_SOURCE == 'stream' and redis_client:
+        start_stream_consumer()
 
     # Parse broker address
     broker_parts = MQTT_BROKER.split(':')
@@ -0,0 +1,371 @@
+"""
+Batching InfluxDB Writer
+Serializes telemetry to line protocol, flushes in batches from a background
+thread and spills to a bounded on-disk WAL while InfluxDB is unavailable
+"""
+import os
+import math
+import time
+import logging
+from datetime import datetime, timezone
+from threading import Condition, Lock, Thread
+from typing import Callable, Dict, List, Optional, Union
+
+from common.circuit_breaker import CircuitBreaker, CircuitBreakerOpenException, CircuitState
+
+logger = logging.getLogger(__name__)
+
+FieldValue = Union[float, int, bool, str]
+
+
+# ============================================================================
+# Line Protocol Serialization
+# ============================================================================
+
+_MEASUREMENT_ESCAPES = str.maketrans({',': r'\,', ' ': r'\ ', '\n': r'\n'})
+_KEY_ESCAPES = str.maketrans({',': r'\,', '=': r'\=', ' ': r'\ ', '\n': r'\n'})
+
+
+def _format_field(value: FieldValue) -> Optional[str]:
+    """Format a single field value, returning None for values Influx cannot store"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return f"{value}i"
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            return None
+        return repr(value)
+    text = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return f'"{text}"'
+
+
+def to_line_protocol(
+    measurement: str,
+    tags: Dict[str, str],
+    fields: Dict[str, FieldValue],
+    timestamp_ns: int
+) -> Optional[str]:
+    """
+    Serialize one point to InfluxDB line protocol.
+
+    Tags are sorted by key (InfluxDB's preferred order). Empty tag values are
+    omitted. Returns None if no field value can be represented.
+    """
+    field_parts = []
+    for key, value in fields.items():
+        formatted = _format_field(value)
+        if formatted is not None:
+            field_parts.append(f"{str(key).translate(_KEY_ESCAPES)}={formatted}")
+    if not field_parts:
+        return None
+
+    head = measurement.translate(_MEASUREMENT_ESCAPES)
+    for key in sorted(tags):
+        value = tags[key]
+        if value is None or value == '':
+            continue
+        head += f",{str(key).translate(_KEY_ESCAPES)}={str(value).translate(_KEY_ESCAPES)}"
+
+    return f"{head} {','.join(field_parts)} {timestamp_ns}"
+
+
+def timestamp_to_ns(timestamp: Optional[str]) -> int:
+    """Convert an ISO-8601 payload timestamp to epoch nanoseconds (now if missing/invalid)"""
+    if timestamp:
+        try:
+            parsed = datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return int(parsed.timestamp()) * 1_000_000_000 + parsed.microsecond * 1_000
+        except ValueError:
+            pass
+    return time.time_ns()
+
+
+# ============================================================================
+# On-Disk Spill Buffer (WAL)
+# ============================================================================
+
+class SpillBuffer:
+    """
+    Bounded, segment-based on-disk buffer for line protocol.
+
+    Lines are appended to the newest segment file; segments are rotated once
+    they exceed ``segment_bytes``. When the total size exceeds ``max_bytes``
+    the oldest segments are discarded. Segments left over from a previous run
+    are picked up on startup and replayed like any other.
+    """
+
+    SEGMENT_PREFIX = "spill-"
+    SEGMENT_SUFFIX = ".lp"
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024,
+                 segment_bytes: int = 4 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self._lock = Lock()
+        self._dropped_lines = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._segments: List[str] = sorted(
+            name for name in os.listdir(directory)
+            if name.startswith(self.SEGMENT_PREFIX) and name.endswith(self.SEGMENT_SUFFIX)
+        )
+        self._sizes: Dict[str, int] = {
+            name: os.path.getsize(os.path.join(directory, name)) for name in self._segments
+        }
+        self._next_seq = self._parse_seq(self._segments[-1]) + 1 if self._segments else 0
+        # Never append to a segment recovered from a previous run
+        self._active: Optional[str] = None
+
+        if self._segments:
+            logger.info(
+                f"Recovered {len(self._segments)} spill segments "
+                f"({self.pending_bytes} bytes) from {directory}"
+            )
+
+    def _parse_seq(self, name: str) -> int:
+        return int(name[len(self.SEGMENT_PREFIX):-len(self.SEGMENT_SUFFIX)])
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @property
+    def pending_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._segments)
+
+    def append(self, lines: List[str]):
+        """Append lines to the active segment, enforcing the size bound"""
+        if not lines:
+            return
+        data = ('\n'.join(lines) + '\n').encode('utf-8')
+
+        with self._lock:
+            if self._active is None or self._sizes[self._active] >= self.segment_bytes:
+                self._active = f"{self.SEGMENT_PREFIX}{self._next_seq:012d}{self.SEGMENT_SUFFIX}"
+                self._next_seq += 1
+                self._segments.append(self._active)
+                self._sizes[self._active] = 0
+
+            with open(self._path(self._active), 'ab') as f:
+                f.write(data)
+            self._sizes[self._active] += len(data)
+
+            # Drop oldest segments until we are back under the bound
+            while self.pending_bytes > self.max_bytes and len(self._segments) > 1:
+                oldest = self._segments.pop(0)
+                with open(self._path(oldest), 'rb') as f:
+                    self._dropped_lines += sum(1 for _ in f)
+                os.remove(self._path(oldest))
+                del self._sizes[oldest]
+                logger.error(
+                    f"Spill buffer exceeded {self.max_bytes} bytes, dropped segment {oldest} "
+                    f"({self._dropped_lines} lines dropped in total)"
+                )
+
+    def replay(self, write: Callable[[str], None]) -> int:
+        """
+        Replay segments oldest-first through ``write``.
+
+        Each segment is deleted only after it was written successfully. Stops at
+        the first failure and re-raises it. Returns the number of segments replayed.
+        """
+        replayed = 0
+        while True:
+            with self._lock:
+                if not self._segments:
+                    return replayed
+                name = self._segments[0]
+                if name == self._active:
+                    # Seal the active segment so new spills go to a fresh file
+                    self._active = None
+
+            with open(self._path(name), 'r', encoding='utf-8') as f:
+                body = f.read()
+            if body.strip():
+                write(body)
+
+            with self._lock:
+                # The segment may have been evicted by append() while we were writing it
+                if name in self._sizes:
+                    self._segments.remove(name)
+                    del self._sizes[name]
+                    os.remove(self._path(name))
+            replayed += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "segments": len(self._segments),
+                "pending_bytes": self.pending_bytes,
+                "max_bytes": self.max_bytes,
+                "dropped_lines": self._dropped_lines,
+            }
+
+
+# ============================================================================
+# Batching Writer
+# ============================================================================
+
+class BatchingWriter:
+    """
+    Buffers line protocol in memory and flushes it from a background thread.
+
+    A batch is flushed when ``batch_size`` lines are buffered or
+    ``flush_interval`` seconds have passed, whichever comes first. Failed
+    batches (and everything written while the circuit breaker is open) go to
+    the spill buffer, which is replayed once the breaker leaves OPEN again.
+
+    Usage:
+        writer = BatchingWriter(write_fn, breaker, spill=SpillBuffer("/data/spill"))
+        writer.start()
+        writer.add(lines)
+    """
+
+    def __init__(
+        self,
+        write: Callable[[str], None],
+        breaker: CircuitBreaker,
+        batch_size: int = 5000,
+        flush_interval: float = 1.0,
+        max_buffered: int = 100_000,
+        spill: Optional[SpillBuffer] = None
+    ):
+        self._write = write
+        self.breaker = breaker
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self.spill = spill
+
+        self._buffer: List[str] = []
+        self._cond = Condition()
+        self._running = False
+        self._thread: Optional[Thread] = None
+
+        self._written_lines = 0
+        self._spilled_lines = 0
+        self._dropped_lines = 0
+        self._batches = 0
+
+    def start(self):
+        """Start the background flush thread"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = Thread(target=self._run, name="influx-batch-writer", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Batching writer started: batch_size={self.batch_size}, "
+            f"flush_interval={self.flush_interval}s, spill={'on' if self.spill else 'off'}"
+        )
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the flush thread, flushing whatever is still buffered"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def add(self, lines: List[str]):
+        """Queue lines for the next batch (never blocks on InfluxDB)"""
+        if not lines:
+            return
+        overflow: List[str] = []
+        with self._cond:
+            self._buffer.extend(lines)
+            if len(self._buffer) > self.max_buffered:
+                # Writer thread can't keep up - move the oldest lines out of memory
+                excess = len(self._buffer) - self.max_buffered
+                overflow = self._buffer[:excess]
+                del self._buffer[:excess]
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+        if overflow:
+            self._spill(overflow)
+
+    def flush(self):
+        """Write everything currently buffered"""
+        while True:
+            with self._cond:
+                batch = self._buffer[:self.batch_size]
+                del self._buffer[:self.batch_size]
+            if not batch:
+                return
+            self._write_batch(batch)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._running and len(self._buffer) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                if not self._running:
+                    return
+                batch = self._buffer[:self.batch_size]
+                del self._buffer[:self.batch_size]
+
+            if batch:
+                self._write_batch(batch)
+            self._maybe_replay()
+
+    def _write_batch(self, batch: List[str]):
+        try:
+            self.breaker.call(self._write, '\n'.join(batch))
+            self._written_lines += len(batch)
+            self._batches += 1
+            logger.debug(f"Wrote batch of {len(batch)} lines to InfluxDB")
+        except CircuitBreakerOpenException:
+            self._spill(batch)
+        except Exception as e:
+            logger.error(f"InfluxDB batch write failed ({len(batch)} lines): {e}")
+            self._spill(batch)
+
+    def _spill(self, lines: List[str]):
+        if self.spill is None:
+            self._dropped_lines += len(lines)
+            logger.warning(f"No spill buffer configured, dropped {len(lines)} lines")
+            return
+        try:
+            self.spill.append(lines)
+            self._spilled_lines += len(lines)
+        except OSError as e:
+            self._dropped_lines += len(lines)
+            logger.error(f"Failed to spill {len(lines)} lines to disk: {e}")
+
+    def _maybe_replay(self):
+        if not self.spill or not self.spill.has_pending:
+            return
+        # Replayed segments double as HALF_OPEN probes, so only OPEN blocks replay
+        if self.breaker.state == CircuitState.OPEN:
+            return
+        try:
+            replayed = self.spill.replay(lambda body: self.breaker.call(self._write, body))
+            if replayed:
+                logger.info(f"Replayed {replayed} spill segments to InfluxDB")
+        except CircuitBreakerOpenException:
+            pass
+        except Exception as e:
+            logger.warning(f"Spill replay interrupted: {e}")
+
+    def get_stats(self) -> dict:
+        """Get writer statistics"""
+        with self._cond:
+            buffered = len(self._buffer)
+        return {
+            "buffered_lines": buffered,
+            "written_lines": self._written_lines,
+            "spilled_lines": self._spilled_lines,
+            "dropped_lines": self._dropped_lines,
+            "batches": self._batches,
+            "spill": self.spill.get_stats() if self.spill else None,
+        }
@@ -7,16 +7,18 @@ import sys
 import json
 import logging
 import time
-from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List
 import paho.mqtt.client as mqtt
-from influxdb_client import InfluxDBClient, Point, WritePrecision
+import requests
+from influxdb_client import InfluxDBClient, WritePrecision
 from influxdb_client.client.write_api import SYNCHRONOUS
 from influxdb_client.rest import ApiException
 
 # Add common module to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-from common.circuit_breaker import get_circuit_breaker, CircuitBreakerOpenException
+from common.circuit_breaker import get_circuit_breaker, register_prometheus_collector
+from common.process_data_decoder import DecoderCache
+from batch_writer import BatchingWriter, SpillBuffer, to_line_protocol, timestamp_to_ns
 
 # Configuration
 MQTT_BROKER = os.getenv('MQTT_BROKER', 'localhost:1883')
@@ -26,8 +28,26 @@ INFLUXDB_URL = os.getenv('INFLUXDB_URL', 'http://localhost:8086')
 INFLUXDB_TOKEN = os.getenv('INFLUXDB_TOKEN', 'my-super-secret-auth-token')
 INFLUXDB_ORG = os.getenv('INFLUXDB_ORG', 'greenstack')
 INFLUXDB_BUCKET = os.getenv('INFLUXDB_BUCKET', 'device-telemetry')
+API_BASE_URL = os.getenv('API_BASE_URL', 'http://localhost:8000')
+# 'stream' consumes telemetry from the bridge's Redis stream, 'mqtt' subscribes directly
+TELEMETRY_SOURCE = os.getenv('TELEMETRY_SOURCE', 'mqtt').lower()
+TELEMETRY_REDIS_URL = os.getenv('TELEMETRY_REDIS_URL', 'redis://localhost:6379/0')
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 
+# Batching / spill configuration
+INFLUX_BATCH_SIZE = int(os.getenv('INFLUX_BATCH_SIZE', '5000'))
+INFLUX_FLUSH_INTERVAL = float(os.getenv('INFLUX_FLUSH_INTERVAL', '1.0'))
+INFLUX_MAX_BUFFERED = int(os.getenv('INFLUX_MAX_BUFFERED', '100000'))
+INFLUX_SPILL_DIR = os.getenv('INFLUX_SPILL_DIR', '/data/spill')
+INFLUX_SPILL_MAX_BYTES = int(os.getenv('INFLUX_SPILL_MAX_BYTES', str(256 * 1024 * 1024)))
+
+# Raw process data decoding
+# PD_DEVICE_MAP: JSON mapping of MQTT device id -> IODD catalog device id, or
+# -> {"iodd_device_id": 12, "variant": "1"} for conditional process data
+PD_DEVICE_MAP = json.loads(os.getenv('PD_DEVICE_MAP') or '{}')
+PD_CYCLE_TIME_MS = float(os.getenv('PD_CYCLE_TIME_MS', '10'))
+PD_DEFINITION_TTL = float(os.getenv('PD_DEFINITION_TTL', '3600'))
+
 # Setup logging
 logging.basicConfig(
     level=getattr(logging, LOG_LEVEL),
@@ -38,6 +58,7 @@ logger = logging.getLogger(__name__)
 # InfluxDB client
 influx_client = None
 write_api = None
+batch_writer = None
 
 # Initialize circuit breaker for InfluxDB writes
 influxdb_breaker = get_circuit_breaker(
@@ -47,6 +68,36 @@ influxdb_breaker = get_circuit_breaker(
     expected_exception=ApiException
 )
 
+def _write_line_protocol(body: str):
+    """Write a newline-separated line protocol batch (called from the writer thread)"""
+    write_api.write(
+        bucket=INFLUXDB_BUCKET,
+        org=INFLUXDB_ORG,
+        record=body,
+        write_precision=WritePrecision.NS
+    )
+
+
+def init_batch_writer() -> BatchingWriter:
+    """Create and start the batching writer with its on-disk spill buffer"""
+    spill = None
+    try:
+        spill = SpillBuffer(INFLUX_SPILL_DIR, max_bytes=INFLUX_SPILL_MAX_BYTES)
+    except OSError as e:
+        logger.error(f"Spill directory {INFLUX_SPILL_DIR} unavailable, spilling disabled: {e}")
+
+    writer = BatchingWriter(
+        _write_line_protocol,
+        influxdb_breaker,
+        batch_size=INFLUX_BATCH_SIZE,
+        flush_interval=INFLUX_FLUSH_INTERVAL,
+        max_buffered=INFLUX_MAX_BUFFERED,
+        spill=spill
+    )
+    writer.start()
+    return writer
+
+
 def init_influxdb():
     """Initialize InfluxDB client"""
     global influx_client, write_api
@@ -85,13 +136,112 @@ def init_influxdb():
 # MQTT Topics to subscribe
 TOPICS = [
     ("devices/+/telemetry", 0),
+    ("devices/+/pdin", 0),
+    ("devices/+/register", 1),
 ]
 
+
+# ============================================================================
+# Raw Process Data Decoding
+# ============================================================================
+
+def _load_process_data_definitions(iodd_device_id: int):
+    """Fetch ProcessData definitions and conditions for a catalog device from the API"""
+    base = f"{API_BASE_URL}/api/iodd/{iodd_device_id}/processdata"
+    definitions = requests.get(base, timeout=10)
+    definitions.raise_for_status()
+    conditions = requests.get(f"{base}/conditions", timeout=10)
+    conditions.raise_for_status()
+    return definitions.json(), conditions.json()
+
+
+decoder_cache = DecoderCache(_load_process_data_definitions, ttl=PD_DEFINITION_TTL)
+
+# MQTT device id -> (IODD catalog device id, variant)
+device_catalog_map: Dict[str, tuple] = {}
+
+# Raw frames dropped because the device's definitions were still loading
+raw_frames_dropped = 0
+
+
+def _map_device(device_id: str, entry) -> None:
+    if isinstance(entry, dict):
+        if entry.get('iodd_device_id') is None:
+            return
+        variant = entry.get('variant')
+        device_catalog_map[device_id] = (
+            int(entry['iodd_device_id']), str(variant) if variant is not None else None
+        )
+    elif entry is not None:
+        device_catalog_map[device_id] = (int(entry), None)
+
+
+for _device_id, _entry in PD_DEVICE_MAP.items():
+    _map_device(_device_id, _entry)
+
+
+def handle_raw_process_data(device_id: str, payload: bytes):
+    """
+    Decode one or more concatenated raw PDin frames and queue them for InfluxDB
+
+    Runs on the MQTT network thread, so definitions are never fetched here:
+    frames arriving before a device's plan has loaded are dropped.
+    """
+    global raw_frames_dropped
+
+    mapping = device_catalog_map.get(device_id)
+    if not mapping:
+        logger.debug(f"No IODD mapping for device {device_id}, ignoring raw process data")
+        return
+
+    iodd_device_id, variant = mapping
+    plan = decoder_cache.get(iodd_device_id, 'input', variant, wait=False)
+    if plan is None and decoder_cache.is_loading(iodd_device_id):
+        raw_frames_dropped += 1
+        logger.debug(f"Process data definitions for IODD device {iodd_device_id} still loading, frame dropped")
+        return
+    if plan is None or not plan.fields:
+        logger.debug(f"No process data plan for IODD device {iodd_device_id}")
+        return
+
+    try:
+        columns = plan.decode(payload)
+    except ValueError as e:
+        logger.warning(f"Raw process data from {device_id} rejected: {e}")
+        return
+
+    # The last frame was sampled now; earlier frames are one PD cycle apart
+    count = len(payload) // plan.frame_bytes
+    now_ns = time.time_ns()
+    cycle_ns = int(PD_CYCLE_TIME_MS * 1_000_000)
+
+    lines = []
+    for name, values in columns.items():
+        tags = {"device_id": device_id, "parameter": name, "pd_id": plan.pd_id}
+        for i, value in enumerate(values.tolist()):
+            timestamp_ns = now_ns - (count - 1 - i) * cycle_ns
+            if isinstance(value, (str, bytes)):
+                line = to_line_protocol(
+                    "device_metadata",
+                    {"device_id": device_id, "attribute": name},
+                    {"value": value.hex() if isinstance(value, bytes) else value},
+                    timestamp_ns
+                )
+            else:
+                line = to_line_protocol("device_telemetry", tags, {"value": float(value)}, timestamp_ns)
+            if line:
+                lines.append(line)
+
+    if batch_writer and lines:
+        batch_writer.add(lines)
+
 def on_connect(client, userdata, flags, rc):
     """Callback when connected to MQTT broker"""
     if rc == 0:
         logger.info("Connected to MQTT broker successfully")
         for topic, qos in TOPICS:
+            if TELEMETRY_SOURCE == 'stream' and topic == "devices/+/telemetry":
+                continue
             client.subscribe(topic, qos)
             logger.info(f"Subscribed to {topic} (QoS {qos})")
     else:
@@ -106,9 +256,6 @@ def on_message(client, userdata, msg):
     """Callback when message received"""
     try:
         topic = msg.topic
-        payload = json.loads(msg.payload.decode())
-
-        logger.debug(f"Received message on {topic}: {payload}")
 
         # Extract device_id from topic (devices/<device_id>/telemetry)
         topic_parts = topic.split('/')
@@ -116,8 +263,20 @@ def on_message(client, userdata, msg):
             device_id = topic_parts[1]
             message_type = topic_parts[2]
 
+            # Raw process data is binary, everything else is JSON
+            if message_type == 'pdin':
+                handle_raw_process_data(device_id, msg.payload)
+                return
+
+            payload = json.loads(msg.payload.decode())
+            logger.debug(f"Received message on {topic}: {payload}")
+
             if message_type == 'telemetry':
                 write_to_influxdb(device_id, payload)
+            elif message_type == 'register':
+                _map_device(device_id, payload)
+                if device_id in device_catalog_map:
+                    decoder_cache.prefetch(device_catalog_map[device_id][0])
 
     except json.JSONDecodeError as e:
         logger.error(f"Failed to decode JSON payload from {msg.topic}: {e}")
@@ -131,6 +290,11 @@ def on_message(client, userdata, msg):
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from threading import Thread
 
+# Circuit breaker metrics are served from the health server at /metrics
+METRICS_ENABLED = register_prometheus_collector()
+if METRICS_ENABLED:
+    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
 class HealthCheckHandler(BaseHTTPRequestHandler):
     """Simple health check HTTP handler"""
 
@@ -146,7 +310,10 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
                 response = json.dumps({
                     "status": "healthy",
                     "service": "influx-ingestion",
-                    "influxdb_connected": True
+                    "influxdb_connected": True,
+                    "writer": batch_writer.get_stats() if batch_writer else None,
+                    "decoder_cache": decoder_cache.get_stats(),
+                    "raw_frames_dropped": raw_frames_dropped
                 })
                 self.wfile.write(response.encode())
             else:
@@ -159,6 +326,11 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
                     "influxdb_connected": False
                 })
                 self.wfile.write(response.encode())
+        elif self.path == '/metrics' and METRICS_ENABLED:
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE_LATEST)
+            self.end_headers()
+            self.wfile.write(generate_latest())
         else:
             self.send_response(404)
             self.end_headers()
@@ -181,86 +353,85 @@ def start_health_check_server(port=8080):
     return server
 
 
-def write_to_influxdb(device_id: str, data: Dict[str, Any]):
-    """Write telemetry data to InfluxDB"""
-    if not write_api:
-        logger.warning("InfluxDB not connected, skipping write")
-        return
+def build_lines(device_id: str, data: Dict[str, Any]) -> List[str]:
+    """
+    Serialize a telemetry payload to line protocol
 
-    try:
-        # Get timestamp from payload or use current time
-        timestamp = data.get('timestamp')
-        if timestamp:
-            try:
-                timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-            except:
-                timestamp = datetime.utcnow()
-        else:
-            timestamp = datetime.utcnow()
+    Payloads from the telemetry stream carry the bridge's receive time in
+    ``timestamp`` and the device's measurement time in ``device_timestamp``;
+    points are stored at the measurement time when there is one.
+    """
+    timestamp_ns = timestamp_to_ns(data.get('device_timestamp') or data.get('timestamp'))
+    lines = []
 
-        # Create a point for each parameter in the telemetry
-        points = []
+    # Handle different telemetry formats
+    if 'parameter' in data and 'value' in data:
+        # Single parameter format
+        tags = {"device_id": device_id, "parameter": data['parameter']}
+        if 'unit' in data:
+            tags["unit"] = data['unit']
+        lines.append(to_line_protocol(
+            "device_telemetry", tags, {"value": float(data['value'])}, timestamp_ns
+        ))
 
-        # Handle different telemetry formats
-        if 'parameter' in data and 'value' in data:
-            # Single parameter format
-            point = Point("device_telemetry") \
-                .tag("device_id", device_id) \
-                .tag("parameter", data['parameter']) \
-                .field("value", float(data['value'])) \
-                .time(timestamp, WritePrecision.NS)
+    else:
+        # Multi-parameter format - each key-value pair is a measurement
+        for key, value in data.items():
+            if key in ['timestamp', 'device_timestamp', 'device_id']:
+                continue
 
-            if 'unit' in data:
-                point = point.tag("unit", data['unit'])
+            try:
+                # Try to convert to float
+                lines.append(to_line_protocol(
+                    "device_telemetry",
+                    {"device_id": device_id, "parameter": key},
+                    {"value": float(value)},
+                    timestamp_ns
+                ))
+            except (ValueError, TypeError):
+                # If not numeric, store as string field
+                lines.append(to_line_protocol(
+                    "device_metadata",
+                    {"device_id": device_id, "attribute": key},
+                    {"value": str(value)},
+                    timestamp_ns
+                ))
+
+    return [line for line in lines if line]
 
-            points.append(point)
 
-        else:
-            # Multi-parameter format - each key-value pair is a measurement
-            for key, value in data.items():
-                if key in ['timestamp', 'device_id']:
-                    continue
-
-                try:
-                    # Try to convert to float
-                    numeric_value = float(value)
-
-                    point = Point("device_telemetry") \
-                        .tag("device_id", device_id) \
-                        .tag("parameter", key) \
-                        .field("value", numeric_value) \
-                        .time(timestamp, WritePrecision.NS)
-
-                    points.append(point)
-
-                except (ValueError, TypeError):
-                    # If not numeric, store as string field
-                    point = Point("device_metadata") \
-                        .tag("device_id", device_id) \
-                        .tag("attribute", key) \
-                        .field("value", str(value)) \
-                        .time(timestamp, WritePrecision.NS)
-
-                    points.append(point)
-
-        # Write points to InfluxDB with circuit breaker protection
-        if points:
-            try:
-                influxdb_breaker.call(
-                    lambda: write_api.write(bucket=INFLUXDB_BUCKET, org=INFLUXDB_ORG, record=points)
-                )
-                logger.info(f"Wrote {len(points)} points to InfluxDB for device {device_id}")
+def write_to_influxdb(device_id: str, data: Dict[str, Any]):
+    """Queue telemetry data for the batching InfluxDB writer"""
+    if not batch_writer:
+        logger.warning("InfluxDB writer not running, skipping write")
+        return
 
-            except CircuitBreakerOpenException as e:
-                logger.warning(f"InfluxDB circuit breaker open, skipping write for {device_id}: {e}")
-            except ApiException as e:
-                logger.error(f"InfluxDB API error for device {device_id}: {e}")
+    try:
+        lines = build_lines(device_id, data)
+        if lines:
+            batch_writer.add(lines)
+            logger.debug(f"Queued {len(lines)} points for device {device_id}")
 
     except Exception as e:
-        logger.error(f"Error writing to InfluxDB for device {device_id}: {e}", exc_info=True)
+        logger.error(f"Error queueing telemetry for device {device_id}: {e}", exc_info=True)
+
+def start_stream_consumer():
+    """Consume telemetry from the shared Redis stream in a background thread"""
+    import redis
+    from common.telemetry_stream import StreamConsumer
+
+    stream_client = redis.from_url(TELEMETRY_REDIS_URL, decode_responses=True)
+    consumer = StreamConsumer(stream_client, group="influx-ingestion")
+    thread = Thread(target=consumer.run, args=(write_to_influxdb,), daemon=True)
+    thread.start()
+    logger.info(f"Consuming telemetry from Redis stream at {TELEMETRY_REDIS_URL}")
+    return consumer
+
 
 def main():
     """Main entry point"""
+    global batch_writer
+
     logger.info("Starting InfluxDB Ingestion Service...")
     logger.info(f"MQTT Broker: {MQTT_BROKER}")
     logger.info(f"InfluxDB URL: {INFLUXDB_URL}")
@@ -275,6 +446,16 @@ def main():
         logger.error("Failed to initialize InfluxDB, exiting...")
         return
 
+    batch_writer = init_batch_writer()
+
+    # Load decoder plans for statically mapped devices before frames arrive
+    for iodd_device_id, _ in set(device_catalog_map.values()):
+        decoder_cache.prefetch(iodd_device_id)
+
+    logger.info(f"Telemetry source: {TELEMETRY_SOURCE}")
+    if TELEMETRY_SOURCE == 'stream':
+        start_stream_consumer()
+
     # Parse broker address
     broker_parts = MQTT_BROKER.split(':')
     broker_host = broker_parts[0]
@@ -314,6 +495,8 @@ def main():
     except KeyboardInterrupt:
         logger.info("Shutting down InfluxDB Ingestion Service...")
         client.disconnect()
+        if batch_writer:
+            batch_writer.stop()
         if influx_client:
             influx_client.close()
     except Exception as e:
@@ -15,7 +15,8 @@ from datetime import datetime
 
 # Add common module to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-from common.circuit_breaker import get_circuit_breaker, CircuitBreakerOpenException
+from common.circuit_breaker import get_circuit_breaker, CircuitBreakerOpenException, register_prometheus_collector
+from common.telemetry_stream import append_telemetry, device_latest_key
 
 # Configuration
 MQTT_BROKER = os.getenv('MQTT_BROKER', 'localhost:1883')
@@ -137,42 +138,29 @@ def handle_telemetry(device_id: str, data: Dict[str, Any]):
         timestamp = datetime.utcnow().isoformat()
 
         # Store in Redis for real-time access
-        redis_key = f"telemetry:{device_id}:latest"
+        redis_key = device_latest_key(device_id)
         telemetry_data = {
             **data,
             'timestamp': timestamp,
             'device_id': device_id
         }
+        # 'timestamp' is the receive time; keep the device's measurement time for stream consumers
+        if data.get('timestamp'):
+            telemetry_data['device_timestamp'] = data['timestamp']
+
+        # Latest value, pub/sub fan-out and stream history in a single round trip
+        def write_telemetry():
+            serialized = json.dumps(telemetry_data)
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.setex(redis_key, 300, serialized)  # TTL 5 minutes
+            pipe.publish(f"telemetry:{device_id}", serialized)
+            # Per-device history and the shared telemetry log (see common.telemetry_stream)
+            append_telemetry(pipe, device_id, telemetry_data)
+            return pipe.execute()
 
         # Use circuit breaker for Redis operations
         try:
-            redis_breaker.call(
-                lambda: redis_client.setex(
-                    redis_key,
-                    300,  # TTL 5 minutes
-                    json.dumps(telemetry_data)
-                )
-            )
-
-            # Publish to Redis pub/sub for real-time subscribers
-            redis_breaker.call(
-                lambda: redis_client.publish(
-                    f"telemetry:{device_id}",
-                    json.dumps(telemetry_data)
-                )
-            )
-
-            # Store in time-series list (keep last 100 readings)
-            redis_list_key = f"telemetry:{device_id}:history"
-            redis_breaker.call(
-                lambda: redis_client.lpush(redis_list_key, json.dumps(telemetry_data))
-            )
-            redis_breaker.call(
-                lambda: redis_client.ltrim(redis_list_key, 0, 99)  # Keep only last 100
-            )
-            redis_breaker.call(
-                lambda: redis_client.expire(redis_list_key, 3600)  # 1 hour TTL
-            )
+            redis_breaker.call(write_telemetry)
 
             logger.info(f"Processed telemetry for device {device_id}: {data.get('parameter', 'unknown')}")
 
@@ -271,6 +259,11 @@ def handle_config_reported(device_id: str, data: Dict[str, Any]):
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from threading import Thread
 
+# Circuit breaker metrics are served from the health server at /metrics
+METRICS_ENABLED = register_prometheus_collector()
+if METRICS_ENABLED:
+    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
 class HealthCheckHandler(BaseHTTPRequestHandler):
     """Simple health check HTTP handler"""
 
@@ -301,6 +294,11 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
                     "mqtt_connected": False
                 })
                 self.wfile.write(response.encode())
+        elif self.path == '/metrics' and METRICS_ENABLED:
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE_LATEST)
+            self.end_headers()
+            self.wfile.write(generate_latest())
         else:
             self.send_response(404)
             self.end_headers()
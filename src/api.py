@@ -15,17 +15,18 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
-import sentry_sdk
-from fastapi import BackgroundTasks, FastAPI, File, HTTPException, Request, UploadFile
+from fastapi import BackgroundTasks, Depends, FastAPI, File, HTTPException, Query, Request, UploadFile
 from prometheus_client import Counter, Histogram
 from prometheus_fastapi_instrumentator import Instrumentator
-from sentry_sdk.integrations.fastapi import FastApiIntegration
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Initialize Sentry for error tracking (production only)
+# Initialize Sentry for error tracking (production only; not imported otherwise)
 if os.getenv("SENTRY_DSN"):
+    import sentry_sdk
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
+
     sentry_sdk.init(
         dsn=os.getenv("SENTRY_DSN"),
         integrations=[FastApiIntegration()],
@@ -46,10 +47,17 @@ from limits.strategies import STRATEGIES
 
 from src import config
 from src.config import validate_production_security
+from src.database import get_db_path
 from src.models import DeviceProfile
 from src.greenstack import IODDManager
+from src.utils.cascade_delete import cascade_delete, invalidate_device_caches
+from src.utils.config_schema import ALL_ROLES, get_config_schema_json, refresh_config_schemas
+from src.utils.fast_json import FastJSONResponse, raw_json
+from src.utils.job_profiler import profiled
+from src.utils.pagination import PageParams, fetch_page, page_params, paginated_response
 from src.utils.pqa_orchestrator import UnifiedPQAOrchestrator, FileType
-from src.utils.pqa_scheduler import init_pqa_scheduler, shutdown_pqa_scheduler
+from src.utils.pqa_scheduler import init_pqa_scheduler, notify_pqa_ready, shutdown_pqa_scheduler
+from src.utils.read_replica import read_replica
 
 # ============================================================================
 # API Models
@@ -378,6 +386,7 @@ via environment variables for production deployments.
         "name": "MIT License",
         "url": "https://opensource.org/licenses/MIT",
     },
+    default_response_class=FastJSONResponse,
 )
 
 # Validate production security (blocks startup if weak passwords detected)
@@ -392,13 +401,27 @@ async def startup_event():
     """Initialize services on application startup"""
     logger.info("Application startup: Initializing services...")
 
-    # Initialize PQA scheduler (runs startup analysis + daily scheduler)
+    include_optional_routers()
+
+    # Initialize PQA scheduler (daily scheduler + startup analysis, which waits
+    # until /api/health/ready has reported ready)
     try:
-        init_pqa_scheduler(db_path="greenstack.db", enabled=True)
+        init_pqa_scheduler(
+            db_path="greenstack.db", enabled=True,
+            startup_delay=config.PQA_STARTUP_DELAY, ready_timeout=config.PQA_STARTUP_READY_TIMEOUT
+        )
         logger.info("PQA scheduler initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize PQA scheduler: {e}", exc_info=True)
 
+    # Sample service processes/ports in the background for /api/services/*
+    from src.routes import service_routes
+
+    service_routes.service_monitor.start()
+
+    # Keep the read replica for dashboards fresh (no-op without READ_REPLICA_PATH)
+    read_replica.start()
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -412,6 +435,11 @@ async def shutdown_event():
     except Exception as e:
         logger.error(f"Failed to stop PQA scheduler: {e}", exc_info=True)
 
+    from src.routes import service_routes
+
+    service_routes.service_monitor.stop()
+    read_replica.stop()
+
 
 # ============================================================================
 # Distributed Tracing (OpenTelemetry)
@@ -500,6 +528,19 @@ except ValueError:
             elif collector._name == 'database_operations_total':
                 database_operations_total = collector
 
+if config.ENABLE_QUEUE_METRICS:
+    try:
+        import redis  # Optional dependency
+        from prometheus_client import REGISTRY
+
+        from src.celery_app import celery_app
+        from src.tasks.queue_metrics import CeleryQueueCollector
+
+        REGISTRY.register(CeleryQueueCollector(redis.from_url(celery_app.conf.broker_url)))
+        logger.info("Celery queue metrics enabled")
+    except Exception as queue_metrics_error:
+        logger.warning("Celery queue metrics unavailable: %s", queue_metrics_error)
+
 logger.info("Prometheus metrics endpoint enabled at /metrics")
 
 # Initialize rate limiter with Redis storage for distributed rate limiting
@@ -519,7 +560,11 @@ if configured_strategy not in STRATEGIES:
 # Pick storage backend, falling back to in-memory limiter if Redis unavailable
 limiter_storage_uri = "memory://"
 if REDIS_URL:
+    from src.utils.redis_probe import redis_reachable
+
     try:
+        if not redis_reachable(REDIS_URL):
+            raise ConnectionError(f"nothing listening at {REDIS_URL}")
         import redis  # Optional dependency
 
         redis.from_url(REDIS_URL).ping()
@@ -563,7 +608,7 @@ async def add_request_id(request, call_next):
 cors_options = {
     "allow_methods": config.CORS_METHODS,
     "allow_headers": ["*"],
-    "expose_headers": ["content-disposition", "X-Request-ID"],
+    "expose_headers": ["content-disposition", "X-Request-ID", "X-Next-Cursor", "X-Total-Count", "Link", "Server-Timing"],
 }
 
 if getattr(config, "CORS_ALLOW_ALL", False):
@@ -581,6 +626,17 @@ logger.info(
     "*" if getattr(config, "CORS_ALLOW_ALL", False) else config.CORS_ORIGINS,
 )
 
+# Response compression (brotli when installed, otherwise gzip)
+if config.ENABLE_COMPRESSION:
+    from src.compression import BROTLI_AVAILABLE, CompressionMiddleware
+
+    app.add_middleware(CompressionMiddleware, minimum_size=config.COMPRESSION_MIN_SIZE)
+    logger.info(
+        "Response compression enabled (%s, min size %d bytes)",
+        "br+gzip" if BROTLI_AVAILABLE else "gzip",
+        config.COMPRESSION_MIN_SIZE,
+    )
+
 # ============================================================================
 # Request Timeout Middleware
 # ============================================================================
@@ -625,7 +681,9 @@ async def timeout_middleware(request: Request, call_next):
         raise
 
 # Initialize Greenstack
-manager = IODDManager()
+# The endpoints below query the SQLite file directly, so the API stays on it
+# even when IODD_DATABASE_URL points IODDManager at PostgreSQL
+manager = IODDManager(db_path=get_db_path())
 
 # Wrap storage with caching layer (if Redis available)
 try:
@@ -635,6 +693,31 @@ try:
 except Exception as e:
     logger.warning(f"Database caching not available: {e}")
 
+# Conditional GETs for device detail endpoints, answered from per-device versions
+if config.ENABLE_HTTP_CACHE:
+    from src.http_cache import ConditionalGetMiddleware
+    from src.utils.device_versions import DeviceVersions
+
+    app.add_middleware(
+        ConditionalGetMiddleware,
+        versions=DeviceVersions(manager.storage.db_path),
+        app_version=config.APP_VERSION,
+        max_age=config.HTTP_CACHE_MAX_AGE,
+    )
+    logger.info("HTTP caching enabled for device detail endpoints (max-age %ds)", config.HTTP_CACHE_MAX_AGE)
+
+# Per-request query statistics; added last so it is outermost and sees every query
+if config.ENABLE_QUERY_STATS:
+    from src import query_stats
+
+    query_stats.install()
+    app.add_middleware(
+        query_stats.QueryStatsMiddleware,
+        slow_request_ms=config.SLOW_REQUEST_MS,
+        top_queries=config.SLOW_REQUEST_TOP_QUERIES,
+    )
+    logger.info("Query statistics enabled (slow request log above %.0fms)", config.SLOW_REQUEST_MS)
+
 # Include EDS routes
 from src.routes import eds_routes
 
@@ -661,19 +744,6 @@ from src.routes import admin_routes
 
 app.include_router(admin_routes.router)
 
-# Include MQTT Broker Management routes
-from src.routes import mqtt_routes
-
-app.include_router(mqtt_routes.router, prefix="/api/mqtt", tags=["MQTT"])
-
-# Include WebSocket for MQTT
-app.add_websocket_route("/ws/mqtt", mqtt_routes.websocket_endpoint)
-
-# Include Service Management routes
-from src.routes import service_routes
-
-app.include_router(service_routes.router, tags=["Services"])
-
 # Include Theme Management routes
 from src.routes import theme_routes
 
@@ -695,10 +765,29 @@ from src.routes import iodd_routes
 
 app.include_router(iodd_routes.router)
 
-# Include Node-RED Flow Generation routes
-from src.routes import flow_routes
+# Optional IoT routes (MQTT broker management, telemetry history, service
+# management, Node-RED flows) pull in paho-mqtt, redis and psutil, so they are
+# included on startup rather than on import
+_optional_routers_included = False
+
+
+def include_optional_routers():
+    """Include the optional IoT routers (idempotent)"""
+    global _optional_routers_included
+    if _optional_routers_included:
+        return
+    _optional_routers_included = True
 
-app.include_router(flow_routes.router)
+    from src import routes
+    from src.routes import mqtt_routes
+
+    app.include_router(routes.mqtt_router, prefix="/api/mqtt", tags=["MQTT"])
+    app.add_websocket_route("/ws/mqtt", mqtt_routes.websocket_endpoint)
+    app.include_router(routes.telemetry_router)
+    app.include_router(routes.service_router, tags=["Services"])
+    app.include_router(routes.flow_router)
+    # Rebuild the schema on the next /openapi.json request
+    app.openapi_schema = None
 
 # ============================================================================
 # API Endpoints
@@ -759,6 +848,7 @@ def queue_iodd_pqa_analysis(device_id: int):
           response_model=Union[UploadResponse, MultiUploadResponse],
           tags=["IODD Management"])
 @limiter.limit("1000/minute")  # Rate limit: 1000 uploads per minute (high-performance server)
+@profiled("iodd.import")
 async def upload_iodd(
     request: Request,
     response: Response,
@@ -862,6 +952,7 @@ async def upload_iodd(
                 # Queue PQA analysis for each device
                 background_tasks.add_task(queue_iodd_pqa_analysis, device_id)
                 logger.info(f"Queued PQA analysis for IODD device {device_id}")
+                background_tasks.add_task(refresh_config_schemas, manager.storage.db_path, device_id)
 
             return MultiUploadResponse(
                 devices=devices,
@@ -875,6 +966,7 @@ async def upload_iodd(
             # Queue PQA analysis
             background_tasks.add_task(queue_iodd_pqa_analysis, device_id)
             logger.info(f"Queued PQA analysis for IODD device {device_id}")
+            background_tasks.add_task(refresh_config_schemas, manager.storage.db_path, device_id)
 
             return UploadResponse(
                 device_id=device_id,
@@ -904,25 +996,42 @@ async def upload_iodd(
         logger.error(f"Failed to import IODD file {file.filename}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=400, detail=str(e))
 
+DEVICE_SORT_FIELDS = {
+    "import_date": "COALESCE(import_date, '')",
+    "product_name": "COALESCE(product_name, '')",
+    "manufacturer": "COALESCE(manufacturer, '')",
+    "vendor_id": "COALESCE(vendor_id, 0)",
+    "id": "id",
+}
+
 @app.get("/api/iodd", 
          response_model=List[DeviceInfo],
          tags=["IODD Management"])
-async def list_devices():
-    """List all imported IODD devices"""
-    devices = manager.list_devices()
-    
-    return [
-        DeviceInfo(
-            id=d['id'],
-            vendor_id=d['vendor_id'],
-            device_id=d['device_id'],
-            product_name=d['product_name'],
-            manufacturer=d['manufacturer'],
-            iodd_version=d['iodd_version'],
-            import_date=d['import_date']
+async def list_devices(
+    request: Request,
+    page: PageParams = Depends(page_params(DEVICE_SORT_FIELDS, "import_date", "desc"))
+):
+    """List imported IODD devices
+
+    Supports keyset pagination (``limit``/``cursor``), ``sort``/``order``,
+    ``fields`` projection and ``include_total``; see src/utils/pagination.py.
+    """
+    import sqlite3
+
+    conn = sqlite3.connect(manager.storage.db_path)
+    try:
+        rows, next_cursor, total = fetch_page(
+            conn,
+            "SELECT id, vendor_id, device_id, product_name, manufacturer, iodd_version, import_date FROM devices",
+            [],
+            page,
+            DEVICE_SORT_FIELDS,
         )
-        for d in devices
-    ]
+    finally:
+        conn.close()
+
+    devices = [DeviceInfo(**row).model_dump() for row in rows]
+    return paginated_response(request, devices, page, next_cursor, total)
 
 @app.get("/api/iodd/{device_id}",
          tags=["IODD Management"])
@@ -944,30 +1053,30 @@ async def get_device_parameters(device_id: int):
     
     if not device:
         raise HTTPException(status_code=404, detail="Device not found")
-    
-    import json
 
-    return [
-        ParameterInfo(
-            index=p['param_index'],
-            name=p['name'],
-            data_type=p['data_type'],
-            access_rights=p['access_rights'],
-            default_value=p['default_value'],
-            min_value=p['min_value'],
-            max_value=p['max_value'],
-            unit=p['unit'],
-            description=p['description'],
-            enumeration_values=json.loads(p['enumeration_values']) if p.get('enumeration_values') else None,
-            bit_length=p.get('bit_length'),
-            dynamic=bool(p.get('dynamic', 0)),
-            excluded_from_data_storage=bool(p.get('excluded_from_data_storage', 0)),
-            modifies_other_variables=bool(p.get('modifies_other_variables', 0)),
-            unit_code=p.get('unit_code'),
-            value_range_name=p.get('value_range_name')
-        )
+    # Fast path: rows are already typed by the schema, so skip per-row
+    # ParameterInfo validation and embed the stored enumeration JSON as-is
+    return FastJSONResponse([
+        {
+            'index': p['param_index'],
+            'name': p['name'],
+            'data_type': p['data_type'],
+            'access_rights': p['access_rights'],
+            'default_value': p['default_value'],
+            'min_value': p['min_value'],
+            'max_value': p['max_value'],
+            'unit': p['unit'],
+            'description': p['description'],
+            'enumeration_values': raw_json(p.get('enumeration_values')),
+            'bit_length': p.get('bit_length'),
+            'dynamic': bool(p.get('dynamic', 0)),
+            'excluded_from_data_storage': bool(p.get('excluded_from_data_storage', 0)),
+            'modifies_other_variables': bool(p.get('modifies_other_variables', 0)),
+            'unit_code': p.get('unit_code'),
+            'value_range_name': p.get('value_range_name')
+        }
         for p in device.get('parameters', [])
-    ]
+    ])
 
 @app.get("/api/iodd/{device_id}/errors",
          response_model=List[ErrorTypeInfo],
@@ -1396,143 +1505,23 @@ async def get_device_ui_menus(device_id: int):
 
 @app.get("/api/iodd/{device_id}/config-schema",
          tags=["IODD Management"])
-async def get_device_config_schema(device_id: int):
-    """Get enriched menu structure with parameter details for config page generation"""
-    device = manager.storage.get_device(device_id)
-
-    if not device:
-        raise HTTPException(status_code=404, detail="Device not found")
-
-    import sqlite3
-    conn = sqlite3.connect(manager.storage.db_path)
-    cursor = conn.cursor()
-
-    # Get all menus with their items
-    cursor.execute("""
-        SELECT id, menu_id, name
-        FROM ui_menus
-        WHERE device_id = ?
-        ORDER BY id
-    """, (device_id,))
-
-    menus = []
-    for menu_row in cursor.fetchall():
-        db_menu_id = menu_row[0]
-        menu_id = menu_row[1]
-        menu_name = menu_row[2]
-
-        # Get menu items
-        cursor.execute("""
-            SELECT variable_id, record_item_ref, subindex, access_right_restriction,
-                   display_format, unit_code, button_value, menu_ref
-            FROM ui_menu_items
-            WHERE menu_id = ?
-            ORDER BY item_order
-        """, (db_menu_id,))
-
-        items = []
-        for item_row in cursor.fetchall():
-            variable_id = item_row[0]
-            record_item_ref = item_row[1]
-
-            # Enrich with parameter details
-            param_details = None
-            if variable_id:
-                # Try exact match first (e.g., "V_Qualityofteach" = "V_Qualityofteach")
-                cursor.execute("""
-                    SELECT id, name, data_type, access_rights, default_value,
-                           min_value, max_value, unit, description, enumeration_values,
-                           bit_length
-                    FROM parameters
-                    WHERE device_id = ? AND name = ?
-                """, (device_id, variable_id))
-
-                param_row = cursor.fetchone()
-
-                # If exact match failed, try transformed name as fallback
-                # e.g., "V_LED_Intensity" -> "LED Intensity"
-                if not param_row:
-                    param_name = variable_id.replace('_', ' ').strip()
-                    if param_name.startswith('V '):
-                        param_name = param_name[2:].strip()
-
-                    cursor.execute("""
-                        SELECT id, name, data_type, access_rights, default_value,
-                               min_value, max_value, unit, description, enumeration_values,
-                               bit_length
-                        FROM parameters
-                        WHERE device_id = ? AND name = ?
-                    """, (device_id, param_name))
-
-                    param_row = cursor.fetchone()
-                if param_row:
-                    # Parse enumeration values
-                    enum_values = {}
-                    if param_row[9]:
-                        try:
-                            import json
-                            enum_values = json.loads(param_row[9])
-                        except:
-                            pass
-
-                    param_details = {
-                        'id': param_row[0],
-                        'name': param_row[1],
-                        'data_type': param_row[2],
-                        'access_rights': param_row[3],
-                        'default_value': param_row[4],
-                        'min_value': param_row[5],
-                        'max_value': param_row[6],
-                        'unit': param_row[7],
-                        'description': param_row[8],
-                        'enumeration_values': enum_values,
-                        'bit_length': param_row[10]
-                    }
-
-            items.append({
-                'variable_id': variable_id,
-                'record_item_ref': record_item_ref,
-                'subindex': item_row[2],
-                'access_right_restriction': item_row[3],
-                'display_format': item_row[4],
-                'unit_code': item_row[5],
-                'button_value': item_row[6],
-                'menu_ref': item_row[7],
-                'parameter': param_details
-            })
-
-        menus.append({
-            'id': menu_id,
-            'name': menu_name,
-            'items': items
-        })
-
-    # Get role mappings
-    cursor.execute("""
-        SELECT role_type, menu_type, menu_id
-        FROM ui_menu_roles
-        WHERE device_id = ?
-    """, (device_id,))
-
-    role_mappings = {
-        'observer': {},
-        'maintenance': {},
-        'specialist': {}
-    }
+async def get_device_config_schema(
+    device_id: int,
+    role: Optional[str] = Query(None, pattern="^(observer|maintenance|specialist)$",
+                                description="Only the menus reachable for this user role")
+):
+    """
+    Get enriched menu structure with parameter details for config page generation
 
-    for row in cursor.fetchall():
-        role_type = row[0]
-        menu_type = row[1]
-        menu_id = row[2]
-        if role_type in role_mappings:
-            role_mappings[role_type][menu_type] = menu_id
+    The resolved schema is materialized per device and role (at import, or
+    on first request) and served from a single stored JSON document.
+    """
+    schema_json = get_config_schema_json(manager.storage.db_path, device_id, role or ALL_ROLES)
 
-    conn.close()
+    if schema_json is None:
+        raise HTTPException(status_code=404, detail="Device not found")
 
-    return {
-        'menus': menus,
-        'role_mappings': role_mappings
-    }
+    return Response(content=schema_json, media_type="application/json")
 
 # IMPORTANT: More specific routes must come BEFORE parameterized routes
 # /api/iodd/reset must be before /api/iodd/{device_id}
@@ -1571,6 +1560,7 @@ async def reset_database():
         "iodd_files",
         "iodd_assets",
         "generated_adapters",
+        "device_config_schemas",
         "devices",
     ])
 
@@ -1616,6 +1606,7 @@ async def reset_iodd_database():
         "iodd_files",
         "iodd_assets",
         "generated_adapters",
+        "device_config_schemas",
         "devices",
     ])
 
@@ -1709,6 +1700,7 @@ async def delete_all_data():
         "iodd_files",
         "iodd_assets",
         "generated_adapters",
+        "device_config_schemas",
         "devices",
     ])
 
@@ -1753,32 +1745,14 @@ async def bulk_delete_devices(request: BulkDeleteRequest):
 
     import sqlite3
     conn = sqlite3.connect(manager.storage.db_path)
-    cursor = conn.cursor()
+    try:
+        result = cascade_delete(conn, "iodd", request.device_ids)
+    finally:
+        conn.close()
+    invalidate_device_caches(manager.storage, "iodd", result["deleted_ids"])
 
-    deleted_count = 0
-    not_found = []
-
-    for device_id in request.device_ids:
-        # Check if device exists
-        cursor.execute("SELECT id FROM devices WHERE id = ?", (device_id,))
-        if not cursor.fetchone():
-            not_found.append(device_id)
-            continue
-
-        # Delete related records
-        cursor.execute("DELETE FROM process_data_record_items WHERE process_data_id IN (SELECT id FROM process_data WHERE device_id = ?)", (device_id,))
-        cursor.execute("DELETE FROM process_data WHERE device_id = ?", (device_id,))
-        cursor.execute("DELETE FROM error_types WHERE device_id = ?", (device_id,))
-        cursor.execute("DELETE FROM events WHERE device_id = ?", (device_id,))
-        cursor.execute("DELETE FROM parameters WHERE device_id = ?", (device_id,))
-        cursor.execute("DELETE FROM iodd_files WHERE device_id = ?", (device_id,))
-        cursor.execute("DELETE FROM iodd_assets WHERE device_id = ?", (device_id,))
-        cursor.execute("DELETE FROM generated_adapters WHERE device_id = ?", (device_id,))
-        cursor.execute("DELETE FROM devices WHERE id = ?", (device_id,))
-        deleted_count += 1
-
-    conn.commit()
-    conn.close()
+    deleted_count = len(result["deleted_ids"])
+    not_found = result["not_found"]
 
     response = {
         "deleted_count": deleted_count,
@@ -1795,29 +1769,17 @@ async def bulk_delete_devices(request: BulkDeleteRequest):
             tags=["IODD Management"])
 async def delete_device(device_id: int):
     """Delete a device from the system"""
-    device = manager.storage.get_device(device_id)
-
-    if not device:
-        raise HTTPException(status_code=404, detail="Device not found")
-
-    # Delete from database
+    # Delete the device with all dependent rows (including assets)
     import sqlite3
     conn = sqlite3.connect(manager.storage.db_path)
-    cursor = conn.cursor()
-
-    # Delete related records (including assets)
-    cursor.execute("DELETE FROM process_data_record_items WHERE process_data_id IN (SELECT id FROM process_data WHERE device_id = ?)", (device_id,))
-    cursor.execute("DELETE FROM process_data WHERE device_id = ?", (device_id,))
-    cursor.execute("DELETE FROM error_types WHERE device_id = ?", (device_id,))
-    cursor.execute("DELETE FROM events WHERE device_id = ?", (device_id,))
-    cursor.execute("DELETE FROM parameters WHERE device_id = ?", (device_id,))
-    cursor.execute("DELETE FROM iodd_files WHERE device_id = ?", (device_id,))
-    cursor.execute("DELETE FROM iodd_assets WHERE device_id = ?", (device_id,))
-    cursor.execute("DELETE FROM generated_adapters WHERE device_id = ?", (device_id,))
-    cursor.execute("DELETE FROM devices WHERE id = ?", (device_id,))
+    try:
+        result = cascade_delete(conn, "iodd", [device_id])
+    finally:
+        conn.close()
 
-    conn.commit()
-    conn.close()
+    if not result["deleted_ids"]:
+        raise HTTPException(status_code=404, detail="Device not found")
+    invalidate_device_caches(manager.storage, "iodd", [device_id])
 
     return {"message": f"Device {device_id} deleted successfully"}
 
@@ -1833,9 +1795,11 @@ async def export_iodd(device_id: int, format: str = "zip"):
     Returns:
         ZIP file with all IODD files or just the XML file
     """
-    import io
     import sqlite3
-    import zipfile
+
+    from fastapi.responses import StreamingResponse
+
+    from src.utils.zip_stream import ZipStream, content_disposition
 
     conn = sqlite3.connect(manager.storage.db_path)
     cursor = conn.cursor()
@@ -1849,15 +1813,15 @@ async def export_iodd(device_id: int, format: str = "zip"):
 
     product_name = device[0]
 
-    # Get all assets for this device
+    # Get asset metadata only; contents are read while streaming
     cursor.execute(
-        "SELECT file_name, file_content, file_type FROM iodd_assets WHERE device_id = ?",
+        "SELECT id, file_name, file_type, length(file_content) FROM iodd_assets WHERE device_id = ?",
         (device_id,)
     )
     assets = cursor.fetchall()
-    conn.close()
 
     if not assets:
+        conn.close()
         raise HTTPException(status_code=404, detail="No files found for this device")
 
     # If XML only format requested
@@ -1865,42 +1829,34 @@ async def export_iodd(device_id: int, format: str = "zip"):
         # Find the XML file
         xml_asset = next((a for a in assets if a[2] == 'xml'), None)
         if not xml_asset:
+            conn.close()
             raise HTTPException(status_code=404, detail="XML file not found")
 
-        file_name, file_content, _ = xml_asset
-
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(mode='wb', suffix='.xml', delete=False) as tmp_file:
-            tmp_file.write(file_content if isinstance(file_content, bytes) else file_content.encode())
-            tmp_path = tmp_file.name
+        asset_id, file_name, _, _ = xml_asset
+        cursor.execute("SELECT file_content FROM iodd_assets WHERE id = ?", (asset_id,))
+        file_content = cursor.fetchone()[0]
+        conn.close()
 
-        return FileResponse(
-            path=tmp_path,
+        return Response(
+            content=file_content if isinstance(file_content, bytes) else file_content.encode(),
             media_type="application/xml",
-            filename=file_name or f"{product_name}.xml"
+            headers={"Content-Disposition": content_disposition(file_name or f"{product_name}.xml")}
         )
 
-    # Create ZIP package with all assets (using original filenames)
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        for file_name, file_content, file_type in assets:
-            # Write each file to the ZIP with its original filename
-            zip_file.writestr(file_name, file_content)
+    conn.close()
 
-    zip_buffer.seek(0)
-
-    # Create temporary file for the ZIP
-    with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as tmp_file:
-        tmp_file.write(zip_buffer.getvalue())
-        tmp_path = tmp_file.name
+    # Stream ZIP package with all assets (using original filenames)
+    archive = ZipStream()
+    for asset_id, file_name, _, size in assets:
+        archive.add_blob(file_name, manager.storage.db_path, "iodd_assets", "file_content", asset_id, size=size)
 
     # Use product name for the ZIP filename
     safe_product_name = "".join(c for c in product_name if c.isalnum() or c in (' ', '-', '_')).strip()
 
-    return FileResponse(
-        path=tmp_path,
+    return StreamingResponse(
+        archive,
         media_type="application/zip",
-        filename=f"{safe_product_name}.zip"
+        headers={"Content-Disposition": content_disposition(f"{safe_product_name}.zip")}
     )
 
 @app.get("/api/iodd/{device_id}/assets",
@@ -2572,9 +2528,11 @@ async def generate_adapter(request: GenerateRequest):
          tags=["Adapter Generation"])
 async def download_generated_adapter(device_id: int, platform: str):
     """Download generated adapter as a zip file"""
-    import io
     import sqlite3
-    import zipfile
+
+    from fastapi.responses import StreamingResponse
+
+    from src.utils.zip_stream import ZipStream, content_disposition
 
     # Get generated adapter from database
     conn = sqlite3.connect(manager.storage.db_path)
@@ -2595,23 +2553,14 @@ async def download_generated_adapter(device_id: int, platform: str):
     # Parse files from JSON
     files = json.loads(result[0])
     
-    # Create zip file in memory
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        for filename, content in files.items():
-            zip_file.writestr(filename, content)
-    
-    zip_buffer.seek(0)
-    
-    # Create temporary file
-    with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as tmp_file:
-        tmp_file.write(zip_buffer.getvalue())
-        tmp_path = tmp_file.name
+    archive = ZipStream()
+    for filename, content in files.items():
+        archive.add(filename, content)
     
-    return FileResponse(
-        path=tmp_path,
+    return StreamingResponse(
+        archive,
         media_type="application/zip",
-        filename=f"device_{device_id}_{platform}_adapter.zip"
+        headers={"Content-Disposition": content_disposition(f"device_{device_id}_{platform}_adapter.zip")}
     )
 
 # -----------------------------------------------------------------------------
@@ -2709,6 +2658,10 @@ async def readiness_probe():
     except Exception as e:
         checks["disk"] = {"status": "error", "message": str(e)}
 
+    if overall_status != "not_ready":
+        # Deferred startup work (PQA analysis) starts once we serve traffic
+        notify_pqa_ready()
+
     return {"status": overall_status, "timestamp": datetime.now().isoformat(), "checks": checks}
 
 @app.get("/api/stats", tags=["System"])
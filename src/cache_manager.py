@@ -5,11 +5,15 @@ Redis-based caching layer for frequently accessed queries
 import json
 import logging
 import hashlib
-from typing import Any, Optional, Callable, List
+from typing import TYPE_CHECKING, Any, Optional, Callable, List
 from functools import wraps
-import redis
 from datetime import timedelta
 
+from src.utils.redis_probe import redis_reachable
+
+if TYPE_CHECKING:
+    import redis
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,13 +36,22 @@ class CacheManager:
             redis_url: Redis connection URL
         """
         self.redis_url = redis_url
-        self.client: Optional[redis.Redis] = None
+        self.client: Optional["redis.Redis"] = None
         self.enabled = True
         self._connect()
 
     def _connect(self):
         """Establish Redis connection"""
+        # Only load the redis client when a server is listening
+        if not redis_reachable(self.redis_url):
+            logger.warning(f"Redis not reachable at {self.redis_url}, caching disabled")
+            self.client = None
+            self.enabled = False
+            return
+
         try:
+            import redis
+
             self.client = redis.from_url(
                 self.redis_url,
                 decode_responses=True,
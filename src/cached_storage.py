@@ -193,6 +193,21 @@ class CachedStorageManager:
         self.cache.invalidate_by_tag("all_eds")
         self.cache.invalidate_by_tag(f"eds:{eds_id}")
 
+    def invalidate_devices(self, device_type: str, ids: List[int]):
+        """Invalidate caches of devices removed outside this wrapper (e.g. bulk deletes)"""
+        if device_type == "eds":
+            self.cache.invalidate_by_tag("all_eds")
+            for eds_id in ids:
+                self.cache.invalidate_by_tag(f"eds:{eds_id}")
+        else:
+            self.cache.invalidate_by_tag("all_devices")
+            for device_id in ids:
+                self.cache.invalidate_by_tag(f"device:{device_id}")
+                self.cache.invalidate_by_tag(f"device:{device_id}_assets")
+        self.cache.invalidate_namespace("stats")
+
+        logger.info(f"Caches invalidated for {len(ids)} deleted {device_type} device(s)")
+
     # ========================================================================
     # Asset Operations with Caching
     # ========================================================================
@@ -5,13 +5,24 @@ This module configures Celery for asynchronous task processing with:
 - Automatic retries with exponential backoff
 - Task timeout handling
 - Dead letter queue for failed tasks
+- Per-domain queues (ingest, generation, export, pqa) with priorities
+- Worker profiles for prefetch/ack tuning per queue group
 - Redis as message broker and result backend
+- Opt-in sampling profiles of armed tasks (see utils/job_profiler.py)
 """
 
+import logging
 import os
+import threading
+import time
 from celery import Celery
+from celery.signals import before_task_publish, task_postrun, task_prerun
 from kombu import Exchange, Queue
 
+from src.utils.job_profiler import ProfiledJob, job_profiles
+
+logger = logging.getLogger(__name__)
+
 # Get Redis URL from environment or use default
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
@@ -20,9 +31,65 @@ celery_app = Celery(
     "greenstack",
     broker=REDIS_URL,
     backend=REDIS_URL,
-    include=["src.tasks.iodd_tasks", "src.tasks.generation_tasks", "src.tasks.export_tasks"]
+    include=["src.tasks.iodd_tasks", "src.tasks.generation_tasks", "src.tasks.export_tasks", "src.tasks.batching"]
 )
 
+# Domain queues: interactive uploads get their own queue so a nightly PQA run
+# or a large export can never sit in front of them
+QUEUE_INGEST = "ingest"
+QUEUE_GENERATION = "generation"
+QUEUE_EXPORT = "export"
+QUEUE_PQA = "pqa"
+QUEUE_DEFAULT = "default"
+QUEUE_DLQ = "celery_dlq"
+
+ALL_QUEUES = (QUEUE_INGEST, QUEUE_GENERATION, QUEUE_EXPORT, QUEUE_PQA, QUEUE_DEFAULT, QUEUE_DLQ)
+
+# Task priorities (Redis transport: 0 is served first, 9 last)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 3
+PRIORITY_BATCH = 6
+
+# Worker profiles: run one worker per profile to isolate queue groups.
+# Short interactive tasks prefetch a few messages; long bulk tasks prefetch
+# one so a busy process never hoards queued work from idle ones.
+WORKER_PROFILES = {
+    "interactive": {
+        "queues": (QUEUE_INGEST, QUEUE_DEFAULT),
+        "prefetch_multiplier": 4,
+        "acks_late": True,
+    },
+    "bulk": {
+        "queues": (QUEUE_GENERATION, QUEUE_EXPORT, QUEUE_PQA),
+        "prefetch_multiplier": 1,
+        "acks_late": True,
+    },
+    "dlq": {
+        "queues": (QUEUE_DLQ,),
+        "prefetch_multiplier": 1,
+        "acks_late": False,
+    },
+    "all": {
+        "queues": ALL_QUEUES,
+        "prefetch_multiplier": 1,
+        "acks_late": True,
+    },
+}
+WORKER_PROFILE = os.getenv("CELERY_WORKER_PROFILE", "all")
+if WORKER_PROFILE not in WORKER_PROFILES:
+    logger.warning(f"Unknown CELERY_WORKER_PROFILE '{WORKER_PROFILE}', using 'all'")
+    WORKER_PROFILE = "all"
+_profile = WORKER_PROFILES[WORKER_PROFILE]
+
+# Rate limits for heavy tasks (per worker, Celery rate limit syntax)
+EXPORT_RATE_LIMIT = os.getenv("CELERY_EXPORT_RATE_LIMIT", "30/m")
+PDF_RATE_LIMIT = os.getenv("CELERY_PDF_RATE_LIMIT", "10/m")
+
+
+def _queue(name: str) -> Queue:
+    return Queue(name, Exchange(name), routing_key=name, queue_arguments={"x-max-priority": 10})
+
+
 # Celery Configuration
 celery_app.conf.update(
     # Task result settings
@@ -41,22 +108,27 @@ celery_app.conf.update(
     task_time_limit=600,  # Hard timeout: 10 minutes
 
     # Task acknowledgment settings
-    task_acks_late=True,  # Acknowledge task after completion
+    task_acks_late=_profile["acks_late"],  # Acknowledge task after completion
     task_reject_on_worker_lost=True,  # Reject tasks if worker dies
 
     # Retry settings
     task_default_retry_delay=60,  # Default retry delay: 1 minute
     task_max_retries=3,  # Maximum retry attempts
 
-    # Dead Letter Queue configuration
-    task_default_queue="default",
-    task_queues=(
-        Queue("default", Exchange("default"), routing_key="default"),
-        Queue("celery_dlq", Exchange("celery_dlq"), routing_key="celery_dlq"),
-    ),
+    # Queues (including the Dead Letter Queue)
+    task_default_queue=QUEUE_DEFAULT,
+    task_queues=tuple(_queue(name) for name in ALL_QUEUES),
+
+    # Priority support
+    task_default_priority=PRIORITY_NORMAL,
+    task_queue_max_priority=10,
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "queue_order_strategy": "priority",
+    },
 
     # Worker settings
-    worker_prefetch_multiplier=4,  # Number of tasks to prefetch
+    worker_prefetch_multiplier=_profile["prefetch_multiplier"],  # Number of tasks to prefetch
     worker_max_tasks_per_child=1000,  # Restart worker after N tasks
     worker_disable_rate_limits=False,
 
@@ -64,11 +136,28 @@ celery_app.conf.update(
     worker_send_task_events=True,  # Enable task events for Flower
     task_send_sent_event=True,
 
-    # Task routing
+    # Task routing (exact names are matched before patterns)
     task_routes={
-        "src.tasks.iodd_tasks.*": {"queue": "default"},
-        "src.tasks.generation_tasks.*": {"queue": "default"},
-        "src.tasks.export_tasks.*": {"queue": "default"},
+        # Batch work shares the domain queues at a lower priority
+        "src.tasks.iodd_tasks.parse_iodd_chunk": {"queue": QUEUE_INGEST, "priority": PRIORITY_BATCH},
+        "src.tasks.iodd_tasks.batch_parse_iodd_files": {"queue": QUEUE_INGEST, "priority": PRIORITY_BATCH},
+        "src.tasks.generation_tasks.generate_flows_chunk": {"queue": QUEUE_GENERATION, "priority": PRIORITY_BATCH},
+        "src.tasks.generation_tasks.batch_generate_flows": {"queue": QUEUE_GENERATION, "priority": PRIORITY_BATCH},
+        "src.tasks.export_tasks.export_devices_chunk": {"queue": QUEUE_EXPORT, "priority": PRIORITY_BATCH},
+        "src.tasks.export_tasks.batch_export_devices": {"queue": QUEUE_EXPORT, "priority": PRIORITY_BATCH},
+        "src.tasks.iodd_tasks.*": {"queue": QUEUE_INGEST, "priority": PRIORITY_INTERACTIVE},
+        "src.tasks.generation_tasks.*": {"queue": QUEUE_GENERATION},
+        "src.tasks.export_tasks.*": {"queue": QUEUE_EXPORT},
+        "src.tasks.pqa_tasks.*": {"queue": QUEUE_PQA, "priority": PRIORITY_BATCH},
+        "src.tasks.batching.*": {"queue": QUEUE_DEFAULT},
+        "src.tasks.dlq_handler.*": {"queue": QUEUE_DLQ},
+    },
+
+    # Rate limits for heavy tasks
+    task_annotations={
+        "src.tasks.export_tasks.export_device_config": {"rate_limit": EXPORT_RATE_LIMIT},
+        "src.tasks.export_tasks.generate_documentation": {"rate_limit": EXPORT_RATE_LIMIT},
+        "src.tasks.generation_tasks.generate_device_pdf": {"rate_limit": PDF_RATE_LIMIT},
     },
 )
 
@@ -83,6 +172,53 @@ celery_app.conf.task_retry_backoff_max = 600  # Max retry delay: 10 minutes
 celery_app.conf.task_retry_jitter = True  # Add jitter to prevent thundering herd
 
 
+@before_task_publish.connect
+def _stamp_published_at(headers=None, **kwargs):
+    """Record the publish time so queue latency can be measured (see tasks/queue_metrics.py)"""
+    if headers is not None:
+        headers.setdefault("published_at", time.time())
+
+
+# Message header asking the worker to profile a task
+PROFILE_HEADER = "profile_job"
+
+# Profiles of the tasks running in this worker, by task id
+_task_profiles = {}
+# Task running in the current thread (set only while it is profiled)
+_profiling = threading.local()
+
+
+@before_task_publish.connect
+def _request_profile(sender=None, headers=None, **kwargs):
+    """Flag armed tasks, and tasks published by a profiled task (e.g. batch chunks)"""
+    if headers is None:
+        return
+    if getattr(_profiling, "task_id", None) in _task_profiles or job_profiles.consume(sender):
+        headers[PROFILE_HEADER] = True
+
+
+@task_prerun.connect
+def _start_task_profile(task_id=None, task=None, **kwargs):
+    if task is None:
+        return
+    request = task.request
+    if not (getattr(request, PROFILE_HEADER, False) or (request.headers or {}).get(PROFILE_HEADER)):
+        return
+    profile = ProfiledJob(task.name, enabled=True, task_id=task_id)
+    profile.__enter__()
+    _task_profiles[task_id] = profile
+    _profiling.task_id = task_id
+
+
+@task_postrun.connect
+def _save_task_profile(task_id=None, state=None, **kwargs):
+    profile = _task_profiles.pop(task_id, None)
+    if profile is not None:
+        _profiling.task_id = None
+        profile.metadata["status"] = (state or "unknown").lower()
+        profile.__exit__(None, None, None)
+
+
 def send_to_dlq(task_id: str, task_name: str, args: tuple, kwargs: dict, exception: Exception):
     """
     Send failed task to Dead Letter Queue.
@@ -110,7 +246,7 @@ def send_to_dlq(task_id: str, task_name: str, args: tuple, kwargs: dict, excepti
     celery_app.send_task(
         "src.tasks.dlq_handler.process_dlq_message",
         args=[dlq_message],
-        queue="celery_dlq",
+        queue=QUEUE_DLQ,
     )
 
 
@@ -124,6 +124,7 @@ TEMPLATE_DIR = Path(os.getenv('TEMPLATE_DIR', './templates'))
 
 REDIS_URL = os.getenv('REDIS_URL', None)
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', None)
+ENABLE_QUEUE_METRICS = os.getenv('ENABLE_QUEUE_METRICS', 'false').lower() == 'true'
 SENTRY_DSN = os.getenv('SENTRY_DSN', None)
 
 # ============================================================================
@@ -141,6 +142,16 @@ LOG_SQL_QUERIES = os.getenv('LOG_SQL_QUERIES', 'false').lower() == 'true'
 REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', '30'))
 MAX_CONNECTIONS = int(os.getenv('MAX_CONNECTIONS', '100'))
 ENABLE_COMPRESSION = os.getenv('ENABLE_COMPRESSION', 'true').lower() == 'true'
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))  # bytes
+DEFAULT_PAGE_SIZE = int(os.getenv('DEFAULT_PAGE_SIZE', '0'))  # 0 = unpaginated unless ?limit= is given
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', '1000'))
+ENABLE_HTTP_CACHE = os.getenv('ENABLE_HTTP_CACHE', 'true').lower() == 'true'
+HTTP_CACHE_MAX_AGE = int(os.getenv('HTTP_CACHE_MAX_AGE', '60'))  # seconds; 0 = always revalidate
+ENABLE_QUERY_STATS = os.getenv('ENABLE_QUERY_STATS', 'true').lower() == 'true'
+SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', '1000'))  # log a query breakdown above this
+SLOW_REQUEST_TOP_QUERIES = int(os.getenv('SLOW_REQUEST_TOP_QUERIES', '5'))
+PQA_STARTUP_DELAY = float(os.getenv('PQA_STARTUP_DELAY', '30'))  # seconds after the API reports ready
+PQA_STARTUP_READY_TIMEOUT = float(os.getenv('PQA_STARTUP_READY_TIMEOUT', '300'))  # run anyway without a readiness probe
 
 # ============================================================================
 # Feature Flags
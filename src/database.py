@@ -7,7 +7,10 @@ import logging
 import sqlite3
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 
@@ -93,6 +96,28 @@ def get_db_connection(enable_foreign_keys: bool = True):
         conn.close()
 
 
+def get_read_connection(db_path: Optional[str] = None, timeout: float = 5.0) -> sqlite3.Connection:
+    """
+    Get a read-only database connection for reporting queries
+
+    Opened with ``mode=ro`` and ``PRAGMA query_only``, so it can never take
+    a write lock; in WAL mode it reads the last committed state without
+    waiting for writers.
+
+    Args:
+        db_path: Database file (default: the configured database)
+        timeout: Seconds to wait on a lock (e.g. during a checkpoint)
+
+    Returns:
+        sqlite3.Connection object
+    """
+    path = Path(db_path or get_db_path()).resolve()
+    conn = sqlite3.connect(f"{path.as_uri()}?mode=ro", uri=True, timeout=timeout)
+    conn.execute("PRAGMA query_only = ON")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
 def initialize_database(db_path: Optional[str] = None) -> None:
     """
     Initialize database connection settings
@@ -116,10 +141,10 @@ def initialize_database(db_path: Optional[str] = None) -> None:
 # PostgreSQL Read/Write Split Support (Production)
 # ============================================================================
 
+# SQLAlchemy is imported when the manager is first used, not at import time:
+# most routes use sqlite3 directly and it adds ~400ms to API startup.
+
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import NullPool, QueuePool
 
 # Database URLs from environment
 PRIMARY_DATABASE_URL = os.getenv("PRIMARY_DATABASE_URL", "sqlite:///./greenstack.db")
@@ -144,6 +169,10 @@ class DatabaseManager:
 
     def _setup_connections(self):
         """Set up primary and replica database connections."""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from sqlalchemy.pool import NullPool, QueuePool
+
         logger.info(f"Connecting to primary database")
 
         if "sqlite" in PRIMARY_DATABASE_URL:
@@ -175,11 +204,11 @@ class DatabaseManager:
             self.replica_engine = self.primary_engine
             self.ReplicaSession = self.PrimarySession
 
-    def get_write_session(self) -> Session:
+    def get_write_session(self) -> "Session":
         """Get session for write operations (primary database)."""
         return self.PrimarySession()
 
-    def get_read_session(self) -> Session:
+    def get_read_session(self) -> "Session":
         """Get session for read operations (replica or primary)."""
         try:
             return self.ReplicaSession()
@@ -188,13 +217,27 @@ class DatabaseManager:
             return self.PrimarySession()
 
 
-# Global database manager
-db_manager = DatabaseManager()
+_db_manager: Optional[DatabaseManager] = None
+
+
+def get_db_manager() -> DatabaseManager:
+    """Global database manager, created on first use"""
+    global _db_manager
+    if _db_manager is None:
+        _db_manager = DatabaseManager()
+    return _db_manager
+
+
+def __getattr__(name):
+    # Keeps ``from src.database import db_manager`` working without an eager manager
+    if name == "db_manager":
+        return get_db_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_db_write():
     """FastAPI dependency for write operations."""
-    session = db_manager.get_write_session()
+    session = get_db_manager().get_write_session()
     try:
         yield session
     finally:
@@ -203,7 +246,7 @@ def get_db_write():
 
 def get_db_read():
     """FastAPI dependency for read operations."""
-    session = db_manager.get_read_session()
+    session = get_db_manager().get_read_session()
     try:
         yield session
     finally:
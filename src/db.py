@@ -6,7 +6,7 @@ Supports both SQLite (development) and PostgreSQL (production)
 import logging
 import os
 from contextlib import contextmanager
-from typing import Generator
+from typing import Generator, Optional
 
 from prometheus_client import Gauge
 from sqlalchemy import create_engine, event
@@ -41,7 +41,7 @@ db_pool_overflow = Gauge(
 # Database Engine Configuration
 # ============================================================================
 
-def create_db_engine() -> Engine:
+def create_db_engine(database_url: Optional[str] = None) -> Engine:
     """
     Create SQLAlchemy engine with optimized connection pooling settings.
 
@@ -49,10 +49,13 @@ def create_db_engine() -> Engine:
     - SQLite: Uses NullPool (no pooling needed for file-based DB)
     - PostgreSQL: Uses QueuePool with production-ready settings
 
+    Args:
+        database_url: Database to connect to (default: config.DATABASE_URL)
+
     Returns:
         Configured SQLAlchemy Engine instance
     """
-    database_url = config.DATABASE_URL
+    database_url = database_url or config.DATABASE_URL
 
     # Determine if using SQLite
     is_sqlite = database_url.startswith('sqlite:///')
@@ -18,6 +18,7 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 
@@ -66,6 +67,9 @@ from src.generation import AdapterGenerator, NodeREDGenerator
 
 # Import modular storage system
 from src.storage import StorageManager as ModularStorageManager
+from src.storage.backends import get_backend, is_postgres_url
+from src.utils.config_schema import install_config_schema_table
+from src.utils.device_versions import install_device_versions
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -1968,15 +1972,38 @@ class IODDIngester:
 # Storage Manager
 # ============================================================================
 
+def default_database() -> str:
+    """
+    Database of StorageManager when none is given: IODD_DATABASE_URL if it is
+    a PostgreSQL URL, otherwise the SQLite file greenstack.db
+    """
+    from src import config
+
+    return config.DATABASE_URL if is_postgres_url(config.DATABASE_URL) else "greenstack.db"
+
+
+@lru_cache(maxsize=None)
+def _init_postgres_schema(database_url: str) -> None:
+    """Create the schema in PostgreSQL once per process"""
+    from src.storage.postgres_migration import create_postgres_schema
+
+    create_postgres_schema(database_url)
+
+
 class StorageManager:
-    """Manage IODD data storage in SQLite database"""
+    """Manage IODD data storage in SQLite database (or PostgreSQL, given a postgresql:// URL)"""
     
-    def __init__(self, db_path: str = "greenstack.db"):
-        self.db_path = db_path
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or default_database()
+        self.backend = get_backend(self.db_path)
         self._init_database()
     
     def _init_database(self):
         """Initialize database schema"""
+        if self.backend.name == "postgresql":
+            _init_postgres_schema(self.db_path)
+            return
+
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
@@ -2617,6 +2644,11 @@ class StorageManager:
             )
         """)
 
+        # Version counters bumped by triggers on import/delete (HTTP ETags)
+        install_device_versions(conn)
+        # Materialized config-page schemas, keyed to those versions
+        install_config_schema_table(conn)
+
         conn.commit()
         conn.close()
     
@@ -2686,9 +2718,12 @@ class StorageManager:
         
         # Save parameters
         for param in profile.parameters:
-            # Serialize enumeration values as JSON
+            # Serialize enumeration values as compact JSON (as in src/storage/parameter.py)
             import json
-            enum_json = json.dumps(param.enumeration_values) if param.enumeration_values else None
+            enum_json = (
+                json.dumps(param.enumeration_values, ensure_ascii=False, separators=(',', ':'))
+                if param.enumeration_values else None
+            )
 
             cursor.execute("""
                 INSERT INTO parameters (device_id, param_index, name, data_type,
@@ -3128,7 +3163,7 @@ class StorageManager:
             device_id: The device ID to associate assets with
             assets: List of dicts with keys: file_name, file_type, file_content, file_path, image_purpose (optional)
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self.backend.connect()
         cursor = conn.cursor()
 
         added_count = 0
@@ -3136,7 +3171,8 @@ class StorageManager:
 
         for asset in assets:
             # Check if asset with same file_name already exists for this device
-            cursor.execute(
+            self.backend.execute(
+                cursor,
                 "SELECT id FROM iodd_assets WHERE device_id = ? AND file_name = ?",
                 (device_id, asset['file_name'])
             )
@@ -3148,7 +3184,7 @@ class StorageManager:
                 continue
 
             # Insert new asset
-            cursor.execute("""
+            self.backend.execute(cursor, """
                 INSERT INTO iodd_assets (device_id, file_name, file_type, file_content, file_path, image_purpose)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (
@@ -3178,23 +3214,22 @@ class StorageManager:
                     'TN_M_Ident': {'en': 'Identification', 'de': 'Identifikation'}
                 }
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        text_count = 0
-
-        for text_id, languages in all_text_data.items():
-            for language_code, text_value in languages.items():
-                cursor.execute("""
-                    INSERT INTO iodd_text (device_id, text_id, language_code, text_value)
-                    VALUES (?, ?, ?, ?)
-                """, (device_id, text_id, language_code, text_value))
-                text_count += 1
+        rows = [
+            (device_id, text_id, language_code, text_value)
+            for text_id, languages in all_text_data.items()
+            for language_code, text_value in languages.items()
+        ]
 
+        conn = self.backend.connect()
+        cursor = conn.cursor()
+        self.backend.execute_many(cursor, """
+            INSERT INTO iodd_text (device_id, text_id, language_code, text_value)
+            VALUES (?, ?, ?, ?)
+        """, rows)
         conn.commit()
         conn.close()
 
-        logger.info(f"Saved {text_count} text entries across {len(all_text_data)} text IDs for device {device_id}")
+        logger.info(f"Saved {len(rows)} text entries across {len(all_text_data)} text IDs for device {device_id}")
 
     def get_assets(self, device_id: int) -> List[Dict[str, Any]]:
         """Retrieve all asset files for a device
@@ -3202,38 +3237,28 @@ class StorageManager:
         Returns:
             List of dicts with keys: id, file_name, file_type, file_content, file_path
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM iodd_assets WHERE device_id = ?", (device_id,))
-        assets = [dict(row) for row in cursor.fetchall()]
-
-        conn.close()
-        return assets
+        return self.query("SELECT * FROM iodd_assets WHERE device_id = ?", (device_id,))
 
     def get_device(self, device_id: int) -> Optional[Dict[str, Any]]:
         """Retrieve device information from database"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM devices WHERE id = ?", (device_id,))
-        device = cursor.fetchone()
-        
-        if device:
-            # Get parameters
-            cursor.execute("SELECT * FROM parameters WHERE device_id = ?", (device_id,))
-            parameters = cursor.fetchall()
-            
-            result = dict(device)
-            result['parameters'] = [dict(p) for p in parameters]
-            
+        devices = self.query("SELECT * FROM devices WHERE id = ?", (device_id,))
+        if not devices:
+            return None
+
+        result = devices[0]
+        result['parameters'] = self.query("SELECT * FROM parameters WHERE device_id = ?", (device_id,))
+        return result
+
+    def query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        """Rows of a SELECT (with ? placeholders) as dicts"""
+        conn = self.backend.connect()
+        try:
+            cursor = conn.cursor()
+            self.backend.execute(cursor, query, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
             conn.close()
-            return result
-        
-        conn.close()
-        return None
 
 # ============================================================================
 # Adapter Generators
@@ -3565,7 +3590,7 @@ MIT
 class IODDManager:
     """Main IODD management system"""
     
-    def __init__(self, storage_path: str = "./iodd_storage", db_path: str = "greenstack.db"):
+    def __init__(self, storage_path: str = "./iodd_storage", db_path: Optional[str] = None):
         self.ingester = IODDIngester(Path(storage_path))
         self.storage = StorageManager(db_path)
         self.generators = {
@@ -3646,15 +3671,7 @@ class IODDManager:
     
     def list_devices(self) -> List[Dict[str, Any]]:
         """List all imported devices"""
-        conn = sqlite3.connect(self.storage.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM devices ORDER BY import_date DESC")
-        devices = [dict(row) for row in cursor.fetchall()]
-        
-        conn.close()
-        return devices
+        return self.storage.query("SELECT * FROM devices ORDER BY import_date DESC")
 
 # ============================================================================
 # CLI Interface
@@ -0,0 +1,107 @@
+"""
+HTTP Caching for Device Detail Endpoints
+ETag / If-None-Match handling backed by per-device version counters
+"""
+import logging
+import re
+from typing import Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils.device_versions import DeviceVersions
+
+logger = logging.getLogger(__name__)
+
+# /api/iodd/{id}[/...] and /api/eds/{id}[/...]; non-numeric segments such as
+# /api/iodd/reset or /api/eds/grouped/... are lists or actions, not details
+DEVICE_PATH_PATTERN = re.compile(r"^/api/(iodd|eds)/(\d+)(?:/|$)")
+
+
+def match_device_path(path: str) -> Optional[Tuple[str, int]]:
+    """(device_type, device_id) for device detail paths, else None"""
+    match = DEVICE_PATH_PATTERN.match(path)
+    if not match:
+        return None
+    return match.group(1), int(match.group(2))
+
+
+def make_etag(device_type: str, device_id: int, version: int, app_version: str) -> str:
+    # Weak: the same entity may be sent gzip/brotli encoded or not
+    return f'W/"{device_type}-{device_id}-{version}-{app_version}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class ConditionalGetMiddleware:
+    """
+    Answer conditional GETs for device detail endpoints.
+
+    A matching ``If-None-Match`` gets a 304 straight from the version cache,
+    before any route handler (and so any detail query) runs. Successful
+    responses get the current ETag and a ``Cache-Control`` header.
+    """
+
+    def __init__(self, app: ASGIApp, versions: DeviceVersions, app_version: str, max_age: int = 60):
+        self.app = app
+        self.versions = versions
+        self.app_version = app_version
+        if max_age > 0:
+            self.cache_control = f"public, max-age={max_age}, must-revalidate"
+        else:
+            self.cache_control = "public, no-cache"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        device = match_device_path(scope["path"])
+        if device is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            version = self.versions.get(*device)
+        except Exception as e:
+            logger.warning(f"Device version lookup failed, serving uncached: {e}")
+            await self.app(scope, receive, send)
+            return
+
+        etag = make_etag(device[0], device[1], version, self.app_version)
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [
+                    (b"etag", etag.encode("latin-1")),
+                    (b"cache-control", self.cache_control.encode("latin-1")),
+                    (b"vary", b"Accept-Encoding"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_etag(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                if "etag" not in headers:
+                    headers["ETag"] = etag
+                if "cache-control" not in headers:
+                    headers["Cache-Control"] = self.cache_control
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
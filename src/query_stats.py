@@ -0,0 +1,305 @@
+"""
+Per-Request Database Query Statistics
+Counts queries, rows fetched and SQL time per request on every SQLite connection
+
+``install()`` makes ``sqlite3.connect`` return instrumented connections (unless
+the caller passes its own ``factory``), so the raw connections opened across
+routes, storage and the reconstructors are all covered without touching them.
+Outside a request connections hand out plain cursors.
+
+``QueryStatsMiddleware`` opens a ``QueryStats`` per request and reports it as:
+- a ``Server-Timing`` header (``db`` time with query/row counts, and ``app``)
+- Prometheus histograms of queries, rows and SQL seconds, labelled by route
+- a warning with the most expensive statements when the request is slow
+
+Other database drivers can report through ``record_query()``.
+"""
+import logging
+import re
+import sqlite3
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from prometheus_client import Histogram
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+http_request_db_queries = Histogram(
+    'http_request_db_queries',
+    'Database queries executed per request',
+    ['method', 'route'],
+    buckets=[0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+)
+
+http_request_db_rows = Histogram(
+    'http_request_db_rows',
+    'Database rows fetched per request',
+    ['method', 'route'],
+    buckets=[0, 1, 10, 100, 1000, 10000, 100000]
+)
+
+http_request_db_seconds = Histogram(
+    'http_request_db_seconds',
+    'Time spent executing SQL and fetching rows per request',
+    ['method', 'route'],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+)
+
+
+class QueryStats:
+    """Query, row and time totals for one request, with a per-statement breakdown"""
+
+    __slots__ = ("queries", "rows", "seconds", "statements", "finished")
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+        self.seconds = 0.0
+        # sql -> [executions, rows, seconds]
+        self.statements: Dict[str, List] = {}
+        self.finished = False
+
+    def record(self, sql: str, seconds: float, rows: int = 0, executed: bool = True):
+        """Add an execution (or, with executed=False, a fetch) of sql"""
+        if executed:
+            self.queries += 1
+        self.rows += rows
+        self.seconds += seconds
+        entry = self.statements.get(sql)
+        if entry is None:
+            self.statements[sql] = [int(executed), rows, seconds]
+        else:
+            entry[0] += executed
+            entry[1] += rows
+            entry[2] += seconds
+
+    def top(self, n: int = 5) -> List[Tuple[str, int, int, float]]:
+        """(sql, executions, rows, seconds) for the n statements with the most time"""
+        ranked = sorted(self.statements.items(), key=lambda item: -item[1][2])[:n]
+        return [(sql, count, rows, seconds) for sql, (count, rows, seconds) in ranked]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    """Stats of the request being handled, if it is still recording"""
+    stats = _current.get()
+    if stats is None or stats.finished:
+        return None
+    return stats
+
+
+def record_query(sql: str, seconds: float, rows: int = 0):
+    """Report a query run outside sqlite3 (e.g. another driver) for the current request"""
+    stats = current_stats()
+    if stats is not None:
+        stats.record(sql, seconds, rows)
+
+
+# ============================================================================
+# Instrumented sqlite3 connections
+# ============================================================================
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that times executes and fetches and counts fetched rows"""
+
+    _sql = ""
+
+    def execute(self, sql, parameters=()):
+        stats = current_stats()
+        if stats is None:
+            return super().execute(sql, parameters)
+        self._sql = sql
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            stats.record(sql, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        stats = current_stats()
+        if stats is None:
+            return super().executemany(sql, seq_of_parameters)
+        self._sql = sql
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            stats.record(sql, time.perf_counter() - start)
+
+    def executescript(self, sql_script):
+        stats = current_stats()
+        if stats is None:
+            return super().executescript(sql_script)
+        self._sql = sql_script
+        start = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            stats.record(sql_script, time.perf_counter() - start)
+
+    def fetchone(self):
+        stats = current_stats()
+        if stats is None:
+            return super().fetchone()
+        start = time.perf_counter()
+        row = super().fetchone()
+        stats.record(self._sql, time.perf_counter() - start, int(row is not None), executed=False)
+        return row
+
+    def fetchmany(self, size=None):
+        stats = current_stats()
+        if stats is None:
+            return super().fetchmany(self.arraysize if size is None else size)
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        stats.record(self._sql, time.perf_counter() - start, len(rows), executed=False)
+        return rows
+
+    def fetchall(self):
+        stats = current_stats()
+        if stats is None:
+            return super().fetchall()
+        start = time.perf_counter()
+        rows = super().fetchall()
+        stats.record(self._sql, time.perf_counter() - start, len(rows), executed=False)
+        return rows
+
+    def __next__(self):
+        stats = current_stats()
+        if stats is None:
+            return super().__next__()
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            stats.record(self._sql, time.perf_counter() - start, executed=False)
+            raise
+        stats.record(self._sql, time.perf_counter() - start, 1, executed=False)
+        return row
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors (including conn.execute shortcuts) are instrumented"""
+
+    def cursor(self, factory=None):
+        # Plain cursors outside a request, so idle connections pay no per-row cost
+        if factory is None:
+            factory = InstrumentedCursor if current_stats() is not None else sqlite3.Cursor
+        return super().cursor(factory)
+
+    # The C shortcuts create plain cursors, so route them through cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+_original_connect = sqlite3.connect
+
+
+def _instrumented_connect(*args, **kwargs):
+    if len(args) < 5:  # factory is the 5th positional parameter
+        kwargs.setdefault("factory", InstrumentedConnection)
+    return _original_connect(*args, **kwargs)
+
+
+def install():
+    """Make sqlite3.connect return instrumented connections (idempotent)"""
+    sqlite3.connect = _instrumented_connect
+
+
+def uninstall():
+    sqlite3.connect = _original_connect
+
+
+# ============================================================================
+# Middleware
+# ============================================================================
+
+def _compact_sql(sql: str, limit: int = 160) -> str:
+    sql = re.sub(r"\s+", " ", sql).strip()
+    return sql if len(sql) <= limit else sql[:limit - 3] + "..."
+
+
+def server_timing(stats: QueryStats, elapsed: float) -> str:
+    return (f'db;dur={stats.seconds * 1000:.2f};desc="{stats.queries} queries, {stats.rows} rows", '
+            f'app;dur={elapsed * 1000:.2f}')
+
+
+def route_label(scope: Scope) -> str:
+    """Route template (e.g. /api/iodd/{device_id}) to keep label cardinality bounded"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class QueryStatsMiddleware:
+    """
+    Collect per-request query statistics and report them.
+
+    The ``Server-Timing`` header covers the queries made before the response
+    starts; the histograms and slow-request log cover the whole request,
+    including streamed bodies. Background tasks are not counted.
+    """
+
+    def __init__(self, app: ASGIApp, slow_request_ms: float = 1000, top_queries: int = 5):
+        self.app = app
+        self.slow_request_seconds = slow_request_ms / 1000
+        self.top_queries = top_queries
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        end = None
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal end
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(stats, time.perf_counter() - start))
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Response complete; anything after this is background work
+                stats.finished = True
+                end = time.perf_counter()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stats.finished = True
+            _current.reset(token)
+            self.report(scope, stats, (end or time.perf_counter()) - start)
+
+    def report(self, scope: Scope, stats: QueryStats, elapsed: float):
+        method = scope["method"]
+        route = route_label(scope)
+        try:
+            http_request_db_queries.labels(method, route).observe(stats.queries)
+            http_request_db_rows.labels(method, route).observe(stats.rows)
+            http_request_db_seconds.labels(method, route).observe(stats.seconds)
+        except Exception as e:
+            logger.warning(f"Failed to record query metrics: {e}")
+
+        if elapsed >= self.slow_request_seconds:
+            breakdown = "\n".join(
+                f"  {count:>5}x {seconds * 1000:>9.1f}ms {rows:>8} rows  {_compact_sql(sql)}"
+                for sql, count, rows, seconds in stats.top(self.top_queries)
+            )
+            logger.warning(
+                f"Slow request {method} {route} ({scope['path']}): {elapsed * 1000:.0f}ms, "
+                f"{stats.queries} queries, {stats.rows} rows, {stats.seconds * 1000:.0f}ms in SQL"
+                + (f"\n{breakdown}" if breakdown else "")
+            )
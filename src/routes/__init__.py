@@ -2,24 +2,32 @@
 Greenstack API Routes
 
 FastAPI route handlers for all API endpoints.
+
+Routers are imported on first access, so importing one route module does not
+load all of them (and their dependencies).
 """
 
-from .admin_routes import router as admin_router
-from .config_export_routes import router as config_export_router
-from .eds_routes import router as eds_router
-from .mqtt_routes import router as mqtt_router
-from .search_routes import router as search_router
-from .service_routes import router as service_router
-from .theme_routes import router as theme_router
-from .ticket_routes import router as ticket_router
+import importlib
+
+_ROUTERS = {
+    "admin_router": "admin_routes",
+    "config_export_router": "config_export_routes",
+    "eds_router": "eds_routes",
+    "flow_router": "flow_routes",
+    "mqtt_router": "mqtt_routes",
+    "search_router": "search_routes",
+    "service_router": "service_routes",
+    "telemetry_router": "telemetry_routes",
+    "theme_router": "theme_routes",
+    "ticket_router": "ticket_routes",
+}
+
+__all__ = list(_ROUTERS)
+
 
-__all__ = [
-    "admin_router",
-    "config_export_router",
-    "eds_router",
-    "mqtt_router",
-    "search_router",
-    "service_router",
-    "theme_router",
-    "ticket_router",
-]
+def __getattr__(name):
+    if name in _ROUTERS:
+        router = importlib.import_module(f".{_ROUTERS[name]}", __name__).router
+        globals()[name] = router
+        return router
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -11,16 +11,35 @@ import tempfile
 from datetime import datetime
 from pathlib import Path
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
-
-from src.database import get_db_path
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, PlainTextResponse
+from starlette.background import BackgroundTask
+
+from src.database import get_db_path, get_read_connection
+from src.utils.db_backup import BackupJobs, backup_path, list_backups, snapshot_database
+from src.utils.db_health import IntegrityChecks
+from src.utils.job_profiler import (
+    JOBS, PROFILE_MAX_SECONDS, SAMPLE_INTERVAL_MS, collapsed_stacks, job_profiles
+)
+from src.utils.read_replica import get_analytics_connection, read_replica
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/admin", tags=["Admin Console"])
 
+BACKUP_DIR = os.getenv("BACKUP_DIR", "backups")
+BACKUP_RETENTION = int(os.getenv("BACKUP_RETENTION_COUNT", "10"))
+
+backup_jobs = BackupJobs(BACKUP_DIR, retention=BACKUP_RETENTION)
+
+# Cached PRAGMA integrity_check / foreign_key_check results for /stats/database-health
+INTEGRITY_CHECK_MAX_AGE = float(os.getenv("DB_INTEGRITY_CHECK_MAX_AGE_SECONDS", "3600"))
+INTEGRITY_CHECK_INLINE_WAIT = 1.0  # seconds the health endpoint waits for a check it started
+
+integrity_checks = IntegrityChecks(INTEGRITY_CHECK_MAX_AGE)
+
 
 def _get_existing_tables(cursor) -> set:
     """Return set of existing tables for defensive operations."""
@@ -216,23 +235,38 @@ async def get_devices_by_vendor():
 
 
 @router.get("/stats/database-health")
-async def get_database_health():
+def get_database_health(refresh: bool = Query(False, description="Start a new integrity check")):
     """
     Comprehensive database health check with actionable diagnostics
 
-    Returns detailed issue detection and resolution recommendations
+    Returns detailed issue detection and resolution recommendations.
+    Integrity and foreign key results come from the background check
+    (see /database/integrity-check); a missing or stale result starts one.
     """
-    conn = sqlite3.connect(get_db_path())
+    if refresh:
+        integrity_checks.start()
+    else:
+        integrity_checks.ensure_fresh()
+    check = integrity_checks.result()
+    if check is None or refresh:
+        # Small databases finish within the request
+        integrity_checks.wait(INTEGRITY_CHECK_INLINE_WAIT)
+        check = integrity_checks.result()
+
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     issues = []
     recommendations = []
 
     # 1. Integrity check
-    cursor.execute("PRAGMA integrity_check")
-    integrity = cursor.fetchone()[0]
+    integrity = check["integrity"] if check else "pending"
+    fk_violations = check["foreign_key_violations"] if check else []
+    fk_violation_count = check["foreign_key_violation_count"] if check else None
 
-    if integrity != "ok":
+    if check is None:
+        recommendations.append("Integrity check is running in the background; refresh in a moment for its results")
+    elif integrity != "ok":
         issues.append({
             "type": "corruption",
             "severity": "critical",
@@ -244,10 +278,7 @@ async def get_database_health():
         recommendations.append("Immediately create a backup before attempting any repairs")
 
     # 2. Foreign key violations
-    cursor.execute("PRAGMA foreign_key_check")
-    fk_violations = cursor.fetchall()
-
-    if len(fk_violations) > 0:
+    if fk_violation_count:
         # Group violations by table to provide specific details
         violations_by_table = {}
         for violation in fk_violations[:10]:  # Limit to first 10 for display
@@ -266,7 +297,7 @@ async def get_database_health():
         issues.append({
             "type": "foreign_keys",
             "severity": "high",
-            "title": f"{len(fk_violations)} Foreign Key Violations Detected",
+            "title": f"{fk_violation_count} Foreign Key Violations Detected",
             "description": f"Orphaned records in: {', '.join(violation_details)}. These records reference parent data that no longer exists. Click 'Clean Orphaned Records' to remove them safely.",
             "action": "clean_fk",
             "action_label": "Clean Orphaned Records"
@@ -396,9 +427,11 @@ async def get_database_health():
 
     return {
         "integrity": integrity,
-        "healthy": len(issues) == 0,
+        "healthy": len(issues) == 0 and check is not None,
         "health_status": health_status,
-        "foreign_key_violations": len(fk_violations),
+        "foreign_key_violations": fk_violation_count,
+        "integrity_checked_at": check["checked_at"] if check else None,
+        "integrity_check_running": integrity_checks.running,
         "index_count": len(indexes),
         "issues": issues,
         "recommendations": recommendations,
@@ -417,6 +450,7 @@ async def vacuum_database():
         conn = sqlite3.connect(get_db_path())
         conn.execute("VACUUM")
         conn.close()
+        integrity_checks.invalidate()
 
         # Get size after
         size_after = os.path.getsize(get_db_path())
@@ -491,6 +525,7 @@ async def clean_fk_violations():
         conn = sqlite3.connect(get_db_path())
         conn.execute("VACUUM")
         conn.close()
+        integrity_checks.invalidate()
 
         return {
             "success": True,
@@ -506,59 +541,189 @@ async def clean_fk_violations():
 
 
 @router.post("/database/backup")
-async def backup_database():
-    """Create a backup of the database"""
+async def backup_database(background_tasks: BackgroundTasks):
+    """
+    Start a compressed online backup of the database
+
+    The snapshot is taken with SQLite's backup API in a worker thread; poll
+    the returned job for progress.
+    """
     try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_name = f"greenstack_backup_{timestamp}.db"
-        backup_path = Path("backups") / backup_name
+        job = backup_jobs.create()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
-        # Create backups directory
-        backup_path.parent.mkdir(exist_ok=True)
+    background_tasks.add_task(backup_jobs.run, job["job_id"], get_db_path())
+    return {"success": True, **job}
 
-        # Copy database
-        shutil.copy2(get_db_path(), backup_path)
 
-        backup_size = os.path.getsize(backup_path)
+@router.get("/database/backup/jobs")
+async def list_backup_jobs():
+    """List backup jobs"""
+    return {"jobs": backup_jobs.list()}
 
-        return {
-            "success": True,
-            "backup_file": backup_name,
-            "backup_path": str(backup_path),
-            "size_mb": round(backup_size / (1024 * 1024), 2),
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create backup: {str(e)}")
+
+@router.get("/database/backup/jobs/{job_id}")
+async def get_backup_job(job_id: str):
+    """Get status and progress of a backup job"""
+    job = backup_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Backup job not found")
+    return job
+
+
+@router.get("/database/backups")
+async def list_database_backups():
+    """List stored backups (newest first) and the retention count"""
+    return {"backups": list_backups(BACKUP_DIR), "retention": BACKUP_RETENTION}
+
+
+@router.get("/database/backups/{backup_file}", response_class=FileResponse)
+async def download_stored_backup(backup_file: str):
+    """Download a stored compressed backup"""
+    path = backup_path(BACKUP_DIR, backup_file)
+    if not path:
+        raise HTTPException(status_code=404, detail="Backup not found")
+    return FileResponse(path=path, media_type="application/gzip", filename=backup_file)
 
 
 @router.get("/database/backup/download", response_class=FileResponse)
 async def download_backup():
-    """Download a database backup"""
+    """Download a fresh (uncompressed) snapshot of the database"""
     try:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         temp_backup = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
         tmp_path = temp_backup.name
-
-        # Copy database to temp file
-        shutil.copy2(get_db_path(), tmp_path)
         temp_backup.close()
 
+        # Consistent snapshot (includes WAL contents), taken off the event loop
+        await run_in_threadpool(snapshot_database, get_db_path(), tmp_path)
+
         # Return file with background task to clean up temp file after response
         return FileResponse(
             path=tmp_path,
             media_type="application/x-sqlite3",
             filename=f"greenstack_backup_{timestamp}.db",
-            background=lambda: os.unlink(tmp_path) if os.path.exists(tmp_path) else None
+            background=BackgroundTask(os.unlink, tmp_path)
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to download backup: {str(e)}")
 
 
+@router.get("/database/integrity-check")
+async def get_integrity_check():
+    """Status and cached result of the background integrity check"""
+    return integrity_checks.status()
+
+
+@router.post("/database/integrity-check")
+async def start_integrity_check():
+    """Start a background integrity and foreign key check"""
+    started = integrity_checks.start()
+    return {"started": started, **integrity_checks.status()}
+
+
+@router.get("/database/replica")
+async def get_read_replica_status():
+    """Read replica used by dashboards and diagnostics"""
+    return read_replica.status()
+
+
+@router.post("/database/replica/refresh")
+async def refresh_read_replica(background_tasks: BackgroundTasks):
+    """Refresh the read replica from the database (online backup API)"""
+    if not read_replica.enabled:
+        raise HTTPException(status_code=409, detail="No read replica configured (READ_REPLICA_PATH)")
+    if read_replica.status()["refreshing"]:
+        raise HTTPException(status_code=409, detail="A replica refresh is already in progress")
+    background_tasks.add_task(_refresh_read_replica)
+    return {"success": True, "message": "Replica refresh started"}
+
+
+def _refresh_read_replica():
+    try:
+        read_replica.refresh()
+    except Exception as e:
+        logger.error(f"Read replica refresh failed: {e}", exc_info=True)
+
+
+@router.get("/profiling")
+async def get_profiling_status():
+    """Profileable jobs, armed runs and sampler settings"""
+    armed = job_profiles.armed()
+    return {
+        "jobs": [
+            {"job": job, "description": description, "armed_runs": armed.get(job, 0)}
+            for job, description in JOBS.items()
+        ],
+        "armed": armed,
+        "sample_interval_ms": SAMPLE_INTERVAL_MS,
+        "max_seconds": PROFILE_MAX_SECONDS,
+        "retention": job_profiles.retention,
+    }
+
+
+@router.post("/profiling/arm")
+async def arm_job_profiling(job: str, runs: int = Query(1, ge=1, le=100)):
+    """
+    Profile the next runs of a job
+
+    Jobs are the names listed by GET /api/admin/profiling, or a Celery task
+    name (e.g. src.tasks.iodd_tasks.batch_parse_iodd_files) to profile the
+    task in its worker, along with the tasks it publishes.
+    """
+    try:
+        return {"success": True, **job_profiles.arm(job, runs)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/profiling/arm/{job}")
+async def disarm_job_profiling(job: str):
+    """Cancel the remaining armed runs of a job"""
+    if not job_profiles.disarm(job):
+        raise HTTPException(status_code=404, detail="Job is not armed")
+    return {"success": True, "job": job}
+
+
+@router.get("/profiles")
+async def list_job_profiles():
+    """List stored job profiles (newest first)"""
+    return {"profiles": job_profiles.list(), "retention": job_profiles.retention}
+
+
+@router.get("/profiles/{profile_id}")
+async def download_job_profile(
+    profile_id: str,
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed)$",
+                        description="speedscope JSON, or collapsed stacks for flamegraph.pl/inferno")
+):
+    """Download a job profile (open speedscope JSON at https://www.speedscope.app)"""
+    path = job_profiles.path(profile_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "speedscope":
+        return FileResponse(path=path, media_type="application/json", filename=f"{profile_id}.speedscope.json")
+
+    document = await run_in_threadpool(job_profiles.load, profile_id)
+    return PlainTextResponse(
+        collapsed_stacks(document),
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'}
+    )
+
+
+@router.delete("/profiles/{profile_id}")
+async def delete_job_profile(profile_id: str):
+    """Delete a stored job profile"""
+    if not job_profiles.delete(profile_id):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return {"success": True, "profile_id": profile_id}
+
+
 @router.get("/diagnostics/eds-summary")
-async def get_eds_diagnostics_summary():
+def get_eds_diagnostics_summary():
     """Get summary of EDS parsing diagnostics"""
-    conn = sqlite3.connect(get_db_path())
+    conn = get_analytics_connection()
     cursor = conn.cursor()
 
     # Get files with issues
@@ -661,9 +826,9 @@ async def get_eds_diagnostics_summary():
 
 
 @router.get("/diagnostics/iodd-summary")
-async def get_iodd_diagnostics_summary():
+def get_iodd_diagnostics_summary():
     """Get summary of IODD parsing quality"""
-    conn = sqlite3.connect(get_db_path())
+    conn = get_analytics_connection()
     cursor = conn.cursor()
 
     # Get total files
@@ -837,6 +1002,7 @@ async def delete_all_iodd_devices():
             "iodd_build_format",
             "iodd_text",
             "iodd_assets",
+            "device_config_schemas",
             "devices",
             "iodd_files",
         ]:
@@ -1065,6 +1231,7 @@ async def delete_all_data():
             "iodd_build_format",
             "iodd_text",
             "iodd_assets",
+            "device_config_schemas",
             "devices",
             "iodd_files",
         ]
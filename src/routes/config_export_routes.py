@@ -6,16 +6,30 @@ Provides endpoints to export device configurations in various formats (JSON, CSV
 import csv
 import io
 import json
+import os
 import sqlite3
 import tempfile
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
 from fastapi.responses import FileResponse, StreamingResponse
 
+from src.utils.catalog_export import (
+    EXPORT_FORMATS,
+    PYARROW_AVAILABLE,
+    CatalogExportJobs,
+    iter_catalog_ndjson,
+    iter_catalog_records,
+)
+from src.utils.zip_stream import ZipStream, content_disposition
+
 router = APIRouter(prefix="/api/config-export", tags=["Configuration Export"])
 
 DB_PATH = "greenstack.db"
 
+CATALOG_EXPORT_DIR = os.getenv("CATALOG_EXPORT_DIR", "exports/catalog")
+
+catalog_jobs = CatalogExportJobs(CATALOG_EXPORT_DIR)
+
 
 @router.get("/iodd/{device_id}/json", response_class=FileResponse)
 async def export_iodd_config_json(device_id: int):
@@ -327,7 +341,7 @@ async def export_eds_config_csv(eds_id: int):
     )
 
 
-@router.get("/batch/json", response_class=FileResponse)
+@router.get("/batch/json", response_class=StreamingResponse)
 async def export_batch_configs_json(
     device_type: str = Query(..., description="Device type: IODD or EDS"),
     device_ids: str = Query(..., description="Comma-separated device IDs")
@@ -335,108 +349,151 @@ async def export_batch_configs_json(
     """
     Export multiple device configurations as a single JSON file
 
+    Each entry holds the full device row (every ``devices`` / ``eds_files``
+    column, including ``iodd_version`` for IODD devices) and its parameters.
+    Devices are ordered by ID. The document is streamed while devices are
+    loaded in batches, so there is no cap on the number of devices; use
+    ``/catalog/ndjson`` for whole catalogs.
+
     Args:
         device_type: Either "IODD" or "EDS"
         device_ids: Comma-separated list of device IDs (e.g., "1,2,3")
     """
-    ids = [int(id.strip()) for id in device_ids.split(',')]
+    if device_type.upper() not in ("IODD", "EDS"):
+        raise HTTPException(status_code=400, detail="device_type must be 'IODD' or 'EDS'")
+
+    try:
+        ids = [int(id.strip()) for id in device_ids.split(',') if id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="device_ids must be comma-separated integers")
 
     if len(ids) == 0:
         raise HTTPException(status_code=400, detail="No device IDs provided")
 
-    if len(ids) > 50:
-        raise HTTPException(status_code=400, detail="Maximum 50 devices can be exported at once")
+    records = iter_catalog_records(DB_PATH, device_type, ids, include=("parameters",))
+    first = next(records, None)
+    if first is None:
+        raise HTTPException(status_code=404, detail="No devices found")
 
-    configs = []
+    def generate():
+        count = 1
+        yield '{"devices": [' + json.dumps(first, default=str)
+        for record in records:
+            yield ", " + json.dumps(record, default=str)
+            count += 1
+        yield (
+            f'], "total_count": {count}, "device_type": {json.dumps(device_type.upper())}, '
+            f'"export_format": "Batch Configuration Export v1.0"}}'
+        )
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/json",
+        headers={"Content-Disposition": content_disposition(f"batch_export_{device_type.lower()}_{len(ids)}_devices.json")}
+    )
+
+
+# ============================================================================
+# CATALOG EXPORT
+# ============================================================================
+
+@router.get("/catalog/ndjson", response_class=StreamingResponse)
+async def export_catalog_ndjson(
+    device_type: str = Query(..., description="Device type: IODD or EDS"),
+    device_ids: str = Query(None, description="Optional comma-separated device IDs (default: whole catalog)")
+):
+    """
+    Stream the device catalog as NDJSON, one device per line
+
+    Each line holds the device row and its parameters, process data (IODD) or
+    assemblies, connections and capacity (EDS). Rows are loaded with one query
+    per table for each batch of devices.
+    """
+    if device_type.upper() not in ("IODD", "EDS"):
+        raise HTTPException(status_code=400, detail="device_type must be 'IODD' or 'EDS'")
+
+    ids = None
+    if device_ids:
+        try:
+            ids = [int(id.strip()) for id in device_ids.split(',') if id.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="device_ids must be comma-separated integers")
+
+    return StreamingResponse(
+        iter_catalog_ndjson(DB_PATH, device_type, ids),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": content_disposition(f"{device_type.lower()}_catalog.ndjson")}
+    )
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+
+@router.post("/catalog/jobs")
+async def create_catalog_export_job(
+    background_tasks: BackgroundTasks,
+    device_type: str = Query(..., description="Device type: IODD or EDS"),
+    format: str = Query("parquet", description="Export format: parquet, arrow or ndjson")
+):
+    """
+    Start a background export of the whole catalog
+
+    Parquet and Arrow exports write one file per table (devices, parameters,
+    process data / assemblies, ...). Poll the job for progress and download the
+    files as a ZIP once it has completed.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if format != "ndjson" and not PYARROW_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Parquet/Arrow exports require the pyarrow package")
 
     try:
-        for device_id in ids:
-            if device_type.upper() == "IODD":
-                # Get IODD device config
-                cursor.execute("""
-                    SELECT d.*, df.iodd_version
-                    FROM devices d
-                    LEFT JOIN iodd_files df ON d.id = df.device_id
-                    WHERE d.id = ?
-                """, (device_id,))
-
-                device_row = cursor.fetchone()
-                if device_row:
-                    device_info = dict(device_row)
-
-                    # Get parameters
-                    cursor.execute("""
-                        SELECT param_index, name, data_type, default_value,
-                               min_value, max_value, unit
-                        FROM parameters
-                        WHERE device_id = ?
-                        ORDER BY param_index
-                    """, (device_id,))
-
-                    parameters = [dict(row) for row in cursor.fetchall()]
-
-                    configs.append({
-                        "device": device_info,
-                        "parameters": parameters,
-                        "type": "IODD"
-                    })
-
-            elif device_type.upper() == "EDS":
-                # Get EDS device config
-                cursor.execute("""
-                    SELECT id, vendor_name, product_name, product_code,
-                           major_revision, minor_revision, description
-                    FROM eds_files
-                    WHERE id = ?
-                """, (device_id,))
-
-                eds_row = cursor.fetchone()
-                if eds_row:
-                    eds_info = dict(eds_row)
-
-                    # Get parameters
-                    cursor.execute("""
-                        SELECT param_number, param_name, data_type, default_value,
-                               min_value, max_value, units
-                        FROM eds_parameters
-                        WHERE eds_file_id = ?
-                        ORDER BY param_number
-                    """, (device_id,))
-
-                    parameters = [dict(row) for row in cursor.fetchall()]
-
-                    configs.append({
-                        "device": eds_info,
-                        "parameters": parameters,
-                        "type": "EDS"
-                    })
-    finally:
-        conn.close()
+        job = catalog_jobs.create(device_type, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    if len(configs) == 0:
-        raise HTTPException(status_code=404, detail="No devices found")
+    background_tasks.add_task(catalog_jobs.run, job["job_id"], DB_PATH)
+    return job
 
-    # Build batch export object
-    batch_export = {
-        "devices": configs,
-        "total_count": len(configs),
-        "device_type": device_type.upper(),
-        "export_format": "Batch Configuration Export v1.0"
-    }
 
-    # Create temporary file
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as tmp_file:
-        json.dump(batch_export, tmp_file, indent=2)
-        tmp_path = tmp_file.name
+@router.get("/catalog/jobs")
+async def list_catalog_export_jobs():
+    """List catalog export jobs"""
+    return {"jobs": catalog_jobs.list()}
 
-    # Return file with background task to clean up temp file after response
-    return FileResponse(
-        path=tmp_path,
-        media_type="application/json",
-        filename=f"batch_export_{device_type.lower()}_{len(configs)}_devices.json",
-        background=lambda: os.unlink(tmp_path) if os.path.exists(tmp_path) else None
+
+@router.get("/catalog/jobs/{job_id}")
+async def get_catalog_export_job(job_id: str):
+    """Get status and progress of a catalog export job"""
+    job = catalog_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if job["status"] == "completed":
+        job["download_url"] = f"{router.prefix}/catalog/jobs/{job_id}/download"
+    return job
+
+
+@router.get("/catalog/jobs/{job_id}/download", response_class=StreamingResponse)
+async def download_catalog_export(job_id: str):
+    """Download the files of a completed catalog export job as a ZIP"""
+    job = catalog_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Export job is {job['status']}")
+
+    archive = ZipStream()
+    job_dir = catalog_jobs.job_dir(job_id)
+    for file in job["files"]:
+        archive.add_file(file["name"], os.path.join(job_dir, file["name"]))
+
+    return StreamingResponse(
+        archive,
+        media_type="application/zip",
+        headers={"Content-Disposition": content_disposition(f"{job['device_type'].lower()}_catalog_{job['format']}.zip")}
     )
+
+
+@router.delete("/catalog/jobs/{job_id}")
+async def delete_catalog_export_job(job_id: str):
+    """Delete a catalog export job and its files"""
+    if not catalog_jobs.delete(job_id):
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return {"message": f"Export job {job_id} deleted"}
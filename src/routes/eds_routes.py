@@ -3,17 +3,16 @@ EDS (Electronic Data Sheet) API Routes
 Endpoints for managing EDS files for EtherNet/IP devices
 """
 
-import io
 import json
 import logging
 import os
 import re
 import sqlite3
 import tempfile
-import zipfile
 from datetime import datetime
+from typing import Optional
 
-from fastapi import APIRouter, BackgroundTasks, File, HTTPException, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, Response, UploadFile
 from fastapi.responses import StreamingResponse
 
 from src.database import get_db_path
@@ -21,7 +20,12 @@ from src.parsers.eds_diagnostics import Severity
 from src.parsers.eds_package_parser import EDSPackageParser
 from src.parsers.eds_parser import parse_eds_file, EDSParser
 from src.parsers.eds_advanced_sections import EDSAdvancedSectionsParser
+from src.utils.cascade_delete import cascade_delete
+from src.utils.fast_json import FastJSONResponse
+from src.utils.job_profiler import profiled
+from src.utils.pagination import PageParams, fetch_page, page_params, paginated_response
 from src.utils.pqa_orchestrator import UnifiedPQAOrchestrator, FileType
+from src.utils.zip_stream import ZipStream, content_disposition
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -58,6 +62,7 @@ def queue_eds_pqa_analysis(eds_id: int):
 
 
 @router.post("/upload")
+@profiled("eds.import")
 async def upload_eds_file(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     """
     Upload and parse an EDS file
@@ -645,89 +650,116 @@ async def upload_eds_file(background_tasks: BackgroundTasks, file: UploadFile =
         )
 
 
+EDS_SORT_FIELDS = {
+    "import_date": "COALESCE(import_date, '')",
+    "vendor_name": "COALESCE(vendor_name, '')",
+    "product_name": "COALESCE(product_name, '')",
+    "product_code": "COALESCE(product_code, 0)",
+    "id": "id",
+}
+
+
 @router.get("")
-async def list_eds_files():
+async def list_eds_files(
+    request: Request,
+    page: PageParams = Depends(page_params(EDS_SORT_FIELDS, "import_date", "desc"))
+):
     """
-    Get list of all imported EDS files
+    Get list of imported EDS files
+
+    Supports keyset pagination (``limit``/``cursor``), ``sort``/``order``,
+    ``fields`` projection and ``include_total``.
 
     Returns:
         List of EDS file information
     """
     conn = sqlite3.connect(get_db_path())
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT
-            id, vendor_code, vendor_name, product_code, product_type,
-            product_type_str, product_name, catalog_number,
-            major_revision, minor_revision, description,
-            import_date, home_url,
-            diagnostic_info_count, diagnostic_warn_count,
-            diagnostic_error_count, diagnostic_fatal_count,
-            has_parsing_issues
-        FROM eds_files
-        ORDER BY import_date DESC
-    """)
+    try:
+        rows, next_cursor, total = fetch_page(conn, """
+            SELECT
+                id, vendor_code, vendor_name, product_code, product_type,
+                product_type_str, product_name, catalog_number,
+                major_revision, minor_revision, description,
+                import_date, home_url,
+                diagnostic_info_count, diagnostic_warn_count,
+                diagnostic_error_count, diagnostic_fatal_count,
+                has_parsing_issues
+            FROM eds_files
+        """, [], page, EDS_SORT_FIELDS)
+    finally:
+        conn.close()
 
     eds_files = []
-    for row in cursor.fetchall():
+    for row in rows:
         eds_files.append({
-            "id": row[0],
-            "vendor_code": row[1],
-            "vendor_name": row[2],
-            "product_code": row[3],
-            "product_type": row[4],
-            "product_type_str": row[5],
-            "product_name": row[6],
-            "catalog_number": row[7],
-            "major_revision": row[8],
-            "minor_revision": row[9],
-            "description": row[10],
-            "import_date": row[11],
-            "home_url": row[12],
+            "id": row["id"],
+            "vendor_code": row["vendor_code"],
+            "vendor_name": row["vendor_name"],
+            "product_code": row["product_code"],
+            "product_type": row["product_type"],
+            "product_type_str": row["product_type_str"],
+            "product_name": row["product_name"],
+            "catalog_number": row["catalog_number"],
+            "major_revision": row["major_revision"],
+            "minor_revision": row["minor_revision"],
+            "description": row["description"],
+            "import_date": row["import_date"],
+            "home_url": row["home_url"],
             "diagnostics": {
-                "info_count": row[13] or 0,
-                "warn_count": row[14] or 0,
-                "error_count": row[15] or 0,
-                "fatal_count": row[16] or 0,
-                "has_issues": bool(row[17])
+                "info_count": row["diagnostic_info_count"] or 0,
+                "warn_count": row["diagnostic_warn_count"] or 0,
+                "error_count": row["diagnostic_error_count"] or 0,
+                "fatal_count": row["diagnostic_fatal_count"] or 0,
+                "has_issues": bool(row["has_parsing_issues"])
             }
         })
 
-    conn.close()
-    return eds_files
+    return paginated_response(request, eds_files, page, next_cursor, total)
 
 
-def detect_eds_variant_features(cursor, eds_file_id: int) -> dict:
+# Assembly instances that mark the extended (IIoT) variants of a device
+VARIANT_FEATURE_ASSEMBLIES = (
+    (210, "OPC-UA"),
+    (211, "MQTT"),
+    (213, "JSON"),
+)
+
+
+def variant_features_cte(where: str = "") -> str:
     """
-    Detect variant features for an EDS file by analyzing its assemblies.
+    Aggregate variant features for all EDS files in one pass over eds_assemblies.
 
-    Returns:
-        dict with variant_label, assembly_count, and feature_flags
+    Served by idx_eds_assemblies_eds_file_id; ``where`` restricts the files
+    aggregated (e.g. to a single device's revisions).
+    """
+    flags = ",\n".join(
+        f"            MAX(assembly_number = {number}) AS has_{label.replace('-', '').lower()}"
+        for number, label in VARIANT_FEATURE_ASSEMBLIES
+    )
+    return f"""
+        variant_features AS (
+            SELECT
+                eds_file_id,
+                COUNT(*) AS assembly_count,
+{flags}
+            FROM eds_assemblies
+            {where}
+            GROUP BY eds_file_id
+        )
     """
-    # Get assembly count and specific feature assemblies
-    cursor.execute("""
-        SELECT assembly_number, assembly_name
-        FROM eds_assemblies
-        WHERE eds_file_id = ?
-    """, (eds_file_id,))
 
-    assemblies = cursor.fetchall()
-    assembly_count = len(assemblies)
-    assembly_numbers = {row[0] for row in assemblies}
 
-    # Detect specific features
-    features = []
-    has_opcua = 210 in assembly_numbers
-    has_mqtt = 211 in assembly_numbers
-    has_json = 213 in assembly_numbers
+def build_variant_info(row) -> dict:
+    """
+    Build variant info from an assembly_count/has_* row (missing row: no assemblies).
 
-    if has_opcua:
-        features.append("OPC-UA")
-    if has_mqtt:
-        features.append("MQTT")
-    if has_json:
-        features.append("JSON")
+    Returns:
+        dict with variant_label, assembly_count, and feature_flags
+    """
+    features = [
+        label for _, label in VARIANT_FEATURE_ASSEMBLIES
+        if row is not None and row[f"has_{label.replace('-', '').lower()}"]
+    ]
 
     # Determine variant label
     if features:
@@ -739,175 +771,207 @@ def detect_eds_variant_features(cursor, eds_file_id: int) -> dict:
 
     return {
         "variant_label": variant_label,
-        "assembly_count": assembly_count,
+        "assembly_count": (row["assembly_count"] or 0) if row is not None else 0,
         "features": features,
         "feature_set": feature_set
     }
 
 
+def detect_eds_variant_features(cursor, eds_file_id: int) -> dict:
+    """
+    Detect variant features for an EDS file by analyzing its assemblies.
+
+    Returns:
+        dict with variant_label, assembly_count, and feature_flags
+    """
+    cursor.execute(
+        f"WITH {variant_features_cte('WHERE eds_file_id = ?')} SELECT * FROM variant_features",
+        (eds_file_id,)
+    )
+    row = cursor.fetchone()
+    if row is not None and not isinstance(row, sqlite3.Row):
+        row = dict(zip([d[0] for d in cursor.description], row))
+    return build_variant_info(row)
+
+
+# Sort keys accepted by the grouped listings; id keeps pagination stable
+GROUPED_SORT_COLUMNS = {
+    "name": ("vendor_name", "product_name"),
+    "vendor": ("vendor_name",),
+    "product": ("product_name",),
+    "product_code": ("vendor_code", "product_code"),
+    "revision": ("major_revision", "minor_revision"),
+    "import_date": ("import_date",),
+}
+
+GROUPED_COLUMNS = """
+    f.id, f.vendor_code, f.vendor_name, f.product_code, f.product_type,
+    f.product_type_str, f.product_name, f.catalog_number,
+    f.major_revision, f.minor_revision, f.description,
+    f.import_date, f.home_url,
+    f.diagnostic_info_count, f.diagnostic_warn_count,
+    f.diagnostic_error_count, f.diagnostic_fatal_count,
+    f.has_parsing_issues,
+    COALESCE(v.assembly_count, 0) AS assembly_count,
+    COALESCE(v.has_opcua, 0) AS has_opcua,
+    COALESCE(v.has_mqtt, 0) AS has_mqtt,
+    COALESCE(v.has_json, 0) AS has_json
+"""
+
+
+def grouped_order_by(sort: str, order: str, tiebreak: str = "") -> str:
+    direction = "DESC" if order == "desc" else "ASC"
+    columns = [f"{column} {direction}" for column in GROUPED_SORT_COLUMNS[sort]]
+    if tiebreak:
+        columns.append(tiebreak)
+    columns.append("id")
+    return ", ".join(columns)
+
+
+def grouped_row_to_dict(row: sqlite3.Row) -> dict:
+    variant_info = build_variant_info(row)
+    return {
+        "id": row["id"],
+        "vendor_code": row["vendor_code"],
+        "vendor_name": row["vendor_name"],
+        "product_code": row["product_code"],
+        "product_type": row["product_type"],
+        "product_type_str": row["product_type_str"],
+        "product_name": row["product_name"],
+        "catalog_number": row["catalog_number"],
+        "major_revision": row["major_revision"],
+        "minor_revision": row["minor_revision"],
+        "description": row["description"],
+        "import_date": row["import_date"],
+        "home_url": row["home_url"],
+        "diagnostics": {
+            "info_count": row["diagnostic_info_count"] or 0,
+            "warn_count": row["diagnostic_warn_count"] or 0,
+            "error_count": row["diagnostic_error_count"] or 0,
+            "fatal_count": row["diagnostic_fatal_count"] or 0,
+            "has_issues": bool(row["has_parsing_issues"])
+        },
+        "variant_label": variant_info["variant_label"],
+        "assembly_count": variant_info["assembly_count"],
+        "features": variant_info["features"],
+        "feature_set": variant_info["feature_set"]
+    }
+
+
+def set_total_count(response: Response, rows: list):
+    """Expose the unpaginated row count (a COUNT(*) OVER () column) as X-Total-Count"""
+    if rows:
+        response.headers["X-Total-Count"] = str(rows[0]["total_count"])
+
+
 @router.get("/grouped/by-device")
-async def list_eds_files_grouped():
+async def list_eds_files_grouped(
+    response: Response,
+    sort: str = Query("name", pattern=f"^({'|'.join(GROUPED_SORT_COLUMNS)})$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
+):
     """
     Get list of EDS files grouped by device (vendor_code + product_code).
     Returns only the latest revision for each unique device, plus revision count and variant info.
 
+    Variant features come from one aggregate over eds_assemblies joined into
+    the listing, and sorting and pagination run in SQL. The unpaginated total
+    is returned in the X-Total-Count header.
+
     Returns:
         List of EDS file information with revision_count and variant information
     """
     conn = sqlite3.connect(get_db_path())
+    conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
 
     # Use window functions to get latest revision per device
-    cursor.execute("""
-        WITH ranked AS (
+    cursor.execute(f"""
+        WITH {variant_features_cte()},
+        ranked AS (
             SELECT
-                id, vendor_code, vendor_name, product_code, product_type,
-                product_type_str, product_name, catalog_number,
-                major_revision, minor_revision, description,
-                import_date, home_url,
-                diagnostic_info_count, diagnostic_warn_count,
-                diagnostic_error_count, diagnostic_fatal_count,
-                has_parsing_issues,
+                {GROUPED_COLUMNS},
                 ROW_NUMBER() OVER (
-                    PARTITION BY vendor_code, product_code
-                    ORDER BY major_revision DESC, minor_revision DESC, import_date DESC
+                    PARTITION BY f.vendor_code, f.product_code
+                    ORDER BY f.major_revision DESC, f.minor_revision DESC, f.import_date DESC
                 ) as rn,
                 COUNT(*) OVER (
-                    PARTITION BY vendor_code, product_code
+                    PARTITION BY f.vendor_code, f.product_code
                 ) as revision_count
-            FROM eds_files
+            FROM eds_files f
+            LEFT JOIN variant_features v ON v.eds_file_id = f.id
         )
-        SELECT
-            id, vendor_code, vendor_name, product_code, product_type,
-            product_type_str, product_name, catalog_number,
-            major_revision, minor_revision, description,
-            import_date, home_url,
-            diagnostic_info_count, diagnostic_warn_count,
-            diagnostic_error_count, diagnostic_fatal_count,
-            has_parsing_issues, revision_count
+        SELECT *, COUNT(*) OVER () AS total_count
         FROM ranked
         WHERE rn = 1
-        ORDER BY vendor_name, product_name
-    """)
+        ORDER BY {grouped_order_by(sort, order)}
+        LIMIT ? OFFSET ?
+    """, (limit if limit is not None else -1, offset))
 
-    eds_files = []
-    for row in cursor.fetchall():
-        eds_id = row[0]
+    rows = cursor.fetchall()
+    conn.close()
 
-        # Detect variant features
-        variant_info = detect_eds_variant_features(cursor, eds_id)
+    set_total_count(response, rows)
 
-        eds_files.append({
-            "id": eds_id,
-            "vendor_code": row[1],
-            "vendor_name": row[2],
-            "product_code": row[3],
-            "product_type": row[4],
-            "product_type_str": row[5],
-            "product_name": row[6],
-            "catalog_number": row[7],
-            "major_revision": row[8],
-            "minor_revision": row[9],
-            "description": row[10],
-            "import_date": row[11],
-            "home_url": row[12],
-            "diagnostics": {
-                "info_count": row[13] or 0,
-                "warn_count": row[14] or 0,
-                "error_count": row[15] or 0,
-                "fatal_count": row[16] or 0,
-                "has_issues": bool(row[17])
-            },
-            "revision_count": row[18],  # Number of revisions for this device
-            "variant_label": variant_info["variant_label"],
-            "assembly_count": variant_info["assembly_count"],
-            "features": variant_info["features"],
-            "feature_set": variant_info["feature_set"]
-        })
+    eds_files = []
+    for row in rows:
+        eds_file = grouped_row_to_dict(row)
+        eds_file["revision_count"] = row["revision_count"]  # Number of revisions for this device
+        eds_files.append(eds_file)
 
-    conn.close()
     return eds_files
 
 
 @router.get("/grouped/by-variant")
-async def list_eds_files_by_variant():
+async def list_eds_files_by_variant(
+    response: Response,
+    sort: str = Query("name", pattern=f"^({'|'.join(GROUPED_SORT_COLUMNS)})$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
+):
     """
     Get list of EDS files grouped by unique variant (vendor + product + revision + variant_label).
     Shows all distinct variants, not just the latest revision per device.
 
+    Sorting and pagination run in SQL; the unpaginated total is returned in
+    the X-Total-Count header.
+
     Returns:
         List of EDS file information with all unique variants
     """
     conn = sqlite3.connect(get_db_path())
+    conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
 
     # Get one representative per unique variant (grouped by vendor, product, revision, and assembly count)
-    cursor.execute("""
-        WITH ranked AS (
+    cursor.execute(f"""
+        WITH {variant_features_cte()},
+        ranked AS (
             SELECT
-                id, vendor_code, vendor_name, product_code, product_type,
-                product_type_str, product_name, catalog_number,
-                major_revision, minor_revision, description,
-                import_date, home_url,
-                diagnostic_info_count, diagnostic_warn_count,
-                diagnostic_error_count, diagnostic_fatal_count,
-                has_parsing_issues,
+                {GROUPED_COLUMNS},
                 ROW_NUMBER() OVER (
-                    PARTITION BY vendor_code, product_code, major_revision, minor_revision,
-                                 (SELECT COUNT(*) FROM eds_assemblies WHERE eds_file_id = eds_files.id)
-                    ORDER BY import_date DESC
+                    PARTITION BY f.vendor_code, f.product_code, f.major_revision, f.minor_revision,
+                                 COALESCE(v.assembly_count, 0)
+                    ORDER BY f.import_date DESC
                 ) as rn
-            FROM eds_files
+            FROM eds_files f
+            LEFT JOIN variant_features v ON v.eds_file_id = f.id
         )
-        SELECT
-            id, vendor_code, vendor_name, product_code, product_type,
-            product_type_str, product_name, catalog_number,
-            major_revision, minor_revision, description,
-            import_date, home_url,
-            diagnostic_info_count, diagnostic_warn_count,
-            diagnostic_error_count, diagnostic_fatal_count,
-            has_parsing_issues
+        SELECT *, COUNT(*) OVER () AS total_count
         FROM ranked
         WHERE rn = 1
-        ORDER BY vendor_name, product_name, major_revision DESC, minor_revision DESC
-    """)
-
-    eds_files = []
-    for row in cursor.fetchall():
-        eds_id = row[0]
-
-        # Detect variant features
-        variant_info = detect_eds_variant_features(cursor, eds_id)
-
-        eds_files.append({
-            "id": eds_id,
-            "vendor_code": row[1],
-            "vendor_name": row[2],
-            "product_code": row[3],
-            "product_type": row[4],
-            "product_type_str": row[5],
-            "product_name": row[6],
-            "catalog_number": row[7],
-            "major_revision": row[8],
-            "minor_revision": row[9],
-            "description": row[10],
-            "import_date": row[11],
-            "home_url": row[12],
-            "diagnostics": {
-                "info_count": row[13] or 0,
-                "warn_count": row[14] or 0,
-                "error_count": row[15] or 0,
-                "fatal_count": row[16] or 0,
-                "has_issues": bool(row[17])
-            },
-            "variant_label": variant_info["variant_label"],
-            "assembly_count": variant_info["assembly_count"],
-            "features": variant_info["features"],
-            "feature_set": variant_info["feature_set"]
-        })
+        ORDER BY {grouped_order_by(sort, order, "major_revision DESC, minor_revision DESC")}
+        LIMIT ? OFFSET ?
+    """, (limit if limit is not None else -1, offset))
 
+    rows = cursor.fetchall()
     conn.close()
-    return eds_files
+
+    set_total_count(response, rows)
+    return [grouped_row_to_dict(row) for row in rows]
 
 
 @router.get("/device/{vendor_code}/{product_code}/revisions")
@@ -924,39 +988,43 @@ async def get_device_revisions(vendor_code: int, product_code: int):
         List of all revisions for this device with variant details
     """
     conn = sqlite3.connect(get_db_path())
+    conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
 
-    cursor.execute("""
+    features_cte = variant_features_cte(
+        "WHERE eds_file_id IN (SELECT id FROM eds_files WHERE vendor_code = ? AND product_code = ?)"
+    )
+    cursor.execute(f"""
+        WITH {features_cte}
         SELECT
-            id, vendor_code, vendor_name, product_code, product_name,
-            catalog_number, major_revision, minor_revision,
-            import_date, description, mod_date, mod_time
-        FROM eds_files
-        WHERE vendor_code = ? AND product_code = ?
-        ORDER BY major_revision DESC, minor_revision DESC, import_date DESC
-    """, (vendor_code, product_code))
+            f.id, f.vendor_code, f.vendor_name, f.product_code, f.product_name,
+            f.catalog_number, f.major_revision, f.minor_revision,
+            f.import_date, f.description, f.mod_date, f.mod_time,
+            v.assembly_count, v.has_opcua, v.has_mqtt, v.has_json
+        FROM eds_files f
+        LEFT JOIN variant_features v ON v.eds_file_id = f.id
+        WHERE f.vendor_code = ? AND f.product_code = ?
+        ORDER BY f.major_revision DESC, f.minor_revision DESC, f.import_date DESC
+    """, (vendor_code, product_code, vendor_code, product_code))
 
     revisions = []
     for row in cursor.fetchall():
-        eds_id = row[0]
-
-        # Detect variant features
-        variant_info = detect_eds_variant_features(cursor, eds_id)
+        variant_info = build_variant_info(row)
 
         revisions.append({
-            "id": eds_id,
-            "vendor_code": row[1],
-            "vendor_name": row[2],
-            "product_code": row[3],
-            "product_name": row[4],
-            "catalog_number": row[5],
-            "major_revision": row[6],
-            "minor_revision": row[7],
-            "import_date": row[8],
-            "description": row[9],
-            "mod_date": row[10],
-            "mod_time": row[11],
-            "revision_string": f"v{row[6]}.{row[7]}",
+            "id": row["id"],
+            "vendor_code": row["vendor_code"],
+            "vendor_name": row["vendor_name"],
+            "product_code": row["product_code"],
+            "product_name": row["product_name"],
+            "catalog_number": row["catalog_number"],
+            "major_revision": row["major_revision"],
+            "minor_revision": row["minor_revision"],
+            "import_date": row["import_date"],
+            "description": row["description"],
+            "mod_date": row["mod_date"],
+            "mod_time": row["mod_time"],
+            "revision_string": f"v{row['major_revision']}.{row['minor_revision']}",
             "variant_label": variant_info["variant_label"],
             "assembly_count": variant_info["assembly_count"],
             "features": variant_info["features"],
@@ -1154,7 +1222,8 @@ async def get_eds_file(eds_id: int):
     eds_info["feature_set"] = variant_info["feature_set"]
 
     conn.close()
-    return eds_info
+    # Large nested payload (full eds_content); render directly with orjson
+    return FastJSONResponse(eds_info)
 
 
 @router.get("/{eds_id}/diagnostics")
@@ -1268,63 +1337,56 @@ async def export_eds_zip(eds_id: int):
         - Icon file (if available)
         - Metadata JSON
     """
-    from fastapi.responses import Response
-
-    conn = sqlite3.connect(get_db_path())
+    db_path = get_db_path()
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
-    # Get EDS file data
+    # Get EDS file data; the icon BLOB is read while streaming
     cursor.execute("""
         SELECT vendor_name, product_name, product_code, major_revision, minor_revision,
-               eds_content, icon_filename, icon_data, catalog_number
+               eds_content, icon_filename, length(icon_data), catalog_number
         FROM eds_files WHERE id = ?
     """, (eds_id,))
 
     row = cursor.fetchone()
+    conn.close()
     if not row:
-        conn.close()
         raise HTTPException(status_code=404, detail="EDS file not found")
 
-    vendor, product, code, maj_rev, min_rev, eds_content, icon_name, icon_data, catalog = row
+    vendor, product, code, maj_rev, min_rev, eds_content, icon_name, icon_size, catalog = row
 
     # Create safe filename
     safe_vendor = re.sub(r'[^\w\s-]', '', vendor or 'Unknown').replace(' ', '_')
     safe_product = re.sub(r'[^\w\s-]', '', product or 'Unknown').replace(' ', '_')
     zip_filename = f"{safe_vendor}_{safe_product}_{code}_v{maj_rev}.{min_rev}.zip"
 
-    # Create ZIP in memory
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        # Add EDS file
-        eds_filename = f"{catalog or product}.eds"
-        zip_file.writestr(eds_filename, eds_content.encode('utf-8'))
-
-        # Add icon if available
-        if icon_data:
-            icon_ext = icon_name.split('.')[-1] if icon_name else 'ico'
-            zip_file.writestr(f"{catalog or product}.{icon_ext}", icon_data)
-
-        # Add metadata JSON
-        metadata = {
-            'eds_id': eds_id,
-            'vendor_name': vendor,
-            'product_name': product,
-            'product_code': code,
-            'revision': f"{maj_rev}.{min_rev}",
-            'catalog_number': catalog,
-            'export_date': datetime.now().isoformat()
-        }
-        zip_file.writestr('metadata.json', json.dumps(metadata, indent=2))
-
-    conn.close()
+    archive = ZipStream()
+
+    # Add EDS file
+    archive.add(f"{catalog or product}.eds", eds_content or "")
+
+    # Add icon if available
+    if icon_size:
+        icon_ext = icon_name.split('.')[-1] if icon_name else 'ico'
+        archive.add_blob(f"{catalog or product}.{icon_ext}", db_path, "eds_files", "icon_data", eds_id, size=icon_size)
+
+    # Add metadata JSON
+    metadata = {
+        'eds_id': eds_id,
+        'vendor_name': vendor,
+        'product_name': product,
+        'product_code': code,
+        'revision': f"{maj_rev}.{min_rev}",
+        'catalog_number': catalog,
+        'export_date': datetime.now().isoformat()
+    }
+    archive.add('metadata.json', json.dumps(metadata, indent=2))
 
-    # Return ZIP file
-    zip_buffer.seek(0)
     return StreamingResponse(
-        zip_buffer,
+        archive,
         media_type="application/zip",
         headers={
-            "Content-Disposition": f"attachment; filename={zip_filename}"
+            "Content-Disposition": content_disposition(zip_filename)
         }
     )
 
@@ -1343,32 +1405,15 @@ async def delete_eds_file(eds_id: int):
     conn = sqlite3.connect(get_db_path())
     # Enable foreign keys for this connection
     conn.execute("PRAGMA foreign_keys = ON")
-    cursor = conn.cursor()
 
-    # Check if EDS exists
-    cursor.execute("SELECT id FROM eds_files WHERE id = ?", (eds_id,))
-    if not cursor.fetchone():
+    # Delete the EDS file with all dependent rows, children first
+    try:
+        result = cascade_delete(conn, "eds", [eds_id])
+    finally:
         conn.close()
-        raise HTTPException(status_code=404, detail="EDS file not found")
 
-    # Delete all associated data in correct order (child tables first)
-    # This is necessary as a fallback if foreign keys are not enabled
-    cursor.execute("DELETE FROM eds_diagnostics WHERE eds_file_id = ?", (eds_id,))
-    cursor.execute("DELETE FROM eds_tspecs WHERE eds_file_id = ?", (eds_id,))
-    cursor.execute("DELETE FROM eds_capacity WHERE eds_file_id = ?", (eds_id,))
-    cursor.execute("DELETE FROM eds_groups WHERE eds_file_id = ?", (eds_id,))
-    cursor.execute("DELETE FROM eds_ports WHERE eds_file_id = ?", (eds_id,))
-    cursor.execute("DELETE FROM eds_modules WHERE eds_file_id = ?", (eds_id,))
-    cursor.execute("DELETE FROM eds_variable_assemblies WHERE eds_file_id = ?", (eds_id,))
-    cursor.execute("DELETE FROM eds_assemblies WHERE eds_file_id = ?", (eds_id,))
-    cursor.execute("DELETE FROM eds_connections WHERE eds_file_id = ?", (eds_id,))
-    cursor.execute("DELETE FROM eds_parameters WHERE eds_file_id = ?", (eds_id,))
-
-    # Finally delete the EDS file itself
-    cursor.execute("DELETE FROM eds_files WHERE id = ?", (eds_id,))
-
-    conn.commit()
-    conn.close()
+    if not result["deleted_ids"]:
+        raise HTTPException(status_code=404, detail="EDS file not found")
 
     return {"message": f"EDS file {eds_id} deleted successfully"}
 
@@ -1430,35 +1475,9 @@ async def bulk_delete_eds_files(request: dict):
             conn.close()
             return {"message": "No EDS files to delete", "deleted_count": 0}
 
-        # Create new placeholders for all IDs
-        all_placeholders = ','.join('?' * len(all_ids_to_delete))
-
-        # List of tables to delete from (in order of dependencies)
-        tables_to_delete = [
-            "eds_diagnostics",
-            "eds_tspecs",
-            "eds_capacity",
-            "eds_groups",
-            "eds_ports",
-            "eds_modules",
-            "eds_variable_assemblies",
-            "eds_assemblies",
-            "eds_connections",
-            "eds_parameters"
-        ]
-
-        # Delete from child tables first
-        for table in tables_to_delete:
-            query = f"DELETE FROM {table} WHERE eds_file_id IN ({all_placeholders})"
-            cursor.execute(query, all_ids_to_delete)
-            print(f"Deleted from {table}: {cursor.rowcount} rows")
-
-        # Finally delete all EDS files (all revisions)
-        cursor.execute(f"DELETE FROM eds_files WHERE id IN ({all_placeholders})", all_ids_to_delete)
-        deleted_count = cursor.rowcount
-
-        # Commit the transaction
-        conn.commit()
+        # Delete all revisions with their dependent rows in one transaction
+        result = cascade_delete(conn, "eds", all_ids_to_delete)
+        deleted_count = len(result["deleted_ids"])
         print(f"Successfully deleted {deleted_count} EDS file(s) including all revisions from database")
 
     except HTTPException:
@@ -1476,6 +1495,7 @@ async def bulk_delete_eds_files(request: dict):
 
 
 @router.post("/upload-package")
+@profiled("eds.package_import")
 async def upload_eds_package(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     """
     Upload and parse an EDS package ZIP file containing multiple versions/variants
@@ -9,6 +9,8 @@ from pydantic import BaseModel
 
 import sqlite3
 
+from src.database import get_db_path
+
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/iodd", tags=["IODD"])
 
@@ -16,7 +18,7 @@ router = APIRouter(prefix="/api/iodd", tags=["IODD"])
 # Database helper
 def get_db():
     """Get database connection"""
-    conn = sqlite3.connect("greenstack.db")
+    conn = sqlite3.connect(get_db_path())
     conn.row_factory = lambda cursor, row: dict(zip([col[0] for col in cursor.description], row))
     return conn
 
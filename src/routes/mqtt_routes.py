@@ -6,8 +6,9 @@ import asyncio
 import json
 import logging
 import os
+from collections import deque
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional, Set
 
 from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
@@ -31,11 +32,114 @@ MQTT_PORT = int(os.getenv('MQTT_PORT', '1883'))
 MQTT_USERNAME = os.getenv('MQTT_USERNAME', 'iodd')
 MQTT_PASSWORD = os.getenv('MQTT_PASSWORD', 'mqtt123')
 
+# WebSocket fan-out configuration
+MQTT_HISTORY_SIZE = int(os.getenv('MQTT_WS_HISTORY_SIZE', '100'))
+MQTT_CLIENT_QUEUE_SIZE = int(os.getenv('MQTT_WS_CLIENT_QUEUE_SIZE', '256'))
+
 # Global MQTT client for the API
 mqtt_client = None
 mqtt_connected = False
-mqtt_messages = []  # Store recent messages
-websocket_clients: List[WebSocket] = []
+
+
+def topic_matches(topic_filter: str, topic: str) -> bool:
+    """Check an MQTT topic against a subscription filter (supports + and # wildcards)"""
+    if topic_filter in ('#', topic):
+        return True
+    filter_parts = topic_filter.split('/')
+    topic_parts = topic.split('/')
+    for i, part in enumerate(filter_parts):
+        if part == '#':
+            return True
+        if i >= len(topic_parts):
+            return False
+        if part != '+' and part != topic_parts[i]:
+            return False
+    return len(filter_parts) == len(topic_parts)
+
+
+class HubClient:
+    """A connected WebSocket with its own bounded queue and topic filters"""
+
+    def __init__(self, websocket: WebSocket, topics: Optional[List[str]] = None,
+                 queue_size: int = MQTT_CLIENT_QUEUE_SIZE):
+        self.websocket = websocket
+        self.loop = asyncio.get_running_loop()
+        self.topics: Set[str] = set(topics or ['#'])
+        self.queue: Deque[Dict[str, Any]] = deque(maxlen=queue_size)
+        self.ready = asyncio.Event()
+        self.dropped = 0
+
+    def wants(self, topic: str) -> bool:
+        return any(topic_matches(f, topic) for f in self.topics)
+
+    def put(self, message: Dict[str, Any]):
+        """Enqueue a message, dropping the oldest one if the client is lagging"""
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(message)
+        self.ready.set()
+
+
+class MessageHub:
+    """
+    Fans MQTT messages out to WebSocket clients.
+
+    paho-mqtt calls ``publish_threadsafe`` from its network thread; messages
+    are handed to the event loop with ``call_soon_threadsafe`` and pushed into
+    each matching client's bounded queue. Every client is drained by its own
+    sender task, so a slow client only loses its own oldest messages instead
+    of delaying everyone else. The last ``history_size`` messages are kept in
+    a ring buffer for late joiners.
+    """
+
+    def __init__(self, history_size: int = MQTT_HISTORY_SIZE):
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self.clients: Set[HubClient] = set()
+        self.published = 0
+
+    def publish_threadsafe(self, message: Dict[str, Any]):
+        """Accept a message from any thread"""
+        self.history.append(message)
+        self.published += 1
+        # One handoff per event loop (normally exactly one), not per client
+        for loop in {client.loop for client in list(self.clients)}:
+            try:
+                loop.call_soon_threadsafe(self._dispatch, message, loop)
+            except RuntimeError:
+                # Loop closed while the client was disconnecting
+                pass
+
+    def _dispatch(self, message: Dict[str, Any], loop: asyncio.AbstractEventLoop):
+        topic = message.get('topic', '')
+        for client in list(self.clients):
+            if client.loop is loop and client.wants(topic):
+                client.put(message)
+
+    def register(self, websocket: WebSocket, topics: Optional[List[str]] = None) -> HubClient:
+        """Register a client; must be called from the event loop serving it"""
+        client = HubClient(websocket, topics)
+        self.clients.add(client)
+        return client
+
+    def unregister(self, client: HubClient):
+        self.clients.discard(client)
+
+    def recent(self, topic_filter: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get buffered messages, oldest first"""
+        messages = [m for m in list(self.history)
+                    if topic_filter is None or topic_matches(topic_filter, m.get('topic', ''))]
+        return messages[-limit:] if limit else messages
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self.clients),
+            "published": self.published,
+            "history": len(self.history),
+            "dropped": sum(c.dropped for c in self.clients),
+        }
+
+
+hub = MessageHub()
 
 # Models
 class PublishRequest(BaseModel):
@@ -85,19 +189,13 @@ def setup_mqtt_client():
         """Handle incoming MQTT messages and forward to websocket clients"""
         message_data = {
             'topic': msg.topic,
-            'payload': msg.payload.decode('utf-8'),
+            'payload': msg.payload.decode('utf-8', errors='replace'),
             'qos': msg.qos,
             'timestamp': datetime.utcnow().isoformat()
         }
 
-        # Store message
-        mqtt_messages.append(message_data)
-        # Keep only last 100 messages
-        if len(mqtt_messages) > 100:
-            mqtt_messages.pop(0)
-
-        # Forward to websocket clients
-        asyncio.create_task(broadcast_message(message_data))
+        # Runs on the paho network thread - hand off to the event loop
+        hub.publish_threadsafe(message_data)
 
     client.on_connect = on_connect
     client.on_disconnect = on_disconnect
@@ -115,20 +213,6 @@ def setup_mqtt_client():
         # Users can start it later via the Services admin page
         return None
 
-async def broadcast_message(message: Dict[str, Any]):
-    """Broadcast message to all connected websocket clients"""
-    disconnected_clients = []
-    for ws in websocket_clients:
-        try:
-            await ws.send_json(message)
-        except Exception:
-            disconnected_clients.append(ws)
-
-    # Remove disconnected clients
-    for ws in disconnected_clients:
-        if ws in websocket_clients:
-            websocket_clients.remove(ws)
-
 # API Endpoints
 @router.get("/status")
 async def get_broker_status():
@@ -154,7 +238,8 @@ async def get_broker_status():
         "messages_per_sec": 0,  # Would need to calculate
         "auth_enabled": bool(MQTT_USERNAME),
         "persistence": True,  # From mosquitto.conf
-        "max_connections": "Unlimited"  # From mosquitto.conf
+        "max_connections": "Unlimited",  # From mosquitto.conf
+        "websocket": hub.get_stats()
     }
 
 @router.post("/publish")
@@ -291,30 +376,109 @@ async def get_active_topics():
         ]
     }
 
-@router.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time MQTT message streaming"""
-    await websocket.accept()
-    websocket_clients.append(websocket)
+@router.get("/messages")
+async def get_recent_messages(topic: Optional[str] = None, limit: int = 100):
+    """Get recently received MQTT messages from the history buffer"""
+    return {
+        "messages": hub.recent(topic, max(1, limit)),
+        "stats": hub.get_stats()
+    }
 
+async def _ws_sender(client: HubClient):
+    """Drain one client's queue; only this client waits on its own socket"""
+    while True:
+        await client.ready.wait()
+        client.ready.clear()
+        while client.queue:
+            await client.websocket.send_json(client.queue.popleft())
+
+def _history_limit(value: Any) -> int:
+    """Coerce a requested number of buffered messages to 0..history size"""
     try:
-        while True:
-            # Keep connection alive
-            await asyncio.sleep(1)
-            # Could also receive commands from client here
-            try:
-                data = await asyncio.wait_for(websocket.receive_text(), timeout=0.1)
-                # Handle any client commands if needed
-            except asyncio.TimeoutError:
-                pass
+        limit = int(value)
+    except (TypeError, ValueError):
+        return 0
+    return max(0, min(limit, hub.history.maxlen))
+
+
+def _command_topics(command: Dict[str, Any]) -> Optional[List[str]]:
+    """Topic filters named by a command, or None if they are malformed"""
+    if 'topics' in command:
+        topics = command['topics']
+        if isinstance(topics, list) and all(isinstance(t, str) and t for t in topics):
+            return topics
+        return None
+    topic = command.get('topic')
+    if topic is None:
+        return []
+    return [topic] if isinstance(topic, str) and topic else None
 
-    except WebSocketDisconnect:
-        if websocket in websocket_clients:
-            websocket_clients.remove(websocket)
-    except Exception as e:
-        logger.error("WebSocket error: %s", e, exc_info=True)
-        if websocket in websocket_clients:
-            websocket_clients.remove(websocket)
+
+async def _ws_receiver(client: HubClient):
+    """Handle subscription commands sent by the client"""
+    while True:
+        try:
+            command = json.loads(await client.websocket.receive_text())
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(command, dict):
+            continue
+
+        action = command.get('action')
+        topics = _command_topics(command)
+        if action in ('subscribe', 'unsubscribe') and topics is None:
+            client.put({"error": "topics must be a list of topic filter strings", "action": action})
+        elif action == 'subscribe':
+            # An explicit subscription replaces the implicit catch-all
+            if topics and client.topics == {'#'}:
+                client.topics.clear()
+            client.topics.update(topics)
+        elif action == 'unsubscribe':
+            client.topics.difference_update(topics)
+        elif action == 'history':
+            topic = command.get('topic')
+            limit = _history_limit(command.get('limit', hub.history.maxlen))
+            if limit and (topic is None or isinstance(topic, str)):
+                for message in hub.recent(topic, limit):
+                    client.put(message)
+
+@router.websocket("/ws")
+async def websocket_endpoint(websocket: WebSocket):
+    """
+    WebSocket endpoint for real-time MQTT message streaming
+
+    Query parameters:
+        topics: Comma-separated topic filters (MQTT wildcards, default ``#``)
+        history: Number of buffered messages to replay on connect (default 0)
+
+    Clients can change filters at runtime by sending
+    ``{"action": "subscribe" | "unsubscribe", "topics": [...]}`` or request
+    buffered messages with ``{"action": "history", "topic": ..., "limit": ...}``.
+    """
+    # Register before accepting so nothing published after the handshake is missed
+    topics = [t for t in websocket.query_params.get('topics', '').split(',') if t]
+    client = hub.register(websocket, topics or None)
+
+    tasks = []
+    try:
+        await websocket.accept()
+
+        history = _history_limit(websocket.query_params.get('history', '0'))
+        if history:
+            for message in hub.recent(limit=history):
+                if client.wants(message.get('topic', '')):
+                    client.put(message)
+
+        tasks = [asyncio.create_task(_ws_sender(client)), asyncio.create_task(_ws_receiver(client))]
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc and not isinstance(exc, WebSocketDisconnect):
+                logger.error("WebSocket error: %s", exc, exc_info=exc)
+    finally:
+        for task in tasks:
+            task.cancel()
+        hub.unregister(client)
 
 @router.post("/connect")
 async def connect_mqtt():
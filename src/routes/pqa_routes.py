@@ -4,7 +4,7 @@ PQA (Parser Quality Assurance) API Routes
 REST endpoints for forensic reconstruction, diff analysis, and quality metrics.
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Query, Request
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import sqlite3
@@ -14,6 +14,9 @@ from ..utils.pqa_orchestrator import (
     UnifiedPQAOrchestrator, FileType, analyze_iodd_quality, analyze_eds_quality
 )
 from ..utils.forensic_reconstruction_v2 import reconstruct_iodd_xml
+from ..utils.job_profiler import profiled
+from ..utils.read_replica import get_analytics_connection
+from ..utils.pagination import PageParams, fetch_page, page_params, paginated_response
 from ..utils.eds_reconstruction import reconstruct_eds_file
 
 logger = logging.getLogger(__name__)
@@ -188,10 +191,23 @@ async def run_pqa_analysis(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def run_bulk_analysis(analyses: List[tuple], profile: bool = False):
+    """Run queued (file_type, id, content) analyses one after another"""
+    with profiled("pqa.analyze_all", enabled=profile, analyses=len(analyses)):
+        orchestrator = UnifiedPQAOrchestrator()
+        for file_type, item_id, content in analyses:
+            try:
+                orchestrator.run_full_analysis(item_id, file_type, content)
+                logger.info(f"Completed PQA analysis for {file_type.value} {item_id}")
+            except Exception as e:
+                logger.error(f"PQA analysis failed for {file_type.value} {item_id}: {e}", exc_info=True)
+
+
 @router.post("/analyze-all", response_model=Dict[str, Any])
 async def run_pqa_analysis_all(
     background_tasks: BackgroundTasks,
-    file_type: Optional[str] = Query(None, description="Filter by file type: IODD or EDS. If not specified, analyzes all types")
+    file_type: Optional[str] = Query(None, description="Filter by file type: IODD or EDS. If not specified, analyzes all types"),
+    profile: bool = Query(False, description="Record a sampling profile of the run (see /api/admin/profiles)")
 ):
     """
     Run PQA analysis on all devices/files
@@ -201,6 +217,7 @@ async def run_pqa_analysis_all(
 
     Args:
         file_type: Optional filter - 'IODD', 'EDS', or None for both
+        profile: Profile the whole run
 
     Returns:
         Summary of queued analyses
@@ -209,7 +226,7 @@ async def run_pqa_analysis_all(
         conn = get_db()
         cursor = conn.cursor()
 
-        queued_count = 0
+        analyses = []
         iodd_count = 0
         eds_count = 0
 
@@ -234,19 +251,7 @@ async def run_pqa_analysis_all(
                     if isinstance(xml_content, bytes):
                         xml_content = xml_content.decode('utf-8')
 
-                    # Queue analysis using functools.partial to avoid closure issues
-                    from functools import partial
-
-                    def run_iodd_analysis(device_id: int, xml_content: str):
-                        try:
-                            orchestrator = UnifiedPQAOrchestrator()
-                            orchestrator.run_full_analysis(device_id, FileType.IODD, xml_content)
-                            logger.info(f"Completed PQA analysis for IODD device {device_id}")
-                        except Exception as e:
-                            logger.error(f"PQA analysis failed for IODD {device_id}: {e}", exc_info=True)
-
-                    background_tasks.add_task(run_iodd_analysis, device_id, xml_content)
-                    queued_count += 1
+                    analyses.append((FileType.IODD, device_id, xml_content))
                     iodd_count += 1
 
         # Queue EDS analyses
@@ -255,31 +260,24 @@ async def run_pqa_analysis_all(
             eds_files = cursor.fetchall()
 
             for eds_file in eds_files:
-                eds_id = eds_file['id']
-                eds_content = eds_file['eds_content']
-
-                if eds_content:
-                    # Queue analysis
-                    def run_eds_analysis(eds_id: int, eds_content: str):
-                        try:
-                            orchestrator = UnifiedPQAOrchestrator()
-                            orchestrator.run_full_analysis(eds_id, FileType.EDS, eds_content)
-                            logger.info(f"Completed PQA analysis for EDS file {eds_id}")
-                        except Exception as e:
-                            logger.error(f"PQA analysis failed for EDS {eds_id}: {e}", exc_info=True)
-
-                    background_tasks.add_task(run_eds_analysis, eds_id, eds_content)
-                    queued_count += 1
+                if eds_file['eds_content']:
+                    analyses.append((FileType.EDS, eds_file['id'], eds_file['eds_content']))
                     eds_count += 1
 
         conn.close()
 
+        # One background task runs the analyses in order, so the run can be profiled as a whole
+        queued_count = len(analyses)
+        if analyses:
+            background_tasks.add_task(run_bulk_analysis, analyses, profile)
+
         return {
             "status": "queued",
             "message": f"Queued {queued_count} analyses ({iodd_count} IODD, {eds_count} EDS)",
             "total_queued": queued_count,
             "iodd_queued": iodd_count,
-            "eds_queued": eds_count
+            "eds_queued": eds_count,
+            "profiled": profile
         }
 
     except Exception as e:
@@ -287,95 +285,78 @@ async def run_pqa_analysis_all(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+ANALYZED_SORT_FIELDS = {
+    "latest_analysis": "COALESCE(latest_analysis, '')",
+    "latest_score": "COALESCE(latest_score, 0)",
+    "product_name": "COALESCE(product_name, '')",
+}
+
+
 @router.get("/analyzed-devices", response_model=List[Dict[str, Any]])
-async def get_analyzed_devices():
+async def get_analyzed_devices(
+    request: Request,
+    page: PageParams = Depends(page_params(ANALYZED_SORT_FIELDS, "latest_analysis", "desc"))
+):
     """
     Get list of all devices that have been analyzed
 
     Returns a list of devices with their latest analysis metrics.
-    Useful for the Analysis History list view.
+    Useful for the Analysis History list view. Latest metrics, analysis
+    counts and device names come from a single windowed query; supports
+    keyset pagination and field projection.
     """
     try:
         conn = get_db()
-        cursor = conn.cursor()
 
-        # Get all unique device/file combinations with analyses
-        cursor.execute("""
-            SELECT DISTINCT
-                m.device_id,
-                a.file_type
-            FROM pqa_quality_metrics m
-            JOIN pqa_file_archive a ON m.archive_id = a.id
-        """)
-
-        device_combos = cursor.fetchall()
-
-        result = []
-        for combo in device_combos:
-            device_id = combo['device_id']
-            file_type = combo['file_type']
-
-            # Get latest metrics for this device/file_type
-            cursor.execute("""
+        # Latest analysis per device/file type plus its analysis count
+        query = """
+            WITH analyses AS (
                 SELECT
+                    m.device_id,
+                    a.file_type,
                     m.overall_score,
                     m.passed_threshold,
                     m.analysis_timestamp,
-                    COUNT(*) OVER() as analysis_count
+                    ROW_NUMBER() OVER (
+                        PARTITION BY m.device_id, a.file_type
+                        ORDER BY m.analysis_timestamp DESC
+                    ) AS rn,
+                    COUNT(*) OVER (PARTITION BY m.device_id, a.file_type) AS analysis_count
                 FROM pqa_quality_metrics m
                 JOIN pqa_file_archive a ON m.archive_id = a.id
-                WHERE m.device_id = ? AND a.file_type = ?
-                ORDER BY m.analysis_timestamp DESC
-                LIMIT 1
-            """, (device_id, file_type))
-
-            latest = cursor.fetchone()
-
-            if not latest:
-                continue
+            )
+            SELECT
+                an.device_id AS id,
+                an.file_type,
+                CASE WHEN an.file_type = 'IODD' THEN d.product_name ELSE e.product_name END AS product_name,
+                -- Vendor column name differs between IODD and EDS tables
+                CASE WHEN an.file_type = 'IODD' THEN d.manufacturer ELSE e.vendor_name END AS vendor_name,
+                an.analysis_timestamp AS latest_analysis,
+                an.analysis_count,
+                an.overall_score AS latest_score,
+                an.passed_threshold AS passed
+            FROM analyses an
+            LEFT JOIN devices d ON an.file_type = 'IODD' AND d.id = an.device_id
+            LEFT JOIN eds_files e ON an.file_type != 'IODD' AND e.id = an.device_id
+            WHERE an.rn = 1
+        """
+        try:
+            # IODD and EDS IDs overlap, so the keyset tiebreak includes the file type
+            rows, next_cursor, total = fetch_page(
+                conn, query, [], page, ANALYZED_SORT_FIELDS, id_expr="file_type || ':' || id"
+            )
+        finally:
+            conn.close()
 
-            # Get device name
-            if file_type == 'IODD':
-                cursor.execute("SELECT product_name, manufacturer FROM devices WHERE id = ?", (device_id,))
-            else:
-                cursor.execute("SELECT product_name, vendor_name FROM eds_files WHERE id = ?", (device_id,))
+        for row in rows:
+            if row["product_name"] is None:
+                row["product_name"] = f"Unknown Device {row['id']}"
+            row["passed"] = bool(row["passed"])
 
-            device_row = cursor.fetchone()
-
-            # Count total analyses for this device/file_type
-            cursor.execute("""
-                SELECT COUNT(*) as count
-                FROM pqa_quality_metrics m
-                JOIN pqa_file_archive a ON m.archive_id = a.id
-                WHERE m.device_id = ? AND a.file_type = ?
-            """, (device_id, file_type))
-            count_row = cursor.fetchone()
-
-            # Get vendor name - column name differs between IODD and EDS tables
-            vendor_name = None
-            if device_row:
-                if file_type == 'IODD':
-                    vendor_name = device_row['manufacturer']
-                else:
-                    vendor_name = device_row['vendor_name']
-
-            result.append({
-                "id": device_id,
-                "file_type": file_type,
-                "product_name": device_row['product_name'] if device_row else f"Unknown Device {device_id}",
-                "vendor_name": vendor_name,
-                "latest_analysis": latest['analysis_timestamp'],
-                "analysis_count": count_row['count'] if count_row else 0,
-                "latest_score": latest['overall_score'],
-                "passed": bool(latest['passed_threshold'])
-            })
-
-        # Sort by latest analysis timestamp descending
-        result.sort(key=lambda x: x['latest_analysis'], reverse=True)
-
-        conn.close()
-        return result
+        return paginated_response(request, rows, page, next_cursor, total)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching analyzed devices: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -761,7 +742,7 @@ async def update_threshold(threshold_id: int, threshold: ThresholdConfig):
 # ============================================================================
 
 @router.get("/dashboard/summary", response_model=DashboardSummary)
-async def get_dashboard_summary(file_type: Optional[str] = Query(None, description="Filter by file type: IODD or EDS")):
+def get_dashboard_summary(file_type: Optional[str] = Query(None, description="Filter by file type: IODD or EDS")):
     """
     Get PQA dashboard summary statistics
 
@@ -769,7 +750,7 @@ async def get_dashboard_summary(file_type: Optional[str] = Query(None, descripti
     or show combined statistics if no filter is applied.
     """
     try:
-        conn = get_db()
+        conn = get_analytics_connection()
         cursor = conn.cursor()
 
         # Build WHERE clause for file_type filtering
@@ -851,10 +832,10 @@ async def get_dashboard_summary(file_type: Optional[str] = Query(None, descripti
 
 
 @router.get("/dashboard/trends")
-async def get_quality_trends(days: int = Query(30, ge=1, le=365)):
+def get_quality_trends(days: int = Query(30, ge=1, le=365)):
     """Get quality score trends over time"""
     try:
-        conn = get_db()
+        conn = get_analytics_connection()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -890,10 +871,10 @@ async def get_quality_trends(days: int = Query(30, ge=1, le=365)):
 
 
 @router.get("/dashboard/failures")
-async def get_quality_failures(limit: int = Query(20, ge=1, le=100)):
+def get_quality_failures(limit: int = Query(20, ge=1, le=100)):
     """Get list of quality analysis failures"""
     try:
-        conn = get_db()
+        conn = get_analytics_connection()
         cursor = conn.cursor()
 
         cursor.execute("""
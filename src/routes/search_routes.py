@@ -6,7 +6,9 @@ Provides global search across all EDS and IODD data including parameters, assemb
 import sqlite3
 from typing import List, Optional
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query
+
+from src.utils.pagination import decode_token, encode_token
 
 router = APIRouter(prefix="/api/search", tags=["Search"])
 
@@ -17,7 +19,8 @@ DB_PATH = "greenstack.db"
 async def global_search(
     q: str = Query(..., min_length=2, description="Search query"),
     device_type: Optional[str] = Query(None, description="Filter by device type: EDS or IODD"),
-    limit: int = Query(50, le=500, description="Maximum results per category")
+    limit: int = Query(50, le=500, description="Maximum results per category"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous response")
 ):
     """
     Global search across all device data
@@ -29,8 +32,31 @@ async def global_search(
     - Connection names
     - Enum values
 
-    Returns results grouped by category for easy navigation
+    Returns results grouped by category for easy navigation. Each category is
+    paged by ID: ``next_cursor`` continues only the categories that had more
+    than ``limit`` matches.
     """
+    after_ids = None
+    if cursor:
+        after_ids = decode_token(cursor)
+        if not isinstance(after_ids, dict):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    next_ids = {}
+
+    def wanted(category: str) -> bool:
+        return after_ids is None or category in after_ids
+
+    def after(category: str) -> int:
+        return int(after_ids.get(category, 0)) if after_ids else 0
+
+    def page(category: str, rows: list) -> list:
+        """Trim the look-ahead row and remember where the category continues"""
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_ids[category] = rows[-1][0]
+        return rows
+
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
@@ -46,18 +72,20 @@ async def global_search(
     }
 
     # Search EDS devices
-    if not device_type or device_type.upper() == "EDS":
+    if (not device_type or device_type.upper() == "EDS") and wanted("eds_devices"):
         cursor.execute("""
             SELECT id, vendor_name, product_name, product_code, revision, description
             FROM eds_files
-            WHERE vendor_name LIKE ?
+            WHERE (vendor_name LIKE ?
                OR product_name LIKE ?
                OR product_code_name LIKE ?
-               OR description LIKE ?
+               OR description LIKE ?)
+              AND id > ?
+            ORDER BY id
             LIMIT ?
-        """, (search_term, search_term, search_term, search_term, limit))
+        """, (search_term, search_term, search_term, search_term, after("eds_devices"), limit + 1))
 
-        for row in cursor.fetchall():
+        for row in page("eds_devices", cursor.fetchall()):
             results["eds_devices"].append({
                 "id": row[0],
                 "vendor_name": row[1],
@@ -69,18 +97,20 @@ async def global_search(
             })
 
     # Search IODD devices
-    if not device_type or device_type.upper() == "IODD":
+    if (not device_type or device_type.upper() == "IODD") and wanted("iodd_devices"):
         cursor.execute("""
             SELECT id, vendor_name, product_name, product_id, device_id, description
             FROM iodd_files
-            WHERE vendor_name LIKE ?
+            WHERE (vendor_name LIKE ?
                OR product_name LIKE ?
                OR product_id LIKE ?
-               OR description LIKE ?
+               OR description LIKE ?)
+              AND id > ?
+            ORDER BY id
             LIMIT ?
-        """, (search_term, search_term, search_term, search_term, limit))
+        """, (search_term, search_term, search_term, search_term, after("iodd_devices"), limit + 1))
 
-        for row in cursor.fetchall():
+        for row in page("iodd_devices", cursor.fetchall()):
             results["iodd_devices"].append({
                 "id": row[0],
                 "vendor_name": row[1],
@@ -92,7 +122,7 @@ async def global_search(
             })
 
     # Search EDS Parameters
-    if not device_type or device_type.upper() == "EDS":
+    if (not device_type or device_type.upper() == "EDS") and wanted("parameters"):
         cursor.execute("""
             SELECT
                 p.id, p.eds_file_id, p.param_number, p.param_name,
@@ -101,16 +131,19 @@ async def global_search(
                 e.vendor_name, e.product_name, e.product_code
             FROM eds_parameters p
             JOIN eds_files e ON p.eds_file_id = e.id
-            WHERE p.param_name LIKE ?
+            WHERE (p.param_name LIKE ?
                OR p.description LIKE ?
                OR p.units LIKE ?
                OR p.help_string_1 LIKE ?
                OR p.help_string_2 LIKE ?
-               OR p.help_string_3 LIKE ?
+               OR p.help_string_3 LIKE ?)
+              AND p.id > ?
+            ORDER BY p.id
             LIMIT ?
-        """, (search_term, search_term, search_term, search_term, search_term, search_term, limit))
+        """, (search_term, search_term, search_term, search_term, search_term, search_term,
+              after("parameters"), limit + 1))
 
-        for row in cursor.fetchall():
+        for row in page("parameters", cursor.fetchall()):
             results["parameters"].append({
                 "id": row[0],
                 "device_id": row[1],
@@ -129,19 +162,21 @@ async def global_search(
             })
 
     # Search EDS Assemblies
-    if not device_type or device_type.upper() == "EDS":
+    if (not device_type or device_type.upper() == "EDS") and wanted("assemblies"):
         cursor.execute("""
             SELECT
                 a.id, a.eds_file_id, a.assembly_number, a.assembly_name, a.description,
                 e.vendor_name, e.product_name, e.product_code
             FROM eds_assemblies a
             JOIN eds_files e ON a.eds_file_id = e.id
-            WHERE a.assembly_name LIKE ?
-               OR a.description LIKE ?
+            WHERE (a.assembly_name LIKE ?
+               OR a.description LIKE ?)
+              AND a.id > ?
+            ORDER BY a.id
             LIMIT ?
-        """, (search_term, search_term, limit))
+        """, (search_term, search_term, after("assemblies"), limit + 1))
 
-        for row in cursor.fetchall():
+        for row in page("assemblies", cursor.fetchall()):
             results["assemblies"].append({
                 "id": row[0],
                 "device_id": row[1],
@@ -155,19 +190,21 @@ async def global_search(
             })
 
     # Search EDS Connections
-    if not device_type or device_type.upper() == "EDS":
+    if (not device_type or device_type.upper() == "EDS") and wanted("connections"):
         cursor.execute("""
             SELECT
                 c.id, c.eds_file_id, c.connection_number, c.connection_name, c.connection_type,
                 e.vendor_name, e.product_name, e.product_code
             FROM eds_connections c
             JOIN eds_files e ON c.eds_file_id = e.id
-            WHERE c.connection_name LIKE ?
-               OR c.connection_type LIKE ?
+            WHERE (c.connection_name LIKE ?
+               OR c.connection_type LIKE ?)
+              AND c.id > ?
+            ORDER BY c.id
             LIMIT ?
-        """, (search_term, search_term, limit))
+        """, (search_term, search_term, after("connections"), limit + 1))
 
-        for row in cursor.fetchall():
+        for row in page("connections", cursor.fetchall()):
             results["connections"].append({
                 "id": row[0],
                 "device_id": row[1],
@@ -181,7 +218,7 @@ async def global_search(
             })
 
     # Search Enum Values (in parameter descriptions/enums)
-    if not device_type or device_type.upper() == "EDS":
+    if (not device_type or device_type.upper() == "EDS") and wanted("enums"):
         cursor.execute("""
             SELECT
                 p.id, p.eds_file_id, p.param_number, p.param_name, p.enum_values,
@@ -190,10 +227,12 @@ async def global_search(
             JOIN eds_files e ON p.eds_file_id = e.id
             WHERE p.enum_values IS NOT NULL
               AND p.enum_values LIKE ?
+              AND p.id > ?
+            ORDER BY p.id
             LIMIT ?
-        """, (search_term, limit))
+        """, (search_term, after("enums"), limit + 1))
 
-        for row in cursor.fetchall():
+        for row in page("enums", cursor.fetchall()):
             if row[4]:  # enum_values not empty
                 results["enums"].append({
                     "id": row[0],
@@ -220,7 +259,8 @@ async def global_search(
     )
 
     results["total_results"] = total_results
-    results["has_more"] = total_results >= limit  # Indicate if there might be more results
+    results["has_more"] = bool(next_ids)
+    results["next_cursor"] = encode_token(next_ids) if next_ids else None
 
     return results
 
@@ -4,8 +4,8 @@ Provides REST API endpoints for managing application services (MQTT, InfluxDB, N
 with port configuration and conflict detection
 """
 import json
+import logging
 import os
-import shutil
 import socket
 import subprocess
 from pathlib import Path
@@ -15,12 +15,20 @@ import psutil
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
+from src.utils.service_monitor import ServiceMonitor, executable_exists
+
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 # Service configuration file path
 SERVICE_CONFIG_FILE = Path("config/services.json")
 SERVICE_CONFIG_FILE.parent.mkdir(exist_ok=True)
 
+# Seconds between status samples, and between process table walks for stopped services
+SERVICE_STATUS_INTERVAL = float(os.getenv("SERVICE_STATUS_INTERVAL", "5"))
+SERVICE_PROCESS_SCAN_INTERVAL = float(os.getenv("SERVICE_PROCESS_SCAN_INTERVAL", "30"))
+
 # Default service configurations
 DEFAULT_SERVICES = {
     "mosquitto": {
@@ -111,7 +119,7 @@ def load_service_config() -> Dict[str, Dict]:
                                 config[service][key] = value
                 return config
         except Exception as e:
-            logger.error("loading service config: {e}")
+            logger.error(f"loading service config: {e}")
             return DEFAULT_SERVICES.copy()
     return DEFAULT_SERVICES.copy()
 
@@ -120,8 +128,9 @@ def save_service_config(config: Dict[str, Dict]):
     try:
         with open(SERVICE_CONFIG_FILE, 'w') as f:
             json.dump(config, f, indent=2)
+        service_monitor.invalidate_config()
     except Exception as e:
-        logger.error("saving service config: {e}")
+        logger.error(f"saving service config: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to save configuration: {str(e)}")
 
 def check_port_available(port: int) -> tuple[bool, Optional[Dict]]:
@@ -173,40 +182,49 @@ def find_process_by_name(name: str, process_cache: Optional[list] = None) -> Opt
 
 def check_executable_exists(executable: str) -> bool:
     """Check if an executable exists in PATH"""
-    if os.name == 'nt':  # Windows
-        executable = executable if executable.endswith('.exe') else f"{executable}.exe"
-
-    return shutil.which(executable) is not None
+    return executable_exists(executable)
+
+# Process/port snapshot served by the status endpoints (started with the app)
+service_monitor = ServiceMonitor(
+    load_service_config, SERVICE_CONFIG_FILE,
+    interval=SERVICE_STATUS_INTERVAL, scan_interval=SERVICE_PROCESS_SCAN_INTERVAL
+)
+
+def _sampled_services() -> tuple[Dict[str, Dict], Dict[str, Dict]]:
+    """Service config and the latest sample of each service"""
+    config = service_monitor.config()
+    samples = service_monitor.snapshot()["services"]
+    if set(samples) != set(config):
+        # Config changed since the last sample
+        samples = service_monitor.refresh()["services"]
+    return config, samples
+
+def _port_conflict(sample: Dict) -> Optional[Dict]:
+    if sample['port_available']:
+        return None
+    return {
+        "port": sample['port'],
+        "process_name": "Unknown",
+        "pid": 0,
+        "cmdline": "Port in use"
+    }
 
 @router.get("/api/services/status", response_model=Dict[str, ServiceStatus])
 async def get_services_status():
-    """Get status of all services"""
-    config = load_service_config()
+    """Get status of all services (from the sampled snapshot)"""
+    config, samples = _sampled_services()
     status = {}
 
-    # Collect process list once for performance (minimal info only)
-    try:
-        process_cache = list(psutil.process_iter(['name']))
-    except Exception:
-        process_cache = None
-
     for service_id, service_config in config.items():
-        # Check if process is running
-        proc = find_process_by_name(service_config['process_name'], process_cache)
-        running = proc is not None
-        pid = proc.pid if proc else None
+        sample = samples[service_id]
+        pid = sample['pid']
+        running = pid is not None
 
-        # Check port availability
-        port = service_config['port']
-        port_available, port_conflict = check_port_available(port)
-
-        # Check if executable exists
-        executable_found = check_executable_exists(service_config['executable'])
-
-        # Validate config file if specified
-        config_valid = True
-        if service_config.get('config_file'):
-            config_valid = Path(service_config['config_file']).exists()
+        port = sample['port']
+        port_available = sample['port_available']
+        port_conflict = _port_conflict(sample)
+        executable_found = sample['executable_found']
+        config_valid = sample['config_valid']
 
         # Determine error message
         error = None
@@ -236,24 +254,19 @@ async def get_services_status():
 
 @router.get("/api/services/conflicts", response_model=List[PortConflict])
 async def get_port_conflicts():
-    """Get all port conflicts"""
-    config = load_service_config()
+    """Get all port conflicts (from the sampled snapshot)"""
+    config, samples = _sampled_services()
     conflicts = []
 
-    # Collect process list once for performance (minimal info only)
-    try:
-        process_cache = list(psutil.process_iter(['name']))
-    except Exception:
-        process_cache = None
+    for service_id in config:
+        sample = samples[service_id]
+        port = sample['port']
+        conflict = _port_conflict(sample)
 
-    for service_id, service_config in config.items():
-        port = service_config['port']
-        available, conflict = check_port_available(port)
-
-        if not available and conflict:
+        if conflict:
             # Check if this is one of our services
-            proc = find_process_by_name(service_config['process_name'], process_cache)
-            if not proc or (proc and proc.pid != conflict.get('pid')):
+            pid = sample['pid']
+            if pid is None or pid != conflict.get('pid'):
                 conflicts.append(PortConflict(
                     port=port,
                     process_name=conflict.get('process_name', 'Unknown'),
@@ -318,6 +331,8 @@ async def start_service(service_id: str):
         # Verify it's running
         proc = find_process_by_name(service_config['process_name'])
         if proc:
+            service_monitor.remember(service_id, proc.pid, service_config['process_name'])
+            service_monitor.refresh()
             return {
                 "status": "started",
                 "pid": proc.pid,
@@ -351,14 +366,18 @@ async def stop_service(service_id: str):
     try:
         proc.terminate()
         proc.wait(timeout=10)  # Wait up to 10 seconds
-        return {"status": "stopped", "message": f"{service_config['name']} stopped successfully"}
+        result = {"status": "stopped", "message": f"{service_config['name']} stopped successfully"}
     except psutil.TimeoutExpired:
         # Force kill if it doesn't stop gracefully
         proc.kill()
-        return {"status": "killed", "message": f"{service_config['name']} was force-stopped"}
+        result = {"status": "killed", "message": f"{service_config['name']} was force-stopped"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to stop service: {str(e)}")
 
+    service_monitor.forget(service_id)
+    service_monitor.refresh()
+    return result
+
 @router.post("/api/services/{service_id}/restart")
 async def restart_service(service_id: str):
     """Restart a service"""
@@ -406,8 +425,8 @@ async def update_service_config(service_id: str, new_config: ServiceConfig):
 
 @router.get("/api/services/health")
 async def services_health_check():
-    """Get overall health status of all services"""
-    config = load_service_config()
+    """Get overall health status of all services (from the sampled snapshot)"""
+    config = service_monitor.config()
     status = await get_services_status()
 
     total = len(config)
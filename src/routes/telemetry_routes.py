@@ -0,0 +1,179 @@
+"""
+Device Telemetry Routes
+Time-range queries over the Redis Streams telemetry history written by the MQTT bridge
+"""
+import json
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from services.common.telemetry_keys import TELEMETRY_STREAM, device_latest_key, device_stream_key
+
+logger = logging.getLogger(__name__)
+
+# Try to import redis, but make it optional
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    logger.warning("redis not installed. Telemetry history endpoints will be disabled.")
+
+router = APIRouter(prefix="/api/telemetry", tags=["Telemetry"])
+
+TELEMETRY_REDIS_URL = os.getenv('TELEMETRY_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+
+_STREAM_ID_RE = re.compile(r'^\d+(-\d+)?$')
+
+_redis_client = None
+
+
+def get_redis():
+    """Get (lazily connecting) the Redis client holding telemetry streams"""
+    global _redis_client
+
+    if not REDIS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Telemetry history requires the redis package")
+
+    if _redis_client is None:
+        _redis_client = redis.from_url(
+            TELEMETRY_REDIS_URL,
+            decode_responses=True,
+            socket_timeout=5,
+            socket_connect_timeout=5
+        )
+    return _redis_client
+
+
+def to_stream_id(value: Optional[str], default: str) -> str:
+    """
+    Convert a range bound to a stream ID.
+
+    Accepts stream IDs (``1700000000000-0``, optionally ``(``-prefixed for an
+    exclusive bound), epoch milliseconds, or ISO-8601 timestamps. Stream IDs
+    start with the entry's receive time in milliseconds, so time ranges map
+    directly onto XRANGE bounds.
+    """
+    if value is None or value == '':
+        return default
+    if value in ('-', '+'):
+        return value
+
+    exclusive = value.startswith('(')
+    raw = value[1:] if exclusive else value
+
+    if _STREAM_ID_RE.match(raw):
+        stream_id = raw
+    else:
+        try:
+            parsed = datetime.fromisoformat(raw.replace('Z', '+00:00'))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid range bound: {value}")
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        stream_id = str(int(parsed.timestamp() * 1000))
+
+    return f"({stream_id}" if exclusive else stream_id
+
+
+def _format_entry(entry_id: str, fields: Dict[str, str]) -> Dict[str, Any]:
+    try:
+        data = json.loads(fields.get('data') or '{}')
+    except json.JSONDecodeError:
+        data = fields.get('data')
+    received_ms = int(entry_id.split('-', 1)[0])
+    return {
+        "id": entry_id,
+        "received_at": datetime.fromtimestamp(received_ms / 1000, tz=timezone.utc).isoformat(),
+        "data": data,
+    }
+
+
+@router.get("/{device_id}/history")
+async def get_telemetry_history(
+    device_id: str,
+    start: Optional[str] = Query(None, description="Range start: stream ID, epoch ms or ISO timestamp"),
+    end: Optional[str] = Query(None, description="Range end: stream ID, epoch ms or ISO timestamp"),
+    count: int = Query(1000, ge=1, le=10000),
+    order: str = Query("asc", pattern="^(asc|desc)$")
+):
+    """
+    Get telemetry history for a device within a time range
+
+    Results are paged by stream ID: pass ``next`` back as ``start`` (ascending)
+    or ``end`` (descending) to fetch the following page.
+    """
+    client = get_redis()
+    key = device_stream_key(device_id)
+    range_start = to_stream_id(start, '-')
+    range_end = to_stream_id(end, '+')
+
+    try:
+        if order == "asc":
+            entries = client.xrange(key, min=range_start, max=range_end, count=count)
+        else:
+            entries = client.xrevrange(key, max=range_end, min=range_start, count=count)
+    except redis.RedisError as e:
+        logger.error(f"Telemetry history query failed for {device_id}: {e}")
+        raise HTTPException(status_code=503, detail="Telemetry store unavailable")
+
+    items = [_format_entry(entry_id, fields) for entry_id, fields in entries]
+    return {
+        "device_id": device_id,
+        "count": len(items),
+        "entries": items,
+        "next": f"({items[-1]['id']}" if len(items) == count else None,
+    }
+
+
+@router.get("/{device_id}/latest")
+async def get_latest_telemetry(device_id: str):
+    """Get the most recent telemetry message for a device"""
+    client = get_redis()
+    try:
+        latest = client.get(device_latest_key(device_id))
+        if latest is None:
+            entries = client.xrevrange(device_stream_key(device_id), count=1)
+            if not entries:
+                raise HTTPException(status_code=404, detail="No telemetry for device")
+            return _format_entry(*entries[0])
+    except redis.RedisError as e:
+        logger.error(f"Latest telemetry query failed for {device_id}: {e}")
+        raise HTTPException(status_code=503, detail="Telemetry store unavailable")
+
+    return {"data": json.loads(latest)}
+
+
+@router.get("/streams/info")
+async def get_stream_info():
+    """Get length and consumer-group lag of the shared telemetry log"""
+    client = get_redis()
+    try:
+        if not client.exists(TELEMETRY_STREAM):
+            return {"stream": TELEMETRY_STREAM, "length": 0, "groups": []}
+        info = client.xinfo_stream(TELEMETRY_STREAM)
+        groups: List[Dict[str, Any]] = [
+            {
+                "name": group.get('name'),
+                "consumers": group.get('consumers'),
+                "pending": group.get('pending'),
+                "last_delivered_id": group.get('last-delivered-id'),
+                "lag": group.get('lag'),
+            }
+            for group in client.xinfo_groups(TELEMETRY_STREAM)
+        ]
+    except redis.RedisError as e:
+        logger.error(f"Telemetry stream info query failed: {e}")
+        raise HTTPException(status_code=503, detail="Telemetry store unavailable")
+
+    return {
+        "stream": TELEMETRY_STREAM,
+        "length": info.get('length'),
+        "first_entry_id": info['first-entry'][0] if info.get('first-entry') else None,
+        "last_entry_id": info['last-entry'][0] if info.get('last-entry') else None,
+        "groups": groups,
+    }
@@ -9,15 +9,17 @@ import logging
 import os
 import shutil
 import sqlite3
-import zipfile
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
 
-from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
 from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 
+from src.utils.pagination import PageParams, fetch_page, page_params, paginated_response
+from src.utils.zip_stream import ZipStream, content_disposition
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/tickets", tags=["Tickets"])
@@ -143,17 +145,28 @@ def get_ticket_with_details(conn, ticket_id: int):
     }
 
 
+TICKET_SORT_FIELDS = {
+    "created_at": "COALESCE(created_at, '')",
+    "updated_at": "COALESCE(updated_at, '')",
+    "ticket_number": "COALESCE(ticket_number, '')",
+    "status": "COALESCE(status, '')",
+    "priority": "COALESCE(priority, '')",
+    "id": "id",
+}
+
+
 @router.get("")
 async def list_tickets(
+    request: Request,
     status: Optional[str] = Query(None, description="Filter by status"),
     priority: Optional[str] = Query(None, description="Filter by priority"),
     device_type: Optional[str] = Query(None, description="Filter by device type (EDS/IODD)"),
     category: Optional[str] = Query(None, description="Filter by category"),
+    page: PageParams = Depends(page_params(TICKET_SORT_FIELDS, "created_at", "desc")),
 ):
-    """List all tickets with optional filters"""
+    """List tickets with optional filters, keyset pagination and field projection"""
     conn = sqlite3.connect(DB_PATH)
     conn.execute("PRAGMA foreign_keys = ON")
-    cursor = conn.cursor()
 
     query = """
         SELECT id, ticket_number, device_type, device_id, device_name, vendor_name,
@@ -180,34 +193,12 @@ async def list_tickets(
         query += " AND category = ?"
         params.append(category)
 
-    query += " ORDER BY created_at DESC"
-
-    cursor.execute(query, params)
-    tickets = cursor.fetchall()
-    conn.close()
+    try:
+        tickets, next_cursor, total = fetch_page(conn, query, params, page, TICKET_SORT_FIELDS)
+    finally:
+        conn.close()
 
-    return [
-        {
-            'id': t[0],
-            'ticket_number': t[1],
-            'device_type': t[2],
-            'device_id': t[3],
-            'device_name': t[4],
-            'vendor_name': t[5],
-            'product_code': t[6],
-            'title': t[7],
-            'description': t[8],
-            'eds_reference': t[9],
-            'status': t[10],
-            'priority': t[11],
-            'category': t[12],
-            'created_at': t[13],
-            'updated_at': t[14],
-            'resolved_at': t[15],
-            'created_by': t[16],
-            'assigned_to': t[17],
-        } for t in tickets
-    ]
+    return paginated_response(request, tickets, page, next_cursor, total)
 
 
 @router.get("/{ticket_id}")
@@ -789,82 +780,79 @@ async def export_tickets_with_attachments(
     cursor.execute(query, params)
     tickets = cursor.fetchall()
 
-    # Create in-memory ZIP file
-    zip_buffer = io.BytesIO()
+    archive = ZipStream()
 
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        # Create CSV
-        csv_output = io.StringIO()
-        writer = csv.writer(csv_output)
+    # CSV rows are collected first; attachment files are only read while streaming
+    csv_output = io.StringIO()
+    writer = csv.writer(csv_output)
 
-        # Write header
-        writer.writerow([
-            'Ticket Number', 'Device Type', 'Device Name', 'Vendor', 'Product Code',
-            'Title', 'Description', 'EDS Reference', 'Status', 'Priority', 'Category',
-            'Created At', 'Updated At', 'Resolved At', 'Comments', 'Attachments'
-        ])
+    # Write header
+    writer.writerow([
+        'Ticket Number', 'Device Type', 'Device Name', 'Vendor', 'Product Code',
+        'Title', 'Description', 'EDS Reference', 'Status', 'Priority', 'Category',
+        'Created At', 'Updated At', 'Resolved At', 'Comments', 'Attachments'
+    ])
 
-        # Write tickets with comments and attachments
-        for ticket in tickets:
-            ticket_id = ticket[14]
-            ticket_number = ticket[0]
+    attachment_entries = []
 
-            # Get comments
-            cursor.execute("""
-                SELECT comment_text FROM ticket_comments
-                WHERE ticket_id = ?
-                ORDER BY created_at ASC
-            """, (ticket_id,))
-            comments = cursor.fetchall()
-            all_comments = " | ".join([c[0] for c in comments])
-
-            # Get attachments
-            cursor.execute("""
-                SELECT filename, file_path FROM ticket_attachments
-                WHERE ticket_id = ?
-                ORDER BY uploaded_at ASC
-            """, (ticket_id,))
-            attachments = cursor.fetchall()
-
-            # Add attachments to ZIP with ticket folder structure
-            attachment_names = []
-            for filename, file_path in attachments:
-                if os.path.exists(file_path):
-                    arc_name = f"{ticket_number}/{filename}"
-                    zip_file.write(file_path, arc_name)
-                    attachment_names.append(filename)
-
-            all_attachments = " | ".join(attachment_names)
-
-            writer.writerow([
-                ticket[0],  # ticket_number
-                ticket[1],  # device_type
-                ticket[2],  # device_name
-                ticket[3],  # vendor_name
-                ticket[4],  # product_code
-                ticket[5],  # title
-                ticket[6],  # description
-                ticket[7],  # eds_reference
-                ticket[8],  # status
-                ticket[9],  # priority
-                ticket[10], # category
-                ticket[11], # created_at
-                ticket[12], # updated_at
-                ticket[13], # resolved_at
-                all_comments,
-                all_attachments
-            ])
-
-        # Add CSV to ZIP
-        csv_output.seek(0)
-        zip_file.writestr("tickets.csv", csv_output.getvalue())
+    # Write tickets with comments and attachments
+    for ticket in tickets:
+        ticket_id = ticket[14]
+        ticket_number = ticket[0]
+
+        # Get comments
+        cursor.execute("""
+            SELECT comment_text FROM ticket_comments
+            WHERE ticket_id = ?
+            ORDER BY created_at ASC
+        """, (ticket_id,))
+        comments = cursor.fetchall()
+        all_comments = " | ".join([c[0] for c in comments])
+
+        # Get attachments
+        cursor.execute("""
+            SELECT filename, file_path FROM ticket_attachments
+            WHERE ticket_id = ?
+            ORDER BY uploaded_at ASC
+        """, (ticket_id,))
+        attachments = cursor.fetchall()
+
+        # Add attachments to ZIP with ticket folder structure
+        attachment_names = []
+        for filename, file_path in attachments:
+            if os.path.exists(file_path):
+                attachment_entries.append((f"{ticket_number}/{filename}", file_path))
+                attachment_names.append(filename)
+
+        all_attachments = " | ".join(attachment_names)
+
+        writer.writerow([
+            ticket[0],  # ticket_number
+            ticket[1],  # device_type
+            ticket[2],  # device_name
+            ticket[3],  # vendor_name
+            ticket[4],  # product_code
+            ticket[5],  # title
+            ticket[6],  # description
+            ticket[7],  # eds_reference
+            ticket[8],  # status
+            ticket[9],  # priority
+            ticket[10], # category
+            ticket[11], # created_at
+            ticket[12], # updated_at
+            ticket[13], # resolved_at
+            all_comments,
+            all_attachments
+        ])
 
     conn.close()
 
-    # Return ZIP file
-    zip_buffer.seek(0)
+    archive.add("tickets.csv", csv_output.getvalue())
+    for arc_name, file_path in attachment_entries:
+        archive.add_file(arc_name, file_path)
+
     return StreamingResponse(
-        iter([zip_buffer.getvalue()]),
+        archive,
         media_type="application/zip",
-        headers={"Content-Disposition": "attachment; filename=tickets_with_attachments.zip"}
+        headers={"Content-Disposition": content_disposition("tickets_with_attachments.zip")}
     )
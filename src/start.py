@@ -68,7 +68,7 @@ class IODDManagerLauncher:
         if not db_path.exists():
             logger.info("Initializing database...")
             from src.greenstack import StorageManager
-            StorageManager()
+            StorageManager(str(db_path))
             logger.info("Database initialized successfully")
         
         return True
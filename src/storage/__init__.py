@@ -5,13 +5,17 @@ Modular storage system for device profiles with specialized savers.
 
 This module replaces the monolithic 483-line save_device() function with
 a clean orchestrator pattern using single-responsibility saver classes.
+
+Savers write through a storage backend (see backends.py): SQLite by
+default, or PostgreSQL when StorageManager is given a postgresql:// URL.
 """
 
 import logging
-import sqlite3
 import hashlib
 from typing import Optional
 
+from .backends import PostgresBackend, SQLiteBackend, StorageBackend, get_backend
+
 from .device import DeviceSaver
 from .iodd_file import IODDFileSaver
 from .parameter import ParameterSaver
@@ -42,9 +46,10 @@ class StorageManager:
         Initialize storage manager
 
         Args:
-            db_path: Path to SQLite database file
+            db_path: Path to SQLite database file, or a PostgreSQL URL
         """
         self.db_path = db_path
+        self.backend = get_backend(db_path)
 
     def save_device(self, profile) -> int:
         """
@@ -60,28 +65,28 @@ class StorageManager:
         Returns:
             int: Database ID of saved device (new or existing)
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self.backend.connect()
         cursor = conn.cursor()
 
         try:
             # Initialize all savers with shared cursor
-            device_saver = DeviceSaver(cursor)
-            iodd_file_saver = IODDFileSaver(cursor)
-            parameter_saver = ParameterSaver(cursor)
-            event_saver = EventSaver(cursor)
-            error_type_saver = ErrorTypeSaver(cursor)
-            process_data_saver = ProcessDataSaver(cursor)
-            document_saver = DocumentSaver(cursor)
-            features_saver = DeviceFeaturesSaver(cursor)
-            variants_saver = DeviceVariantsSaver(cursor)
-            communication_saver = CommunicationSaver(cursor)
-            wire_config_saver = WireConfigSaver(cursor)
-            menu_saver = MenuSaver(cursor)
-            text_saver = TextSaver(cursor)
-            custom_datatype_saver = CustomDatatypeSaver(cursor)
-            test_config_saver = TestConfigSaver(cursor)
-            std_variable_ref_saver = StdVariableRefSaver(cursor)
-            build_format_saver = BuildFormatSaver(cursor)
+            device_saver = DeviceSaver(cursor, self.backend)
+            iodd_file_saver = IODDFileSaver(cursor, self.backend)
+            parameter_saver = ParameterSaver(cursor, self.backend)
+            event_saver = EventSaver(cursor, self.backend)
+            error_type_saver = ErrorTypeSaver(cursor, self.backend)
+            process_data_saver = ProcessDataSaver(cursor, self.backend)
+            document_saver = DocumentSaver(cursor, self.backend)
+            features_saver = DeviceFeaturesSaver(cursor, self.backend)
+            variants_saver = DeviceVariantsSaver(cursor, self.backend)
+            communication_saver = CommunicationSaver(cursor, self.backend)
+            wire_config_saver = WireConfigSaver(cursor, self.backend)
+            menu_saver = MenuSaver(cursor, self.backend)
+            text_saver = TextSaver(cursor, self.backend)
+            custom_datatype_saver = CustomDatatypeSaver(cursor, self.backend)
+            test_config_saver = TestConfigSaver(cursor, self.backend)
+            std_variable_ref_saver = StdVariableRefSaver(cursor, self.backend)
+            build_format_saver = BuildFormatSaver(cursor, self.backend)
 
             # Save core device info (may return existing device ID)
             # The save method returns existing ID if device already exists
@@ -90,7 +95,8 @@ class StorageManager:
             # Check if this was an existing device (by checking if it returned early)
             # If device already existed, DeviceSaver.save() would have returned early
             # We can detect this by checking if the device was just created
-            cursor.execute(
+            self.backend.execute(
+                cursor,
                 "SELECT id FROM devices WHERE vendor_id = ? AND device_id = ? AND checksum = ?",
                 (profile.device_info.vendor_id, profile.device_info.device_id,
                  hashlib.sha256(profile.raw_xml.encode()).hexdigest())
@@ -140,6 +146,10 @@ class StorageManager:
 # Export main class and savers for external use
 __all__ = [
     'StorageManager',
+    'StorageBackend',
+    'SQLiteBackend',
+    'PostgresBackend',
+    'get_backend',
     'DeviceSaver',
     'IODDFileSaver',
     'ParameterSaver',
@@ -0,0 +1,254 @@
+"""
+Storage Backends
+
+The savers write through a backend, so the same saver code stores device
+profiles in SQLite or PostgreSQL:
+- SQLite: a sqlite3 connection to the database file (the default)
+- PostgreSQL: connections checked out of the pooled SQLAlchemy engine
+  (see src/db.py). Placeholders are translated, values are coerced to the
+  column types (SQLite's 0/1 flags into BOOLEAN columns), single-row
+  inserts return their id with RETURNING, and bulk inserts are streamed
+  with COPY, or sent with execute_values when they are small or the
+  VALUES list has SQL expressions
+
+``get_backend(db)`` picks the backend from a file path or database URL;
+Postgres backends (and their pools) are shared per URL.
+"""
+
+import io
+import logging
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bulk inserts below this many rows use execute_values instead of COPY
+COPY_MIN_ROWS = 50
+EXECUTE_VALUES_PAGE_SIZE = 1000
+
+_INSERT = re.compile(
+    r"^\s*INSERT\s+INTO\s+(\w+)\s*\(([^)]*)\)\s*VALUES\s*\((.*)\)\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+_INTEGER_TYPES = {"smallint", "integer", "bigint", "numeric", "real", "double precision"}
+_TEXT_TYPES = {"text", "character varying", "character"}
+
+
+def is_postgres_url(db: str) -> bool:
+    return db.startswith(("postgresql://", "postgresql+", "postgres://"))
+
+
+def psycopg2_url(database_url: str) -> str:
+    """Pin the psycopg2 driver (COPY goes through its copy_expert)"""
+    for prefix in ("postgresql://", "postgres://"):
+        if database_url.startswith(prefix):
+            return "postgresql+psycopg2://" + database_url[len(prefix):]
+    return database_url
+
+
+class StorageBackend:
+    """
+    Runs saver statements on a DB-API cursor with sqlite3 semantics
+    (``?`` placeholders, ``cursor.lastrowid``).
+    """
+
+    name = "sqlite"
+
+    def connect(self):
+        raise NotImplementedError
+
+    def execute(self, cursor, query: str, params: Sequence = ()) -> Optional[int]:
+        """Execute a statement; returns the id of the inserted row, if any"""
+        cursor.execute(query, params)
+        return cursor.lastrowid
+
+    def execute_many(self, cursor, query: str, params_list: List[Sequence]):
+        cursor.executemany(query, params_list)
+
+
+class SQLiteBackend(StorageBackend):
+    """sqlite3 connections to a database file"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def connect(self):
+        return sqlite3.connect(self.db_path)
+
+
+@lru_cache(maxsize=1024)
+def _translate(query: str) -> str:
+    """qmark placeholders to psycopg2's format style"""
+    return query.replace("%", "%%").replace("?", "%s")
+
+
+@lru_cache(maxsize=1024)
+def _parse_insert(query: str) -> Optional[Tuple[str, Tuple[str, ...], Tuple[str, ...]]]:
+    """(table, columns, value expressions) of an INSERT ... VALUES statement"""
+    match = _INSERT.match(query)
+    if not match:
+        return None
+    columns = tuple(column.strip().strip('"') for column in match.group(2).split(","))
+    values = tuple(value.strip() for value in match.group(3).split(","))
+    if len(columns) != len(values):
+        return None
+    return match.group(1), columns, values
+
+
+def _to_text(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).decode("utf-8", errors="replace")
+    return str(value)
+
+
+def _converter(data_type: str) -> Optional[Callable[[Any], Any]]:
+    """Coerce SQLite-style values for a Postgres column type (None: keep as is)"""
+    if data_type == "boolean":
+        return lambda value: value if value is None else bool(value)
+    if data_type in _INTEGER_TYPES:
+        return lambda value: int(value) if isinstance(value, bool) else value
+    if data_type in _TEXT_TYPES:
+        return _to_text
+    if data_type == "bytea":
+        return lambda value: value.encode("utf-8") if isinstance(value, str) else value
+    return None
+
+
+def copy_text(value: Any) -> str:
+    """A value in COPY's text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\\\x" + bytes(value).hex()
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def copy_rows(cursor, table: str, columns: Sequence[str], rows) -> int:
+    """Stream rows into table with COPY FROM STDIN; returns the row count"""
+    buffer = io.StringIO()
+    count = 0
+    for row in rows:
+        buffer.write("\t".join(map(copy_text, row)))
+        buffer.write("\n")
+        count += 1
+    buffer.seek(0)
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    cursor.copy_expert(f'COPY "{table}" ({column_list}) FROM STDIN', buffer)
+    return count
+
+
+class PostgresBackend(StorageBackend):
+    """Pooled PostgreSQL connections (psycopg2) for the savers"""
+
+    name = "postgresql"
+
+    def __init__(self, database_url: str, engine=None):
+        self.database_url = database_url
+        self._engine = engine
+        # table -> {column: data type}
+        self._columns: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    from src.db import create_db_engine
+                    self._engine = create_db_engine(psycopg2_url(self.database_url))
+        return self._engine
+
+    def connect(self):
+        """DB-API connection from the pool; close() returns it"""
+        return self.engine.raw_connection()
+
+    def column_types(self, cursor, table: str) -> Dict[str, str]:
+        columns = self._columns.get(table)
+        if columns is None:
+            cursor.execute(
+                "SELECT column_name, data_type FROM information_schema.columns"
+                " WHERE table_schema = current_schema() AND table_name = %s",
+                (table,)
+            )
+            columns = dict(cursor.fetchall())
+            self._columns[table] = columns
+        return columns
+
+    def _coerce(self, cursor, table: str, columns: Sequence[str], rows: List[Sequence]) -> List[Sequence]:
+        types = self.column_types(cursor, table)
+        converters = [_converter(types.get(column, "")) for column in columns]
+        if not any(converters):
+            return rows
+        return [
+            tuple(value if convert is None else convert(value) for convert, value in zip(converters, row))
+            for row in rows
+        ]
+
+    def execute(self, cursor, query: str, params: Sequence = ()) -> Optional[int]:
+        insert = _parse_insert(query)
+        if insert is None:
+            cursor.execute(_translate(query), params)
+            return None
+
+        table, columns, values = insert
+        if all(value == "?" for value in values):
+            (params,) = self._coerce(cursor, table, columns, [params])
+        if "id" in self.column_types(cursor, table):
+            cursor.execute(_translate(query) + " RETURNING id", params)
+            return cursor.fetchone()[0]
+        cursor.execute(_translate(query), params)
+        return None
+
+    def execute_many(self, cursor, query: str, params_list: List[Sequence]):
+        if not params_list:
+            return
+        insert = _parse_insert(query)
+        if insert is None:
+            cursor.executemany(_translate(query), params_list)
+            return
+
+        from psycopg2.extras import execute_values
+
+        table, columns, values = insert
+        if all(value == "?" for value in values):
+            rows = self._coerce(cursor, table, columns, params_list)
+            if len(rows) >= COPY_MIN_ROWS:
+                copy_rows(cursor, table, columns, rows)
+                return
+        else:
+            rows = params_list
+
+        column_list = ", ".join(columns)
+        template = "(" + ", ".join(_translate(value) for value in values) + ")"
+        execute_values(cursor, f"INSERT INTO {table} ({column_list}) VALUES %s", rows,
+                       template=template, page_size=EXECUTE_VALUES_PAGE_SIZE)
+
+
+_postgres_backends: Dict[str, PostgresBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(db: str) -> StorageBackend:
+    """Backend for a SQLite file path (or sqlite:/// URL) or a PostgreSQL URL"""
+    if is_postgres_url(db):
+        with _backends_lock:
+            backend = _postgres_backends.get(db)
+            if backend is None:
+                backend = _postgres_backends[db] = PostgresBackend(db)
+        return backend
+    if db.startswith("sqlite:///"):
+        db = db[len("sqlite:///"):]
+    return SQLiteBackend(db)
+
+
+# Used by savers constructed with only a cursor
+DEFAULT_BACKEND = StorageBackend()
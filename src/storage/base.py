@@ -9,6 +9,8 @@ from abc import ABC, abstractmethod
 from typing import Any, Optional
 import logging
 
+from .backends import DEFAULT_BACKEND, StorageBackend
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,14 +24,17 @@ class BaseSaver(ABC):
     - Transaction management helpers
     """
 
-    def __init__(self, cursor):
+    def __init__(self, cursor, backend: Optional[StorageBackend] = None):
         """
         Initialize saver with database cursor
 
         Args:
             cursor: Database cursor (sqlite3 or psycopg2)
+            backend: Backend the cursor belongs to (default: sqlite3 semantics)
         """
         self.cursor = cursor
+        self.backend = backend or DEFAULT_BACKEND
+        self._lastrowid = None
 
     @abstractmethod
     def save(self, device_id: int, data: Any) -> Optional[int]:
@@ -57,7 +62,7 @@ class BaseSaver(ABC):
             Exception: If database error occurs
         """
         try:
-            self.cursor.execute(query, params)
+            self._lastrowid = self.backend.execute(self.cursor, query, params)
         except Exception as e:
             logger.error(f"Database error in {self.__class__.__name__}: {e}")
             logger.error(f"Query: {query}")
@@ -76,7 +81,7 @@ class BaseSaver(ABC):
             Exception: If database error occurs
         """
         try:
-            self.cursor.executemany(query, params_list)
+            self.backend.execute_many(self.cursor, query, params_list)
         except Exception as e:
             logger.error(f"Database error in {self.__class__.__name__}: {e}")
             logger.error(f"Query: {query}")
@@ -93,7 +98,7 @@ class BaseSaver(ABC):
 
     def _get_lastrowid(self):
         """Get the last inserted row ID"""
-        return self.cursor.lastrowid
+        return self._lastrowid
 
     def _delete_existing(self, table: str, device_id: int):
         """
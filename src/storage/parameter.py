@@ -34,10 +34,11 @@ class ParameterSaver(BaseSaver):
         params_with_record_items = []
 
         for param in parameters:
-            # Serialize enumeration values as JSON
+            # Serialize enumeration values as compact JSON; the API embeds
+            # the stored text as-is (see src/utils/fast_json.raw_json)
             enum_json = None
             if hasattr(param, 'enumeration_values') and param.enumeration_values:
-                enum_json = json.dumps(param.enumeration_values)
+                enum_json = json.dumps(param.enumeration_values, ensure_ascii=False, separators=(',', ':'))
 
             # Insert parameter one at a time to get the ID for record_items
             query = """
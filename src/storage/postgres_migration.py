@@ -0,0 +1,296 @@
+"""
+SQLite to PostgreSQL Migration
+
+Moves an existing GreenStack database to PostgreSQL for the Postgres
+storage backend:
+- The schema is reflected from the SQLite file, so it matches whatever
+  migrations and runtime columns the file has. Types are mapped to their
+  Postgres equivalents (integers to BIGINT, flags declared BOOLEAN to
+  BOOLEAN, BLOB to BYTEA, untyped columns to TEXT) and non-portable
+  defaults are dropped
+- Rows are streamed per table in batches with COPY; indexes are built
+  after the load
+- Foreign keys are added after the data as NOT VALID and then validated;
+  ones that fail validation (orphaned rows, which SQLite does not reject)
+  are kept unvalidated and reported. They still apply to new rows
+- Serial sequences are moved past the copied ids
+
+Used by scripts/migrate_sqlite_to_postgres.py. create_postgres_schema()
+creates the schema in an empty database the same way, reflected from a
+SQLite template built from the migrations (see schema.py); it is run by
+greenstack.StorageManager for postgresql:// URLs.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import (
+    BigInteger, Boolean, Date, DateTime, Float, Integer, LargeBinary, MetaData, Numeric, Text, create_engine, inspect,
+    text
+)
+from sqlalchemy.schema import DefaultClause, ForeignKeyConstraint
+
+from .backends import PostgresBackend, copy_rows, psycopg2_url
+from .schema import build_sqlite_schema
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 10000
+
+_PORTABLE_DEFAULT = re.compile(
+    r"^\s*(CURRENT_TIMESTAMP|CURRENT_DATE|NULL|TRUE|FALSE|-?\d+(\.\d+)?|'[^']*')\s*$", re.IGNORECASE
+)
+
+
+def _postgres_type(column):
+    """Postgres type for a reflected SQLite column"""
+    for sqlite_type, postgres_type in (
+        (Boolean, Boolean), (Integer, BigInteger), (Float, Float), (Numeric, Numeric),
+        (DateTime, DateTime), (Date, Date), (LargeBinary, LargeBinary),
+    ):
+        if isinstance(column.type, sqlite_type):
+            return postgres_type()
+    return Text()
+
+
+def _portable_default(column) -> Optional[DefaultClause]:
+    default = column.server_default
+    if default is None:
+        return None
+    value = str(getattr(default, "arg", default))
+    if not _PORTABLE_DEFAULT.match(value):
+        logger.warning(f"Dropping non-portable default {value!r} of {column.table.name}.{column.name}")
+        return None
+    if isinstance(column.type, Boolean) and value.strip() in ("0", "1"):
+        value = "true" if value.strip() == "1" else "false"
+    return DefaultClause(text(value))
+
+
+def postgres_metadata(sqlite_path: str, tables: Optional[List[str]] = None):
+    """
+    Reflect the SQLite schema as Postgres-ready metadata.
+
+    Returns:
+        (metadata, indexes, foreign_keys): tables without indexes or
+        foreign keys, and the indexes and foreign keys to add once the
+        data is in
+    """
+    source = MetaData()
+    engine = create_engine(f"sqlite:///{sqlite_path}")
+    try:
+        source.reflect(engine, only=tables)
+    finally:
+        engine.dispose()
+
+    target = MetaData()
+    indexes = []
+    foreign_keys = []
+    for table in source.sorted_tables:
+        if table.name.startswith("sqlite_"):  # sqlite_sequence, sqlite_stat1
+            continue
+        copy = table.to_metadata(target)
+        for column in copy.columns:
+            column.type = _postgres_type(column)
+            column.server_default = _portable_default(column)
+        primary_key = list(copy.primary_key.columns)
+        if len(primary_key) == 1 and isinstance(primary_key[0].type, BigInteger):
+            primary_key[0].autoincrement = True
+
+        for constraint in list(copy.foreign_key_constraints):
+            copy.constraints.discard(constraint)
+            for column in constraint.columns:
+                column.foreign_keys.clear()
+            referred = constraint.elements[0].column.table.name if constraint.elements else None
+            if referred not in source.tables:
+                logger.warning(f"Skipping foreign key of {table.name} to missing table {referred}")
+                continue
+            foreign_keys.append(constraint)
+
+        for index in list(copy.indexes):
+            copy.indexes.discard(index)
+            # Partial indexes keep their WHERE clause
+            where = index.dialect_options["sqlite"]._non_defaults.get("where")
+            if where is not None:
+                index.dialect_options["postgresql"]["where"] = where
+            indexes.append(index)
+
+    return target, indexes, foreign_keys
+
+
+def _create_indexes(connection, indexes) -> List[str]:
+    """Build the indexes; returns the ones Postgres rejected"""
+    skipped = []
+    for index in indexes:
+        savepoint = connection.begin_nested()
+        try:
+            index.create(connection)
+            savepoint.commit()
+        except Exception as e:
+            # e.g. a partial index WHERE clause written for SQLite
+            savepoint.rollback()
+            logger.warning(f"Skipping index {index.name} on {index.table.name}: {getattr(e, 'orig', e)}")
+            skipped.append(index.name)
+    return skipped
+
+
+def _add_foreign_keys(connection, foreign_keys: List[ForeignKeyConstraint]) -> List[str]:
+    """Add foreign keys NOT VALID, then validate; returns the ones left unvalidated"""
+    unvalidated = []
+    for number, constraint in enumerate(foreign_keys):
+        table = constraint.parent.name
+        columns = ", ".join(f'"{column.name}"' for column in constraint.columns)
+        referred_table = constraint.elements[0].column.table.name
+        referred = ", ".join(f'"{element.column.name}"' for element in constraint.elements)
+        name = constraint.name or f"fk_{table}_{number}"
+        on_delete = f" ON DELETE {constraint.ondelete}" if constraint.ondelete else ""
+        description = f"{table}({columns}) -> {referred_table}({referred})"
+
+        savepoint = connection.begin_nested()
+        try:
+            connection.execute(text(
+                f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" FOREIGN KEY ({columns})'
+                f' REFERENCES "{referred_table}" ({referred}){on_delete} NOT VALID'
+            ))
+            savepoint.commit()
+        except Exception as e:
+            # e.g. the referenced columns are not unique, which SQLite allows
+            savepoint.rollback()
+            logger.warning(f"Skipping foreign key {description}: {getattr(e, 'orig', e)}")
+            unvalidated.append(f"{description} (not created)")
+            continue
+
+        savepoint = connection.begin_nested()
+        try:
+            connection.execute(text(f'ALTER TABLE "{table}" VALIDATE CONSTRAINT "{name}"'))
+            savepoint.commit()
+        except Exception:
+            savepoint.rollback()
+            logger.warning(f"Foreign key {description} has orphaned rows; left NOT VALID")
+            unvalidated.append(description)
+    return unvalidated
+
+
+def _reset_sequences(cursor, metadata: MetaData):
+    for table in metadata.sorted_tables:
+        primary_key = list(table.primary_key.columns)
+        if len(primary_key) != 1 or not isinstance(primary_key[0].type, BigInteger):
+            continue
+        column = primary_key[0].name
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, %s), COALESCE(MAX(\"{column}\"), 0) + 1, false)"
+            f' FROM "{table.name}"',
+            (f'"{table.name}"', column)
+        )
+
+
+def migrate_sqlite_to_postgres(
+    sqlite_path: str,
+    database_url: str,
+    batch_size: int = BATCH_SIZE,
+    drop_existing: bool = False,
+    tables: Optional[List[str]] = None,
+    progress: Optional[Callable[[str, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Copy schema and data of a SQLite database into PostgreSQL, in one transaction.
+
+    Args:
+        sqlite_path: Source database file
+        database_url: Target PostgreSQL URL
+        batch_size: Rows per COPY
+        drop_existing: Drop the target tables first (otherwise they must not exist)
+        tables: Only these tables (default: all)
+        progress: Called with (table, rows copied so far) after each batch
+
+    Returns:
+        dict: Rows per table, indexes and foreign keys added, and the
+        ones skipped or left unvalidated
+    """
+    start = time.perf_counter()
+    metadata, indexes, foreign_keys = postgres_metadata(sqlite_path, tables)
+
+    engine = create_engine(psycopg2_url(database_url))
+    backend = PostgresBackend(database_url, engine=engine)
+    source = sqlite3.connect(sqlite_path)
+    counts: Dict[str, int] = {}
+    try:
+        with engine.begin() as connection:
+            if drop_existing:
+                for table in reversed(metadata.sorted_tables):
+                    connection.execute(text(f'DROP TABLE IF EXISTS "{table.name}" CASCADE'))
+            metadata.create_all(connection)
+
+            cursor = connection.connection.cursor()
+            for table in metadata.sorted_tables:
+                columns = [column.name for column in table.columns]
+                column_list = ", ".join(f'"{column}"' for column in columns)
+                rows = source.execute(f'SELECT {column_list} FROM "{table.name}"')
+                counts[table.name] = 0
+                while True:
+                    batch = rows.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    batch = backend._coerce(cursor, table.name, columns, [_text_safe(row) for row in batch])
+                    counts[table.name] += copy_rows(cursor, table.name, columns, batch)
+                    if progress:
+                        progress(table.name, counts[table.name])
+                logger.info(f"Copied {counts[table.name]} rows into {table.name}")
+
+            _reset_sequences(cursor, metadata)
+            skipped_indexes = _create_indexes(connection, indexes)
+            unvalidated = _add_foreign_keys(connection, foreign_keys)
+    finally:
+        source.close()
+        engine.dispose()
+
+    return {
+        "tables": counts,
+        "rows": sum(counts.values()),
+        "indexes": len(indexes) - len(skipped_indexes),
+        "skipped_indexes": skipped_indexes,
+        "foreign_keys": len(foreign_keys),
+        "unvalidated_foreign_keys": unvalidated,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def create_postgres_schema(database_url: str) -> List[str]:
+    """
+    Create the GreenStack tables missing from a PostgreSQL database, with
+    their indexes and foreign keys. Existing tables are left as they are.
+
+    Returns:
+        list: Names of the tables created
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        template = os.path.join(directory, "schema.db")
+        build_sqlite_schema(template)
+        metadata, indexes, foreign_keys = postgres_metadata(template)
+
+    engine = create_engine(psycopg2_url(database_url))
+    try:
+        with engine.begin() as connection:
+            existing = set(inspect(connection).get_table_names())
+            missing = [table for table in metadata.sorted_tables if table.name not in existing]
+            if not missing:
+                return []
+            created = {table.name for table in missing}
+            metadata.create_all(connection, tables=missing)
+            _create_indexes(connection, [index for index in indexes if index.table.name in created])
+            _add_foreign_keys(connection, [fk for fk in foreign_keys if fk.parent.name in created])
+    finally:
+        engine.dispose()
+
+    logger.info(f"Created {len(created)} tables in PostgreSQL")
+    return sorted(created)
+
+
+def _text_safe(row) -> tuple:
+    """Postgres text cannot hold NUL characters, which SQLite TEXT can"""
+    return tuple(value.replace("\x00", "") if isinstance(value, str) and "\x00" in value else value
+                 for value in row)
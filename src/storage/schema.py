@@ -0,0 +1,60 @@
+"""
+GreenStack Schema
+
+The schema the savers write to: the tables greenstack.StorageManager
+creates, brought to the alembic head. Deployed databases grew through both,
+and the migrations assume the StorageManager tables and re-create some of
+them, so migrations are applied with CREATE and ADD COLUMN statements for
+objects that already exist skipped.
+
+Used to build a SQLite template of the schema (e.g. to create it in
+PostgreSQL, see postgres_migration.create_postgres_schema).
+"""
+
+import re
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+_CREATE = re.compile(r'^\s*CREATE\s+(UNIQUE\s+)?(TABLE|INDEX)\s+(?!IF\s+NOT\s+EXISTS)', re.I)
+_ADD_COLUMN = re.compile(r'^\s*ALTER\s+TABLE\s+"?(\w+)"?\s+ADD\s+(?:COLUMN\s+)?"?(\w+)"?', re.I)
+
+
+def upgrade_sqlite(path: str) -> None:
+    """Apply every alembic migration to a StorageManager database"""
+    import sqlalchemy
+    from alembic.config import Config
+    from alembic.operations import Operations
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    engine = sqlalchemy.create_engine(f"sqlite:///{path}")
+
+    @sqlalchemy.event.listens_for(engine, "before_cursor_execute", retval=True)
+    def skip_existing(conn, cursor, statement, parameters, context, executemany):
+        statement = _CREATE.sub(lambda m: f"CREATE {m.group(1) or ''}{m.group(2)} IF NOT EXISTS ",
+                                statement, count=1)
+        add = _ADD_COLUMN.match(statement)
+        if add and add.group(2) in {row[1] for row in cursor.execute(f'PRAGMA table_info("{add.group(1)}")')}:
+            return "SELECT 1", ()
+        return statement, parameters
+
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    try:
+        # Oldest first; some migrations commit on their own, so each gets its own connection
+        for revision in reversed(list(ScriptDirectory.from_config(config).walk_revisions())):
+            with engine.connect() as conn:
+                with Operations.context(MigrationContext.configure(conn)):
+                    revision.module.upgrade()
+                conn.commit()
+    finally:
+        engine.dispose()
+
+
+def build_sqlite_schema(path: str) -> None:
+    """Create the complete schema in a SQLite database file"""
+    from src.greenstack import StorageManager
+
+    StorageManager(str(path))
+    upgrade_sqlite(str(path))
@@ -53,7 +53,7 @@ class StdVariableRefSaver(BaseSaver):
                  excluded_from_data_storage, order_index)
                 VALUES (?, ?, ?, ?, ?, ?)
             """
-            self.cursor.execute(query, (
+            self._execute(query, (
                 device_id,
                 ref.variable_id,
                 ref.default_value,
@@ -63,7 +63,7 @@ class StdVariableRefSaver(BaseSaver):
             ))
 
             # Get the inserted ID
-            std_var_ref_id = self.cursor.lastrowid
+            std_var_ref_id = self._get_lastrowid()
 
             # Insert SingleValue children if any
             if hasattr(ref, 'single_values') and ref.single_values:
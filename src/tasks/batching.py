@@ -0,0 +1,176 @@
+"""
+Chunked batch workflows for Celery tasks.
+
+Batch tasks fan out as a chord instead of waiting on subtasks one by one
+(``result.get()`` inside a task serializes the batch and can deadlock the
+pool):
+- Items are split into chunks; each chunk is one task in a group, so
+  throughput scales with the number of workers
+- Each chunk processes its items in-process with per-item retries and
+  records failures instead of raising, so one bad item never fails the chord
+- Chunks publish PROGRESS state in their task meta; ``batch_progress``
+  aggregates it for the whole batch
+- A chord callback merges the chunk results into one summary
+"""
+
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from celery import Task, chord, group
+from celery.result import GroupResult
+
+from src.celery_app import celery_app, send_to_dlq
+
+logger = logging.getLogger(__name__)
+
+BATCH_CHUNK_SIZE = int(os.getenv("CELERY_BATCH_CHUNK_SIZE", "10"))
+ITEM_MAX_RETRIES = int(os.getenv("CELERY_BATCH_ITEM_RETRIES", "2"))
+ITEM_RETRY_BACKOFF = 2  # seconds, doubled per attempt
+
+
+class BatchChunkTask(Task):
+    """
+    Base class for chunk tasks.
+
+    No autoretry: retrying a whole chunk would redo items that already
+    succeeded, so retries happen per item inside ``run_chunk``.
+    """
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        """Handle task failure by sending to dead letter queue."""
+        logger.error(f"Task {self.name} failed: {exc}")
+        send_to_dlq(task_id, self.name, args, kwargs, exc)
+
+
+def chunked(items: List[Any], size: int) -> List[List[Any]]:
+    """Split items into consecutive chunks of at most ``size``"""
+    size = max(1, size)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def run_chunk(
+    task: Task,
+    items: Iterable[Any],
+    process: Callable[[Any], Dict[str, Any]],
+    item_key: str,
+    max_retries: int = ITEM_MAX_RETRIES,
+    backoff: float = ITEM_RETRY_BACKOFF,
+) -> Dict[str, Any]:
+    """
+    Process a chunk of items with per-item retries.
+
+    Args:
+        task: The running chunk task (for PROGRESS updates)
+        items: Items of this chunk
+        process: Handles one item and returns its success entry
+        item_key: Key identifying the item in failure entries
+        max_retries: Retries per item after the first attempt
+        backoff: Initial delay between attempts, doubled each retry
+
+    Returns:
+        dict: {"total", "successful": [...], "failed": [...]}
+    """
+    items = list(items)
+    results = {"total": len(items), "successful": [], "failed": []}
+
+    for done, item in enumerate(items, start=1):
+        for attempt in range(max_retries + 1):
+            try:
+                results["successful"].append(process(item))
+                break
+            except Exception as e:
+                if attempt < max_retries:
+                    delay = backoff * (2 ** attempt)
+                    logger.warning(f"{task.name}: {item_key}={item} failed ({e}), retrying in {delay}s")
+                    time.sleep(delay)
+                    continue
+                logger.error(f"{task.name}: {item_key}={item} failed after {attempt + 1} attempts: {e}")
+                results["failed"].append({item_key: item, "error": str(e), "attempts": attempt + 1})
+
+        task.update_state(state="PROGRESS", meta={
+            "total": len(items),
+            "done": done,
+            "successful": len(results["successful"]),
+            "failed": len(results["failed"]),
+        })
+
+    return results
+
+
+def merge_chunk_results(chunk_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge chunk summaries: totals are summed, lists concatenated"""
+    merged: Dict[str, Any] = {"total": 0, "successful": [], "failed": []}
+    for chunk in chunk_results:
+        for key, value in chunk.items():
+            if isinstance(value, list):
+                merged.setdefault(key, []).extend(value)
+            elif key == "total":
+                merged["total"] += value
+    return merged
+
+
+@celery_app.task(name="src.tasks.batching.aggregate_batch_results")
+def aggregate_batch_results(chunk_results: List[Dict[str, Any]], batch_name: str = "batch") -> Dict[str, Any]:
+    """Chord callback: one summary for the whole batch"""
+    results = merge_chunk_results(chunk_results)
+    logger.info(
+        f"{batch_name} complete: {len(results['successful'])} successful, {len(results['failed'])} failed"
+    )
+    return results
+
+
+def start_batch(
+    task: Task,
+    items: List[Any],
+    chunk_task: Task,
+    chunk_kwargs: Optional[Dict[str, Any]] = None,
+    chunk_size: int = BATCH_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """
+    Launch ``chunk_task`` over chunks of ``items`` as a chord.
+
+    Returns immediately; the returned IDs locate the running batch:
+    ``group_id`` for progress (``batch_progress``), ``callback_id`` for the
+    merged result.
+    """
+    chunks = chunked(items, chunk_size)
+    header = group(chunk_task.s(chunk, **(chunk_kwargs or {})) for chunk in chunks)
+    callback = aggregate_batch_results.s(batch_name=task.name)
+    result = chord(header)(callback)
+
+    # Saved so batch_progress can restore the group from its ID
+    result.parent.save()
+
+    batch = {
+        "total": len(items),
+        "chunks": len(chunks),
+        "chunk_size": chunk_size,
+        "group_id": result.parent.id,
+        "callback_id": result.id,
+    }
+    logger.info(f"{task.name}: dispatched {len(items)} items in {len(chunks)} chunks")
+    return batch
+
+
+def batch_progress(group_id: str) -> Dict[str, Any]:
+    """Aggregate the PROGRESS meta of a batch's chunk tasks"""
+    group_result = GroupResult.restore(group_id, app=celery_app)
+    if group_result is None:
+        return {"group_id": group_id, "found": False}
+
+    progress = {"group_id": group_id, "found": True, "chunks": len(group_result.results),
+                "chunks_done": 0, "total": 0, "done": 0, "successful": 0, "failed": 0}
+    for chunk in group_result.results:
+        if chunk.state == "PROGRESS" and isinstance(chunk.info, dict):
+            for key in ("total", "done", "successful", "failed"):
+                progress[key] += chunk.info.get(key, 0)
+        elif chunk.successful():
+            summary = chunk.result
+            progress["chunks_done"] += 1
+            progress["total"] += summary["total"]
+            progress["done"] += summary["total"]
+            progress["successful"] += len(summary["successful"])
+            progress["failed"] += len(summary["failed"])
+    return progress
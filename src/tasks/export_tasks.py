@@ -14,6 +14,7 @@ import os
 from typing import Dict, Any, Optional, List
 from celery import Task
 from src.celery_app import celery_app, send_to_dlq
+from src.tasks.batching import BATCH_CHUNK_SIZE, BatchChunkTask, run_chunk, start_batch
 from src.storage.storage_manager import StorageManager
 
 logger = logging.getLogger(__name__)
@@ -169,6 +170,35 @@ def export_device_config(
         raise
 
 
+@celery_app.task(
+    base=BatchChunkTask,
+    name="src.tasks.export_tasks.export_devices_chunk",
+    bind=True,
+    soft_time_limit=600,
+    time_limit=1200
+)
+def export_devices_chunk(self, device_ids: List[int], format: str = "json") -> Dict[str, Any]:
+    """
+    Export one chunk of a batch (see batch_export_devices).
+
+    Args:
+        self: Celery task instance
+        device_ids: Device database IDs of this chunk
+        format: Export format (json, csv, xml)
+
+    Returns:
+        dict: Chunk summary with successful and failed exports
+    """
+    def export(device_id: int) -> Dict[str, Any]:
+        export_info = export_device_config(device_id, format)
+        return {
+            "device_id": device_id,
+            "file_path": export_info["file_path"],
+        }
+
+    return run_chunk(self, device_ids, export, item_key="device_id")
+
+
 @celery_app.task(
     base=ExportTask,
     name="src.tasks.export_tasks.batch_export_devices",
@@ -180,19 +210,25 @@ def batch_export_devices(
     self,
     device_ids: List[int],
     format: str = "json",
-    combine: bool = False
+    combine: bool = False,
+    chunk_size: int = BATCH_CHUNK_SIZE
 ) -> Dict[str, Any]:
     """
     Export multiple devices in batch.
 
+    Separate exports run as chunks in parallel across workers; the merged
+    summary becomes the result of the chord callback.
+
     Args:
         self: Celery task instance
         device_ids: List of device database IDs
         format: Export format (json, csv, xml)
         combine: Whether to combine all exports into a single file
+        chunk_size: Devices per chunk task (separate exports only)
 
     Returns:
-        dict: Batch export results
+        dict: Combined export results, or batch info with group_id
+        (progress) and callback_id (merged results)
     """
     logger.info(f"Batch exporting {len(device_ids)} devices in {format} format")
 
@@ -232,21 +268,9 @@ def batch_export_devices(
         results["combined_file"] = combined_file
 
     else:
-        # Export each device separately
-        for device_id in device_ids:
-            try:
-                result = export_device_config.delay(device_id, format)
-                export_info = result.get(timeout=180)
-                results["successful"].append({
-                    "device_id": device_id,
-                    "file_path": export_info["file_path"],
-                })
-            except Exception as e:
-                logger.error(f"Failed to export device {device_id}: {e}")
-                results["failed"].append({
-                    "device_id": device_id,
-                    "error": str(e),
-                })
+        # Export each device separately, in parallel chunks
+        return start_batch(self, device_ids, export_devices_chunk, chunk_kwargs={"format": format},
+                           chunk_size=chunk_size)
 
     logger.info(f"Batch export complete: {len(results['successful'])} successful, {len(results['failed'])} failed")
 
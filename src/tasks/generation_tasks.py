@@ -13,6 +13,7 @@ import os
 from typing import Dict, Any, Optional
 from celery import Task
 from src.celery_app import celery_app, send_to_dlq
+from src.tasks.batching import BATCH_CHUNK_SIZE, BatchChunkTask, run_chunk, start_batch
 from src.storage.storage_manager import StorageManager
 from src.generation.nodered_flows import NodeREDFlowGenerator
 
@@ -102,63 +103,86 @@ def generate_nodered_flow(
 
 
 @celery_app.task(
-    base=GenerationTask,
-    name="src.tasks.generation_tasks.batch_generate_flows",
+    base=BatchChunkTask,
+    name="src.tasks.generation_tasks.generate_flows_chunk",
     bind=True,
     soft_time_limit=600,
     time_limit=1200
 )
-def batch_generate_flows(
+def generate_flows_chunk(
     self,
     device_ids: list[int],
     flow_type: str = "monitoring",
     mqtt_config: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
-    Generate Node-RED flows for multiple devices in batch.
+    Generate the flows of one chunk of a batch (see batch_generate_flows).
 
     Args:
         self: Celery task instance
-        device_ids: List of device database IDs
+        device_ids: Device database IDs of this chunk
         flow_type: Type of flow to generate
         mqtt_config: Optional MQTT broker configuration
 
     Returns:
-        dict: Batch generation results
+        dict: Chunk summary including the chunk's combined flow nodes
     """
-    logger.info(f"Batch generating {flow_type} flows for {len(device_ids)} devices")
+    combined_flow = []
 
-    results = {
-        "total": len(device_ids),
-        "successful": [],
-        "failed": [],
-        "combined_flow": [],
-    }
+    def generate(device_id: int) -> Dict[str, Any]:
+        flow_info = generate_nodered_flow(device_id, flow_type, mqtt_config)
+        # Add nodes to combined flow
+        combined_flow.extend(flow_info["flow"])
+        return {
+            "device_id": device_id,
+            "device_name": flow_info["device_name"],
+            "node_count": flow_info["node_count"],
+        }
 
-    for device_id in device_ids:
-        try:
-            result = generate_nodered_flow.delay(device_id, flow_type, mqtt_config)
-            flow_info = result.get(timeout=180)
+    results = run_chunk(self, device_ids, generate, item_key="device_id")
+    results["combined_flow"] = combined_flow
+    return results
 
-            results["successful"].append({
-                "device_id": device_id,
-                "device_name": flow_info["device_name"],
-                "node_count": flow_info["node_count"],
-            })
 
-            # Add nodes to combined flow
-            results["combined_flow"].extend(flow_info["flow"])
+@celery_app.task(
+    base=GenerationTask,
+    name="src.tasks.generation_tasks.batch_generate_flows",
+    bind=True,
+    soft_time_limit=60,
+    time_limit=120
+)
+def batch_generate_flows(
+    self,
+    device_ids: list[int],
+    flow_type: str = "monitoring",
+    mqtt_config: Optional[Dict[str, Any]] = None,
+    chunk_size: int = BATCH_CHUNK_SIZE
+) -> Dict[str, Any]:
+    """
+    Generate Node-RED flows for multiple devices in batch.
 
-        except Exception as e:
-            logger.error(f"Failed to generate flow for device {device_id}: {e}")
-            results["failed"].append({
-                "device_id": device_id,
-                "error": str(e),
-            })
+    Devices are processed in chunks running in parallel across workers;
+    the merged summary (with the combined flow) becomes the result of the
+    chord callback.
 
-    logger.info(f"Batch generation complete: {len(results['successful'])} successful, {len(results['failed'])} failed")
+    Args:
+        self: Celery task instance
+        device_ids: List of device database IDs
+        flow_type: Type of flow to generate
+        mqtt_config: Optional MQTT broker configuration
+        chunk_size: Devices per chunk task
 
-    return results
+    Returns:
+        dict: Batch info with group_id (progress) and callback_id (merged results)
+    """
+    logger.info(f"Batch generating {flow_type} flows for {len(device_ids)} devices")
+    return start_batch(
+        self,
+        device_ids,
+        generate_flows_chunk,
+        chunk_kwargs={"flow_type": flow_type, "mqtt_config": mqtt_config},
+        chunk_size=chunk_size,
+    )
 
 
 @celery_app.task(
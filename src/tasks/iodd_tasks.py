@@ -11,6 +11,7 @@ import logging
 from typing import Dict, Any, Optional
 from celery import Task
 from src.celery_app import celery_app, send_to_dlq
+from src.tasks.batching import BATCH_CHUNK_SIZE, BatchChunkTask, run_chunk, start_batch
 from src.parsing.iodd_parser import IODDParser
 from src.storage.storage_manager import StorageManager
 
@@ -89,51 +90,58 @@ def parse_iodd_file(self, file_path: str, storage_path: Optional[str] = None) ->
 
 
 @celery_app.task(
-    base=IODDTask,
-    name="src.tasks.iodd_tasks.batch_parse_iodd_files",
+    base=BatchChunkTask,
+    name="src.tasks.iodd_tasks.parse_iodd_chunk",
     bind=True,
     soft_time_limit=600,
     time_limit=1200
 )
-def batch_parse_iodd_files(self, file_paths: list[str]) -> Dict[str, Any]:
+def parse_iodd_chunk(self, file_paths: list[str]) -> Dict[str, Any]:
+    """
+    Parse one chunk of a batch (see batch_parse_iodd_files).
+
+    Args:
+        self: Celery task instance
+        file_paths: Paths of this chunk
+
+    Returns:
+        dict: Chunk summary with successful and failed files
+    """
+    def parse(file_path: str) -> Dict[str, Any]:
+        device_info = parse_iodd_file(file_path)
+        return {
+            "file_path": file_path,
+            "device_id": device_info["device_id"],
+            "product_name": device_info["product_name"],
+        }
+
+    return run_chunk(self, file_paths, parse, item_key="file_path")
+
+
+@celery_app.task(
+    base=IODDTask,
+    name="src.tasks.iodd_tasks.batch_parse_iodd_files",
+    bind=True,
+    soft_time_limit=60,
+    time_limit=120
+)
+def batch_parse_iodd_files(self, file_paths: list[str], chunk_size: int = BATCH_CHUNK_SIZE) -> Dict[str, Any]:
     """
     Parse multiple IODD files in batch.
 
+    Files are parsed in chunks running in parallel across workers; the
+    merged summary becomes the result of the chord callback.
+
     Args:
         self: Celery task instance
         file_paths: List of paths to IODD files
+        chunk_size: Files per chunk task
 
     Returns:
-        dict: Summary of batch processing results
+        dict: Batch info with group_id (progress) and callback_id (merged results)
     """
     logger.info(f"Batch parsing {len(file_paths)} IODD files")
-
-    results = {
-        "total": len(file_paths),
-        "successful": [],
-        "failed": [],
-    }
-
-    for file_path in file_paths:
-        try:
-            result = parse_iodd_file.delay(file_path)
-            # Wait for result (with timeout)
-            device_info = result.get(timeout=300)
-            results["successful"].append({
-                "file_path": file_path,
-                "device_id": device_info["device_id"],
-                "product_name": device_info["product_name"],
-            })
-        except Exception as e:
-            logger.error(f"Failed to parse {file_path}: {e}")
-            results["failed"].append({
-                "file_path": file_path,
-                "error": str(e),
-            })
-
-    logger.info(f"Batch processing complete: {len(results['successful'])} successful, {len(results['failed'])} failed")
-
-    return results
+    return start_batch(self, file_paths, parse_iodd_chunk, chunk_size=chunk_size)
 
 
 @celery_app.task(
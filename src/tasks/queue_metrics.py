@@ -0,0 +1,89 @@
+"""
+Prometheus metrics for Celery queues.
+
+Collected from the Redis broker at scrape time, so the API process can
+export them without touching the workers:
+- celery_queue_length: messages waiting per queue
+- celery_queue_oldest_message_age_seconds: how long the next message of a
+  queue has been waiting (queue latency), from the ``published_at`` header
+  stamped at publish time
+"""
+
+import json
+import logging
+import time
+from typing import Iterable, List, Optional
+
+from prometheus_client.core import GaugeMetricFamily
+
+from src.celery_app import ALL_QUEUES, celery_app
+
+logger = logging.getLogger(__name__)
+
+# Separator kombu's Redis transport puts between a queue name and its priority step
+PRIORITY_SEP = "\x06\x16"
+
+
+def priority_keys(queue: str, steps: Iterable[int]) -> List[str]:
+    """Redis list keys holding a queue's messages, one per priority step"""
+    return [queue if step == 0 else f"{queue}{PRIORITY_SEP}{step}" for step in steps]
+
+
+def _published_at(raw: Optional[bytes]) -> Optional[float]:
+    if not raw:
+        return None
+    try:
+        return float(json.loads(raw)["headers"]["published_at"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class CeleryQueueCollector:
+    """Custom collector reading queue depth and latency from Redis"""
+
+    def __init__(self, redis_client, queues: Iterable[str] = ALL_QUEUES):
+        self.redis = redis_client
+        self.queues = tuple(queues)
+        self.steps = celery_app.conf.broker_transport_options.get("priority_steps", [0, 3, 6, 9])
+
+    @staticmethod
+    def _families():
+        length = GaugeMetricFamily(
+            'celery_queue_length', 'Messages waiting in a Celery queue', labels=['queue']
+        )
+        age = GaugeMetricFamily(
+            'celery_queue_oldest_message_age_seconds',
+            'Time the oldest waiting message of a Celery queue has been queued',
+            labels=['queue']
+        )
+        return length, age
+
+    def describe(self):
+        # Lets the registry check metric names without querying Redis
+        return list(self._families())
+
+    def collect(self):
+        length, age = self._families()
+
+        try:
+            pipe = self.redis.pipeline()
+            for queue in self.queues:
+                for key in priority_keys(queue, self.steps):
+                    pipe.llen(key)
+                    # Messages are pushed left and consumed right: the tail is the oldest
+                    pipe.lindex(key, -1)
+            replies = pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not read Celery queue metrics: {e}")
+            return
+
+        now = time.time()
+        per_queue = len(self.steps) * 2
+        for i, queue in enumerate(self.queues):
+            chunk = replies[i * per_queue:(i + 1) * per_queue]
+            length.add_metric([queue], sum(chunk[0::2]))
+            published = [ts for ts in map(_published_at, chunk[1::2]) if ts is not None]
+            age.add_metric([queue], max(0.0, now - min(published)) if published else 0.0)
+
+        yield length
+        yield age
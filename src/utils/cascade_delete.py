@@ -0,0 +1,147 @@
+"""
+Cascading Device Deletes
+
+Deletes IODD devices or EDS files together with every dependent row, driven
+by the foreign keys declared in the schema rather than a hand-kept table
+list:
+- The dependency graph is read with ``PRAGMA foreign_key_list``, so tables
+  added by later migrations are covered automatically
+- Each dependent table gets one set-based ``DELETE ... WHERE fk IN (...)``
+  per foreign-key path for all requested devices, children before parents
+- The IDs are staged in a temp table, so statement size does not grow with
+  the number of devices
+- Everything runs in one transaction
+
+Deletes on ``devices``/``eds_files`` bump the per-device versions (see
+device_versions.py), which invalidates ETags and materialized config schemas.
+"""
+
+import logging
+import sqlite3
+from typing import Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Root table per device type
+DEVICE_TABLES = {
+    "iodd": "devices",
+    "eds": "eds_files",
+}
+
+# Tables keyed by a device ID without a declared foreign key
+SOFT_REFERENCES = {
+    "devices": (("device_config_schemas", "device_id"),),
+}
+
+# PQA history is keyed by device ID *and* file type (IODD and EDS IDs overlap),
+# so it is not removed through the device foreign keys; version counters
+# must outlive their device for ETags to change
+EXCLUDED_PREFIXES = ("pqa_",)
+EXCLUDED_TABLES = ("device_versions",)
+
+# Edge: (child table, child column, parent column)
+Edge = Tuple[str, str, str]
+
+
+def _excluded(table: str) -> bool:
+    return table in EXCLUDED_TABLES or table.startswith(EXCLUDED_PREFIXES)
+
+
+def dependency_graph(conn: sqlite3.Connection) -> Dict[str, List[Edge]]:
+    """Parent table -> referencing (child, child column, parent column) edges"""
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    )]
+
+    graph: Dict[str, List[Edge]] = {}
+    for table in tables:
+        if _excluded(table):
+            continue
+        # Columns: id, seq, table, from, to, on_update, on_delete, match
+        for fk in conn.execute(f'PRAGMA foreign_key_list("{table}")'):
+            parent, child_col, parent_col = fk[2], fk[3], fk[4] or "id"
+            graph.setdefault(parent, []).append((table, child_col, parent_col))
+
+    existing = set(tables)
+    for parent, references in SOFT_REFERENCES.items():
+        for child, child_col in references:
+            if child in existing:
+                graph.setdefault(parent, []).append((child, child_col, "id"))
+    return graph
+
+
+def delete_plan(graph: Dict[str, List[Edge]], root: str, ids_query: str) -> List[Tuple[str, str]]:
+    """
+    Ordered (table, DELETE statement) pairs removing ``root`` rows whose id is
+    in ``ids_query`` and everything depending on them, children first.
+    """
+    plan: List[Tuple[str, str]] = []
+
+    def visit(table: str, key_col: str, key_query: str, path: Tuple[str, ...]):
+        for child, child_col, parent_col in graph.get(table, ()):
+            if child in path:
+                # Self-reference or cycle: the rows go with this table's delete
+                continue
+            child_keys = f'SELECT "{parent_col}" FROM "{table}" WHERE "{key_col}" IN ({key_query})'
+            visit(child, child_col, child_keys, path + (child,))
+        plan.append((table, f'DELETE FROM "{table}" WHERE "{key_col}" IN ({key_query})'))
+
+    visit(root, "id", ids_query, (root,))
+    return plan
+
+
+def cascade_delete(conn: sqlite3.Connection, device_type: str, ids: Iterable[int]) -> Dict:
+    """
+    Delete devices of one type with all dependent rows in a single transaction.
+
+    Args:
+        conn: Connection (committed on success, rolled back on error)
+        device_type: "iodd" or "eds"
+        ids: Root table IDs to delete
+
+    Returns:
+        dict: deleted_ids, not_found and rows deleted per table
+    """
+    root = DEVICE_TABLES[device_type]
+    ids = list(dict.fromkeys(int(i) for i in ids))
+    if not ids:
+        return {"deleted_ids": [], "not_found": [], "rows": {}}
+
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS cascade_delete_ids (id INTEGER PRIMARY KEY)")
+    try:
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM temp.cascade_delete_ids")
+        conn.executemany("INSERT OR IGNORE INTO temp.cascade_delete_ids (id) VALUES (?)", [(i,) for i in ids])
+
+        found = {row[0] for row in conn.execute(
+            f'SELECT id FROM "{root}" WHERE id IN (SELECT id FROM temp.cascade_delete_ids)'
+        )}
+        rows: Dict[str, int] = {}
+        if found:
+            plan = delete_plan(dependency_graph(conn), root, "SELECT id FROM temp.cascade_delete_ids")
+            for table, statement in plan:
+                count = conn.execute(statement).rowcount
+                if count:
+                    rows[table] = rows.get(table, 0) + count
+
+        conn.execute("DELETE FROM temp.cascade_delete_ids")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    deleted = [i for i in ids if i in found]
+    logger.info(f"Deleted {len(deleted)} {device_type} device(s): {sum(rows.values())} rows in {len(rows)} tables")
+    return {"deleted_ids": deleted, "not_found": [i for i in ids if i not in found], "rows": rows}
+
+
+def invalidate_device_caches(storage, device_type: str, ids: Iterable[int]):
+    """Drop cached lists, details and statistics of deleted devices (no-op without caching)"""
+    invalidate = getattr(storage, "invalidate_devices", None)
+    if invalidate is None:
+        return
+    try:
+        invalidate(device_type, list(ids))
+    except Exception as e:
+        logger.warning(f"Cache invalidation after delete failed: {e}")
@@ -0,0 +1,497 @@
+"""
+Catalog Export
+
+Bulk export of the IODD and EDS catalogs for analytics:
+- Set-based queries: one query per table per batch of devices, never per device
+- NDJSON records (one device per line) generated incrementally for HTTP streaming
+- Columnar Parquet / Arrow IPC files (one per table) written in row batches
+- In-process background jobs with progress for the columnar exports
+
+Memory use is bounded by the device batch size (NDJSON) or the row batch
+size (columnar), not by catalog size.
+"""
+
+import gzip
+import importlib.util
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# pyarrow is optional, and imported on the first columnar export rather than
+# at startup (it pulls in numpy)
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+if not PYARROW_AVAILABLE:
+    logger.warning("pyarrow not installed. Parquet/Arrow catalog exports will be disabled.")
+
+pa = pq = None
+
+
+def _load_pyarrow():
+    global pa, pq
+    if pa is None:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+        pa, pq = pyarrow, pyarrow.parquet
+
+
+DEVICE_BATCH_SIZE = 500
+ROW_BATCH_SIZE = 10000
+
+EXPORT_FORMATS = ("parquet", "arrow", "ndjson")
+
+
+@dataclass(frozen=True)
+class CatalogTable:
+    """A catalog table and how its rows link to a device"""
+    name: str
+    table: str
+    device_column: str
+    order_by: str
+    exclude: tuple = ()
+    # Tables linked through another table get the device ID joined in
+    join: Optional[str] = None
+    join_device_column: Optional[str] = None
+
+    @property
+    def device_expr(self) -> str:
+        return self.join_device_column or f"t.{self.device_column}"
+
+    @property
+    def key(self) -> str:
+        return "device_id" if self.join else self.device_column
+
+
+CATALOG_TABLES: Dict[str, List[CatalogTable]] = {
+    "IODD": [
+        CatalogTable("devices", "devices", "id", "t.id"),
+        CatalogTable("parameters", "parameters", "device_id", "t.param_index, t.id"),
+        CatalogTable("process_data", "process_data", "device_id", "t.id"),
+        CatalogTable(
+            "process_data_record_items", "process_data_record_items", "process_data_id",
+            "t.process_data_id, t.subindex, t.id",
+            join="JOIN process_data pd ON pd.id = t.process_data_id",
+            join_device_column="pd.device_id",
+        ),
+        CatalogTable("error_types", "error_types", "device_id", "t.code, t.additional_code, t.id"),
+        CatalogTable("events", "events", "device_id", "t.code, t.id"),
+    ],
+    "EDS": [
+        # Raw file content and icons are left to the per-device ZIP export
+        CatalogTable("devices", "eds_files", "id", "t.id", exclude=("eds_content", "icon_data")),
+        CatalogTable("parameters", "eds_parameters", "eds_file_id", "t.param_number, t.id"),
+        CatalogTable("assemblies", "eds_assemblies", "eds_file_id", "t.assembly_number, t.id"),
+        CatalogTable("connections", "eds_connections", "eds_file_id", "t.connection_number, t.id"),
+        CatalogTable("capacity", "eds_capacity", "eds_file_id", "t.id"),
+    ],
+}
+
+
+def _catalog(device_type: str) -> List[CatalogTable]:
+    try:
+        return CATALOG_TABLES[device_type.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown device type: {device_type}")
+
+
+def _table_columns(conn: sqlite3.Connection, spec: CatalogTable) -> List[tuple]:
+    """(name, declared type) of exported columns, including the joined device ID"""
+    columns = [
+        (row[1], (row[2] or "").upper())
+        for row in conn.execute(f"PRAGMA table_info({spec.table})")
+        if row[1] not in spec.exclude
+    ]
+    if spec.join:
+        columns.append(("device_id", "INTEGER"))
+    return columns
+
+
+def _select(spec: CatalogTable, columns: List[tuple], where: str = "") -> str:
+    select_list = [f"t.{name}" for name, _ in columns if not (spec.join and name == "device_id")]
+    if spec.join:
+        select_list.append(f"{spec.device_expr} AS device_id")
+    return (
+        f"SELECT {', '.join(select_list)} FROM {spec.table} t {spec.join or ''} "
+        f"{where} ORDER BY {spec.device_expr}, {spec.order_by}"
+    )
+
+
+def _device_id_batches(
+    conn: sqlite3.Connection,
+    root: CatalogTable,
+    device_ids: Optional[Sequence[int]],
+    batch_size: int
+) -> Iterator[List[int]]:
+    if device_ids is not None:
+        ids = sorted(set(device_ids))
+        for start in range(0, len(ids), batch_size):
+            yield ids[start:start + batch_size]
+        return
+
+    # Keyset pagination over the primary key
+    last_id = -1
+    while True:
+        batch = [row[0] for row in conn.execute(
+            f"SELECT id FROM {root.table} WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+        )]
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]
+
+
+def iter_catalog_records(
+    db_path: str,
+    device_type: str,
+    device_ids: Optional[Sequence[int]] = None,
+    include: Optional[Iterable[str]] = None,
+    batch_size: int = DEVICE_BATCH_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one nested record per device: ``{"type", "device", <table>: [...]}``.
+
+    Devices are processed in batches; each child table is loaded with a single
+    ``IN (...)`` query per batch and grouped in memory.
+
+    Args:
+        db_path: SQLite database path
+        device_type: "IODD" or "EDS"
+        device_ids: Restrict to these devices (default: whole catalog)
+        include: Child table names to include (default: all)
+        batch_size: Devices per batch
+    """
+    tables = _catalog(device_type)
+    root, children = tables[0], tables[1:]
+    if include is not None:
+        wanted = set(include)
+        children = [child for child in children if child.name in wanted]
+
+    # Generators may be resumed on different threadpool threads
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        columns = {spec.name: _table_columns(conn, spec) for spec in [root] + children}
+        names = {spec_name: [name for name, _ in cols] for spec_name, cols in columns.items()}
+
+        for batch in _device_id_batches(conn, root, device_ids, batch_size):
+            placeholders = ",".join("?" * len(batch))
+
+            devices = {}
+            for row in conn.execute(_select(root, columns[root.name], f"WHERE t.id IN ({placeholders})"), batch):
+                device = dict(zip(names[root.name], row))
+                devices[device["id"]] = device
+
+            grouped = {}
+            for child in children:
+                rows = defaultdict(list)
+                child_names = names[child.name]
+                key_index = child_names.index(child.key)
+                where = f"WHERE {child.device_expr} IN ({placeholders})"
+                for row in conn.execute(_select(child, columns[child.name], where), batch):
+                    rows[row[key_index]].append(dict(zip(child_names, row)))
+                grouped[child.name] = rows
+
+            for device_id in batch:
+                device = devices.get(device_id)
+                if device is None:
+                    continue
+                record = {"type": device_type.upper(), "device": device}
+                for child in children:
+                    record[child.name] = grouped[child.name].get(device_id, [])
+                yield record
+    finally:
+        conn.close()
+
+
+def iter_catalog_ndjson(
+    db_path: str,
+    device_type: str,
+    device_ids: Optional[Sequence[int]] = None,
+    batch_size: int = DEVICE_BATCH_SIZE
+) -> Iterator[bytes]:
+    """NDJSON lines for :func:`iter_catalog_records`, one chunk per device batch"""
+    lines = []
+    for record in iter_catalog_records(db_path, device_type, device_ids, batch_size=batch_size):
+        lines.append(json.dumps(record, default=str))
+        if len(lines) >= batch_size:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+# ---------------------------------------------------------------------------
+# Columnar export
+# ---------------------------------------------------------------------------
+
+def _arrow_field(name: str, declared_type: str):
+    if "INT" in declared_type:
+        return pa.field(name, pa.int64())
+    if any(t in declared_type for t in ("REAL", "FLOA", "DOUB")):
+        return pa.field(name, pa.float64())
+    if "BLOB" in declared_type:
+        return pa.field(name, pa.binary())
+    return pa.field(name, pa.string())
+
+
+def _coerce(value, arrow_type):
+    """Coerce a dynamically typed SQLite value to the column's declared type"""
+    if value is None:
+        return None
+    if pa.types.is_string(arrow_type):
+        return value if isinstance(value, str) else str(value)
+    if pa.types.is_int64(arrow_type):
+        if isinstance(value, int):
+            return value
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    if pa.types.is_float64(arrow_type):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    return value
+
+
+def _record_batch(rows: List[tuple], schema) -> "pa.RecordBatch":
+    arrays = []
+    for index, field in enumerate(schema):
+        values = [_coerce(row[index], field.type) for row in rows]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def count_catalog_rows(db_path: str, device_type: str, devices_only: bool = False) -> int:
+    """Total rows a columnar export of the catalog will write (or its device count)"""
+    tables = _catalog(device_type)
+    conn = sqlite3.connect(db_path)
+    try:
+        return sum(
+            conn.execute(f"SELECT COUNT(*) FROM {spec.table} t {spec.join or ''}").fetchone()[0]
+            for spec in (tables[:1] if devices_only else tables)
+        )
+    finally:
+        conn.close()
+
+
+def write_catalog_tables(
+    db_path: str,
+    device_type: str,
+    output_dir: str,
+    fmt: str = "parquet",
+    batch_rows: int = ROW_BATCH_SIZE,
+    progress: Optional[Callable[[str, int], None]] = None
+) -> List[str]:
+    """
+    Write one columnar file per catalog table.
+
+    Args:
+        db_path: SQLite database path
+        device_type: "IODD" or "EDS"
+        output_dir: Directory for the output files
+        fmt: "parquet" or "arrow" (Arrow IPC file format)
+        batch_rows: Rows per record batch / Parquet row group
+        progress: Called with (table name, rows written so far) after each batch
+
+    Returns:
+        Paths of the written files
+    """
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("Columnar catalog exports require the pyarrow package")
+    if fmt not in ("parquet", "arrow"):
+        raise ValueError(f"Unsupported columnar format: {fmt}")
+    _load_pyarrow()
+
+    os.makedirs(output_dir, exist_ok=True)
+    prefix = device_type.lower()
+    written = 0
+    paths = []
+
+    conn = sqlite3.connect(db_path)
+    try:
+        for spec in _catalog(device_type):
+            columns = _table_columns(conn, spec)
+            schema = pa.schema([_arrow_field(name, declared) for name, declared in columns])
+            path = os.path.join(output_dir, f"{prefix}_{spec.name}.{fmt}")
+
+            if fmt == "parquet":
+                writer = pq.ParquetWriter(path, schema, compression="zstd")
+            else:
+                writer = pa.ipc.new_file(path, schema)
+
+            try:
+                cursor = conn.execute(_select(spec, columns))
+                while True:
+                    rows = cursor.fetchmany(batch_rows)
+                    if not rows:
+                        break
+                    batch = _record_batch(rows, schema)
+                    if fmt == "parquet":
+                        writer.write_batch(batch, row_group_size=batch_rows)
+                    else:
+                        writer.write_batch(batch)
+                    written += len(rows)
+                    if progress:
+                        progress(spec.name, written)
+            finally:
+                writer.close()
+
+            paths.append(path)
+            if progress:
+                progress(spec.name, written)
+    finally:
+        conn.close()
+
+    return paths
+
+
+def write_catalog_ndjson(
+    db_path: str,
+    device_type: str,
+    output_dir: str,
+    progress: Optional[Callable[[str, int], None]] = None
+) -> List[str]:
+    """Write the catalog as a gzip-compressed NDJSON file"""
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{device_type.lower()}_catalog.ndjson.gz")
+    devices = 0
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for record in iter_catalog_records(db_path, device_type):
+            f.write(json.dumps(record, default=str))
+            f.write("\n")
+            devices += 1
+            if progress and devices % DEVICE_BATCH_SIZE == 0:
+                progress("devices", devices)
+    if progress:
+        progress("devices", devices)
+    return [path]
+
+
+# ---------------------------------------------------------------------------
+# Background jobs
+# ---------------------------------------------------------------------------
+
+class CatalogExportJobs:
+    """
+    Registry of catalog export jobs.
+
+    Jobs run in the API process (via FastAPI BackgroundTasks) and write their
+    files under ``base_dir/<job_id>``; finished jobs are downloaded as a ZIP
+    and removed with :meth:`delete` or when the registry evicts them.
+    """
+
+    def __init__(self, base_dir: str, max_jobs: int = 20):
+        self.base_dir = base_dir
+        self.max_jobs = max_jobs
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, device_type: str, fmt: str) -> Dict[str, Any]:
+        _catalog(device_type)
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        if fmt != "ndjson" and not PYARROW_AVAILABLE:
+            raise RuntimeError("Columnar catalog exports require the pyarrow package")
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "device_type": device_type.upper(),
+            "format": fmt,
+            "status": "queued",
+            "current_table": None,
+            "rows_total": None,
+            "rows_written": 0,
+            "progress": 0.0,
+            "files": [],
+            "error": None,
+            "created_at": datetime.now().isoformat(),
+            "completed_at": None,
+        }
+        with self._lock:
+            self._evict()
+            self._jobs[job_id] = job
+        return dict(job)
+
+    def _evict(self):
+        """Drop the oldest finished jobs once the registry is full"""
+        finished = [j for j in self._jobs.values() if j["status"] in ("completed", "failed")]
+        finished.sort(key=lambda j: j["created_at"])
+        while len(self._jobs) >= self.max_jobs and finished:
+            old = finished.pop(0)
+            self._jobs.pop(old["job_id"], None)
+            shutil.rmtree(self.job_dir(old["job_id"]), ignore_errors=True)
+
+    def job_dir(self, job_id: str) -> str:
+        return os.path.join(self.base_dir, job_id)
+
+    def _update(self, job_id: str, **changes):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(changes)
+
+    def run(self, job_id: str, db_path: str):
+        """Execute a queued job; intended to run as a background task"""
+        job = self.get(job_id)
+        if job is None:
+            return
+
+        device_type, fmt = job["device_type"], job["format"]
+        output_dir = self.job_dir(job_id)
+
+        try:
+            # NDJSON progress counts devices, columnar progress counts rows
+            total = count_catalog_rows(db_path, device_type, devices_only=(fmt == "ndjson"))
+            self._update(job_id, status="running", rows_total=total)
+
+            def progress(table: str, written: int):
+                self._update(
+                    job_id, current_table=table, rows_written=written,
+                    progress=round(min(written / total, 1.0) * 100, 1) if total else 100.0
+                )
+
+            if fmt == "ndjson":
+                paths = write_catalog_ndjson(db_path, device_type, output_dir, progress)
+            else:
+                paths = write_catalog_tables(db_path, device_type, output_dir, fmt, progress=progress)
+
+            files = [{"name": os.path.basename(p), "size": os.path.getsize(p)} for p in paths]
+            self._update(
+                job_id, status="completed", progress=100.0, current_table=None,
+                files=files, completed_at=datetime.now().isoformat()
+            )
+            logger.info(f"Catalog export {job_id} completed: {len(files)} files")
+        except Exception as e:
+            logger.error(f"Catalog export {job_id} failed: {e}", exc_info=True)
+            shutil.rmtree(output_dir, ignore_errors=True)
+            self._update(job_id, status="failed", error=str(e), completed_at=datetime.now().isoformat())
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(job) for job in self._jobs.values()]
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job is None:
+            return False
+        shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+        return True
@@ -0,0 +1,243 @@
+"""
+Materialized Device Config Schemas
+
+The config page needs every UI menu with each item's parameter details.
+Resolving that per request meant one or two parameter lookups per menu
+item, so the resolved schema is stored once per device and role in
+``device_config_schemas`` and served as a single-row read.
+
+Rows record the device version (see device_versions.py) they were built
+from; a re-import or delete bumps the version, so stale rows are never
+served and are rebuilt on the next read.
+"""
+
+import json
+import logging
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ROLES = ("observer", "maintenance", "specialist")
+
+# Role key of the document containing every menu and all role mappings
+ALL_ROLES = "all"
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS device_config_schemas (
+        device_id INTEGER NOT NULL,
+        role TEXT NOT NULL,
+        device_version INTEGER NOT NULL,
+        schema_json TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (device_id, role)
+    )
+"""
+
+
+def install_config_schema_table(conn: sqlite3.Connection):
+    """Create device_config_schemas (idempotent)"""
+    conn.execute(CREATE_TABLE_SQL)
+
+
+def _fallback_parameter_name(variable_id: str) -> str:
+    """Transformed lookup name, e.g. "V_LED_Intensity" -> "LED Intensity" """
+    name = variable_id.replace('_', ' ').strip()
+    if name.startswith('V '):
+        name = name[2:].strip()
+    return name
+
+
+def _parameter_details(row: sqlite3.Row) -> Dict[str, Any]:
+    enum_values = {}
+    if row['enumeration_values']:
+        try:
+            enum_values = json.loads(row['enumeration_values'])
+        except ValueError:
+            pass
+
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'data_type': row['data_type'],
+        'access_rights': row['access_rights'],
+        'default_value': row['default_value'],
+        'min_value': row['min_value'],
+        'max_value': row['max_value'],
+        'unit': row['unit'],
+        'description': row['description'],
+        'enumeration_values': enum_values,
+        'bit_length': row['bit_length'],
+    }
+
+
+def build_config_schema(conn: sqlite3.Connection, device_id: int) -> Dict[str, Any]:
+    """
+    Resolve the full menu -> parameter schema of a device.
+
+    Three queries in total (parameters, menus, menu items) with the
+    parameter matching done in memory.
+    """
+    previous_factory = conn.row_factory
+    conn.row_factory = sqlite3.Row
+    try:
+        # First parameter per name wins, as with the old per-item lookups
+        parameters = {}
+        for row in conn.execute("""
+            SELECT id, name, data_type, access_rights, default_value,
+                   min_value, max_value, unit, description, enumeration_values,
+                   bit_length
+            FROM parameters
+            WHERE device_id = ?
+            ORDER BY id
+        """, (device_id,)):
+            parameters.setdefault(row['name'], row)
+
+        menus = []
+        menus_by_db_id = {}
+        for row in conn.execute("""
+            SELECT id, menu_id, name
+            FROM ui_menus
+            WHERE device_id = ?
+            ORDER BY id
+        """, (device_id,)):
+            menu = {'id': row['menu_id'], 'name': row['name'], 'items': []}
+            menus.append(menu)
+            menus_by_db_id[row['id']] = menu
+
+        for row in conn.execute("""
+            SELECT i.menu_id, i.variable_id, i.record_item_ref, i.subindex,
+                   i.access_right_restriction, i.display_format, i.unit_code,
+                   i.button_value, i.menu_ref
+            FROM ui_menu_items i
+            JOIN ui_menus m ON m.id = i.menu_id
+            WHERE m.device_id = ?
+            ORDER BY i.menu_id, i.item_order
+        """, (device_id,)):
+            param_details = None
+            variable_id = row['variable_id']
+            if variable_id:
+                param_row = parameters.get(variable_id) or parameters.get(_fallback_parameter_name(variable_id))
+                if param_row is not None:
+                    param_details = _parameter_details(param_row)
+
+            menus_by_db_id[row['menu_id']]['items'].append({
+                'variable_id': variable_id,
+                'record_item_ref': row['record_item_ref'],
+                'subindex': row['subindex'],
+                'access_right_restriction': row['access_right_restriction'],
+                'display_format': row['display_format'],
+                'unit_code': row['unit_code'],
+                'button_value': row['button_value'],
+                'menu_ref': row['menu_ref'],
+                'parameter': param_details,
+            })
+
+        role_mappings = {role: {} for role in ROLES}
+        for row in conn.execute("""
+            SELECT role_type, menu_type, menu_id
+            FROM ui_menu_roles
+            WHERE device_id = ?
+        """, (device_id,)):
+            if row['role_type'] in role_mappings:
+                role_mappings[row['role_type']][row['menu_type']] = row['menu_id']
+    finally:
+        conn.row_factory = previous_factory
+
+    return {'menus': menus, 'role_mappings': role_mappings}
+
+
+def role_schema(schema: Dict[str, Any], role: str) -> Dict[str, Any]:
+    """Menus reachable from a role's entry menus (following menu_ref), plus its mappings"""
+    menus_by_id = {menu['id']: menu for menu in schema['menus']}
+    pending: List[str] = list(schema['role_mappings'].get(role, {}).values())
+    reachable = set()
+    while pending:
+        menu_id = pending.pop()
+        if menu_id in reachable or menu_id not in menus_by_id:
+            continue
+        reachable.add(menu_id)
+        pending.extend(item['menu_ref'] for item in menus_by_id[menu_id]['items'] if item['menu_ref'])
+
+    return {
+        'menus': [menu for menu in schema['menus'] if menu['id'] in reachable],
+        'role_mappings': {role: schema['role_mappings'].get(role, {})},
+    }
+
+
+def _device_version(conn: sqlite3.Connection, device_id: int) -> int:
+    try:
+        row = conn.execute(
+            "SELECT version FROM device_versions WHERE device_type = 'iodd' AND device_id = ?",
+            (device_id,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] if row else 0
+
+
+def materialize_config_schemas(conn: sqlite3.Connection, device_id: int) -> Dict[str, str]:
+    """
+    Build and store the schema documents of a device (all roles plus each role).
+
+    The device version is read before building: if the device changes
+    meanwhile, the stored rows are already stale and get rebuilt on the
+    next read rather than served with new data under an old version.
+
+    Returns:
+        role -> schema JSON text
+    """
+    version = _device_version(conn, device_id)
+    schema = build_config_schema(conn, device_id)
+
+    documents = {ALL_ROLES: json.dumps(schema, ensure_ascii=False, separators=(',', ':'))}
+    for role in ROLES:
+        documents[role] = json.dumps(role_schema(schema, role), ensure_ascii=False, separators=(',', ':'))
+
+    install_config_schema_table(conn)
+    conn.executemany("""
+        INSERT OR REPLACE INTO device_config_schemas (device_id, role, device_version, schema_json)
+        VALUES (?, ?, ?, ?)
+    """, [(device_id, role, version, document) for role, document in documents.items()])
+    conn.commit()
+    return documents
+
+
+def get_config_schema_json(db_path: str, device_id: int, role: str = ALL_ROLES) -> Optional[str]:
+    """
+    Stored schema JSON of a device, building it on first use.
+
+    Returns:
+        JSON text, or None if the device does not exist
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        try:
+            row = conn.execute("""
+                SELECT s.schema_json
+                FROM device_config_schemas s
+                LEFT JOIN device_versions v ON v.device_type = 'iodd' AND v.device_id = s.device_id
+                WHERE s.device_id = ? AND s.role = ? AND s.device_version = COALESCE(v.version, 0)
+            """, (device_id, role)).fetchone()
+        except sqlite3.OperationalError:
+            # Tables not created yet
+            row = None
+        if row:
+            return row[0]
+
+        if not conn.execute("SELECT 1 FROM devices WHERE id = ?", (device_id,)).fetchone():
+            return None
+        return materialize_config_schemas(conn, device_id)[role]
+    finally:
+        conn.close()
+
+
+def refresh_config_schemas(db_path: str, device_id: int):
+    """Materialize a device's schemas after import (background task)"""
+    conn = sqlite3.connect(db_path)
+    try:
+        materialize_config_schemas(conn, device_id)
+    except Exception as e:
+        logger.warning(f"Could not materialize config schema for device {device_id}: {e}")
+    finally:
+        conn.close()
@@ -0,0 +1,230 @@
+"""
+Online Database Backups
+
+Consistent snapshots of the live SQLite database without blocking the API:
+- Pages are copied with the online backup API (``sqlite3.Connection.backup``),
+  which reads committed data including frames still in the ``-wal`` file,
+  unlike a file copy
+- The copy proceeds in steps of a few pages with a short pause between
+  steps, so writers keep getting the database
+- Snapshots are gzip-compressed and the oldest ones pruned beyond the
+  retention count
+- Jobs run in a worker thread (via FastAPI BackgroundTasks) and report
+  progress in pages
+
+A write by another connection during the copy makes SQLite restart the
+backup at its next step; larger steps shorten the window on busy databases.
+"""
+
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BACKUP_PREFIX = "greenstack_backup_"
+BACKUP_SUFFIX = ".db.gz"
+
+PAGES_PER_STEP = 1024
+STEP_PAUSE = 0.005  # seconds between steps
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def snapshot_database(
+    db_path: str,
+    dest_path: str,
+    pages_per_step: int = PAGES_PER_STEP,
+    pause: float = STEP_PAUSE,
+    progress: Optional[Callable[[int, int], None]] = None,
+):
+    """
+    Copy the database into a standalone SQLite file with the online backup API.
+
+    Args:
+        db_path: Live database
+        dest_path: Snapshot file (overwritten)
+        pages_per_step: Pages copied per step
+        pause: Sleep between steps, yielding the database to writers
+        progress: Called with (pages_done, pages_total) after each step
+    """
+    def on_step(status, remaining, total):
+        if progress:
+            progress(total - remaining, total)
+        if pause and remaining:
+            time.sleep(pause)
+
+    if os.path.exists(dest_path):
+        os.unlink(dest_path)
+
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(dest_path)
+    try:
+        source.backup(target, pages=pages_per_step, progress=on_step)
+        # The copied header keeps the source's WAL mode; make the file self-contained
+        target.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        target.close()
+        source.close()
+
+
+def compress_file(src_path: str, dest_path: str, compresslevel: int = 6):
+    """gzip a file in chunks; the destination appears only once complete"""
+    part_path = dest_path + ".part"
+    with open(src_path, "rb") as src, gzip.open(part_path, "wb", compresslevel=compresslevel) as dest:
+        shutil.copyfileobj(src, dest, COPY_CHUNK_SIZE)
+    os.replace(part_path, dest_path)
+
+
+def list_backups(backup_dir: str) -> List[Dict[str, Any]]:
+    """Compressed snapshots in backup_dir, newest first"""
+    directory = Path(backup_dir)
+    if not directory.is_dir():
+        return []
+
+    entries = []
+    for path in directory.glob(f"{BACKUP_PREFIX}*{BACKUP_SUFFIX}"):
+        stat = path.stat()
+        entries.append((stat.st_mtime_ns, path.name, stat.st_size))
+    entries.sort(reverse=True)
+
+    return [
+        {
+            "backup_file": name,
+            "size_mb": round(size / (1024 * 1024), 2),
+            "created_at": datetime.fromtimestamp(mtime_ns / 1e9).isoformat(),
+        }
+        for mtime_ns, name, size in entries
+    ]
+
+
+def prune_backups(backup_dir: str, keep: int) -> List[str]:
+    """Delete all but the newest ``keep`` snapshots; returns the deleted names"""
+    if keep <= 0:
+        return []
+    removed = []
+    for backup in list_backups(backup_dir)[keep:]:
+        try:
+            os.unlink(os.path.join(backup_dir, backup["backup_file"]))
+            removed.append(backup["backup_file"])
+        except OSError as e:
+            logger.warning(f"Could not delete old backup {backup['backup_file']}: {e}")
+    return removed
+
+
+def backup_path(backup_dir: str, backup_file: str) -> Optional[str]:
+    """Path of a snapshot by name, or None for unknown names (no path traversal)"""
+    if os.path.basename(backup_file) != backup_file or not backup_file.startswith(BACKUP_PREFIX) \
+            or not backup_file.endswith(BACKUP_SUFFIX):
+        return None
+    path = os.path.join(backup_dir, backup_file)
+    return path if os.path.isfile(path) else None
+
+
+class BackupJobs:
+    """
+    Registry of backup jobs.
+
+    One backup runs at a time. Jobs run in the API process (via FastAPI
+    BackgroundTasks, i.e. in the thread pool) and write their snapshot to
+    ``backup_dir``.
+    """
+
+    def __init__(self, backup_dir: str, retention: int = 10, pages_per_step: int = PAGES_PER_STEP,
+                 max_jobs: int = 20):
+        self.backup_dir = backup_dir
+        self.retention = retention
+        self.pages_per_step = pages_per_step
+        self.max_jobs = max_jobs
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self) -> Dict[str, Any]:
+        """Queue a backup job; raises RuntimeError while another one is active"""
+        now = datetime.now()
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "backup_file": f"{BACKUP_PREFIX}{now.strftime('%Y%m%d_%H%M%S')}_{job_id[:6]}{BACKUP_SUFFIX}",
+            "pages_total": None,
+            "pages_done": 0,
+            "progress": 0.0,
+            "size_mb": None,
+            "pruned": [],
+            "error": None,
+            "created_at": now.isoformat(),
+            "completed_at": None,
+        }
+        with self._lock:
+            if any(j["status"] in ("queued", "running", "compressing") for j in self._jobs.values()):
+                raise RuntimeError("A backup is already in progress")
+            self._evict()
+            self._jobs[job_id] = job
+        return dict(job)
+
+    def _evict(self):
+        """Drop the oldest finished jobs once the registry is full"""
+        finished = [j for j in self._jobs.values() if j["status"] in ("completed", "failed")]
+        finished.sort(key=lambda j: j["created_at"])
+        while len(self._jobs) >= self.max_jobs and finished:
+            self._jobs.pop(finished.pop(0)["job_id"], None)
+
+    def _update(self, job_id: str, **changes):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(changes)
+
+    def run(self, job_id: str, db_path: str):
+        """Execute a queued job; intended to run as a background task"""
+        job = self.get(job_id)
+        if job is None:
+            return
+
+        os.makedirs(self.backup_dir, exist_ok=True)
+        final_path = os.path.join(self.backup_dir, job["backup_file"])
+        raw_path = final_path[:-len(".gz")] + ".part"
+
+        def progress(done: int, total: int):
+            self._update(
+                job_id, pages_done=done, pages_total=total,
+                progress=round(done / total * 100, 1) if total else 100.0
+            )
+
+        try:
+            self._update(job_id, status="running")
+            snapshot_database(db_path, raw_path, self.pages_per_step, progress=progress)
+
+            self._update(job_id, status="compressing")
+            compress_file(raw_path, final_path)
+            pruned = prune_backups(self.backup_dir, self.retention)
+
+            self._update(
+                job_id, status="completed", progress=100.0, pruned=pruned,
+                size_mb=round(os.path.getsize(final_path) / (1024 * 1024), 2),
+                completed_at=datetime.now().isoformat()
+            )
+            logger.info(f"Backup {job['backup_file']} completed")
+        except Exception as e:
+            logger.error(f"Backup {job_id} failed: {e}", exc_info=True)
+            self._update(job_id, status="failed", error=str(e), completed_at=datetime.now().isoformat())
+        finally:
+            for leftover in (raw_path, final_path + ".part"):
+                if os.path.exists(leftover):
+                    os.unlink(leftover)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(job) for job in self._jobs.values()]
@@ -0,0 +1,128 @@
+"""
+Background Database Integrity Checks
+
+``PRAGMA integrity_check`` and ``PRAGMA foreign_key_check`` read every page
+of the database, so the health endpoint no longer runs them inline:
+- Checks run in a worker thread on a read-only connection to the live
+  database, one at a time
+- The last result is cached with its timestamp; a result older than
+  ``max_age`` is served while a new check runs (stale-while-revalidate)
+- Repairs (cleaning orphaned rows, VACUUM) invalidate the cached result
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from src.database import get_db_path, get_read_connection
+
+logger = logging.getLogger(__name__)
+
+# Violations kept in the cached result (the count covers all of them)
+MAX_REPORTED_VIOLATIONS = 100
+
+
+def run_integrity_check(db_path: str) -> Dict[str, Any]:
+    """Run integrity_check and foreign_key_check on a read-only connection"""
+    start = time.perf_counter()
+    conn = get_read_connection(db_path, timeout=30)
+    try:
+        integrity = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+        violations = conn.execute("PRAGMA foreign_key_check").fetchall()
+    finally:
+        conn.close()
+    return {
+        "integrity": integrity[0] if integrity == ["ok"] else "; ".join(integrity),
+        "foreign_key_violation_count": len(violations),
+        # (table, rowid, parent table, foreign key index)
+        "foreign_key_violations": [tuple(row) for row in violations[:MAX_REPORTED_VIOLATIONS]],
+        "checked_at": datetime.now().isoformat(),
+        "checked_at_epoch": time.time(),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+class IntegrityChecks:
+    """Runs integrity checks in the background and caches the last result"""
+
+    def __init__(self, max_age: float = 3600, db_path: Callable[[], str] = get_db_path):
+        self.max_age = max_age
+        self.db_path = db_path
+        self._result: Optional[Dict[str, Any]] = None
+        self._error: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Bumped by invalidate(), so a check that started before a repair is discarded
+        self._generation = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return dict(self._result) if self._result else None
+
+    def is_stale(self) -> bool:
+        result = self.result()
+        return result is None or time.time() - result["checked_at_epoch"] > self.max_age
+
+    def start(self) -> bool:
+        """Start a check unless one is running; returns True if one was started"""
+        with self._lock:
+            if self.running:
+                return False
+            self._thread = threading.Thread(target=self.run, name="integrity-check", daemon=True)
+            self._thread.start()
+            return True
+
+    def ensure_fresh(self) -> bool:
+        """Start a check if the cached result is missing or stale"""
+        return self.is_stale() and self.start()
+
+    def wait(self, timeout: float) -> bool:
+        """Wait up to timeout for a running check; True once none is running"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return not self.running
+
+    def run(self):
+        """Run a check and cache its result (in the calling thread)"""
+        generation = self._generation
+        try:
+            result = run_integrity_check(self.db_path())
+        except Exception as e:
+            logger.error(f"Integrity check failed to run: {e}", exc_info=True)
+            with self._lock:
+                self._error = str(e)
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._result = result
+            self._error = None
+        logger.info(
+            f"Integrity check: {result['integrity']}, "
+            f"{result['foreign_key_violation_count']} foreign key violations ({result['seconds']}s)"
+        )
+
+    def invalidate(self):
+        """Drop the cached result (after a repair changed the data)"""
+        with self._lock:
+            self._result = None
+            self._generation += 1
+
+    def status(self) -> Dict[str, Any]:
+        result = self.result()
+        with self._lock:
+            error = self._error
+        return {
+            "running": self.running,
+            "stale": self.is_stale(),
+            "max_age_seconds": self.max_age,
+            "error": error,
+            "result": result,
+        }
@@ -0,0 +1,133 @@
+"""
+Per-Device Version Counters
+
+Device detail data is immutable after import; it only changes when a device
+is (re)imported, deleted, or gets new PQA results. SQLite triggers bump a
+row in ``device_versions`` on each of those writes, whatever code path
+performs them, so the version can back HTTP ETags.
+
+Versions are seeded from the wall clock (milliseconds) and only ever
+increase, so IDs reused after a database reset never repeat a version an
+HTTP cache may still hold.
+"""
+
+import logging
+import sqlite3
+import threading
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Cap on cached (device_type, device_id) -> version entries
+MAX_CACHED_VERSIONS = 50000
+
+_NOW_MS = "CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)"
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS device_versions (
+        device_type TEXT NOT NULL,
+        device_id INTEGER NOT NULL,
+        version INTEGER NOT NULL,
+        PRIMARY KEY (device_type, device_id)
+    ) WITHOUT ROWID
+"""
+
+# (trigger name, table, event, device type expression, device id expression)
+_TRIGGERS = (
+    ("trg_devices_version_insert", "devices", "INSERT", "'iodd'", "NEW.id"),
+    ("trg_devices_version_update", "devices", "UPDATE", "'iodd'", "NEW.id"),
+    ("trg_devices_version_delete", "devices", "DELETE", "'iodd'", "OLD.id"),
+    ("trg_iodd_assets_version_insert", "iodd_assets", "INSERT", "'iodd'", "NEW.device_id"),
+    ("trg_eds_files_version_insert", "eds_files", "INSERT", "'eds'", "NEW.id"),
+    ("trg_eds_files_version_update", "eds_files", "UPDATE", "'eds'", "NEW.id"),
+    ("trg_eds_files_version_delete", "eds_files", "DELETE", "'eds'", "OLD.id"),
+    ("trg_pqa_metrics_version_insert", "pqa_quality_metrics", "INSERT",
+     "lower(NEW.file_type)", "NEW.device_id"),
+)
+
+# Columns a trigger reads, beyond the table itself
+_TRIGGER_COLUMNS = {
+    "iodd_assets": "device_id",
+    "pqa_quality_metrics": "file_type",
+}
+
+
+def _trigger_sql(name: str, table: str, event: str, type_expr: str, id_expr: str) -> str:
+    return f"""
+        CREATE TRIGGER IF NOT EXISTS {name}
+        AFTER {event} ON {table}
+        BEGIN
+            INSERT INTO device_versions (device_type, device_id, version)
+            VALUES ({type_expr}, {id_expr}, {_NOW_MS})
+            ON CONFLICT (device_type, device_id)
+            DO UPDATE SET version = MAX(device_versions.version + 1, excluded.version);
+        END
+    """
+
+
+def install_device_versions(conn: sqlite3.Connection):
+    """
+    Create the version table and bump triggers for the tables that exist.
+
+    Idempotent; safe to call on every startup. Tables created later (e.g. the
+    PQA tables) get their trigger from the next call or from the migration.
+    """
+    conn.execute(CREATE_TABLE_SQL)
+    for name, table, event, type_expr, id_expr in _TRIGGERS:
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if not columns or _TRIGGER_COLUMNS.get(table, "id") not in columns:
+            continue
+        conn.execute(_trigger_sql(name, table, event, type_expr, id_expr))
+
+
+class DeviceVersions:
+    """
+    In-process cache of device versions.
+
+    Cached entries stay valid until another connection commits to the
+    database, detected with ``PRAGMA data_version``. That check reads the
+    WAL index rather than any table, so a revalidation of an unchanged
+    device does no table I/O at all.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._versions: Dict[Tuple[str, int], int] = {}
+        self._data_version: Optional[int] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        return self._conn
+
+    def get(self, device_type: str, device_id: int) -> int:
+        """Current version of a device (0 if it was never bumped)"""
+        key = (device_type, device_id)
+        with self._lock:
+            conn = self._connection()
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version or len(self._versions) >= MAX_CACHED_VERSIONS:
+                self._versions.clear()
+                self._data_version = data_version
+
+            version = self._versions.get(key)
+            if version is None:
+                try:
+                    row = conn.execute(
+                        "SELECT version FROM device_versions WHERE device_type = ? AND device_id = ?",
+                        key
+                    ).fetchone()
+                except sqlite3.OperationalError:
+                    # Table not created yet (database predates the migration)
+                    row = None
+                version = row[0] if row else 0
+                self._versions[key] = version
+        return version
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
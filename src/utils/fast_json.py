@@ -0,0 +1,82 @@
+"""
+Fast JSON Responses
+
+orjson-backed response class for the API plus helpers for a fast path that
+serializes DB-sourced data directly:
+- ``FastJSONResponse`` renders with orjson (stdlib json if it is missing)
+- Returning a ``FastJSONResponse`` from a handler skips FastAPI's
+  response_model validation and ``jsonable_encoder`` pass; the
+  response_model stays on the route for the OpenAPI schema
+- ``raw_json`` embeds JSON already stored in the database (e.g.
+  ``parameters.enumeration_values``) without decoding and re-encoding it
+"""
+
+import json
+import logging
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Try to import orjson, but make it optional
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    # orjson.Fragment (3.9+) embeds pre-serialized JSON verbatim
+    FRAGMENT_AVAILABLE = hasattr(orjson, "Fragment")
+except ImportError:
+    ORJSON_AVAILABLE = False
+    FRAGMENT_AVAILABLE = False
+    logger.warning("orjson not installed. API responses will use the standard json encoder.")
+
+
+def _default(value: Any) -> Any:
+    """Types neither encoder handles natively"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, Path):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def raw_json(text: Optional[str]) -> Any:
+    """
+    Embed a stored JSON document in a FastJSONResponse payload.
+
+    Only valid in content rendered by ``dumps``/``FastJSONResponse`` (not in
+    values passed through ``jsonable_encoder``). Without orjson.Fragment the
+    document is decoded instead.
+    """
+    if not text:
+        return None
+    if FRAGMENT_AVAILABLE:
+        return orjson.Fragment(text)
+    return json.loads(text)
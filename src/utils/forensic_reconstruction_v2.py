@@ -15,6 +15,13 @@ from xml.dom import minidom
 logger = logging.getLogger(__name__)
 
 
+class _Row(sqlite3.Row):
+    """sqlite3.Row with dict-style get() for columns added by later migrations"""
+
+    def get(self, key: str, default=None):
+        return self[key] if key in self.keys() else default
+
+
 class IODDReconstructor:
     """
     Reconstructs IODD XML from GreenStack database
@@ -81,7 +88,7 @@ class IODDReconstructor:
     def get_connection(self) -> sqlite3.Connection:
         """Get database connection with Row factory"""
         conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn.row_factory = _Row
         return conn
 
     def _get_schema_version(self, conn: sqlite3.Connection, device_id: int) -> str:
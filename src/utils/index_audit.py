@@ -0,0 +1,333 @@
+"""
+Index Audit
+
+Finds lookups the schema has no index for:
+- Foreign key columns (child rows are fetched and deleted by parent ID)
+- Equality lookups in the SQL the application actually runs, extracted from
+  string literals in the source tree (``FROM t WHERE a = ? AND b = ?``,
+  ``JOIN t x ON x.a = ...``); narrow SELECT lists become covering indexes
+- ``EXPLAIN QUERY PLAN`` full table scans of the extracted statements,
+  ranked by how often the statement appears
+
+Used by scripts/audit_indexes.py, which also renders the missing indexes as
+an Alembic migration.
+"""
+
+import ast
+import re
+import sqlite3
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Widest SELECT list folded into a covering index
+MAX_COVERING_COLUMNS = 2
+
+# Payload columns never copied into an index (searched by or covered)
+LARGE_COLUMN_SUFFIXES = ("_content", "_data", "_text", "text_value", "description")
+
+_FROM_WHERE = re.compile(
+    r"\bFROM\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?\s+WHERE\s+(.*?)(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|\)|;|$)",
+    re.IGNORECASE | re.DOTALL,
+)
+_JOIN_ON = re.compile(r"\bJOIN\s+(\w+)\s+(?:AS\s+)?(\w+)\s+ON\s+(\w+)\.(\w+)\s*=\s*(\w+)\.(\w+)", re.IGNORECASE)
+# ``col = ?``, ``col = 'literal'``, ``col = 42`` and ``col IN (...)``
+_EQUALITY = re.compile(
+    r"(?:(\w+)\.)?(\w+)\s*(?:=\s*(?:\?|'[^']*'|-?\d+(?:\.\d+)?\b)|IN\s*\()", re.IGNORECASE
+)
+_SELECT_LIST = re.compile(r"^\s*SELECT\s+(?:DISTINCT\s+)?(.*?)\s+FROM\s", re.IGNORECASE | re.DOTALL)
+_SQL_START = re.compile(r"^\s*(SELECT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+_KEYWORDS = {"select", "from", "where", "and", "or", "not", "null", "is", "limit", "order", "group", "by"}
+
+
+@dataclass
+class Query:
+    """A SQL statement found in the source tree"""
+    sql: str
+    location: str
+
+
+@dataclass
+class IndexCandidate:
+    """A missing index"""
+    table: str
+    columns: Tuple[str, ...]
+    equality: int = 0  # leading columns searched by equality; the rest only cover
+    reasons: Set[str] = field(default_factory=set)
+    uses: int = 0
+
+    @property
+    def name(self) -> str:
+        return f"idx_{self.table}_{'_'.join(self.columns)}"
+
+    @property
+    def sql(self) -> str:
+        return f"CREATE INDEX IF NOT EXISTS {self.name} ON {self.table}({', '.join(self.columns)})"
+
+
+# ---------------------------------------------------------------------------
+# Schema
+# ---------------------------------------------------------------------------
+
+def table_columns(conn: sqlite3.Connection) -> Dict[str, Dict[str, str]]:
+    """Table -> {column: declared type}"""
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    )]
+    return {
+        table: {row[1]: row[2].upper() for row in conn.execute(f'PRAGMA table_info("{table}")')}
+        for table in tables
+    }
+
+
+def rowid_alias(conn: sqlite3.Connection, table: str) -> Optional[str]:
+    """The INTEGER PRIMARY KEY column (an alias of the rowid), if any"""
+    keys = [row for row in conn.execute(f'PRAGMA table_info("{table}")') if row[5]]
+    if len(keys) == 1 and keys[0][2].upper() == "INTEGER":
+        return keys[0][1]
+    return None
+
+
+def index_prefixes(conn: sqlite3.Connection, table: str) -> List[Tuple[str, ...]]:
+    """Column lists of every index on a table, including the rowid alias"""
+    indexes = []
+    # INTEGER PRIMARY KEY is the rowid: lookups on it are always indexed
+    alias = rowid_alias(conn, table)
+    if alias:
+        indexes.append((alias,))
+    for index in conn.execute(f'PRAGMA index_list("{table}")'):
+        columns = tuple(info[2] for info in conn.execute(f'PRAGMA index_info("{index[1]}")'))
+        if columns and None not in columns:
+            indexes.append(columns)
+    return indexes
+
+
+def is_indexed(indexes: Sequence[Tuple[str, ...]], columns: Sequence[str]) -> bool:
+    """True if an index leads with exactly these columns (in any order)"""
+    wanted = set(columns)
+    return any(len(index) >= len(wanted) and set(index[:len(wanted)]) == wanted for index in indexes)
+
+
+def foreign_key_columns(conn: sqlite3.Connection) -> List[Tuple[str, Tuple[str, ...], str]]:
+    """(child table, child columns, parent table) for every declared foreign key"""
+    keys = []
+    for table in table_columns(conn):
+        grouped: Dict[int, List] = defaultdict(list)
+        for fk in conn.execute(f'PRAGMA foreign_key_list("{table}")'):
+            grouped[fk[0]].append(fk)
+        for rows in grouped.values():
+            rows.sort(key=lambda fk: fk[1])
+            keys.append((table, tuple(fk[3] for fk in rows), rows[0][2]))
+    return keys
+
+
+# ---------------------------------------------------------------------------
+# Source queries
+# ---------------------------------------------------------------------------
+
+def extract_queries(paths: Iterable[Path], root: Optional[Path] = None) -> List[Query]:
+    """SQL string literals (plain strings only, not f-strings) in Python files"""
+    queries = []
+    for path in paths:
+        shown = path.relative_to(root) if root and path.is_relative_to(root) else path
+        try:
+            tree = ast.parse(path.read_text(encoding="utf-8"))
+        except (SyntaxError, UnicodeDecodeError):
+            continue
+        fstring_parts = {id(value) for node in ast.walk(tree) if isinstance(node, ast.JoinedStr)
+                         for value in node.values}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str) and id(node) not in fstring_parts:
+                if _SQL_START.match(node.value) and re.search(r"\bFROM\b", node.value, re.IGNORECASE):
+                    queries.append(Query(" ".join(node.value.split()), f"{shown}:{node.lineno}"))
+    return queries
+
+
+def _plain_columns(select_list: str, alias: Optional[str]) -> Optional[List[str]]:
+    columns = []
+    for item in select_list.split(","):
+        name = item.strip()
+        if alias and name.startswith(f"{alias}."):
+            name = name[len(alias) + 1:]
+        if not re.fullmatch(r"\w+", name) or name.lower() in _KEYWORDS:
+            return None
+        columns.append(name)
+    return columns
+
+
+def lookup_patterns(sql: str) -> List[Tuple[str, Tuple[str, ...], Tuple[str, ...]]]:
+    """(table, equality columns, covered SELECT columns) lookups of a statement"""
+    lookups = []
+
+    for match in _FROM_WHERE.finditer(sql):
+        table, alias, where = match.group(1), match.group(2), match.group(3)
+        if alias and alias.lower() in _KEYWORDS:
+            alias = None
+        columns = []
+        for qualifier, column in _EQUALITY.findall(where):
+            if (not qualifier or qualifier in (alias, table)) and column.lower() not in _KEYWORDS \
+                    and column not in columns:
+                columns.append(column)
+        if not columns:
+            continue
+
+        # Single-table statement with a narrow SELECT list: cover it
+        extra: List[str] = []
+        select = _SELECT_LIST.match(sql)
+        if select and not re.search(r"\bJOIN\b", sql, re.IGNORECASE) \
+                and len(re.findall(r"\bSELECT\b", sql, re.IGNORECASE)) == 1:
+            selected = _plain_columns(select.group(1), alias) or []
+            extra = [c for c in selected if c not in columns]
+            if len(extra) > MAX_COVERING_COLUMNS:
+                extra = []
+        lookups.append((table, tuple(columns), tuple(extra)))
+
+    for table, alias, left_alias, left_col, right_alias, right_col in _JOIN_ON.findall(sql):
+        if left_alias == alias:
+            lookups.append((table, (left_col,), ()))
+        elif right_alias == alias:
+            lookups.append((table, (right_col,), ()))
+    return lookups
+
+
+# ---------------------------------------------------------------------------
+# Audit
+# ---------------------------------------------------------------------------
+
+def _merge_prefixes(candidates: Dict[Tuple[str, Tuple[str, ...]], IndexCandidate]) -> List[IndexCandidate]:
+    """Drop candidates a wider candidate on the same table also serves"""
+    merged = []
+    for (table, columns), candidate in candidates.items():
+        lead = columns[:candidate.equality]
+        wider = [other for (other_table, other_cols), other in candidates.items()
+                 if other_table == table and len(other_cols) > len(columns)
+                 and set(columns) <= set(other_cols) and set(other_cols[:len(lead)]) == set(lead)]
+        if wider:
+            target = max(wider, key=lambda c: len(c.columns))
+            target.reasons |= candidate.reasons
+            target.uses += candidate.uses
+        else:
+            merged.append(candidate)
+    return merged
+
+
+def missing_indexes(conn: sqlite3.Connection, queries: Sequence[Query]) -> List[IndexCandidate]:
+    """Missing indexes for foreign keys and source lookups, most used first"""
+    schema = table_columns(conn)
+    indexes = {table: index_prefixes(conn, table) for table in schema}
+    rowids = {table: rowid_alias(conn, table) for table in schema}
+    candidates: Dict[Tuple[str, Tuple[str, ...]], IndexCandidate] = {}
+
+    def payload(table: str, column: str) -> bool:
+        return "BLOB" in schema[table][column] or column.endswith(LARGE_COLUMN_SUFFIXES)
+
+    def add(table: str, columns: Tuple[str, ...], reason: str, covered: Tuple[str, ...] = ()):
+        if table not in schema or not set(columns) <= set(schema[table]):
+            return
+        # Searching by a payload column would copy it into the index: search by the rest
+        columns = tuple(c for c in columns if not payload(table, c))
+        if not columns or rowids[table] in columns or is_indexed(indexes[table], columns):
+            # Equality on the rowid or an indexed prefix is already a search
+            return
+        equality = len(columns)
+        # The rowid is part of every index entry; payload columns would bloat it
+        columns += tuple(
+            c for c in covered
+            if c in schema[table] and c != rowids[table] and not payload(table, c)
+        )
+        candidate = candidates.setdefault((table, columns), IndexCandidate(table, columns, equality))
+        candidate.reasons.add(reason)
+        candidate.uses += 1
+
+    for table, columns, parent in foreign_key_columns(conn):
+        add(table, columns, f"foreign key -> {parent}")
+
+    for query in queries:
+        for table, columns, covered in lookup_patterns(query.sql):
+            add(table, columns, f"lookup at {query.location}", covered)
+
+    merged = _merge_prefixes(candidates)
+    merged.sort(key=lambda c: (-c.uses, c.table, c.columns))
+    return merged
+
+
+def full_scans(conn: sqlite3.Connection, queries: Sequence[Query]) -> List[Tuple[int, Query, List[str]]]:
+    """
+    EXPLAIN QUERY PLAN full scans, as (occurrences, query, scan details),
+    most frequent statements first.
+    """
+    counts = Counter(query.sql for query in queries)
+    seen = set()
+    scans = []
+    for query in queries:
+        if query.sql in seen or re.search(r":\w+|\{", query.sql):
+            continue
+        seen.add(query.sql)
+        try:
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {query.sql}", [None] * query.sql.count("?")).fetchall()
+        except sqlite3.Error:
+            # Needs tables or columns this database does not have
+            continue
+        details = [row[3] for row in plan
+                   if row[3].startswith("SCAN ") and "USING" not in row[3] and "CONSTANT" not in row[3]]
+        if details:
+            scans.append((counts[query.sql], query, details))
+    scans.sort(key=lambda s: -s[0])
+    return scans
+
+
+def render_migration(candidates: Sequence[IndexCandidate], revision: str, down_revision: str,
+                     create_date: str) -> str:
+    """Alembic migration creating the candidates (skipping absent tables/columns)"""
+    def why(candidate: IndexCandidate) -> str:
+        reasons = sorted(candidate.reasons)
+        return reasons[0] + (f" (+{len(reasons) - 1} more)" if len(reasons) > 1 else "")
+
+    entries = "\n".join(
+        f"    # {why(c)}\n    ({c.table!r}, {c.name!r}, {c.columns!r}),"
+        for c in candidates
+    )
+    return f'''"""Add missing foreign-key and lookup indexes
+
+Generated by scripts/audit_indexes.py: every foreign key column and every
+equality lookup used by the routes and reconstructors gets an index (covering
+for narrow lookups). Tables or columns absent from a database are skipped.
+
+Revision ID: {revision}
+Revises: {down_revision}
+Create Date: {create_date}
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = {revision!r}
+down_revision = {down_revision!r}
+branch_labels = None
+depends_on = None
+
+# (table, index name, columns)
+INDEXES = [
+{entries}
+]
+
+
+def _columns(conn, table):
+    return {{row[1] for row in conn.execute(text(f'PRAGMA table_info("{{table}}")'))}}
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    for table, name, columns in INDEXES:
+        if not set(columns) <= _columns(conn, table):
+            continue
+        op.execute(f"CREATE INDEX IF NOT EXISTS {{name}} ON {{table}}({{', '.join(columns)}})")
+    op.execute("ANALYZE")
+
+
+def downgrade() -> None:
+    for _, name, _ in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {{name}}")
+'''
@@ -0,0 +1,357 @@
+"""
+Sampling Profiler for Long-Running Jobs
+
+Opt-in profiling of imports, PQA runs and Celery tasks in production:
+- A job run is profiled when it is started with its ``profile`` flag, or
+  when an admin armed the job for its next N runs (``JobProfiles.arm``)
+- A sampler thread snapshots the job thread's stack every few milliseconds
+  (``sys._current_frames``); the job itself runs uninstrumented
+- Identical stacks are aggregated by time spent, so a profile stays small
+  however long the job runs
+- Profiles are saved in speedscope's file format; ``collapsed_stacks``
+  converts them for flamegraph.pl / inferno
+- The oldest profiles are pruned beyond the retention count
+
+Jobs hook in with ``profiled(job)``, as a context manager or as a
+decorator of sync or async functions. Celery tasks are armed by task name
+and profiled in the worker (see celery_app.py); workers write to their own
+PROFILE_DIR, so share it with the API to list their profiles there.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_RETENTION = int(os.getenv("PROFILE_RETENTION_COUNT", "50"))
+SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "3600"))
+MAX_STACK_DEPTH = 256
+
+PROFILE_SUFFIX = ".speedscope.json"
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+# Jobs that can be armed, besides Celery tasks (armed by their task name)
+JOBS = {
+    "iodd.import": "IODD file or package upload (POST /api/iodd/upload)",
+    "eds.import": "EDS file upload (POST /api/eds/upload)",
+    "eds.package_import": "EDS package upload (POST /api/eds/upload-package)",
+    "pqa.analyze_all": "Bulk PQA analysis (POST /api/pqa/analyze-all)",
+    "pqa.daily": "Scheduled daily PQA analysis (PQAScheduler)",
+}
+CELERY_TASK_PREFIX = "src.tasks."
+
+# (function, file, first line)
+Frame = Tuple[str, str, int]
+
+
+def is_profileable(job: str) -> bool:
+    return job in JOBS or job.startswith(CELERY_TASK_PREFIX)
+
+
+class SamplingProfiler:
+    """Samples the stacks of attached threads from a background thread"""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL_MS / 1000, max_seconds: float = PROFILE_MAX_SECONDS,
+                 max_depth: int = MAX_STACK_DEPTH):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.max_depth = max_depth
+        self.threads: Dict[int, str] = {}
+        # thread id -> stack (root first) -> seconds
+        self.stacks: Dict[int, Dict[Tuple[Frame, ...], float]] = {}
+        self.samples = 0
+        self.truncated = False
+        self.started_at: Optional[datetime] = None
+        self.duration = 0.0
+        self._start = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def attach(self, thread: Optional[threading.Thread] = None):
+        """Sample thread (default: the calling thread)"""
+        thread = thread or threading.current_thread()
+        self.threads[thread.ident] = thread.name
+
+    def start(self):
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="job-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self._start
+
+    def _run(self):
+        last = self._start
+        deadline = self._start + self.max_seconds
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            if now > deadline:
+                self.truncated = True
+                break
+            # Weighted by the time since the previous sample, so late wakeups still add up
+            self.sample(now - last)
+            last = now
+
+    def sample(self, weight: float):
+        frames = sys._current_frames()
+        for ident in self.threads:
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            stack.reverse()
+            key = tuple(stack)
+            per_thread = self.stacks.setdefault(ident, {})
+            per_thread[key] = per_thread.get(key, 0.0) + weight
+        self.samples += 1
+
+
+def to_speedscope(profiler: SamplingProfiler, name: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """speedscope document with one sampled profile per thread (weights in milliseconds)"""
+    index: Dict[Frame, int] = {}
+    profiles = []
+    for ident, stacks in profiler.stacks.items():
+        samples, weights = [], []
+        for stack, seconds in stacks.items():
+            samples.append([index.setdefault(frame, len(index)) for frame in stack])
+            weights.append(round(seconds * 1000, 3))
+        profiles.append({
+            "type": "sampled",
+            "name": profiler.threads.get(ident, str(ident)),
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": round(sum(weights), 3),
+            "samples": samples,
+            "weights": weights,
+        })
+
+    return {
+        "$schema": SPEEDSCOPE_SCHEMA,
+        "name": name,
+        "exporter": "greenstack",
+        "activeProfileIndex": 0,
+        "shared": {"frames": [{"name": fn, "file": file, "line": line} for fn, file, line in index]},
+        "profiles": profiles,
+        "metadata": metadata or {},
+    }
+
+
+def collapsed_stacks(document: Dict[str, Any]) -> str:
+    """Folded stacks ("thread;frame;frame microseconds") for flamegraph.pl / inferno"""
+    frames = [f"{frame['name']} ({frame.get('file', '?')}:{frame.get('line', 0)})"
+              for frame in document["shared"]["frames"]]
+    lines = []
+    for profile in document["profiles"]:
+        root = profile["name"].replace(";", ":")
+        for stack, weight in zip(profile["samples"], profile["weights"]):
+            count = round(weight * 1000)
+            if count:
+                lines.append(";".join([root] + [frames[i] for i in stack]) + f" {count}")
+    return "\n".join(lines) + "\n"
+
+
+class JobProfiles:
+    """
+    Armed jobs and stored profiles.
+
+    Arming is per process: jobs armed through the admin routes are profiled
+    when they run in (or, for Celery tasks, are published from) the API
+    process.
+    """
+
+    def __init__(self, profile_dir: str = PROFILE_DIR, retention: int = PROFILE_RETENTION):
+        self.profile_dir = profile_dir
+        self.retention = retention
+        self._armed: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def arm(self, job: str, runs: int = 1) -> Dict[str, Any]:
+        """Profile the next ``runs`` runs of job; raises ValueError for unknown jobs"""
+        if not is_profileable(job):
+            raise ValueError(f"Unknown job '{job}'")
+        with self._lock:
+            self._armed[job] = runs
+        return {"job": job, "armed_runs": runs}
+
+    def disarm(self, job: str) -> bool:
+        with self._lock:
+            return self._armed.pop(job, None) is not None
+
+    def armed(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._armed)
+
+    def consume(self, job: str) -> bool:
+        """Take one armed run of job, if any"""
+        if not self._armed:
+            return False
+        with self._lock:
+            runs = self._armed.get(job, 0)
+            if runs <= 0:
+                return False
+            if runs == 1:
+                del self._armed[job]
+            else:
+                self._armed[job] = runs - 1
+            return True
+
+    def save(self, job: str, profiler: SamplingProfiler, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Write the profile and prune old ones; returns its list entry"""
+        started = profiler.started_at or datetime.now()
+        safe_job = re.sub(r"[^A-Za-z0-9._-]", "_", job)
+        profile_id = f"{safe_job}__{started.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        metadata = {
+            "job": job,
+            "started_at": started.isoformat(),
+            "duration_seconds": round(profiler.duration, 3),
+            "samples": profiler.samples,
+            "sample_interval_ms": profiler.interval * 1000,
+            "truncated": profiler.truncated,
+            "pid": os.getpid(),
+            **(metadata or {}),
+        }
+        document = to_speedscope(profiler, f"{job} {started.isoformat(timespec='seconds')}", metadata)
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, profile_id + PROFILE_SUFFIX)
+        with open(path + ".part", "w") as f:
+            json.dump(document, f, separators=(",", ":"))
+        os.replace(path + ".part", path)
+        self.prune()
+
+        logger.info(f"Saved {job} profile {profile_id} ({profiler.samples} samples, {profiler.duration:.1f}s)")
+        return self._entry(Path(path))
+
+    @staticmethod
+    def _entry(path: Path) -> Dict[str, Any]:
+        profile_id = path.name[:-len(PROFILE_SUFFIX)]
+        stat = path.stat()
+        return {
+            "profile_id": profile_id,
+            "job": profile_id.split("__", 1)[0],
+            "size_kb": round(stat.st_size / 1024, 1),
+            "created_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+        }
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Stored profiles, newest first"""
+        directory = Path(self.profile_dir)
+        if not directory.is_dir():
+            return []
+        paths = sorted(directory.glob(f"*{PROFILE_SUFFIX}"), key=lambda p: p.stat().st_mtime_ns, reverse=True)
+        return [self._entry(path) for path in paths]
+
+    def prune(self) -> List[str]:
+        if self.retention <= 0:
+            return []
+        removed = []
+        for entry in self.list()[self.retention:]:
+            path = self.path(entry["profile_id"])
+            try:
+                os.unlink(path)
+                removed.append(entry["profile_id"])
+            except OSError as e:
+                logger.warning(f"Could not delete old profile {entry['profile_id']}: {e}")
+        return removed
+
+    def path(self, profile_id: str) -> Optional[str]:
+        """Path of a stored profile, or None for unknown ids (no path traversal)"""
+        if os.path.basename(profile_id) != profile_id or profile_id.startswith("."):
+            return None
+        path = os.path.join(self.profile_dir, profile_id + PROFILE_SUFFIX)
+        return path if os.path.isfile(path) else None
+
+    def load(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        path = self.path(profile_id)
+        if path is None:
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def delete(self, profile_id: str) -> bool:
+        path = self.path(profile_id)
+        if path is None:
+            return False
+        os.unlink(path)
+        return True
+
+
+job_profiles = JobProfiles()
+
+
+class ProfiledJob:
+    """Profile a job run if it is flagged or armed (see ``profiled``)"""
+
+    def __init__(self, job: str, enabled: bool = False, store: Optional[JobProfiles] = None, **metadata):
+        self.job = job
+        self.enabled = enabled
+        self.store = store or job_profiles
+        self.metadata = metadata
+        self.profiler: Optional[SamplingProfiler] = None
+
+    def __enter__(self) -> Optional[SamplingProfiler]:
+        if self.enabled or self.store.consume(self.job):
+            self.profiler = SamplingProfiler()
+            self.profiler.attach()
+            self.profiler.start()
+        return self.profiler
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profiler is None:
+            return False
+        self.profiler.stop()
+        metadata = {"status": "failed" if exc_type else "completed", **self.metadata}
+        if exc_type:
+            metadata["error"] = str(exc)
+        try:
+            self.store.save(self.job, self.profiler, metadata)
+        except Exception as e:
+            logger.warning(f"Could not save {self.job} profile: {e}")
+        return False
+
+    def __call__(self, func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with ProfiledJob(self.job, self.enabled, self.store, **self.metadata):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with ProfiledJob(self.job, self.enabled, self.store, **self.metadata):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def profiled(job: str, enabled: bool = False, store: Optional[JobProfiles] = None, **metadata) -> ProfiledJob:
+    """
+    Profile a job run when ``enabled`` or when the job is armed.
+
+    Usable as ``with profiled("pqa.daily"): ...`` or as a decorator. Only the
+    calling thread is sampled; async functions are sampled on the event
+    loop thread, so other requests served while they await show up too.
+    Extra keyword arguments are stored in the profile's metadata.
+    """
+    return ProfiledJob(job, enabled, store, **metadata)
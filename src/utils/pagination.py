@@ -0,0 +1,199 @@
+"""
+Keyset Pagination
+
+Shared paging layer for list endpoints:
+- Keyset cursors on (sort_key, id), so page N costs the same as page 1
+- ``fields=`` projection of the returned objects
+- Total count only when asked for (``include_total=true``)
+
+Responses stay plain JSON arrays; paging metadata travels in headers
+(``X-Next-Cursor``, ``Link: rel="next"``, ``X-Total-Count``).
+
+Usage:
+    DEVICE_SORTS = {"import_date": "COALESCE(import_date, '')", "name": "product_name"}
+
+    @app.get("/api/things")
+    async def list_things(request: Request,
+                          page: PageParams = Depends(page_params(DEVICE_SORTS, "import_date", "desc"))):
+        rows, next_cursor, total = fetch_page(conn, "SELECT ... FROM things", [], page, DEVICE_SORTS)
+        return paginated_response(request, rows, page, next_cursor, total)
+"""
+
+import base64
+import json
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, Request
+
+from src import config
+from src.utils.fast_json import FastJSONResponse
+
+SORT_KEY_COLUMN = "_page_sort_key"
+ID_KEY_COLUMN = "_page_id_key"
+
+
+@dataclass
+class PageParams:
+    """Parsed paging query parameters"""
+    limit: Optional[int]
+    sort: str
+    order: str
+    after: Optional[Tuple[Any, Any]]
+    fields: Optional[List[str]]
+    include_total: bool
+
+
+def encode_token(value: Any) -> str:
+    """Encode a JSON value as an opaque URL-safe cursor token"""
+    payload = json.dumps(value, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_token(token: str) -> Any:
+    """Decode a cursor token (HTTP 400 if malformed)"""
+    try:
+        return json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_cursor(sort: str, order: str, sort_value: Any, id_value: Any) -> str:
+    return encode_token([sort, order, sort_value, id_value])
+
+
+def decode_cursor(cursor: str, sort: str, order: str) -> Tuple[Any, Any]:
+    """Decode a cursor, rejecting ones issued for a different sort"""
+    try:
+        cursor_sort, cursor_order, sort_value, id_value = decode_token(cursor)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if (cursor_sort, cursor_order) != (sort, order):
+        raise HTTPException(status_code=400, detail="Cursor was issued for a different sort order")
+    return sort_value, id_value
+
+
+def page_params(
+    sort_fields: Dict[str, str],
+    default_sort: str,
+    default_order: str = "asc"
+) -> Callable[..., PageParams]:
+    """Build a FastAPI dependency parsing limit/cursor/sort/order/fields/include_total"""
+    sort_pattern = f"^({'|'.join(sort_fields)})$"
+
+    def dependency(
+        limit: Optional[int] = Query(None, ge=1, description="Page size (default: unpaginated unless configured)"),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's X-Next-Cursor"),
+        sort: str = Query(default_sort, pattern=sort_pattern, description="Sort key"),
+        order: str = Query(default_order, pattern="^(asc|desc)$"),
+        fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+        include_total: bool = Query(False, description="Return the total row count in X-Total-Count")
+    ) -> PageParams:
+        if limit is None and config.DEFAULT_PAGE_SIZE > 0:
+            limit = config.DEFAULT_PAGE_SIZE
+        if limit is not None:
+            limit = min(limit, config.MAX_PAGE_SIZE)
+        if cursor and limit is None:
+            limit = config.MAX_PAGE_SIZE
+
+        return PageParams(
+            limit=limit,
+            sort=sort,
+            order=order,
+            after=decode_cursor(cursor, sort, order) if cursor else None,
+            fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+            include_total=include_total,
+        )
+
+    return dependency
+
+
+def fetch_page(
+    conn: sqlite3.Connection,
+    base_query: str,
+    params: Sequence[Any],
+    page: PageParams,
+    sort_fields: Dict[str, str],
+    id_expr: str = "id"
+) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[int]]:
+    """
+    Run one page of ``base_query``.
+
+    Sort and id expressions refer to the base query's output columns. The
+    query is wrapped so the keyset predicate and ORDER BY apply on top of any
+    filters; SQLite flattens the subquery, so indexes on the sort columns
+    still serve it. Sort expressions must never be NULL (row-value
+    comparisons with NULL match nothing), so wrap nullable columns in COALESCE.
+
+    Returns:
+        (rows as dicts, next cursor or None, total count or None)
+    """
+    sort_expr = sort_fields[page.sort]
+    direction = "DESC" if page.order == "desc" else "ASC"
+    comparison = "<" if page.order == "desc" else ">"
+
+    query = (
+        f"SELECT page_q.*, {sort_expr} AS {SORT_KEY_COLUMN}, {id_expr} AS {ID_KEY_COLUMN} "
+        f"FROM ({base_query}) AS page_q"
+    )
+    query_params = list(params)
+    if page.after is not None:
+        query += f" WHERE ({sort_expr}, {id_expr}) {comparison} (?, ?)"
+        query_params.extend(page.after)
+    query += f" ORDER BY {sort_expr} {direction}, {id_expr} {direction}"
+    if page.limit is not None:
+        # One extra row tells us whether there is a next page
+        query += " LIMIT ?"
+        query_params.append(page.limit + 1)
+
+    previous_factory = conn.row_factory
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(query, query_params).fetchall()
+        total = None
+        if page.include_total:
+            total = conn.execute(f"SELECT COUNT(*) FROM ({base_query})", list(params)).fetchone()[0]
+    finally:
+        conn.row_factory = previous_factory
+
+    next_cursor = None
+    if page.limit is not None and len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(page.sort, page.order, last[SORT_KEY_COLUMN], last[ID_KEY_COLUMN])
+
+    items = []
+    for row in rows:
+        item = dict(row)
+        del item[SORT_KEY_COLUMN]
+        del item[ID_KEY_COLUMN]
+        items.append(item)
+    return items, next_cursor, total
+
+
+def project(items: List[Dict[str, Any]], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Keep only the requested top-level fields"""
+    if not fields or not items:
+        return items
+    unknown = [field for field in fields if field not in items[0]]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return [{field: item[field] for field in fields} for item in items]
+
+
+def paginated_response(
+    request: Request,
+    items: List[Dict[str, Any]],
+    page: PageParams,
+    next_cursor: Optional[str],
+    total: Optional[int] = None
+) -> FastJSONResponse:
+    """JSON array response with paging metadata in headers"""
+    headers = {}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+    return FastJSONResponse(content=project(items, page.fields), headers=headers)
@@ -2,7 +2,8 @@
 PQA Automated Scheduler
 
 Handles automated PQA analysis scheduling:
-- Run on server startup for unanalyzed devices
+- Run after server startup for unanalyzed devices, deferred until the API
+  reports ready (so it does not compete with startup and readiness)
 - Daily scheduled runs
 - Re-analysis of failed/old analyses
 """
@@ -14,6 +15,7 @@ import time
 from datetime import datetime, timedelta
 from typing import Optional
 
+from .job_profiler import profiled
 from .pqa_orchestrator import UnifiedPQAOrchestrator, FileType
 
 logger = logging.getLogger(__name__)
@@ -29,11 +31,22 @@ class PQAScheduler:
     - Manual triggers
     """
 
-    def __init__(self, db_path: str = "greenstack.db", enabled: bool = True):
+    def __init__(self, db_path: str = "greenstack.db", enabled: bool = True,
+                 startup_delay: float = 30, ready_timeout: float = 300):
+        """
+        Args:
+            db_path: Database path
+            enabled: Start the scheduler threads at all
+            startup_delay: Seconds between readiness and the startup analysis
+            ready_timeout: Longest wait for readiness before running anyway
+        """
         self.db_path = db_path
         self.enabled = enabled
+        self.startup_delay = startup_delay
+        self.ready_timeout = ready_timeout
         self.orchestrator = UnifiedPQAOrchestrator(db_path)
         self._stop_flag = threading.Event()
+        self._ready = threading.Event()
         self._scheduler_thread: Optional[threading.Thread] = None
         self._startup_complete = False
 
@@ -45,7 +58,7 @@ class PQAScheduler:
 
         logger.info("Starting PQA scheduler...")
 
-        # Run startup analysis in background thread
+        # Run startup analysis in background thread (after readiness)
         startup_thread = threading.Thread(target=self._run_startup_analysis, daemon=True)
         startup_thread.start()
 
@@ -63,8 +76,28 @@ class PQAScheduler:
             self._scheduler_thread.join(timeout=5)
         logger.info("PQA scheduler stopped")
 
+    def notify_ready(self):
+        """The API reported ready: the startup analysis may begin"""
+        if not self._ready.is_set():
+            logger.info(f"API ready; PQA startup analysis begins in {self.startup_delay}s")
+            self._ready.set()
+
+    def _wait_for_readiness(self) -> bool:
+        """Wait for readiness plus the startup delay; False if stopped meanwhile"""
+        deadline = time.monotonic() + self.ready_timeout
+        while not self._ready.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.info("No readiness signal; running PQA startup analysis anyway")
+                break
+            if self._stop_flag.wait(timeout=min(remaining, 1.0)):
+                return False
+        return not self._stop_flag.wait(timeout=self.startup_delay)
+
     def _run_startup_analysis(self):
-        """Run PQA analysis for all unanalyzed devices on server startup"""
+        """Run PQA analysis for all unanalyzed devices once the server is ready"""
+        if not self._wait_for_readiness():
+            return
         try:
             logger.info("Running PQA startup analysis for unanalyzed devices...")
 
@@ -177,7 +210,8 @@ class PQAScheduler:
                 now = datetime.now()
                 if now >= next_run:
                     logger.info("Starting daily PQA analysis...")
-                    self._run_daily_analysis()
+                    with profiled("pqa.daily"):
+                        self._run_daily_analysis()
 
                     # Schedule next run
                     next_run = self._get_next_daily_run_time()
@@ -282,17 +316,24 @@ class PQAScheduler:
 _scheduler: Optional[PQAScheduler] = None
 
 
-def init_pqa_scheduler(db_path: str = "greenstack.db", enabled: bool = True) -> PQAScheduler:
+def init_pqa_scheduler(db_path: str = "greenstack.db", enabled: bool = True,
+                       startup_delay: float = 30, ready_timeout: float = 300) -> PQAScheduler:
     """Initialize the global PQA scheduler"""
     global _scheduler
 
     if _scheduler is None:
-        _scheduler = PQAScheduler(db_path, enabled)
+        _scheduler = PQAScheduler(db_path, enabled, startup_delay, ready_timeout)
         _scheduler.start()
 
     return _scheduler
 
 
+def notify_pqa_ready():
+    """Tell the global scheduler the API is ready (called by the readiness probe)"""
+    if _scheduler:
+        _scheduler.notify_ready()
+
+
 def get_pqa_scheduler() -> Optional[PQAScheduler]:
     """Get the global PQA scheduler instance"""
     return _scheduler
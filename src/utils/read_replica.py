@@ -0,0 +1,155 @@
+"""
+Read Routing for Dashboards and Diagnostics
+
+Analytics queries (PQA dashboards, admin diagnostics) open their
+connections with ``get_analytics_connection()``:
+- Connections are read-only (``mode=ro`` + ``query_only``), so a dashboard
+  never takes or waits for a write lock
+- With ``READ_REPLICA_PATH`` set, they read a replica file instead of the
+  live database. The replica is a snapshot taken with the online backup
+  API (see db_backup.py) and swapped in atomically; open readers keep the
+  previous file until they close. A background thread refreshes it every
+  ``READ_REPLICA_REFRESH_SECONDS``
+- A replica older than ``READ_REPLICA_MAX_AGE_SECONDS`` (or missing) is
+  skipped and the live database is read instead
+
+Replica reads lag the database by up to the refresh interval.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from src.database import get_db_path, get_read_connection
+from src.utils.db_backup import snapshot_database
+
+logger = logging.getLogger(__name__)
+
+READ_REPLICA_PATH = os.getenv("READ_REPLICA_PATH", "")
+READ_REPLICA_REFRESH_SECONDS = float(os.getenv("READ_REPLICA_REFRESH_SECONDS", "300"))
+READ_REPLICA_MAX_AGE_SECONDS = float(os.getenv("READ_REPLICA_MAX_AGE_SECONDS", "900"))
+
+
+class ReadReplica:
+    """
+    A snapshot of the database for read-only analytics.
+
+    Without a path the replica is disabled and reads go to the database.
+    """
+
+    def __init__(self, path: str = "", interval: float = 300, max_age: float = 900,
+                 db_path: Callable[[], str] = get_db_path):
+        self.path = path
+        self.interval = interval
+        self.max_age = max_age
+        self.db_path = db_path
+        self._refresh_lock = threading.Lock()
+        self._last: Dict[str, Any] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def age(self) -> Optional[float]:
+        """Seconds since the replica was last refreshed (None: no replica)"""
+        try:
+            return max(0.0, time.time() - os.path.getmtime(self.path))
+        except OSError:
+            return None
+
+    def fresh_path(self) -> Optional[str]:
+        """Path of the replica if it is within max_age, else None"""
+        if not self.enabled:
+            return None
+        age = self.age()
+        if age is None or age > self.max_age:
+            return None
+        return self.path
+
+    def refresh(self) -> Dict[str, Any]:
+        """Snapshot the database into the replica; concurrent calls wait for the running one"""
+        if not self.enabled:
+            raise RuntimeError("No read replica configured (READ_REPLICA_PATH)")
+        with self._refresh_lock:
+            start = time.perf_counter()
+            part_path = self.path + ".part"
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                snapshot_database(self.db_path(), part_path)
+                os.replace(part_path, self.path)
+            except Exception as e:
+                self._last = {"status": "failed", "error": str(e), "at": datetime.now().isoformat()}
+                raise
+            finally:
+                if os.path.exists(part_path):
+                    os.unlink(part_path)
+            self._last = {
+                "status": "completed",
+                "error": None,
+                "at": datetime.now().isoformat(),
+                "seconds": round(time.perf_counter() - start, 3),
+            }
+            logger.info(f"Read replica refreshed in {self._last['seconds']}s")
+            return dict(self._last)
+
+    def status(self) -> Dict[str, Any]:
+        age = self.age() if self.enabled else None
+        return {
+            "enabled": self.enabled,
+            "path": self.path or None,
+            "age_seconds": None if age is None else round(age, 1),
+            "in_use": self.fresh_path() is not None,
+            "refresh_interval_seconds": self.interval,
+            "max_age_seconds": self.max_age,
+            "refreshing": self._refresh_lock.locked(),
+            "last_refresh": dict(self._last) or None,
+        }
+
+    def start(self):
+        """Refresh in a background thread every interval (no-op without a path)"""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="read-replica", daemon=True)
+        self._thread.start()
+        logger.info(f"Read replica refresher started (every {self.interval}s, {self.path})")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Read replica refresh failed: {e}", exc_info=True)
+            self._stop.wait(self.interval)
+
+
+read_replica = ReadReplica(READ_REPLICA_PATH, READ_REPLICA_REFRESH_SECONDS, READ_REPLICA_MAX_AGE_SECONDS)
+
+
+def get_analytics_connection(use_replica: bool = True) -> sqlite3.Connection:
+    """
+    Read-only connection for analytics queries
+
+    Args:
+        use_replica: Read the replica when it is fresh (False: always the database)
+
+    Returns:
+        sqlite3.Connection object (rows are sqlite3.Row)
+    """
+    path = (read_replica.fresh_path() if use_replica else None) or get_db_path()
+    return get_read_connection(path)
+
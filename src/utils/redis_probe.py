@@ -0,0 +1,31 @@
+"""
+Redis Reachability Probe
+
+Checks whether a Redis URL accepts TCP connections without importing the
+redis client (which takes ~150ms to import), so optional Redis features can
+skip loading it when no server is running.
+"""
+
+import socket
+from urllib.parse import urlsplit
+
+
+def redis_reachable(url: str, timeout: float = 1.0) -> bool:
+    """
+    True if the server behind a ``redis://`` or ``rediss://`` URL accepts
+    connections. Other schemes (e.g. ``unix://``) are left to the client and
+    reported as reachable.
+    """
+    try:
+        parts = urlsplit(url)
+        if parts.scheme not in ("redis", "rediss"):
+            return True
+        address = (parts.hostname or "localhost", parts.port or 6379)
+    except ValueError:
+        return False
+
+    try:
+        with socket.create_connection(address, timeout=timeout):
+            return True
+    except OSError:
+        return False
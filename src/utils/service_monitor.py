@@ -0,0 +1,243 @@
+"""
+Service Status Sampler
+
+Keeps an in-memory snapshot of the managed services (MQTT, InfluxDB,
+Node-RED, Grafana) so status and health polls are answered without
+syscalls:
+- A background thread refreshes the snapshot every ``interval`` seconds
+- PIDs come from the service's ``pid_file`` if configured, else from a
+  name -> PID cache; cached PIDs are checked for liveness (same process
+  name and start time, so a recycled PID is not mistaken for the service)
+- The process table is only walked for services without a live PID, and
+  at most every ``scan_interval`` seconds
+- The config file is re-read only when its mtime changes; executable
+  lookups are cached per config
+
+Without a running thread (e.g. in tests) ``snapshot()`` samples inline
+once the snapshot is older than ``interval``.
+"""
+
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+def port_available(port: int) -> bool:
+    """True if nothing listens on the port (bind test)"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(('localhost', port))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def executable_exists(executable: str) -> bool:
+    """Check if an executable exists in PATH"""
+    if os.name == 'nt':  # Windows
+        executable = executable if executable.endswith('.exe') else f"{executable}.exe"
+    return shutil.which(executable) is not None
+
+
+def read_pid_file(path: Optional[str]) -> Optional[int]:
+    if not path:
+        return None
+    try:
+        return int(Path(path).read_text().strip())
+    except (OSError, ValueError):
+        return None
+
+
+class ServiceMonitor:
+    """Background sampler of service processes, ports and executables"""
+
+    def __init__(
+        self,
+        load_config: Callable[[], Dict[str, Dict]],
+        config_path: Path,
+        interval: float = 5.0,
+        scan_interval: float = 30.0,
+    ):
+        self.load_config = load_config
+        self.config_path = Path(config_path)
+        self.interval = interval
+        self.scan_interval = scan_interval
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._config: Optional[Dict[str, Dict]] = None
+        self._config_mtime: Optional[int] = None
+        self._executables: Dict[str, bool] = {}
+        # service id -> (pid, create_time)
+        self._pids: Dict[str, Tuple[int, float]] = {}
+        self._last_scan = 0.0
+        self._snapshot: Dict[str, Any] = {"sampled_at": 0.0, "services": {}}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="service-monitor", daemon=True)
+        self._thread.start()
+        logger.info(f"Service monitor started (every {self.interval}s)")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Service monitor refresh failed: {e}", exc_info=True)
+            self._stop.wait(self.interval)
+
+    # ------------------------------------------------------------------
+    # Config
+    # ------------------------------------------------------------------
+
+    def config(self) -> Dict[str, Dict]:
+        """Service config, re-read only when the file changed"""
+        try:
+            mtime = self.config_path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        with self._lock:
+            if self._config is None or mtime != self._config_mtime:
+                self._config = self.load_config()
+                self._config_mtime = mtime
+                self._executables.clear()
+            return self._config
+
+    def invalidate_config(self):
+        """Forget the cached config (after saving it)"""
+        with self._lock:
+            self._config = None
+
+    # ------------------------------------------------------------------
+    # Processes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _alive(pid: int, process_name: str, create_time: Optional[float] = None) -> Optional[float]:
+        """Start time of pid if it is still the named process, else None"""
+        try:
+            proc = psutil.Process(pid)
+            started = proc.create_time()
+            if create_time is not None and started != create_time:
+                return None
+            if process_name.lower() not in proc.name().lower():
+                return None
+            return started
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return None
+
+    def remember(self, service_id: str, pid: int, process_name: str):
+        """Record a PID learned elsewhere (e.g. right after starting the service)"""
+        started = self._alive(pid, process_name)
+        if started is not None:
+            with self._lock:
+                self._pids[service_id] = (pid, started)
+
+    def forget(self, service_id: str):
+        with self._lock:
+            self._pids.pop(service_id, None)
+
+    def _resolve_pids(self, config: Dict[str, Dict], force_scan: bool) -> Dict[str, Optional[int]]:
+        pids: Dict[str, Optional[int]] = {}
+        missing = []
+
+        for service_id, service in config.items():
+            name = service['process_name']
+            pid_file_pid = read_pid_file(service.get('pid_file'))
+            if pid_file_pid and self._alive(pid_file_pid, name) is not None:
+                pids[service_id] = pid_file_pid
+                continue
+
+            cached = self._pids.get(service_id)
+            if cached and self._alive(cached[0], name, cached[1]) is not None:
+                pids[service_id] = cached[0]
+                continue
+
+            self._pids.pop(service_id, None)
+            pids[service_id] = None
+            missing.append(service_id)
+
+        now = time.monotonic()
+        if missing and (force_scan or now - self._last_scan >= self.scan_interval):
+            self._last_scan = now
+            wanted = {service_id: config[service_id]['process_name'].lower() for service_id in missing}
+            try:
+                for proc in psutil.process_iter(['name', 'create_time']):
+                    proc_name = (proc.info.get('name') or '').lower()
+                    for service_id, name in list(wanted.items()):
+                        if name in proc_name:
+                            self._pids[service_id] = (proc.pid, proc.info['create_time'])
+                            pids[service_id] = proc.pid
+                            del wanted[service_id]
+                    if not wanted:
+                        break
+            except Exception as e:
+                logger.warning(f"Process scan failed: {e}")
+        return pids
+
+    # ------------------------------------------------------------------
+    # Snapshot
+    # ------------------------------------------------------------------
+
+    def refresh(self, force_scan: bool = False) -> Dict[str, Any]:
+        """Sample all services now and replace the snapshot"""
+        config = self.config()
+        pids = self._resolve_pids(config, force_scan)
+
+        services = {}
+        for service_id, service in config.items():
+            executable = service['executable']
+            if executable not in self._executables:
+                self._executables[executable] = executable_exists(executable)
+            config_file = service.get('config_file')
+            services[service_id] = {
+                "pid": pids[service_id],
+                "port": service['port'],
+                "port_available": port_available(service['port']),
+                "executable_found": self._executables[executable],
+                "config_valid": Path(config_file).exists() if config_file else True,
+            }
+
+        snapshot = {"sampled_at": time.time(), "services": services}
+        with self._lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Latest snapshot; sampled inline if stale and no thread is running"""
+        with self._lock:
+            snapshot = self._snapshot
+        if not self.running and time.time() - snapshot["sampled_at"] >= self.interval:
+            return self.refresh()
+        return snapshot
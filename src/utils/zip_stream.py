@@ -0,0 +1,219 @@
+"""
+Streaming ZIP Writer
+
+Builds ZIP archives as a stream of chunks for StreamingResponse instead of
+materializing the whole archive in memory or in a temp file:
+- Entries are declared up front and only read while the archive is generated
+- Files and SQLite BLOBs are read incrementally in fixed-size chunks
+- Already-compressed assets (images, archives) are stored rather than deflated
+
+Memory use is bounded by the chunk size plus zlib state, independent of the
+number or size of entries.
+"""
+
+import logging
+import os
+import sqlite3
+import time
+import zipfile
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Deflating these again costs CPU and gains nothing
+STORED_EXTENSIONS = {
+    'png', 'jpg', 'jpeg', 'gif', 'webp', 'ico', 'bmp',
+    'zip', 'gz', 'tgz', 'bz2', 'xz', '7z', 'rar', 'iodd',
+    'pdf', 'mp4', 'mp3', 'parquet',
+}
+
+
+class _ChunkSink:
+    """Write-only, unseekable file object collecting zipfile output until drained"""
+
+    def __init__(self):
+        self._parts = []
+        self.pending = 0
+
+    def write(self, data) -> int:
+        if data:
+            self._parts.append(bytes(data))
+            self.pending += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        self.pending = 0
+        return data
+
+
+@dataclass
+class _Entry:
+    arcname: str
+    chunks: Callable[[], Iterable[bytes]]
+    size: Optional[int]
+    compress_type: int
+
+
+def iter_file(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Read a file in fixed-size chunks"""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def iter_blob(
+    db_path: str,
+    table: str,
+    column: str,
+    rowid: int,
+    chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Read a SQLite BLOB in fixed-size chunks.
+
+    Uses incremental BLOB I/O where available; values stored as TEXT (or
+    Python builds without ``Connection.blobopen``) fall back to reading the
+    single value and slicing it.
+    """
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        try:
+            blob = conn.blobopen(table, column, rowid, readonly=True)
+        except (AttributeError, sqlite3.OperationalError):
+            blob = None
+
+        if blob is not None:
+            with blob:
+                while True:
+                    chunk = blob.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+            return
+
+        row = conn.execute(f"SELECT {column} FROM {table} WHERE rowid = ?", (rowid,)).fetchone()
+        value = row[0] if row else None
+        if value is None:
+            return
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        for offset in range(0, len(value), chunk_size):
+            yield value[offset:offset + chunk_size]
+    finally:
+        conn.close()
+
+
+class ZipStream:
+    """
+    Lazily generated ZIP archive.
+
+    Usage:
+        archive = ZipStream()
+        archive.add("metadata.json", json.dumps(meta))
+        archive.add_file("docs/manual.pdf", "/data/manual.pdf")
+        archive.add_blob("device.xml", db_path, "iodd_assets", "file_content", asset_id)
+        return StreamingResponse(archive, media_type="application/zip")
+
+    Iteration is synchronous, so Starlette runs it in its threadpool; BLOB
+    readers open their own connection for that reason.
+    """
+
+    def __init__(self, store_only: bool = False, chunk_size: int = CHUNK_SIZE):
+        self.store_only = store_only
+        self.chunk_size = chunk_size
+        self._entries = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _compress_type(self, arcname: str, compress: Optional[bool]) -> int:
+        if compress is None:
+            extension = arcname.rsplit('.', 1)[-1].lower() if '.' in arcname else ''
+            compress = not self.store_only and extension not in STORED_EXTENSIONS
+        return zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+
+    def add(self, arcname: str, data: Union[bytes, str], compress: Optional[bool] = None):
+        """Add an in-memory entry"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self._entries.append(_Entry(
+            arcname, lambda: (data,), len(data), self._compress_type(arcname, compress)
+        ))
+
+    def add_file(self, arcname: str, path: str, compress: Optional[bool] = None):
+        """Add a file from disk, read in chunks while streaming"""
+        chunk_size = self.chunk_size
+        self._entries.append(_Entry(
+            arcname, lambda: iter_file(path, chunk_size), os.path.getsize(path),
+            self._compress_type(arcname, compress)
+        ))
+
+    def add_blob(
+        self,
+        arcname: str,
+        db_path: str,
+        table: str,
+        column: str,
+        rowid: int,
+        size: Optional[int] = None,
+        compress: Optional[bool] = None
+    ):
+        """Add a SQLite BLOB, read incrementally while streaming"""
+        chunk_size = self.chunk_size
+        self._entries.append(_Entry(
+            arcname, lambda: iter_blob(db_path, table, column, rowid, chunk_size), size,
+            self._compress_type(arcname, compress)
+        ))
+
+    def add_chunks(
+        self,
+        arcname: str,
+        chunks: Callable[[], Iterable[bytes]],
+        size: Optional[int] = None,
+        compress: Optional[bool] = None
+    ):
+        """Add an entry produced by a chunk iterator factory"""
+        self._entries.append(_Entry(arcname, chunks, size, self._compress_type(arcname, compress)))
+
+    def __iter__(self) -> Iterator[bytes]:
+        sink = _ChunkSink()
+        date_time = time.localtime()[:6]
+
+        # An unseekable sink makes zipfile write sizes in data descriptors
+        with zipfile.ZipFile(sink, 'w') as zf:
+            for entry in self._entries:
+                zinfo = zipfile.ZipInfo(entry.arcname, date_time=date_time)
+                zinfo.compress_type = entry.compress_type
+                zinfo.external_attr = 0o644 << 16
+                if entry.size is not None:
+                    # Lets zipfile decide up front whether ZIP64 headers are needed
+                    zinfo.file_size = entry.size
+
+                with zf.open(zinfo, 'w') as dest:
+                    for chunk in entry.chunks():
+                        dest.write(chunk)
+                        if sink.pending >= self.chunk_size:
+                            yield sink.drain()
+                if sink.pending >= self.chunk_size:
+                    yield sink.drain()
+
+        # Remaining entry data plus the central directory
+        if sink.pending:
+            yield sink.drain()
+
+
+def content_disposition(filename: str) -> str:
+    """Attachment Content-Disposition header value for a download filename"""
+    safe = filename.replace('"', '').replace('\r', '').replace('\n', '')
+    return f'attachment; filename="{safe}"'
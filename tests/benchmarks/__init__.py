@@ -0,0 +1,12 @@
+"""
+Performance Benchmarks for GreenStack
+=====================================
+
+pytest-benchmark suite over the real IODD/EDS corpus in test-data/:
+- test_parse_benchmarks.py - IODDParser.parse and parse_eds_file
+- test_pipeline_benchmarks.py - save_device, IODD/EDS reconstruction, diff analyzers
+- test_api_benchmarks.py - main GET endpoints
+
+Not collected by a plain ``pytest`` run; use ``make benchmark`` (saves JSON
+results) and ``make benchmark-check`` (fails on regressions).
+"""
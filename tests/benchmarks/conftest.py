@@ -0,0 +1,189 @@
+"""
+Benchmark fixtures: the test-data corpus and a catalog database seeded from it.
+
+The corpus is every distinct ``*IODD1.1.xml`` and ``*.eds`` file under
+test-data/ (language variants and copies are deduplicated by content), so
+results stay comparable for as long as test-data/ is unchanged.
+
+The catalog starts from the deployed schema: the StorageManager tables
+brought to the alembic head (see src/storage/schema.py). Set
+GREENSTACK_BENCHMARK_DB to a migrated database to benchmark against a copy of
+its schema instead. Stages that cannot
+run against the schema are skipped with the database error; with
+GREENSTACK_BENCHMARK_STRICT=1 (``make benchmark``/``make benchmark-check``)
+they fail instead, so a baseline or comparison never silently misses a stage.
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+from pathlib import Path
+from typing import Callable, Generator, List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.greenstack import StorageManager
+from src.storage.schema import build_sqlite_schema
+
+ROOT = Path(__file__).resolve().parents[2]
+TEST_DATA = ROOT / "test-data"
+
+# (file name, content)
+Corpus = List[Tuple[str, str]]
+
+STRICT = os.getenv("GREENSTACK_BENCHMARK_STRICT", "").lower() in ("1", "true")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if STRICT and report.skipped:
+        reason = report.longrepr[2] if isinstance(report.longrepr, tuple) else report.longrepr
+        report.outcome = "failed"
+        report.longrepr = f"Benchmark stage could not run: {reason}"
+
+
+def _distinct_files(pattern: str) -> List[Path]:
+    files = {}
+    for path in sorted(TEST_DATA.glob(pattern)):
+        files.setdefault(hashlib.md5(path.read_bytes()).hexdigest(), path)
+    return sorted(files.values())
+
+
+def _read_text(path: Path) -> str:
+    data = path.read_bytes()
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode('latin-1')
+
+
+# ============================================================================
+# Corpus
+# ============================================================================
+
+@pytest.fixture(scope="session")
+def iodd_corpus() -> Corpus:
+    """Every distinct IODD 1.1 file in test-data/"""
+    corpus = [(path.name, _read_text(path)) for path in _distinct_files("**/*IODD1.1.xml")]
+    if not corpus:
+        pytest.skip("No IODD files in test-data/")
+    return corpus
+
+
+@pytest.fixture(scope="session")
+def eds_corpus() -> Corpus:
+    """Every distinct EDS file in test-data/"""
+    corpus = [(path.name, _read_text(path)) for path in _distinct_files("**/*.eds")]
+    if not corpus:
+        pytest.skip("No EDS files in test-data/")
+    return corpus
+
+
+# ============================================================================
+# Databases
+# ============================================================================
+
+@pytest.fixture(scope="session")
+def schema_db(tmp_path_factory) -> Path:
+    """Empty database with the schema under test; never written to"""
+    path = tmp_path_factory.mktemp("schema") / "schema.db"
+    source = os.getenv("GREENSTACK_BENCHMARK_DB")
+    if source:
+        shutil.copyfile(source, path)
+        conn = sqlite3.connect(path)
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+            " AND name NOT LIKE 'sqlite_%' AND name != 'alembic_version'"
+        )]
+        for table in tables:
+            conn.execute(f'DELETE FROM "{table}"')
+        conn.commit()
+        conn.execute("VACUUM")
+        conn.close()
+        StorageManager(str(path))
+    else:
+        build_sqlite_schema(str(path))
+    return path
+
+
+@pytest.fixture(scope="session")
+def fresh_db(schema_db: Path, tmp_path_factory) -> Callable[[], Path]:
+    """Factory for empty copies of the schema database"""
+    directory = tmp_path_factory.mktemp("fresh")
+    counter = iter(range(1_000_000))
+
+    def make() -> Path:
+        path = directory / f"fresh_{next(counter)}.db"
+        shutil.copyfile(schema_db, path)
+        return path
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def catalog_db(fresh_db: Callable[[], Path]) -> Path:
+    """Database seeded once with the corpus and shared by read benchmarks"""
+    return fresh_db()
+
+
+@pytest.fixture(scope="session")
+def iodd_devices(catalog_db: Path, iodd_corpus: Corpus) -> List[Tuple[int, str]]:
+    """(device id, original XML) for every corpus IODD stored in the catalog"""
+    from src.parsing import IODDParser
+
+    storage = StorageManager(str(catalog_db))
+    devices = []
+    error = None
+    for name, xml in iodd_corpus:
+        try:
+            devices.append((storage.save_device(IODDParser(xml).parse()), xml))
+        except Exception as e:
+            error = error or f"{name}: {e}"
+    if not devices:
+        pytest.skip(f"No IODD could be stored in the benchmark schema ({error})")
+    return devices
+
+
+@pytest.fixture(scope="session")
+def api_client(catalog_db: Path) -> Generator[TestClient, None, None]:
+    """TestClient whose IODD storage and EDS routes both use the catalog"""
+    from src.api import app, manager as api_manager
+    from src.database import get_db_path, set_db_path
+
+    original_storage = api_manager.storage
+    original_db_path = get_db_path()
+    api_manager.storage = StorageManager(str(catalog_db))
+    set_db_path(str(catalog_db))
+
+    yield TestClient(app)
+
+    api_manager.storage = original_storage
+    set_db_path(original_db_path)
+
+
+@pytest.fixture(scope="session")
+def eds_files(api_client: TestClient, eds_corpus: Corpus) -> List[Tuple[int, str]]:
+    """(EDS id, original content) for every corpus EDS imported via the upload route"""
+    from src.routes import eds_routes
+
+    files = []
+    error = None
+    with pytest.MonkeyPatch.context() as mp:
+        # The TestClient runs background tasks inline; PQA is not part of the import path
+        mp.setattr(eds_routes, "queue_eds_pqa_analysis", lambda eds_id: None)
+        for name, content in eds_corpus:
+            response = api_client.post(
+                "/api/eds/upload",
+                files={"file": (name, content.encode('utf-8'), "application/octet-stream")}
+            )
+            if response.status_code == 200:
+                files.append((response.json()["eds_id"], content))
+            else:
+                error = error or f"{name}: {response.status_code} {response.text[:200]}"
+    if not files:
+        pytest.skip(f"No EDS file could be imported into the benchmark schema ({error})")
+    return files
@@ -0,0 +1,64 @@
+"""
+API benchmarks for the main GET endpoints against the corpus catalog.
+
+Per-device endpoints request every stored device in one round, so a slow
+outlier device shows up in the totals.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+CATALOG_ENDPOINTS = [
+    "/api/iodd",
+    "/api/stats",
+]
+
+DEVICE_ENDPOINTS = [
+    "/api/iodd/{id}",
+    "/api/iodd/{id}/parameters",
+    "/api/iodd/{id}/processdata",
+    "/api/iodd/{id}/menus",
+    "/api/iodd/{id}/config-schema",
+]
+
+EDS_CATALOG_ENDPOINTS = [
+    "/api/eds",
+    "/api/eds/grouped/by-device",
+]
+
+EDS_ENDPOINTS = [
+    "/api/eds/{id}",
+]
+
+
+def _get_all(client, urls):
+    for url in urls:
+        response = client.get(url)
+        assert response.status_code == 200, f"{url}: {response.status_code}"
+
+
+@pytest.mark.benchmark(group="api-catalog")
+@pytest.mark.parametrize("endpoint", CATALOG_ENDPOINTS)
+def test_catalog_endpoint(benchmark, api_client, iodd_devices, endpoint):
+    benchmark(_get_all, api_client, [endpoint])
+
+
+@pytest.mark.benchmark(group="api-device")
+@pytest.mark.parametrize("endpoint", DEVICE_ENDPOINTS)
+def test_device_endpoint(benchmark, api_client, iodd_devices, endpoint):
+    urls = [endpoint.format(id=device_id) for device_id, _ in iodd_devices]
+    benchmark(_get_all, api_client, urls)
+
+
+@pytest.mark.benchmark(group="api-eds")
+@pytest.mark.parametrize("endpoint", EDS_CATALOG_ENDPOINTS)
+def test_eds_catalog_endpoint(benchmark, api_client, eds_files, endpoint):
+    benchmark(_get_all, api_client, [endpoint])
+
+
+@pytest.mark.benchmark(group="api-eds")
+@pytest.mark.parametrize("endpoint", EDS_ENDPOINTS)
+def test_eds_endpoint(benchmark, api_client, eds_files, endpoint):
+    urls = [endpoint.format(id=eds_id) for eds_id, _ in eds_files]
+    benchmark(_get_all, api_client, urls)
@@ -0,0 +1,28 @@
+"""
+Parser benchmarks: one round parses the whole IODD or EDS corpus.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from src.parsers.eds_parser import parse_eds_file
+from src.parsing import IODDParser
+
+
+@pytest.mark.benchmark(group="parse")
+def test_iodd_parse(benchmark, iodd_corpus):
+    def parse_all():
+        return [IODDParser(xml).parse() for _, xml in iodd_corpus]
+
+    profiles = benchmark(parse_all)
+    assert len(profiles) == len(iodd_corpus)
+
+
+@pytest.mark.benchmark(group="parse")
+def test_eds_parse(benchmark, eds_corpus):
+    def parse_all():
+        return [parse_eds_file(content, file_path=name) for name, content in eds_corpus]
+
+    results = benchmark(parse_all)
+    assert len(results) == len(eds_corpus)
@@ -0,0 +1,93 @@
+"""
+Storage, reconstruction and PQA diff benchmarks over the corpus catalog.
+
+save_device gets a fresh database every round so each round measures a cold
+import of the IODD corpus; the other benchmarks read the shared catalog.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from src.greenstack import StorageManager
+from src.parsing import IODDParser
+from src.utils.eds_diff_analyzer import EDSDiffAnalyzer
+from src.utils.eds_reconstruction import EDSReconstructor
+from src.utils.forensic_reconstruction_v2 import IODDReconstructor
+from src.utils.pqa_diff_analyzer import DiffAnalyzer
+
+
+@pytest.fixture(scope="module")
+def iodd_profiles(iodd_devices):
+    # Only the IODDs the schema can store, so a round never stops half way
+    return [IODDParser(xml).parse() for _, xml in iodd_devices]
+
+
+@pytest.fixture(scope="module")
+def reconstructed_iodds(catalog_db, iodd_devices):
+    reconstructor = IODDReconstructor(str(catalog_db))
+    try:
+        return [(xml, reconstructor.reconstruct_iodd(device_id)) for device_id, xml in iodd_devices]
+    except Exception as e:
+        pytest.skip(f"IODD reconstruction fails on the benchmark schema ({e})")
+
+
+@pytest.fixture(scope="module")
+def reconstructed_eds(catalog_db, eds_files):
+    reconstructor = EDSReconstructor(str(catalog_db))
+    try:
+        return [(content, reconstructor.reconstruct_eds(eds_id)) for eds_id, content in eds_files]
+    except Exception as e:
+        pytest.skip(f"EDS reconstruction fails on the benchmark schema ({e})")
+
+
+@pytest.mark.benchmark(group="storage")
+def test_save_device(benchmark, fresh_db, iodd_profiles):
+    def setup():
+        return (StorageManager(str(fresh_db())),), {}
+
+    def save_all(storage):
+        return [storage.save_device(profile) for profile in iodd_profiles]
+
+    device_ids = benchmark.pedantic(save_all, setup=setup, rounds=5)
+    assert len(device_ids) == len(iodd_profiles)
+
+
+@pytest.mark.benchmark(group="reconstruction")
+def test_reconstruct_iodd(benchmark, catalog_db, iodd_devices, reconstructed_iodds):
+    reconstructor = IODDReconstructor(str(catalog_db))
+
+    def reconstruct_all():
+        return [reconstructor.reconstruct_iodd(device_id) for device_id, _ in iodd_devices]
+
+    assert all(benchmark(reconstruct_all))
+
+
+@pytest.mark.benchmark(group="reconstruction")
+def test_reconstruct_eds(benchmark, catalog_db, eds_files, reconstructed_eds):
+    reconstructor = EDSReconstructor(str(catalog_db))
+
+    def reconstruct_all():
+        return [reconstructor.reconstruct_eds(eds_id) for eds_id, _ in eds_files]
+
+    assert all(benchmark(reconstruct_all))
+
+
+@pytest.mark.benchmark(group="diff")
+def test_iodd_diff(benchmark, catalog_db, reconstructed_iodds):
+    analyzer = DiffAnalyzer(str(catalog_db))
+
+    def analyze_all():
+        return [analyzer.analyze(original, rebuilt) for original, rebuilt in reconstructed_iodds]
+
+    assert len(benchmark(analyze_all)) == len(reconstructed_iodds)
+
+
+@pytest.mark.benchmark(group="diff")
+def test_eds_diff(benchmark, catalog_db, reconstructed_eds):
+    analyzer = EDSDiffAnalyzer(str(catalog_db))
+
+    def analyze_all():
+        return [analyzer.analyze(original, rebuilt) for original, rebuilt in reconstructed_eds]
+
+    assert len(benchmark(analyze_all)) == len(reconstructed_eds)
@@ -17,7 +17,7 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.greenstack import IODDManager, StorageManager
-from src.api import app
+from src.api import app, include_optional_routers
 
 
 # ============================================================================
@@ -112,8 +112,10 @@ def test_client() -> TestClient:
     """
     Create a FastAPI TestClient for API endpoint testing.
 
-    Returns a TestClient configured to test the API endpoints.
+    Returns a TestClient configured to test the API endpoints, including the
+    optional routers that are otherwise included on startup.
     """
+    include_optional_routers()
     return TestClient(app)
 
 
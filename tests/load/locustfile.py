@@ -1,371 +1,260 @@
 """
 GreenStack Load Testing Suite
 
-Performance and load testing scenarios using Locust.
+Locust scenarios modelling the production traffic mix against a seeded
+catalog:
+- CatalogBrowser - paging the IODD/EDS lists and drilling into device tabs
+- SearchTyper - autocomplete on every keystroke, then a full search
+- PQADashboard - the quality dashboard and per-device metric drill-downs
+- PackageImporter - bursts of IODD/EDS file and package imports with long
+  idle gaps, built from the synthetic catalog so every import is new
+
+Seed the catalog first (see synthetic_catalog.py), e.g.:
+    python tests/load/synthetic_catalog.py --devices 1000 --api http://localhost:8000
 
 Run with:
-    locust -f locustfile.py --host=http://localhost:8000
+    locust -f tests/load/locustfile.py --host=http://localhost:8000
+
+    # Headless, with per-endpoint percentiles written to JSON
+    locust -f tests/load/locustfile.py --host=http://localhost:8000 \\
+        --headless -u 50 -r 5 -t 10m --percentiles-json load-percentiles.json
 
 Web UI will be available at:
     http://localhost:8089
+
+Per-endpoint latency percentiles are printed when the test stops; Locust's
+--csv/--html reports contain them as well.
 """
 
-from locust import HttpUser, task, between, SequentialTaskSet
-import random
+import itertools
 import json
-import os
+import random
+import time
 from datetime import datetime
+from typing import Dict, List
 
+import gevent
+import requests
+from locust import HttpUser, SequentialTaskSet, between, events, task
 
-class IODDUploadTasks(SequentialTaskSet):
-    """Sequential tasks for IODD file upload workflow"""
+from synthetic_catalog import SyntheticCatalog
 
-    @task
-    def upload_iodd_file(self):
-        """Upload an IODD file"""
-        # Simulate IODD file upload
-        files = {'file': ('test-device.iodd', b'<IODevice></IODevice>', 'application/xml')}
-
-        with self.client.post(
-            "/api/iodd/upload",
-            files=files,
-            headers={"Authorization": f"Bearer {self.user.token}"},
-            catch_response=True
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Upload failed with status {response.status_code}")
+PERCENTILES = (0.5, 0.9, 0.95, 0.99)
 
-    @task
-    def list_uploaded_files(self):
-        """List uploaded IODD files"""
-        with self.client.get(
-            "/api/iodd",
-            headers={"Authorization": f"Bearer {self.user.token}"},
-            catch_response=True
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"List failed with status {response.status_code}")
-
-
-class DeviceSearchTasks(SequentialTaskSet):
-    """Sequential tasks for device search workflow"""
+# Device ids and search terms from the target catalog, loaded on test start
+catalog: Dict[str, List] = {"iodd": [], "eds": [], "terms": []}
 
-    @task(3)
-    def search_by_vendor(self):
-        """Search devices by vendor"""
-        vendors = ["Balluff", "IFM", "Sick", "Turck", "Pepperl+Fuchs"]
-        vendor = random.choice(vendors)
-
-        with self.client.get(
-            f"/api/devices/search?vendor={vendor}",
-            headers={"Authorization": f"Bearer {self.user.token}"},
-            name="/api/devices/search?vendor=[vendor]",
-            catch_response=True
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Search failed with status {response.status_code}")
+generator = SyntheticCatalog()
+# Device numbers for imports, per process; offset by --import-start and worker
+import_numbers = itertools.count()
+# Device numbers reserved per worker in distributed runs
+WORKER_NUMBER_RANGE = 100_000
 
-    @task(2)
-    def search_by_keyword(self):
-        """Search devices by keyword"""
-        keywords = ["temperature", "pressure", "sensor", "analog", "digital"]
-        keyword = random.choice(keywords)
-
-        with self.client.get(
-            f"/api/devices/search?q={keyword}",
-            headers={"Authorization": f"Bearer {self.user.token}"},
-            name="/api/devices/search?q=[keyword]",
-            catch_response=True
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Search failed with status {response.status_code}")
 
-    @task(1)
-    def get_device_details(self):
-        """Get device details"""
-        device_id = random.randint(1, 100)
+@events.init_command_line_parser.add_listener
+def on_init_parser(parser, **kwargs):
+    parser.add_argument("--percentiles-json", default="", help="Write per-endpoint latency percentiles to this file")
+    parser.add_argument("--catalog-sample", type=int, default=500, help="Devices to sample from the catalog for browsing")
+    parser.add_argument("--import-start", type=int, default=1_000_000,
+                        help="First synthetic device number used by PackageImporter")
 
-        with self.client.get(
-            f"/api/devices/{device_id}",
-            headers={"Authorization": f"Bearer {self.user.token}"},
-            name="/api/devices/[id]",
-            catch_response=True
-        ) as response:
-            if response.status_code in [200, 404]:
-                response.success()
-            else:
-                response.failure(f"Get device failed with status {response.status_code}")
 
+def load_catalog(host: str, sample: int):
+    """Sample IODD/EDS ids and search terms from the running API"""
+    def fetch(path: str, fields: str) -> List[dict]:
+        try:
+            response = requests.get(f"{host}{path}", params={"limit": sample, "fields": fields}, timeout=30)
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            print(f"Could not load {path} for the load test catalog: {e}")
+            return []
 
-class AdapterGenerationTasks(SequentialTaskSet):
-    """Sequential tasks for adapter generation workflow"""
+    devices = fetch("/api/iodd", "id,product_name,manufacturer")
+    eds_files = fetch("/api/eds", "id,product_name,vendor_name")
+    catalog["iodd"] = [d["id"] for d in devices]
+    catalog["eds"] = [e["id"] for e in eds_files]
 
-    @task
-    def generate_node_red_adapter(self):
-        """Generate Node-RED adapter"""
-        payload = {
-            "device_id": random.randint(1, 100),
-            "platform": "node-red",
-            "options": {
-                "include_comments": True,
-                "format": "json"
-            }
-        }
-
-        with self.client.post(
-            "/api/adapters/generate",
-            json=payload,
-            headers={"Authorization": f"Bearer {self.user.token}"},
-            name="/api/adapters/generate (node-red)",
-            catch_response=True
-        ) as response:
-            if response.status_code in [200, 201]:
-                response.success()
-            else:
-                response.failure(f"Generation failed with status {response.status_code}")
+    terms = set()
+    for row in devices + eds_files:
+        for key in ("product_name", "manufacturer", "vendor_name"):
+            words = str(row.get(key) or "").split()
+            if words and len(words[0]) >= 3:
+                terms.add(words[0])
+    catalog["terms"] = sorted(terms) or ["sensor", "pressure", "temperature"]
 
-    @task
-    def generate_python_adapter(self):
-        """Generate Python adapter"""
-        payload = {
-            "device_id": random.randint(1, 100),
-            "platform": "python",
-            "options": {
-                "async": True,
-                "type_hints": True
-            }
-        }
-
-        with self.client.post(
-            "/api/adapters/generate",
-            json=payload,
-            headers={"Authorization": f"Bearer {self.user.token}"},
-            name="/api/adapters/generate (python)",
-            catch_response=True
-        ) as response:
-            if response.status_code in [200, 201]:
-                response.success()
-            else:
-                response.failure(f"Generation failed with status {response.status_code}")
-
-
-class GreenStackUser(HttpUser):
-    """
-    Simulated GreenStack user with mixed workload
-
-    Simulates typical user behavior:
-    - Authenticates once
-    - Performs device searches (most common)
-    - Occasionally uploads IODD files
-    - Sometimes generates adapters
-    """
-
-    wait_time = between(1, 5)  # Wait 1-5 seconds between tasks
-    token = None
 
-    def on_start(self):
-        """Called when a user starts - authenticate"""
-        # Get credentials from environment or use defaults
-        username = os.getenv("TEST_USERNAME", "admin")
-        password = os.getenv("TEST_PASSWORD", "admin")
-
-        # Authenticate
-        response = self.client.post("/api/auth/login", json={
-            "username": username,
-            "password": password
-        })
+def option(environment, name: str, default):
+    """Command line option, or its default when Locust runs as a library"""
+    return getattr(environment.parsed_options, name, default)
 
-        if response.status_code == 200:
-            self.token = response.json().get("access_token")
-        else:
-            print(f"Authentication failed: {response.status_code}")
-
-    @task(10)
-    def search_devices(self):
-        """Search for devices (most common task)"""
-        search_terms = [
-            "temperature",
-            "pressure",
-            "sensor",
-            "analog",
-            "digital",
-            "Balluff",
-            "IFM",
-            "Sick"
-        ]
-        term = random.choice(search_terms)
-
-        self.client.get(
-            f"/api/devices/search?q={term}",
-            headers={"Authorization": f"Bearer {self.token}"},
-            name="/api/devices/search"
-        )
-
-    @task(5)
-    def view_device_details(self):
-        """View device details"""
-        device_id = random.randint(1, 100)
-
-        self.client.get(
-            f"/api/devices/{device_id}",
-            headers={"Authorization": f"Bearer {self.token}"},
-            name="/api/devices/[id]"
-        )
 
-    @task(3)
-    def list_iodd_files(self):
-        """List IODD files"""
-        self.client.get(
-            "/api/iodd",
-            headers={"Authorization": f"Bearer {self.token}"}
-        )
+def expect(response, *ok_statuses):
+    if response.status_code in (ok_statuses or (200,)):
+        response.success()
+    else:
+        response.failure(f"HTTP {response.status_code}")
 
-    @task(2)
-    def generate_adapter(self):
-        """Generate adapter code"""
-        platforms = ["node-red", "python", "plc"]
-        platform = random.choice(platforms)
-
-        payload = {
-            "device_id": random.randint(1, 100),
-            "platform": platform
-        }
-
-        self.client.post(
-            "/api/adapters/generate",
-            json=payload,
-            headers={"Authorization": f"Bearer {self.token}"},
-            name="/api/adapters/generate"
-        )
 
-    @task(1)
-    def upload_iodd(self):
-        """Upload IODD file (least common task)"""
-        files = {'file': ('test-device.iodd', b'<IODevice></IODevice>', 'application/xml')}
+# ============================================================================
+# Catalog browsing
+# ============================================================================
 
-        self.client.post(
-            "/api/iodd/upload",
-            files=files,
-            headers={"Authorization": f"Bearer {self.token}"}
-        )
+class CatalogBrowser(HttpUser):
+    """Most common user: pages through the catalog and opens devices"""
+
+    weight = 6
+    wait_time = between(2, 8)
+
+    @task(4)
+    def browse_iodd_list(self):
+        cursor = None
+        # Most visits stop at the first page, a few keep paging
+        for _ in range(random.choice((1, 1, 1, 2, 3))):
+            params = {"limit": 50, **({"cursor": cursor} if cursor else {})}
+            with self.client.get("/api/iodd", params=params, name="/api/iodd?limit=50",
+                                 catch_response=True) as response:
+                expect(response)
+                cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
 
-    @task(1)
-    def check_health(self):
-        """Check API health"""
-        self.client.get("/api/health", name="/api/health")
+    @task(3)
+    class DeviceDrilldown(SequentialTaskSet):
+        """Open one IODD device and click through its tabs"""
 
+        def on_start(self):
+            self.device_id = random.choice(catalog["iodd"]) if catalog["iodd"] else None
 
-class HighLoadUser(HttpUser):
-    """
-    Aggressive user simulating high load conditions
+        @task
+        def detail(self):
+            if self.device_id is None:
+                self.interrupt()
+            self.client.get(f"/api/iodd/{self.device_id}", name="/api/iodd/[id]")
 
-    Used for stress testing - generates more requests with less wait time
-    """
+        @task
+        def parameters(self):
+            self.client.get(f"/api/iodd/{self.device_id}/parameters", name="/api/iodd/[id]/parameters")
 
-    wait_time = between(0.1, 0.5)  # Very short wait times
-    token = None
+        @task
+        def process_data(self):
+            self.client.get(f"/api/iodd/{self.device_id}/processdata", name="/api/iodd/[id]/processdata")
 
-    def on_start(self):
-        """Authenticate on start"""
-        username = os.getenv("TEST_USERNAME", "admin")
-        password = os.getenv("TEST_PASSWORD", "admin")
+        @task
+        def menus(self):
+            self.client.get(f"/api/iodd/{self.device_id}/menus", name="/api/iodd/[id]/menus")
 
-        response = self.client.post("/api/auth/login", json={
-            "username": username,
-            "password": password
-        })
+        @task
+        def config_schema(self):
+            self.client.get(f"/api/iodd/{self.device_id}/config-schema", name="/api/iodd/[id]/config-schema")
+            self.interrupt()
 
-        if response.status_code == 200:
-            self.token = response.json().get("access_token")
+    @task(2)
+    def browse_eds(self):
+        self.client.get("/api/eds", params={"limit": 50}, name="/api/eds?limit=50")
+        self.client.get("/api/eds/grouped/by-device", params={"limit": 50}, name="/api/eds/grouped/by-device")
+        if catalog["eds"]:
+            eds_id = random.choice(catalog["eds"])
+            self.client.get(f"/api/eds/{eds_id}", name="/api/eds/[id]")
 
-    @task
-    def rapid_search(self):
-        """Perform rapid device searches"""
-        term = random.choice(["sensor", "device", "analog"])
-        self.client.get(
-            f"/api/devices/search?q={term}",
-            headers={"Authorization": f"Bearer {self.token}"},
-            name="/api/devices/search (rapid)"
-        )
+    @task(1)
+    def stats(self):
+        self.client.get("/api/stats")
 
 
-class APIOnlyUser(HttpUser):
-    """
-    User that only hits API endpoints without file uploads
+# ============================================================================
+# Search
+# ============================================================================
 
-    Useful for testing pure API performance
-    """
+class SearchTyper(HttpUser):
+    """Types a search term: one suggestions request per keystroke, then the search"""
 
-    wait_time = between(1, 3)
-    token = None
+    weight = 3
+    wait_time = between(5, 15)
 
-    def on_start(self):
-        """Authenticate on start"""
-        username = os.getenv("TEST_USERNAME", "admin")
-        password = os.getenv("TEST_PASSWORD", "admin")
+    @task
+    def type_search(self):
+        term = random.choice(catalog["terms"] or ["sensor"])
+        typed = term[:random.randint(min(3, len(term)), min(12, len(term)))]
+        for length in range(1, len(typed) + 1):
+            self.client.get("/api/search/suggestions", params={"q": typed[:length]},
+                            name="/api/search/suggestions?q=[prefix]")
+            gevent.sleep(random.uniform(0.08, 0.25))  # keystroke interval
+        if len(typed) >= 2:
+            self.client.get("/api/search", params={"q": typed, "limit": 50}, name="/api/search?q=[term]")
 
-        response = self.client.post("/api/auth/login", json={
-            "username": username,
-            "password": password
-        })
 
-        if response.status_code == 200:
-            self.token = response.json().get("access_token")
+# ============================================================================
+# PQA dashboards
+# ============================================================================
+
+class PQADashboard(HttpUser):
+    """Quality dashboard: summary widgets, then drill-down into one device"""
 
-    @task(5)
-    def list_devices(self):
-        """List all devices"""
-        self.client.get(
-            "/api/devices",
-            headers={"Authorization": f"Bearer {self.token}"}
-        )
+    weight = 1
+    wait_time = between(10, 30)
 
     @task(3)
-    def search_devices(self):
-        """Search devices"""
-        self.client.get(
-            "/api/devices/search?q=sensor",
-            headers={"Authorization": f"Bearer {self.token}"}
-        )
+    def dashboard(self):
+        self.client.get("/api/pqa/dashboard/summary")
+        self.client.get("/api/pqa/dashboard/trends", params={"days": 30}, name="/api/pqa/dashboard/trends")
+        self.client.get("/api/pqa/dashboard/failures", params={"limit": 20}, name="/api/pqa/dashboard/failures")
 
     @task(2)
-    def get_statistics(self):
-        """Get system statistics"""
-        self.client.get(
-            "/api/stats",
-            headers={"Authorization": f"Bearer {self.token}"}
-        )
+    def analysis_history(self):
+        with self.client.get("/api/pqa/analyzed-devices", params={"limit": 50},
+                             name="/api/pqa/analyzed-devices?limit=50", catch_response=True) as response:
+            expect(response)
+            analyzed = response.json() if response.status_code == 200 else []
+        if not analyzed:
+            return
+        device = random.choice(analyzed)
+        params = {"file_type": device.get("file_type", "IODD")}
+        with self.client.get(f"/api/pqa/metrics/{device['id']}", params=params,
+                             name="/api/pqa/metrics/[id]", catch_response=True) as response:
+            expect(response, 200, 404)
+        self.client.get(f"/api/pqa/metrics/{device['id']}/history", params=params,
+                        name="/api/pqa/metrics/[id]/history")
 
-    @task(1)
-    def check_health(self):
-        """Health check"""
-        self.client.get("/api/health")
+
+# ============================================================================
+# Imports
+# ============================================================================
+
+class PackageImporter(HttpUser):
+    """Bursts of back-to-back imports (an engineer dropping a folder), then idle"""
+
+    weight = 1
+
+    def on_start(self):
+        self.burst_left = 0
+
+    def wait_time(self):
+        if self.burst_left > 0:
+            return random.uniform(0.0, 0.2)
+        self.burst_left = random.randint(5, 30)
+        return random.uniform(60, 180)
+
+    @task
+    def import_device(self):
+        self.burst_left -= 1
+        worker = getattr(self.environment.runner, "worker_index", 0) or 0
+        n = (option(self.environment, "import_start", 1_000_000)
+             + worker * WORKER_NUMBER_RANGE + next(import_numbers))
+        route, name, content = next(generator.devices(1, eds_share=0.4, package_share=0.5, start=n))
+        with self.client.post(route, files={"file": (name, content)}, name=route,
+                              catch_response=True) as response:
+            # 409: the EDS was imported by an earlier run
+            expect(response, 200, 409)
 
 
 # ============================================================================
 # Custom Locust Events for Advanced Metrics
 # ============================================================================
 
-from locust import events
-
 @events.request.add_listener
 def on_request(request_type, name, response_time, response_length, exception, context, **kwargs):
-    """
-    Custom request handler to track additional metrics
-
-    This could be used to:
-    - Log slow requests to file
-    - Send metrics to external monitoring
-    - Track custom business metrics
-    """
+    """Log failed and very slow requests"""
     if exception:
         print(f"Request failed: {name} - {exception}")
 
@@ -380,20 +269,48 @@ def on_test_start(environment, **kwargs):
     print("=" * 80)
     print(f"Load test started at {datetime.now()}")
     print(f"Target host: {environment.host}")
+    if environment.host:
+        load_catalog(environment.host.rstrip("/"), option(environment, "catalog_sample", 500))
+        print(f"Catalog sample: {len(catalog['iodd'])} IODD devices, {len(catalog['eds'])} EDS files, "
+              f"{len(catalog['terms'])} search terms")
     print("=" * 80)
 
 
 @events.test_stop.add_listener
 def on_test_stop(environment, **kwargs):
-    """Called when test stops"""
+    """Called when test stops: summary and per-endpoint latency percentiles"""
     print("=" * 80)
     print(f"Load test completed at {datetime.now()}")
     print("=" * 80)
 
-    # Print summary statistics
     stats = environment.stats
     print(f"\nTotal requests: {stats.total.num_requests}")
     print(f"Total failures: {stats.total.num_failures}")
-    print(f"Average response time: {stats.total.avg_response_time:.2f}ms")
-    print(f"Max response time: {stats.total.max_response_time:.2f}ms")
     print(f"Requests per second: {stats.total.total_rps:.2f}")
+
+    entries = sorted(stats.entries.values(), key=lambda entry: (entry.name, entry.method))
+    header = "".join(f"{f'p{int(p * 100)}':>8}" for p in PERCENTILES)
+    print(f"\n{'Method':<7} {'Endpoint':<50} {'Reqs':>7} {'Fails':>6}{header} {'Max':>8}  (ms)")
+    report = []
+    for entry in entries:
+        if not entry.num_requests:
+            continue
+        percentiles = {f"p{int(p * 100)}": entry.get_response_time_percentile(p) for p in PERCENTILES}
+        print(f"{entry.method:<7} {entry.name[:50]:<50} {entry.num_requests:>7} {entry.num_failures:>6}"
+              + "".join(f"{value:>8.0f}" for value in percentiles.values())
+              + f" {entry.max_response_time:>8.0f}")
+        report.append({
+            "method": entry.method,
+            "name": entry.name,
+            "requests": entry.num_requests,
+            "failures": entry.num_failures,
+            "rps": entry.total_rps,
+            **percentiles,
+            "max": entry.max_response_time,
+        })
+
+    path = option(environment, "percentiles_json", "")
+    if path:
+        with open(path, "w") as f:
+            json.dump({"finished": time.time(), "host": environment.host, "endpoints": report}, f, indent=2)
+        print(f"\nPer-endpoint percentiles written to {path}")
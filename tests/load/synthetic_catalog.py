@@ -0,0 +1,299 @@
+"""
+Synthetic Device Catalog Generator
+
+Builds N unique devices by mutating the real IODD/EDS samples in test-data/
+and seeds a catalog with them, so load tests run against realistic data:
+- Identity fields (IODD deviceId, productId and product name; EDS VendCode,
+  ProdCode, ProdName, Catalog and revision) are rewritten per device, so every device
+  imports as new
+- IODD sizes follow the corpus: a sample is drawn, then padded with cloned
+  Variables by a log-normal factor, giving the long tail of large devices
+  real catalogs have
+- EDS sizes follow the mix of EDS samples
+- Devices can also be built as packages (IODD .zip, multi-revision EDS .zip)
+
+Generation is deterministic for a given seed and device number.
+
+Seeding goes through the import routes, so data is stored exactly as real
+uploads are: in-process against greenstack.db in the working directory
+(--local, run from where the API runs), or over HTTP against a running server
+(--api), whichever database backend that server is configured with.
+
+Usage:
+    python tests/load/synthetic_catalog.py --devices 500 --local
+    python tests/load/synthetic_catalog.py --devices 2000 --api http://localhost:8000
+    python tests/load/synthetic_catalog.py --devices 100 --out /tmp/catalog --packages 0.2
+"""
+
+import argparse
+import hashlib
+import io
+import random
+import re
+import sys
+import time
+import zipfile
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+TEST_DATA = ROOT / "test-data"
+
+# Synthetic IODD deviceIds live in the top half of the 24-bit range
+SYNTHETIC_DEVICE_ID_BASE = 0x800000
+# Synthetic EDS VendCodes live in the top half of the 16-bit range; each
+# vendor takes 0xFFFF devices (ProdCode 1..0xFFFF)
+SYNTHETIC_VENDOR_CODE_BASE = 0x8000
+# Largest padding factor for IODDs (the upload limit is 10MB)
+MAX_SIZE_FACTOR = 8.0
+
+_VARIABLE = re.compile(r'<Variable\b[^>]*>.*?</Variable>', re.S)
+_INDEX = re.compile(r'\bindex="(\d+)"')
+
+# (file name, content)
+Upload = Tuple[str, bytes]
+
+
+def _distinct_files(pattern: str, root: Path) -> List[Path]:
+    files = {}
+    for path in sorted(root.glob(pattern)):
+        files.setdefault(hashlib.md5(path.read_bytes()).hexdigest(), path)
+    return sorted(files.values())
+
+
+def _read_text(path: Path) -> str:
+    data = path.read_bytes()
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode('latin-1')
+
+
+def eds_identity(n: int) -> Tuple[int, int]:
+    """(VendCode, ProdCode) of EDS number n, unique for n < 0x8000 * 0xFFFF"""
+    vendor, product = divmod(n, 0xFFFF)
+    if vendor >= 0x10000 - SYNTHETIC_VENDOR_CODE_BASE:
+        raise ValueError(f"EDS number {n} is out of the synthetic identity range")
+    return SYNTHETIC_VENDOR_CODE_BASE + vendor, product + 1
+
+
+class SyntheticCatalog:
+    """Deterministic generator of unique IODD/EDS devices from real samples"""
+
+    def __init__(self, seed: int = 0, root: Path = TEST_DATA, size_sigma: float = 0.6):
+        self.seed = seed
+        self.root = Path(root)
+        self.size_sigma = size_sigma
+        self._iodd: Optional[List[str]] = None
+        self._eds: Optional[List[str]] = None
+
+    @property
+    def iodd_samples(self) -> List[str]:
+        if self._iodd is None:
+            self._iodd = [_read_text(p) for p in _distinct_files("**/*IODD1.1.xml", self.root)]
+            if not self._iodd:
+                raise FileNotFoundError(f"No IODD samples under {self.root}")
+        return self._iodd
+
+    @property
+    def eds_samples(self) -> List[str]:
+        if self._eds is None:
+            self._eds = [_read_text(p) for p in _distinct_files("**/*.eds", self.root)]
+            if not self._eds:
+                raise FileNotFoundError(f"No EDS samples under {self.root}")
+        return self._eds
+
+    def _rng(self, kind: str, n: int) -> random.Random:
+        return random.Random(f"{self.seed}:{kind}:{n}")
+
+    # ------------------------------------------------------------------
+    # IODD
+    # ------------------------------------------------------------------
+
+    def iodd_xml(self, n: int) -> str:
+        """IODD number n: a mutated, possibly padded copy of a real sample"""
+        rng = self._rng("iodd", n)
+        xml = rng.choice(self.iodd_samples)
+        suffix = f"S{n:06d}"
+
+        xml = re.sub(r'(<DeviceIdentity\b[^>]*\bdeviceId=")\d+(")',
+                     rf'\g<1>{SYNTHETIC_DEVICE_ID_BASE + n}\g<2>', xml, count=1)
+        xml = re.sub(r'(<DeviceVariant\b[^>]*\bproductId=")([^"]*)(")',
+                     rf'\g<1>\g<2>-{suffix}\g<3>', xml)
+
+        # Product name: the text behind DeviceName, else the first DeviceVariant's Name
+        name = (re.search(r'<DeviceName\s+textId="([^"]+)"', xml)
+                or re.search(r'<DeviceVariant\b.*?<Name\s+textId="([^"]+)"', xml, re.S))
+        if name:
+            text_id = re.escape(name.group(1))
+            xml = re.sub(rf'(<Text\s+id="{text_id}"\s+value=")([^"]*)(")',
+                         rf'\g<1>\g<2> {suffix}\g<3>', xml)
+
+        factor = min(rng.lognormvariate(0, self.size_sigma), MAX_SIZE_FACTOR)
+        return self._pad(xml, int(len(xml) * factor), rng)
+
+    @staticmethod
+    def _pad(xml: str, target_size: int, rng: random.Random) -> str:
+        """Clone Variables (with fresh ids and indices) until xml reaches target_size"""
+        variables = _VARIABLE.findall(xml)
+        if not variables or len(xml) >= target_size:
+            return xml
+
+        used = {int(i) for i in _INDEX.findall("".join(variables))}
+        free_indices = (i for i in range(0x4000, 0x10000) if i not in used)
+        clones = []
+        size = len(xml)
+        for clone_number, index in enumerate(free_indices):
+            if size >= target_size:
+                break
+            clone = rng.choice(variables)
+            clone = re.sub(r'\bid="[^"]*"', f'id="V_Synthetic_{clone_number}"', clone, count=1)
+            clone = _INDEX.sub(f'index="{index}"', clone, count=1)
+            clones.append(clone)
+            size += len(clone) + 1
+
+        insert_at = xml.rfind("</Variable>") + len("</Variable>")
+        return xml[:insert_at] + "\n" + "\n".join(clones) + xml[insert_at:]
+
+    def iodd(self, n: int) -> Upload:
+        return f"synthetic-{n:06d}-IODD1.1.xml", self.iodd_xml(n).encode('utf-8')
+
+    def iodd_package(self, n: int) -> Upload:
+        name, xml = self.iodd(n)
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as package:
+            package.writestr(name, xml)
+        return f"synthetic-{n:06d}.zip", buffer.getvalue()
+
+    # ------------------------------------------------------------------
+    # EDS
+    # ------------------------------------------------------------------
+
+    def eds_text(self, n: int, revision: Optional[Tuple[int, int]] = None) -> str:
+        """EDS number n: a real sample with its identity rewritten"""
+        rng = self._rng("eds", n)
+        eds = rng.choice(self.eds_samples)
+        major, minor = revision or (rng.randint(1, 4), rng.randint(1, 20))
+        suffix = f"S{n:06d}"
+
+        def replace(key: str, value: str, text: str) -> str:
+            return re.sub(rf'(^\s*{key}\s*=\s*)[^;]*;', rf'\g<1>{value};', text, count=1, flags=re.M)
+
+        vendor_code, product_code = eds_identity(n)
+        eds = replace("VendCode", str(vendor_code), eds)
+        eds = replace("ProdCode", str(product_code), eds)
+        eds = replace("MajRev", str(major), eds)
+        eds = replace("MinRev", str(minor), eds)
+        eds = re.sub(r'(^\s*ProdName\s*=\s*")([^"]*)(")', rf'\g<1>\g<2> {suffix}\g<3>', eds, count=1, flags=re.M)
+        eds = re.sub(r'(^\s*Catalog\s*=\s*")([^"]*)(")', rf'\g<1>\g<2>-{suffix}\g<3>', eds, count=1, flags=re.M)
+        return eds
+
+    def eds(self, n: int) -> Upload:
+        return f"synthetic-{n:06d}.eds", self.eds_text(n).encode('utf-8')
+
+    def eds_package(self, n: int, revisions: int = 3) -> Upload:
+        """Package with several revisions of EDS number n"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as package:
+            for minor in range(1, revisions + 1):
+                package.writestr(f"V1.{minor}/synthetic-{n:06d}.eds", self.eds_text(n, (1, minor)))
+        return f"synthetic-eds-{n:06d}.zip", buffer.getvalue()
+
+    # ------------------------------------------------------------------
+    # Catalog
+    # ------------------------------------------------------------------
+
+    def devices(self, count: int, eds_share: float = 0.4, package_share: float = 0.0,
+                start: int = 0) -> Iterator[Tuple[str, str, bytes]]:
+        """(upload route, file name, content) for devices start .. start+count-1"""
+        for n in range(start, start + count):
+            rng = self._rng("mix", n)
+            is_eds = rng.random() < eds_share
+            as_package = rng.random() < package_share
+            if is_eds:
+                route = "/api/eds/upload-package" if as_package else "/api/eds/upload"
+                name, content = self.eds_package(n) if as_package else self.eds(n)
+            else:
+                route = "/api/iodd/upload"
+                name, content = self.iodd_package(n) if as_package else self.iodd(n)
+            yield route, name, content
+
+
+def size_summary(sizes: List[int]) -> str:
+    sizes = sorted(sizes)
+
+    def pick(q: float) -> int:
+        return sizes[min(len(sizes) - 1, int(q * len(sizes)))]
+
+    return (f"min {sizes[0] / 1024:.0f}KB, p50 {pick(0.5) / 1024:.0f}KB, "
+            f"p90 {pick(0.9) / 1024:.0f}KB, max {sizes[-1] / 1024:.0f}KB")
+
+
+def seed(uploads: Iterator[Tuple[str, str, bytes]], post: Callable[[str, str, bytes], int]) -> Tuple[int, int]:
+    """Post every upload; returns (imported, failed)"""
+    imported = failed = 0
+    for route, name, content in uploads:
+        status = post(route, name, content)
+        if status == 200:
+            imported += 1
+        else:
+            failed += 1
+            print(f"  {name}: HTTP {status}")
+    return imported, failed
+
+
+def _local_poster() -> Callable[[str, str, bytes], int]:
+    sys.path.insert(0, str(ROOT))
+    from fastapi.testclient import TestClient
+    from src.api import app
+
+    client = TestClient(app)
+    return lambda route, name, content: client.post(route, files={"file": (name, content)}).status_code
+
+
+def _http_poster(base_url: str) -> Callable[[str, str, bytes], int]:
+    import requests
+
+    session = requests.Session()
+    return lambda route, name, content: session.post(
+        base_url.rstrip("/") + route, files={"file": (name, content)}, timeout=120
+    ).status_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate and seed a synthetic device catalog")
+    parser.add_argument("--devices", type=int, default=100, help="Number of devices to generate")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed")
+    parser.add_argument("--start", type=int, default=0, help="First device number (to extend a catalog)")
+    parser.add_argument("--eds-share", type=float, default=0.4, help="Fraction of devices that are EDS")
+    parser.add_argument("--packages", type=float, default=0.0, help="Fraction of devices built as .zip packages")
+    parser.add_argument("--size-sigma", type=float, default=0.6, help="Spread of the IODD size factor (log-normal)")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--local", action="store_true", help="Import in-process into ./greenstack.db")
+    target.add_argument("--api", help="Import via a running API, e.g. http://localhost:8000")
+    target.add_argument("--out", type=Path, help="Only write the files to this directory")
+    args = parser.parse_args()
+
+    catalog = SyntheticCatalog(seed=args.seed, size_sigma=args.size_sigma)
+    uploads = list(catalog.devices(args.devices, args.eds_share, args.packages, args.start))
+    print(f"Generated {len(uploads)} devices from {len(catalog.iodd_samples)} IODD and "
+          f"{len(catalog.eds_samples)} EDS samples ({size_summary([len(c) for _, _, c in uploads])})")
+
+    if args.out:
+        args.out.mkdir(parents=True, exist_ok=True)
+        for _, name, content in uploads:
+            (args.out / name).write_bytes(content)
+        print(f"Wrote {len(uploads)} files to {args.out}")
+        return
+
+    post = _local_poster() if args.local else _http_poster(args.api)
+    start = time.perf_counter()
+    imported, failed = seed(iter(uploads), post)
+    elapsed = time.perf_counter() - start
+    print(f"Imported {imported} devices ({failed} failed) in {elapsed:.1f}s "
+          f"({imported / max(elapsed, 1e-9):.1f}/s)")
+    sys.exit(1 if failed and not imported else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+PostgreSQL Test Fixtures
+
+Provides ``postgres_url``, a scratch PostgreSQL database:
+- GREENSTACK_TEST_POSTGRES_URL when set
+- otherwise a server started by pytest-postgresql, when installed
+- otherwise the tests are skipped
+
+Kept apart from tests/integration/, whose fixtures need the Docker SDK.
+"""
+
+import os
+
+import pytest
+
+
+@pytest.fixture
+def postgres_url(request) -> str:
+    url = os.getenv("GREENSTACK_TEST_POSTGRES_URL")
+    if url:
+        return url
+    if not request.config.pluginmanager.hasplugin("pytest_postgresql"):
+        pytest.skip("Set GREENSTACK_TEST_POSTGRES_URL or install pytest-postgresql")
+
+    from pytest_postgresql.exceptions import ExecutableMissingException
+
+    try:
+        server = request.getfixturevalue("postgresql_proc")
+    except ExecutableMissingException as e:
+        pytest.skip(f"pytest-postgresql cannot start PostgreSQL: {e}")
+    # Creates the test database, and drops it afterwards
+    request.getfixturevalue("postgresql")
+    return (f"postgresql://{server.user}:{server.password or ''}"
+            f"@{server.host}:{server.port}/{server.dbname}")
@@ -0,0 +1,264 @@
+"""
+PostgreSQL Storage Backend Integration Tests
+
+Tests the Postgres storage backend and the SQLite migration:
+- Migrating schema and data (types, defaults, indexes, sequences)
+- Foreign keys over orphaned rows are kept NOT VALID
+- Savers on Postgres: RETURNING ids, COPY bulk inserts, BOOLEAN coercion
+- IODDManager/StorageManager on a postgresql:// URL, schema setup included
+
+Runs against the postgres_url database (see conftest.py); its tables are
+dropped and recreated.
+"""
+
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from src import greenstack
+from src.greenstack import IODDManager
+from src.storage.backends import COPY_MIN_ROWS, PostgresBackend, get_backend, psycopg2_url
+from src.storage.device import DeviceSaver
+from src.storage.postgres_migration import migrate_sqlite_to_postgres
+from src.storage.std_variable_ref import StdVariableRefSaver
+from src.storage.text import TextSaver
+
+SCHEMA = """
+    CREATE TABLE devices (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        vendor_id INTEGER,
+        device_id INTEGER,
+        product_name TEXT,
+        manufacturer TEXT,
+        iodd_version TEXT,
+        import_date TIMESTAMP,
+        checksum TEXT,
+        vendor_logo_filename TEXT,
+        device_name_text_id TEXT,
+        vendor_text_text_id TEXT,
+        vendor_url_text_id TEXT,
+        device_family_text_id TEXT
+    );
+    CREATE TABLE iodd_text (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        device_id INTEGER,
+        text_id TEXT,
+        language_code TEXT,
+        text_value TEXT,
+        xml_order INTEGER,
+        language_order INTEGER,
+        FOREIGN KEY (device_id) REFERENCES devices (id)
+    );
+    CREATE INDEX idx_iodd_text_device ON iodd_text (device_id);
+    CREATE TABLE std_variable_refs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        device_id INTEGER NOT NULL,
+        variable_id VARCHAR(100) NOT NULL,
+        default_value TEXT,
+        fixed_length_restriction INTEGER,
+        excluded_from_data_storage BOOLEAN,
+        order_index INTEGER NOT NULL,
+        FOREIGN KEY (device_id) REFERENCES devices (id) ON DELETE CASCADE
+    );
+    CREATE TABLE std_variable_ref_single_values (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        std_variable_ref_id INTEGER NOT NULL,
+        value VARCHAR(255) NOT NULL,
+        name_text_id VARCHAR(255),
+        is_std_ref BOOLEAN NOT NULL DEFAULT 0,
+        order_index INTEGER NOT NULL,
+        FOREIGN KEY (std_variable_ref_id) REFERENCES std_variable_refs (id) ON DELETE CASCADE
+    );
+"""
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    path = str(tmp_path / "greenstack.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.execute(
+        "INSERT INTO devices (vendor_id, device_id, product_name, import_date, checksum)"
+        " VALUES (310, 1, 'Sensor\twith tab', '2025-01-02 03:04:05', 'abc')"
+    )
+    conn.executemany(
+        "INSERT INTO iodd_text (device_id, text_id, language_code, text_value) VALUES (?, ?, ?, ?)",
+        [(1, "TI_A", "en", "line\nbreak"), (1, "TI_B", "en", "back\\slash"), (2, "TI_C", "en", "orphan")]
+    )
+    conn.execute(
+        "INSERT INTO std_variable_refs (device_id, variable_id, excluded_from_data_storage, order_index)"
+        " VALUES (1, 'V_VendorName', 1, 0)"
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def migrated(sqlite_db, postgres_url):
+    result = migrate_sqlite_to_postgres(sqlite_db, postgres_url, batch_size=2, drop_existing=True)
+    engine = create_engine(psycopg2_url(postgres_url))
+    yield result, engine
+    engine.dispose()
+
+
+@pytest.fixture
+def backend(migrated, postgres_url):
+    backend = PostgresBackend(postgres_url)
+    yield backend
+    backend.engine.dispose()
+
+
+class TestMigration:
+    """Test copying a SQLite database into PostgreSQL"""
+
+    def test_copies_rows_and_types(self, migrated):
+        result, engine = migrated
+        assert result["tables"] == {
+            "devices": 1, "iodd_text": 3, "std_variable_refs": 1, "std_variable_ref_single_values": 0
+        }
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT product_name FROM devices")).scalar() == "Sensor\twith tab"
+            values = conn.execute(text("SELECT text_value FROM iodd_text ORDER BY id")).scalars().all()
+            assert values == ["line\nbreak", "back\\slash", "orphan"]
+            assert conn.execute(text("SELECT excluded_from_data_storage FROM std_variable_refs")).scalar() is True
+            types = dict(conn.execute(text(
+                "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = 'devices'"
+            )).fetchall())
+            assert types["id"] == "bigint"
+            assert types["import_date"] == "timestamp without time zone"
+            indexes = conn.execute(text("SELECT indexname FROM pg_indexes WHERE tablename = 'iodd_text'"))
+            assert "idx_iodd_text_device" in indexes.scalars().all()
+
+    def test_orphaned_rows_leave_foreign_key_unvalidated(self, migrated):
+        result, _ = migrated
+        assert result["foreign_keys"] == 3
+        (unvalidated,) = result["unvalidated_foreign_keys"]
+        assert unvalidated.startswith("iodd_text(")
+
+    def test_sequences_continue_after_copied_ids(self, migrated):
+        _, engine = migrated
+        with engine.begin() as conn:
+            new_id = conn.execute(text(
+                "INSERT INTO iodd_text (device_id, text_id) VALUES (1, 'TI_D') RETURNING id"
+            )).scalar()
+        assert new_id == 4
+
+
+def profile(vendor_id=888, device_id=7):
+    return SimpleNamespace(
+        raw_xml="<IODevice/>",
+        iodd_version="1.1",
+        import_date="2025-06-01 12:00:00",
+        vendor_logo_filename=None,
+        device_info=SimpleNamespace(vendor_id=vendor_id, device_id=device_id, product_name="Valve"),
+        vendor_info=SimpleNamespace(name="ACME"),
+    )
+
+
+class TestSaversOnPostgres:
+    """Test the savers through the Postgres backend"""
+
+    def test_device_insert_returns_id(self, backend):
+        conn = backend.connect()
+        try:
+            cursor = conn.cursor()
+            saver = DeviceSaver(cursor, backend)
+            new_id = saver.save(None, profile())
+            assert new_id == 2
+            assert saver.save(None, profile()) == new_id
+            conn.commit()
+        finally:
+            conn.close()
+
+    def test_bulk_text_insert(self, backend):
+        texts = {f"TI_{n}": {"en": f"Text {n}\t\\", "de": None} for n in range(COPY_MIN_ROWS)}
+        conn = backend.connect()
+        try:
+            cursor = conn.cursor()
+            TextSaver(cursor, backend).save(1, texts, {"TI_0": {"en": 5}}, {"en": 0, "de": 1})
+            cursor.execute("SELECT COUNT(*) FROM iodd_text WHERE device_id = 1")
+            assert cursor.fetchone()[0] == 2 * COPY_MIN_ROWS
+            cursor.execute("SELECT text_value, xml_order FROM iodd_text WHERE text_id = 'TI_0' AND language_code = 'en'")
+            assert cursor.fetchone() == ("Text 0\t\\", 5)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def test_std_variable_refs_coerce_flags(self, backend):
+        refs = [SimpleNamespace(
+            variable_id="V_ProductName", default_value=None, fixed_length_restriction=64,
+            excluded_from_data_storage=False, order_index=0,
+            single_values=[SimpleNamespace(value=str(n), name_text_id=None, is_std_ref=n % 2 == 0, order_index=n)
+                           for n in range(3)],
+            record_item_refs=[],
+        )]
+        conn = backend.connect()
+        try:
+            cursor = conn.cursor()
+            StdVariableRefSaver(cursor, backend).save(1, refs)
+            cursor.execute("SELECT id, excluded_from_data_storage FROM std_variable_refs WHERE device_id = 1")
+            ((ref_id, excluded),) = cursor.fetchall()
+            assert excluded is False
+            cursor.execute(
+                "SELECT std_variable_ref_id, is_std_ref FROM std_variable_ref_single_values ORDER BY order_index"
+            )
+            assert cursor.fetchall() == [(ref_id, True), (ref_id, False), (ref_id, True)]
+            conn.commit()
+        finally:
+            conn.close()
+
+
+@pytest.fixture
+def empty_postgres(postgres_url):
+    engine = create_engine(psycopg2_url(postgres_url))
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    engine.dispose()
+    greenstack._init_postgres_schema.cache_clear()
+    get_backend(postgres_url)._columns.clear()
+    return postgres_url
+
+
+class TestIODDManagerOnPostgres:
+    """Test importing and reading devices with a postgresql:// database"""
+
+    def test_schema_is_created_once(self, empty_postgres):
+        manager = IODDManager(db_path=empty_postgres)
+        engine = create_engine(psycopg2_url(empty_postgres))
+        try:
+            with engine.connect() as conn:
+                tables = set(conn.execute(text(
+                    "SELECT table_name FROM information_schema.tables WHERE table_schema = 'public'"
+                )).scalars())
+            assert {"devices", "iodd_files", "parameters", "iodd_text", "std_record_item_refs"} <= tables
+        finally:
+            engine.dispose()
+        assert manager.storage.backend.name == "postgresql"
+        assert greenstack._init_postgres_schema.cache_info().currsize == 1
+
+    def test_import_and_read_back(self, empty_postgres, sample_iodd_path):
+        manager = IODDManager(db_path=empty_postgres)
+        device_id = manager.import_iodd(str(sample_iodd_path))
+        assert manager.import_iodd(str(sample_iodd_path)) == device_id
+
+        device = manager.storage.get_device(device_id)
+        assert device["vendor_id"] == 42
+        assert device["parameters"] == []
+        assert [d["id"] for d in manager.list_devices()] == [device_id]
+        (asset,) = manager.storage.get_assets(device_id)
+        assert bytes(asset["file_content"]).startswith(b"<?xml")
+
+    def test_save_text_data(self, empty_postgres, sample_iodd_path):
+        manager = IODDManager(db_path=empty_postgres)
+        device_id = manager.import_iodd(str(sample_iodd_path))
+        count = "SELECT COUNT(*) AS n FROM iodd_text WHERE device_id = ?"
+        (before,) = manager.storage.query(count, (device_id,))
+
+        texts = {f"TI_{n}": {"en": f"Text {n}", "de": f"Text {n}"} for n in range(COPY_MIN_ROWS)}
+        manager.storage.save_text_data(device_id, texts)
+        assert manager.storage.query(count, (device_id,)) == [{"n": before["n"] + 2 * COPY_MIN_ROWS}]
+
@@ -239,3 +239,123 @@ class TestOpenAPIDocumentation:
 
         assert response.status_code == 200
         assert "redoc" in response.text.lower() or "html" in response.text.lower()
+
+
+class TestMqttWebSocketHub:
+    """Test cases for the MQTT WebSocket fan-out hub."""
+
+    def test_topic_filter_matching(self):
+        """Test MQTT wildcard matching used for per-client filters."""
+        from src.routes.mqtt_routes import topic_matches
+
+        assert topic_matches("devices/+/telemetry", "devices/d1/telemetry")
+        assert topic_matches("devices/#", "devices/d1/config/reported")
+        assert not topic_matches("devices/+/telemetry", "devices/d1/status")
+        assert not topic_matches("devices/+", "devices/d1/telemetry")
+
+    def test_filtered_broadcast_from_foreign_thread(self, test_client):
+        """Test messages published off-loop reach only matching clients."""
+        import threading
+        from src.routes.mqtt_routes import hub
+
+        with test_client.websocket_connect("/ws/mqtt?topics=devices/%2B/status") as ws:
+            publisher = threading.Thread(target=lambda: [
+                hub.publish_threadsafe({"topic": "devices/d1/telemetry", "payload": "1"}),
+                hub.publish_threadsafe({"topic": "devices/d1/status", "payload": "online"}),
+            ])
+            publisher.start()
+            publisher.join()
+
+            assert ws.receive_json() == {"topic": "devices/d1/status", "payload": "online"}
+
+        recent = test_client.get("/api/mqtt/messages", params={"topic": "devices/d1/#"}).json()
+        assert [m["payload"] for m in recent["messages"]][-2:] == ["1", "online"]
+
+    def test_history_action_ignores_invalid_limits(self, test_client):
+        """Test bad history limits are ignored without closing the socket."""
+        from src.routes.mqtt_routes import hub
+
+        hub.history.clear()
+        for payload in ("a", "b", "c"):
+            hub.publish_threadsafe({"topic": "devices/d2/telemetry", "payload": payload})
+
+        with test_client.websocket_connect("/ws/mqtt?topics=devices/d2/%23") as ws:
+            for limit in ("ten", -1, None, [1]):
+                ws.send_json({"action": "history", "topic": "devices/d2/#", "limit": limit})
+            ws.send_json({"action": "history", "topic": "devices/d2/#", "limit": "2"})
+            assert [ws.receive_json()["payload"] for _ in range(2)] == ["b", "c"]
+
+        recent = test_client.get("/api/mqtt/messages", params={"topic": "devices/d2/#", "limit": 0}).json()
+        assert [m["payload"] for m in recent["messages"]] == ["c"]
+
+    def test_malformed_subscriptions_are_rejected(self, test_client):
+        """Test subscribe commands need a list of topic strings."""
+        from src.routes.mqtt_routes import hub
+
+        with test_client.websocket_connect("/ws/mqtt?topics=devices/d3/status") as ws:
+            for topics in ("#", [{"topic": "#"}], ["devices/#", 1]):
+                ws.send_json({"action": "subscribe", "topics": topics})
+                assert "error" in ws.receive_json()
+
+            ws.send_json({"action": "subscribe", "topics": ["devices/d3/telemetry"]})
+            ws.send_json({"action": "unsubscribe", "topics": "#"})
+            assert "error" in ws.receive_json()  # commands run in order: the subscribe is in place
+            hub.publish_threadsafe({"topic": "devices/d4/telemetry", "payload": "other"})
+            hub.publish_threadsafe({"topic": "devices/d3/telemetry", "payload": "mine"})
+            assert ws.receive_json()["payload"] == "mine"
+
+
+class TestEdsGroupedListings:
+    """Test cases for the EDS grouped listings with aggregated variant features."""
+
+    @pytest.fixture
+    def eds_client(self, storage_manager, temp_db_path, monkeypatch, test_client):
+        import sqlite3
+        from src.routes import eds_routes
+
+        monkeypatch.setattr(eds_routes, "get_db_path", lambda: str(temp_db_path))
+        conn = sqlite3.connect(str(temp_db_path))
+        files = [
+            (1, 1, 1, "A", [100, 101]),
+            (1, 1, 2, "A", [100, 210, 211]),
+            (1, 2, 1, "B", []),
+            (2, 5, 1, "C", [100, 213]),
+        ]
+        for vendor_code, product_code, major, name, assemblies in files:
+            eds_id = conn.execute(
+                "INSERT INTO eds_files (vendor_code, vendor_name, product_code, product_name, "
+                "major_revision, minor_revision, eds_content) VALUES (?, ?, ?, ?, ?, 0, '')",
+                (vendor_code, f"Vendor {vendor_code}", product_code, name, major)
+            ).lastrowid
+            for number in assemblies:
+                conn.execute(
+                    "INSERT INTO eds_assemblies (eds_file_id, assembly_number) VALUES (?, ?)",
+                    (eds_id, number)
+                )
+        conn.commit()
+        conn.close()
+        return test_client
+
+    def test_grouped_by_device(self, eds_client):
+        """Test latest revision per device carries its variant features."""
+        response = eds_client.get("/api/eds/grouped/by-device")
+        assert response.status_code == 200
+        assert response.headers["x-total-count"] == "3"
+
+        by_name = {item["product_name"]: item for item in response.json()}
+        assert by_name["A"]["major_revision"] == 2
+        assert by_name["A"]["revision_count"] == 2
+        assert by_name["A"]["features"] == ["OPC-UA", "MQTT"]
+        assert by_name["B"]["assembly_count"] == 0
+        assert by_name["B"]["variant_label"] == "Standard"
+        assert by_name["C"]["feature_set"] == "JSON"
+
+    def test_grouped_by_variant_pagination(self, eds_client):
+        """Test sort and pagination are applied in SQL."""
+        response = eds_client.get(
+            "/api/eds/grouped/by-variant",
+            params={"sort": "revision", "order": "desc", "limit": 2, "offset": 1}
+        )
+        assert response.status_code == 200
+        assert response.headers["x-total-count"] == "4"
+        assert [item["major_revision"] for item in response.json()] == [1, 1]
@@ -7,4 +7,25 @@ This package contains unit tests for individual GreenStack modules:
 - test_parsing.py - Tests for IODD parsing (src/parsing)
 - test_generation.py - Tests for adapter generation (src/generation)
 - test_storage.py - Tests for storage layer (src/storage)
+- test_process_data_decoder.py - Tests for raw process data decoding (services/common)
+- test_zip_stream.py - Tests for streaming ZIP export (src/utils)
+- test_catalog_export.py - Tests for catalog-scale exports (src/utils)
+- test_pagination.py - Tests for keyset pagination and response compression
+- test_http_cache.py - Tests for device version counters and conditional GETs
+- test_fast_json.py - Tests for orjson response rendering (src/utils)
+- test_config_schema.py - Tests for materialized config-page schemas (src/utils)
+- test_batch_tasks.py - Tests for chunked Celery batch workflows (src/tasks)
+- test_celery_queues.py - Tests for Celery queue routing and queue metrics (src/tasks)
+- test_db_backup.py - Tests for online database backups (src/utils)
+- test_cascade_delete.py - Tests for schema-driven cascading device deletes (src/utils)
+- test_index_audit.py - Tests for the foreign-key and lookup index audit (src/utils)
+- test_service_monitor.py - Tests for the background service status sampler (src/utils)
+- test_startup.py - Tests for deferred imports and PQA startup work (src/api.py)
+- test_query_stats.py - Tests for per-request query statistics (src/query_stats.py)
+- test_job_profiler.py - Tests for sampling profiles of import, PQA and Celery jobs (src/utils)
+- test_storage_backends.py - Tests for the SQLite/PostgreSQL storage backends (src/storage)
+- test_read_replica.py - Tests for read-only analytics connections, the read replica and integrity checks (src/utils)
+- test_batch_writer.py - Tests for batched InfluxDB writes and the spill buffer (services/influx-ingestion)
+- test_telemetry_stream.py - Tests for Redis telemetry streams, consumer groups and history routes (services/common)
+- test_circuit_breaker.py - Tests for circuit breaker tripping, recovery and metrics (services/common)
 """
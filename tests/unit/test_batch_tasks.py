@@ -0,0 +1,59 @@
+"""
+Unit Tests for Chunked Batch Workflows (src/tasks/batching.py)
+==============================================================
+
+Tests chunking, per-item retries with progress state and merging of chunk
+results in the chord callback.
+"""
+
+from src.tasks.batching import chunked, merge_chunk_results, run_chunk
+
+
+class _FakeTask:
+    name = "tests.batch"
+
+    def __init__(self):
+        self.states = []
+
+    def update_state(self, state=None, meta=None):
+        self.states.append((state, meta))
+
+
+class TestBatching:
+    """Test batch helpers."""
+
+    def test_chunked(self):
+        assert chunked([1, 2, 3, 4, 5], 2) == [[1, 2], [3, 4], [5]]
+        assert chunked([], 3) == []
+        assert chunked([1, 2], 0) == [[1], [2]]
+
+    def test_run_chunk_retries_items_and_reports_progress(self):
+        attempts = {}
+
+        def process(item):
+            attempts[item] = attempts.get(item, 0) + 1
+            if item == "flaky" and attempts[item] < 2:
+                raise RuntimeError("transient")
+            if item == "bad":
+                raise ValueError("broken file")
+            return {"file_path": item}
+
+        task = _FakeTask()
+        results = run_chunk(task, ["ok", "flaky", "bad"], process, item_key="file_path",
+                            max_retries=2, backoff=0)
+
+        assert results["total"] == 3
+        assert results["successful"] == [{"file_path": "ok"}, {"file_path": "flaky"}]
+        assert results["failed"] == [{"file_path": "bad", "error": "broken file", "attempts": 3}]
+        assert attempts == {"ok": 1, "flaky": 2, "bad": 3}
+        assert task.states[-1] == ("PROGRESS", {"total": 3, "done": 3, "successful": 2, "failed": 1})
+
+    def test_merge_chunk_results(self):
+        merged = merge_chunk_results([
+            {"total": 2, "successful": [{"device_id": 1}], "failed": [{"device_id": 2}], "combined_flow": [{"id": "a"}]},
+            {"total": 1, "successful": [{"device_id": 3}], "failed": [], "combined_flow": [{"id": "b"}]},
+        ])
+        assert merged["total"] == 3
+        assert [item["device_id"] for item in merged["successful"]] == [1, 3]
+        assert len(merged["failed"]) == 1
+        assert merged["combined_flow"] == [{"id": "a"}, {"id": "b"}]
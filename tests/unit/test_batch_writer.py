@@ -0,0 +1,181 @@
+"""
+Unit Tests for Batching InfluxDB Writer (services/influx-ingestion/batch_writer.py)
+==================================================================================
+
+Tests line protocol serialization, batch flushing and the on-disk spill
+buffer, including replay of segments left behind by a previous run.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+SERVICES = Path(__file__).parent.parent.parent / "services"
+for path in (SERVICES, SERVICES / "influx-ingestion"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from batch_writer import BatchingWriter, SpillBuffer, timestamp_to_ns, to_line_protocol  # noqa: E402
+from common.circuit_breaker import CircuitBreaker, CircuitState  # noqa: E402
+
+
+class FlakyInflux:
+    """Records written bodies; raises while ``down`` is set"""
+
+    def __init__(self):
+        self.down = False
+        self.bodies = []
+
+    def write(self, body):
+        if self.down:
+            raise ConnectionError("influxdb unavailable")
+        self.bodies.append(body)
+
+    @property
+    def lines(self):
+        return [line for body in self.bodies for line in body.splitlines()]
+
+
+def make_lines(count, start=0):
+    return [f"m,device=d{i} value={i}i {i}" for i in range(start, start + count)]
+
+
+class TestLineProtocol:
+    """Test line protocol serialization and timestamps."""
+
+    def test_escaping(self):
+        line = to_line_protocol(
+            "process data",
+            {"z": "last", "device id": "a,b=c", "empty": ""},
+            {"temp c": 21.5, "ok": True, "count": 3, "label": 'say "hi"\\\n'},
+            123,
+        )
+        assert line == (
+            r'process\ data,device\ id=a\,b\=c,z=last '
+            r'temp\ c=21.5,ok=true,count=3i,label="say \"hi\"\\\n" 123'
+        )
+
+    def test_unrepresentable_fields(self):
+        assert to_line_protocol("m", {}, {"a": float("nan"), "b": float("inf")}, 1) is None
+        assert to_line_protocol("m", {}, {"a": float("nan"), "b": 1.0}, 1) == "m b=1.0 1"
+
+    def test_timestamp_to_ns(self):
+        assert timestamp_to_ns("2024-01-01T00:00:00Z") == 1_704_067_200_000_000_000
+        assert timestamp_to_ns("2024-01-01T00:00:00.123456") == 1_704_067_200_123_456_000
+        assert timestamp_to_ns("2024-01-01T01:00:00+01:00") == 1_704_067_200_000_000_000
+
+        before = time.time_ns()
+        assert before <= timestamp_to_ns("not a timestamp") <= time.time_ns()
+        assert before <= timestamp_to_ns(None) <= time.time_ns()
+
+
+class TestBatchingWriter:
+    """Test flushing by size and interval and spilling on failures."""
+
+    def test_flush_by_size(self):
+        influx = FlakyInflux()
+        writer = BatchingWriter(influx.write, CircuitBreaker("test"), batch_size=3)
+        writer.add(make_lines(7))
+        writer.flush()
+        assert [len(body.splitlines()) for body in influx.bodies] == [3, 3, 1]
+        assert writer.get_stats()["written_lines"] == 7
+        assert writer.get_stats()["batches"] == 3
+
+    def test_background_flush_by_size_and_interval(self):
+        influx = FlakyInflux()
+        writer = BatchingWriter(influx.write, CircuitBreaker("test"), batch_size=5, flush_interval=60)
+        writer.start()
+        try:
+            writer.add(make_lines(5))
+            deadline = time.time() + 5
+            while not influx.bodies and time.time() < deadline:
+                time.sleep(0.01)
+            assert influx.lines == make_lines(5)  # full batch, long before the interval
+        finally:
+            writer.stop()
+
+        influx = FlakyInflux()
+        writer = BatchingWriter(influx.write, CircuitBreaker("test"), batch_size=1000, flush_interval=0.05)
+        writer.start()
+        try:
+            writer.add(make_lines(2))
+            deadline = time.time() + 5
+            while not influx.bodies and time.time() < deadline:
+                time.sleep(0.01)
+            assert influx.lines == make_lines(2)  # partial batch, after the interval
+        finally:
+            writer.stop()
+
+    def test_spills_failed_batches_and_replays(self, tmp_path):
+        influx = FlakyInflux()
+        influx.down = True
+        breaker = CircuitBreaker("test", failure_threshold=1, timeout=0)
+        writer = BatchingWriter(influx.write, breaker, batch_size=2, spill=SpillBuffer(str(tmp_path)))
+
+        writer.add(make_lines(4))
+        writer.flush()
+        stats = writer.get_stats()
+        assert stats["spilled_lines"] == 4
+        assert stats["written_lines"] == 0
+        assert stats["spill"]["segments"] == 1
+        assert influx.bodies == []
+
+        influx.down = False
+        assert breaker.state == CircuitState.HALF_OPEN  # timeout=0
+        writer._maybe_replay()
+        assert influx.lines == make_lines(4)
+        assert writer.spill.has_pending is False
+        assert list(tmp_path.iterdir()) == []
+
+    def test_drops_without_spill_buffer(self):
+        influx = FlakyInflux()
+        influx.down = True
+        writer = BatchingWriter(influx.write, CircuitBreaker("test"), batch_size=10)
+        writer.add(make_lines(3))
+        writer.flush()
+        assert writer.get_stats()["dropped_lines"] == 3
+
+
+class TestSpillBuffer:
+    """Test segment rotation, the size bound and replay after a restart."""
+
+    def test_rotation_and_eviction(self, tmp_path):
+        spill = SpillBuffer(str(tmp_path), max_bytes=100, segment_bytes=30)
+        for i in range(10):
+            spill.append(make_lines(1, start=i))
+        stats = spill.get_stats()
+        assert stats["pending_bytes"] <= 100
+        assert stats["dropped_lines"] > 0
+        assert stats["segments"] == len(list(tmp_path.iterdir()))
+
+    def test_replay_after_restart(self, tmp_path):
+        spill = SpillBuffer(str(tmp_path), segment_bytes=1)
+        spill.append(make_lines(2))
+        spill.append(make_lines(2, start=2))
+        assert spill.get_stats()["segments"] == 2
+
+        # New process: recovered segments are replayed oldest-first and never appended to
+        restarted = SpillBuffer(str(tmp_path), segment_bytes=1)
+        assert restarted.has_pending
+        restarted.append(make_lines(1, start=4))
+        assert restarted.get_stats()["segments"] == 3
+
+        influx = FlakyInflux()
+        assert restarted.replay(influx.write) == 3
+        assert influx.lines == make_lines(5)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_replay_keeps_segment_on_failure(self, tmp_path):
+        spill = SpillBuffer(str(tmp_path))
+        spill.append(make_lines(3))
+        influx = FlakyInflux()
+        influx.down = True
+        with pytest.raises(ConnectionError):
+            spill.replay(influx.write)
+        assert spill.get_stats()["segments"] == 1
+
+        influx.down = False
+        assert SpillBuffer(str(tmp_path)).replay(influx.write) == 1
+        assert influx.lines == make_lines(3)
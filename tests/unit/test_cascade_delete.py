@@ -0,0 +1,89 @@
+"""
+Unit Tests for Cascading Device Deletes (src/utils/cascade_delete.py)
+=====================================================================
+
+Tests that deletes follow the declared foreign keys down to grandchild
+tables, leave other devices alone and run one statement per table.
+"""
+
+import sqlite3
+
+import pytest
+
+from src.utils.cascade_delete import cascade_delete, delete_plan, dependency_graph
+
+
+def _count(conn, table, where="1=1"):
+    return conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}").fetchone()[0]
+
+
+@pytest.fixture
+def conn(storage_manager):
+    conn = sqlite3.connect(storage_manager.db_path)
+    for device_id in (1, 2):
+        conn.execute(
+            "INSERT INTO devices (id, vendor_id, device_id, product_name, checksum) VALUES (?, 1, ?, 'P', ?)",
+            (device_id, device_id, f"c{device_id}")
+        )
+        conn.execute("INSERT INTO parameters (device_id, param_index, name, data_type) VALUES (?, 1, 'p', 'UIntegerT')",
+                     (device_id,))
+        conn.execute("INSERT INTO iodd_text (device_id, text_id, language_code, text_value) VALUES (?, 'T', 'en', 'x')",
+                     (device_id,))
+        conn.execute("INSERT INTO process_data (id, device_id, pd_id, name, direction, bit_length, data_type) "
+                     "VALUES (?, ?, 'PD', 'pd', 'input', 8, 'RecordT')", (device_id * 10, device_id))
+        conn.execute("INSERT INTO process_data_record_items (id, process_data_id, subindex, name, bit_offset, "
+                     "bit_length, data_type) VALUES (?, ?, 1, 'r', 0, 8, 'UIntegerT')", (device_id * 100, device_id * 10))
+        conn.execute("INSERT INTO process_data_single_values (record_item_id, value, name) VALUES (?, '1', 'one')",
+                     (device_id * 100,))
+        conn.execute("INSERT INTO ui_menus (id, device_id, menu_id, name) VALUES (?, ?, 'M', 'm')",
+                     (device_id * 10, device_id))
+        conn.execute("INSERT INTO ui_menu_items (menu_id, variable_id, item_order) VALUES (?, 'V', 0)",
+                     (device_id * 10,))
+        conn.execute("INSERT INTO device_config_schemas (device_id, role, device_version, schema_json) "
+                     "VALUES (?, 'all', 0, '{}')", (device_id,))
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+class TestCascadeDelete:
+    """Test schema-driven cascading deletes."""
+
+    def test_plan_orders_children_first(self, conn):
+        plan = [table for table, _ in delete_plan(dependency_graph(conn), "devices", "SELECT 1")]
+        assert plan[-1] == "devices"
+        assert plan.index("process_data_single_values") < plan.index("process_data_record_items") \
+            < plan.index("process_data")
+        assert plan.index("ui_menu_items") < plan.index("ui_menus")
+        assert "device_config_schemas" in plan
+        assert len(plan) == len(set(plan))
+
+    def test_deletes_whole_subtree_only(self, conn):
+        result = cascade_delete(conn, "iodd", [1, 99, 1])
+
+        assert result["deleted_ids"] == [1]
+        assert result["not_found"] == [99]
+        assert result["rows"]["process_data_single_values"] == 1
+        for table in ("parameters", "iodd_text", "process_data", "ui_menus", "device_config_schemas"):
+            assert _count(conn, table, "device_id = 1") == 0
+            assert _count(conn, table, "device_id = 2") == 1
+        assert _count(conn, "process_data_record_items") == 1
+        assert _count(conn, "process_data_single_values") == 1
+        assert _count(conn, "ui_menu_items") == 1
+        assert not conn.in_transaction
+
+    def test_eds_delete_covers_package_files(self, conn):
+        conn.execute("INSERT INTO eds_packages (id, package_name, vendor_name, product_name) VALUES (1, 'pkg', 'v', 'p')")
+        conn.execute("INSERT INTO eds_files (id, vendor_code, product_code, product_name, eds_content, package_id) "
+                     "VALUES (5, 1, 2, 'p', '', 1)")
+        conn.execute("INSERT INTO eds_package_files (package_id, eds_file_id) VALUES (1, 5)")
+        conn.execute("INSERT INTO eds_parameters (eds_file_id, param_number, param_name) VALUES (5, 1, 'x')")
+        conn.commit()
+        conn.execute("PRAGMA foreign_keys = ON")
+
+        result = cascade_delete(conn, "eds", [5])
+
+        assert result["deleted_ids"] == [5]
+        assert _count(conn, "eds_package_files") == 0
+        assert _count(conn, "eds_parameters") == 0
+        assert _count(conn, "eds_packages") == 1
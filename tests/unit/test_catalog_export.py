@@ -0,0 +1,155 @@
+"""
+Unit Tests for Catalog Export (src/utils/catalog_export.py)
+===========================================================
+
+Tests set-based NDJSON records, columnar table files and export jobs
+against a small IODD catalog.
+"""
+
+import gzip
+import json
+import sqlite3
+
+import pytest
+
+from src.utils.catalog_export import CatalogExportJobs, iter_catalog_ndjson, iter_catalog_records
+
+
+@pytest.fixture
+def catalog_db(tmp_path):
+    db_path = str(tmp_path / "catalog.db")
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE devices (id INTEGER PRIMARY KEY, vendor_id INTEGER, product_name TEXT);
+        CREATE TABLE parameters (id INTEGER PRIMARY KEY, device_id INTEGER, param_index INTEGER,
+                                 name TEXT, default_value TEXT);
+        CREATE TABLE process_data (id INTEGER PRIMARY KEY, device_id INTEGER, pd_id TEXT, bit_length INTEGER);
+        CREATE TABLE process_data_record_items (id INTEGER PRIMARY KEY, process_data_id INTEGER,
+                                                subindex INTEGER, name TEXT);
+        CREATE TABLE error_types (id INTEGER PRIMARY KEY, device_id INTEGER, code INTEGER,
+                                  additional_code INTEGER, name TEXT);
+        CREATE TABLE events (id INTEGER PRIMARY KEY, device_id INTEGER, code INTEGER, name TEXT);
+    """)
+    for device_id in range(1, 8):
+        conn.execute("INSERT INTO devices VALUES (?, 42, ?)", (device_id, f"Sensor {device_id}"))
+        for index in range(device_id):
+            conn.execute(
+                "INSERT INTO parameters (device_id, param_index, name, default_value) VALUES (?, ?, ?, ?)",
+                (device_id, index, f"P{index}", index if index % 2 else f"v{index}")
+            )
+        pd_id = conn.execute(
+            "INSERT INTO process_data (device_id, pd_id, bit_length) VALUES (?, 'PDin', 16)", (device_id,)
+        ).lastrowid
+        conn.execute(
+            "INSERT INTO process_data_record_items (process_data_id, subindex, name) VALUES (?, 1, 'Value')",
+            (pd_id,)
+        )
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+class TestCatalogRecords:
+    """Test NDJSON catalog records."""
+
+    def test_records_group_children_by_device(self, catalog_db):
+        records = list(iter_catalog_records(catalog_db, "IODD", batch_size=3))
+
+        assert [r["device"]["id"] for r in records] == list(range(1, 8))
+        assert [len(r["parameters"]) for r in records] == list(range(1, 8))
+        assert records[4]["process_data_record_items"][0]["device_id"] == 5
+        assert records[0]["events"] == []
+
+    def test_device_filter_and_include(self, catalog_db):
+        records = list(iter_catalog_records(catalog_db, "IODD", [6, 2, 99], include=("parameters",)))
+        assert [r["device"]["id"] for r in records] == [2, 6]
+        assert set(records[0]) == {"type", "device", "parameters"}
+
+    def test_ndjson_lines(self, catalog_db):
+        lines = b"".join(iter_catalog_ndjson(catalog_db, "IODD", batch_size=2)).splitlines()
+        assert len(lines) == 7
+        assert json.loads(lines[2])["device"]["product_name"] == "Sensor 3"
+
+    def test_unknown_device_type(self, catalog_db):
+        with pytest.raises(ValueError):
+            list(iter_catalog_records(catalog_db, "PROFINET"))
+
+
+class TestCatalogJobs:
+    """Test background export jobs."""
+
+    def test_parquet_job(self, catalog_db, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        jobs = CatalogExportJobs(str(tmp_path / "exports"))
+        job = jobs.create("IODD", "parquet")
+
+        jobs.run(job["job_id"], catalog_db)
+
+        job = jobs.get(job["job_id"])
+        assert job["status"] == "completed"
+        assert job["rows_written"] == job["rows_total"] == 7 + 28 + 7 + 7
+        table = pq.read_table(f"{jobs.job_dir(job['job_id'])}/iodd_parameters.parquet")
+        assert table.num_rows == 28
+        # Mixed SQLite storage classes are coerced to the declared column type
+        assert table.schema.field("default_value").type == "string"
+
+    def test_ndjson_job_and_delete(self, catalog_db, tmp_path):
+        jobs = CatalogExportJobs(str(tmp_path / "exports"))
+        job_id = jobs.create("IODD", "ndjson")["job_id"]
+        jobs.run(job_id, catalog_db)
+
+        path = f"{jobs.job_dir(job_id)}/iodd_catalog.ndjson.gz"
+        with gzip.open(path, "rt") as f:
+            assert len(f.readlines()) == 7
+
+        assert jobs.delete(job_id)
+        assert jobs.get(job_id) is None
+
+
+class TestBatchJsonExport:
+    """Test the batch JSON export route."""
+
+    def test_full_device_rows(self, tmp_path, monkeypatch):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        from src.greenstack import StorageManager
+        from src.routes import config_export_routes
+
+        db_path = str(tmp_path / "greenstack.db")
+        StorageManager(db_path)
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            INSERT INTO devices (vendor_id, device_id, product_name, manufacturer, iodd_version, checksum)
+            VALUES (310, 1234, 'Sensor', 'ACME', '1.1', 'abc')
+        """)
+        conn.execute("INSERT INTO iodd_files (device_id, file_name, schema_version) VALUES (1, 'a.xml', '1.1')")
+        conn.execute("""
+            INSERT INTO parameters (device_id, param_index, name, data_type, default_value, min_value, max_value, unit)
+            VALUES (1, 0, 'Range', 'UIntegerT', '5', '0', '10', 'm')
+        """)
+        conn.commit()
+        device_columns = [row[1] for row in conn.execute("PRAGMA table_info(devices)")]
+        conn.close()
+
+        monkeypatch.setattr(config_export_routes, "DB_PATH", db_path)
+        app = FastAPI()
+        app.include_router(config_export_routes.router)
+        response = TestClient(app).get(
+            "/api/config-export/batch/json", params={"device_type": "iodd", "device_ids": "1, 99"}
+        )
+
+        assert response.status_code == 200
+        export = response.json()
+        assert export["total_count"] == 1
+        assert export["device_type"] == "IODD"
+        entry = export["devices"][0]
+        assert entry["type"] == "IODD"
+        assert list(entry["device"]) == device_columns
+        assert entry["device"]["iodd_version"] == "1.1"
+        parameter = entry["parameters"][0]
+        assert {key: parameter[key] for key in ("param_index", "name", "data_type", "default_value",
+                                                "min_value", "max_value", "unit")} == {
+            "param_index": 0, "name": "Range", "data_type": "UIntegerT", "default_value": "5",
+            "min_value": "0", "max_value": "10", "unit": "m",
+        }
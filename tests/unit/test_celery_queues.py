@@ -0,0 +1,73 @@
+"""
+Unit Tests for Celery Queues (src/celery_app.py, src/tasks/queue_metrics.py)
+============================================================================
+
+Tests per-domain routing with priorities and the queue depth/latency
+collector.
+"""
+
+import json
+import time
+
+from src.celery_app import PRIORITY_BATCH, PRIORITY_INTERACTIVE, celery_app
+from src.tasks.queue_metrics import CeleryQueueCollector, priority_keys
+
+
+def _route(task_name):
+    route = celery_app.amqp.router.route({}, task_name)
+    return route['queue'].name, route.get('priority')
+
+
+class _FakePipeline:
+    def __init__(self, lists):
+        self.lists = lists
+        self.calls = []
+
+    def llen(self, key):
+        self.calls.append(len(self.lists.get(key, [])))
+
+    def lindex(self, key, index):
+        items = self.lists.get(key, [])
+        self.calls.append(items[index] if items else None)
+
+    def execute(self):
+        return self.calls
+
+
+class _FakeRedis:
+    def __init__(self, lists):
+        self.lists = lists
+
+    def pipeline(self):
+        return _FakePipeline(self.lists)
+
+
+class TestCeleryQueues:
+    """Test queue routing and metrics."""
+
+    def test_domain_routing(self):
+        assert _route('src.tasks.iodd_tasks.parse_iodd_file') == ('ingest', PRIORITY_INTERACTIVE)
+        assert _route('src.tasks.iodd_tasks.parse_iodd_chunk') == ('ingest', PRIORITY_BATCH)
+        assert _route('src.tasks.export_tasks.export_devices_chunk') == ('export', PRIORITY_BATCH)
+        assert _route('src.tasks.generation_tasks.generate_device_pdf')[0] == 'generation'
+        assert _route('src.tasks.dlq_handler.process_dlq_message')[0] == 'celery_dlq'
+
+    def test_collector_reports_depth_and_oldest_age(self):
+        def message(age):
+            return json.dumps({'headers': {'published_at': time.time() - age}}).encode()
+
+        steps = celery_app.conf.broker_transport_options['priority_steps']
+        ingest_keys = priority_keys('ingest', steps)
+        fake = _FakeRedis({
+            ingest_keys[0]: [message(1), message(5)],
+            ingest_keys[6]: [message(30)],
+            'export': [b'not json'],
+        })
+
+        families = {family.name: family for family in CeleryQueueCollector(fake, ['ingest', 'export']).collect()}
+        lengths = {s.labels['queue']: s.value for s in families['celery_queue_length'].samples}
+        ages = {s.labels['queue']: s.value for s in families['celery_queue_oldest_message_age_seconds'].samples}
+
+        assert lengths == {'ingest': 3, 'export': 1}
+        assert 29 <= ages['ingest'] < 60
+        assert ages['export'] == 0.0
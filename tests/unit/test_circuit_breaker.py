@@ -0,0 +1,186 @@
+"""
+Unit Tests for the Circuit Breaker (services/common/circuit_breaker.py)
+=======================================================================
+
+Tests consecutive-failure and failure-rate tripping, HALF_OPEN probing and
+recovery, and the Prometheus collector.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+SERVICES = Path(__file__).parent.parent.parent / "services"
+if str(SERVICES) not in sys.path:
+    sys.path.insert(0, str(SERVICES))
+
+from common import circuit_breaker as circuit_breaker_module  # noqa: E402
+from common.circuit_breaker import (  # noqa: E402
+    CircuitBreaker, CircuitBreakerCollector, CircuitBreakerOpenException, CircuitState, SlidingWindow
+)
+
+
+def ok():
+    return "ok"
+
+
+def fail():
+    raise ConnectionError("unavailable")
+
+
+def call(breaker, func):
+    try:
+        return breaker.call(func)
+    except ConnectionError:
+        return None
+
+
+class TestSlidingWindow:
+    """Test time-bucketed call counts."""
+
+    def test_totals_expire_with_the_window(self):
+        window = SlidingWindow(window_seconds=10, buckets=10)
+        window.record_success(100.0)
+        window.record_failure(100.5)
+        window.record_failure(105.0)
+        assert window.totals(105.0) == (3, 2)
+        assert window.totals(110.5) == (1, 1)  # buckets from t=100 fell out
+        assert window.totals(200.0) == (0, 0)
+
+    def test_reused_bucket_is_reset(self):
+        window = SlidingWindow(window_seconds=10, buckets=10)
+        window.record_failure(100.0)
+        window.record_success(110.0)  # same slot, next lap
+        assert window.totals(110.0) == (1, 0)
+
+
+class NoLock:
+    def __enter__(self):
+        raise AssertionError("lock taken")
+
+    def __exit__(self, *exc):
+        return False
+
+
+class TestTripping:
+    """Test opening on consecutive failures and on the failure rate."""
+
+    def test_closed_path_takes_no_lock(self):
+        breaker = CircuitBreaker("test")
+        breaker._lock = NoLock()
+        for _ in range(3):
+            assert breaker.call(ok) == "ok"
+        assert breaker.calls_succeeded == 3
+        assert breaker._window.totals(time.perf_counter()) == (3, 0)
+
+    def test_consecutive_failures(self):
+        breaker = CircuitBreaker("test", failure_threshold=3)
+        call(breaker, fail)
+        call(breaker, fail)
+        call(breaker, ok)  # a success resets the count
+        call(breaker, fail)
+        call(breaker, fail)
+        assert breaker.state == CircuitState.CLOSED
+        call(breaker, fail)
+        assert breaker.state == CircuitState.OPEN
+
+        with pytest.raises(CircuitBreakerOpenException):
+            breaker.call(ok)
+        assert breaker.get_stats()["calls"] == {"succeeded": 1, "failed": 5, "rejected": 1}
+
+    def test_failure_rate_needs_minimum_calls(self):
+        breaker = CircuitBreaker("test", failure_threshold=100, failure_rate_threshold=0.5, minimum_calls=10)
+        for _ in range(4):
+            call(breaker, ok)
+            call(breaker, fail)
+        # 50% failures, but only 8 calls in the window
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.get_stats()["window"] == {"calls": 8, "failures": 4}
+
+        call(breaker, ok)
+        call(breaker, fail)
+        assert breaker.state == CircuitState.OPEN
+
+    def test_failure_rate_below_threshold(self):
+        breaker = CircuitBreaker("test", failure_threshold=100, failure_rate_threshold=0.5, minimum_calls=10)
+        for _ in range(10):
+            call(breaker, ok)
+            call(breaker, ok)
+            call(breaker, fail)
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_only_expected_exceptions_count(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, expected_exception=ConnectionError)
+        with pytest.raises(KeyError):
+            breaker.call(lambda: {}["missing"])
+        assert breaker.state == CircuitState.CLOSED
+
+
+class TestRecovery:
+    """Test HALF_OPEN probes after the timeout."""
+
+    def open_breaker(self, timeout=0.05, success_threshold=2):
+        breaker = CircuitBreaker("test", failure_threshold=1, success_threshold=success_threshold, timeout=timeout)
+        call(breaker, fail)
+        assert breaker.state == CircuitState.OPEN
+        return breaker
+
+    def test_probe_successes_close_the_circuit(self):
+        breaker = self.open_breaker()
+        time.sleep(0.06)
+        assert breaker.call(ok) == "ok"
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.call(ok) == "ok"
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.get_stats()["window"]["calls"] == 0  # window cleared on recovery
+        assert breaker.transitions == {("closed", "open"): 1, ("open", "half_open"): 1, ("half_open", "closed"): 1}
+
+    def test_failed_probe_reopens(self):
+        breaker = self.open_breaker()
+        time.sleep(0.06)
+        call(breaker, fail)
+        assert breaker.state == CircuitState.OPEN
+        with pytest.raises(CircuitBreakerOpenException):
+            breaker.call(ok)
+
+    def test_reset(self):
+        breaker = self.open_breaker(timeout=60)
+        breaker.reset()
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.call(ok) == "ok"
+
+
+class TestCollector:
+    """Test the samples exported to Prometheus."""
+
+    def test_collect(self, monkeypatch):
+        pytest.importorskip("prometheus_client")
+        breaker = CircuitBreaker("influxdb", failure_threshold=1)
+        breaker.call(ok)
+        call(breaker, fail)
+        monkeypatch.setattr(circuit_breaker_module, "_circuit_breakers", {"influxdb": breaker})
+
+        samples = {
+            (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+            for family in CircuitBreakerCollector().collect()
+            for sample in family.samples
+        }
+        assert samples[("circuit_breaker_state", (("name", "influxdb"),))] == 2
+        calls = (("name", "influxdb"), ("result", "success"))
+        assert samples[("circuit_breaker_calls_total", calls)] == 1
+        transition = (("from_state", "closed"), ("name", "influxdb"), ("to_state", "open"))
+        assert samples[("circuit_breaker_state_transitions_total", transition)] == 1
+        assert samples[("circuit_breaker_call_duration_seconds_count", (("name", "influxdb"),))] == 2
+        assert samples[("circuit_breaker_call_duration_seconds_bucket", (("le", "+Inf"), ("name", "influxdb")))] == 2
+
+    def test_register_once(self, monkeypatch):
+        prometheus_client = pytest.importorskip("prometheus_client")
+        registry = prometheus_client.CollectorRegistry()
+        monkeypatch.setattr(circuit_breaker_module, "_collector_registered", False)
+        monkeypatch.setattr(circuit_breaker_module, "_circuit_breakers", {"redis": CircuitBreaker("redis")})
+
+        assert circuit_breaker_module.register_prometheus_collector(registry) is True
+        assert circuit_breaker_module.register_prometheus_collector(registry) is True
+        assert registry.get_sample_value("circuit_breaker_state", {"name": "redis"}) == 0
@@ -0,0 +1,80 @@
+"""
+Unit Tests for Materialized Config Schemas (src/utils/config_schema.py)
+=======================================================================
+
+Tests schema resolution, per-role documents and invalidation through the
+device version counters.
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from src.utils.config_schema import build_config_schema, get_config_schema_json
+
+
+@pytest.fixture
+def db_path(storage_manager):
+    conn = sqlite3.connect(storage_manager.db_path)
+    conn.execute("INSERT INTO devices (id, vendor_id, device_id, product_name, checksum) VALUES (1, 1, 1, 'P', 'c')")
+    conn.execute("""
+        INSERT INTO parameters (device_id, param_index, name, data_type, access_rights, enumeration_values)
+        VALUES (1, 5, 'LED Intensity', 'UIntegerT', 'rw', '{"0":"Off","1":"On"}')
+    """)
+    conn.execute("""
+        INSERT INTO ui_menus (id, device_id, menu_id, name)
+        VALUES (10, 1, 'M_Main', 'Main'), (11, 1, 'M_Sub', 'Sub'), (12, 1, 'M_Other', 'Other')
+    """)
+    conn.execute("""
+        INSERT INTO ui_menu_items (menu_id, variable_id, menu_ref, item_order)
+        VALUES (10, 'V_LED_Intensity', NULL, 0), (10, NULL, 'M_Sub', 1), (11, 'V_Missing', NULL, 0)
+    """)
+    conn.execute("""
+        INSERT INTO ui_menu_roles (device_id, role_type, menu_type, menu_id)
+        VALUES (1, 'observer', 'main', 'M_Main'), (1, 'specialist', 'main', 'M_Other')
+    """)
+    conn.commit()
+    conn.close()
+    return storage_manager.db_path
+
+
+class TestConfigSchema:
+    """Test config schema resolution and materialization."""
+
+    def test_build_resolves_parameters(self, db_path):
+        conn = sqlite3.connect(db_path)
+        schema = build_config_schema(conn, 1)
+        conn.close()
+
+        main, sub, _ = schema['menus']
+        assert main['items'][0]['parameter']['name'] == 'LED Intensity'
+        assert main['items'][0]['parameter']['enumeration_values'] == {'0': 'Off', '1': 'On'}
+        assert main['items'][1]['menu_ref'] == 'M_Sub'
+        assert sub['items'][0]['parameter'] is None
+        assert schema['role_mappings']['observer'] == {'main': 'M_Main'}
+
+    def test_role_documents(self, db_path):
+        observer = json.loads(get_config_schema_json(db_path, 1, 'observer'))
+        assert [menu['id'] for menu in observer['menus']] == ['M_Main', 'M_Sub']
+        assert list(observer['role_mappings']) == ['observer']
+
+        full = json.loads(get_config_schema_json(db_path, 1))
+        assert len(full['menus']) == 3
+        assert get_config_schema_json(db_path, 99) is None
+
+    def test_rebuilt_after_device_changes(self, db_path):
+        get_config_schema_json(db_path, 1)
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE parameters SET name = 'Renamed' WHERE device_id = 1")
+        conn.commit()
+        # Stored rows are still current: only device-level writes bump the version
+        assert 'LED Intensity' in get_config_schema_json(db_path, 1)
+
+        conn.execute("UPDATE devices SET product_name = 'Reimported' WHERE id = 1")
+        conn.commit()
+        assert 'LED Intensity' not in get_config_schema_json(db_path, 1)
+        versions = conn.execute("SELECT DISTINCT device_version FROM device_config_schemas").fetchall()
+        assert len(versions) == 1
+        conn.close()
@@ -0,0 +1,52 @@
+"""
+Unit Tests for Fast JSON Responses (src/utils/fast_json.py)
+===========================================================
+
+Tests orjson rendering of API payloads and verbatim embedding of JSON
+documents stored in the database.
+"""
+
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from pydantic import BaseModel
+
+from src.utils.fast_json import FRAGMENT_AVAILABLE, FastJSONResponse, dumps, raw_json
+
+
+class _Item(BaseModel):
+    name: str
+    created: datetime
+
+
+class TestFastJSON:
+    """Test serialization helpers."""
+
+    def test_dumps_handles_api_types(self):
+        payload = {
+            "when": datetime(2025, 1, 2, 3, 4, 5),
+            "price": Decimal("1.5"),
+            "tags": {"a"},
+            "item": _Item(name="x", created=datetime(2025, 1, 1)),
+            1: "non-string key",
+        }
+        data = json.loads(dumps(payload))
+        assert data["when"] == "2025-01-02T03:04:05"
+        assert data["price"] == 1.5
+        assert data["tags"] == ["a"]
+        assert data["item"] == {"name": "x", "created": "2025-01-01T00:00:00"}
+        assert data["1"] == "non-string key"
+
+    def test_raw_json_embeds_stored_document(self):
+        stored = '{"0":"Off","1":"On \\u00e9"}'
+        body = dumps([{"enumeration_values": raw_json(stored)}, {"enumeration_values": raw_json(None)}])
+
+        assert json.loads(body) == [{"enumeration_values": {"0": "Off", "1": "On é"}}, {"enumeration_values": None}]
+        if FRAGMENT_AVAILABLE:
+            assert stored.encode() in body
+
+    def test_response_renders_with_fast_path(self):
+        response = FastJSONResponse({"name": "ä", "values": [1, 2]})
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == {"name": "ä", "values": [1, 2]}
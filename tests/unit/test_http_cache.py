@@ -0,0 +1,117 @@
+"""
+Unit Tests for Device Versions and Conditional GETs
+===================================================
+
+Tests the trigger-maintained version counters (src/utils/device_versions.py)
+and the ETag / If-None-Match middleware (src/http_cache.py).
+"""
+
+import sqlite3
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.http_cache import ConditionalGetMiddleware, etag_matches, match_device_path
+from src.utils.device_versions import DeviceVersions, install_device_versions
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "versions.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE devices (id INTEGER PRIMARY KEY, product_name TEXT)")
+    conn.execute("CREATE TABLE eds_files (id INTEGER PRIMARY KEY, product_name TEXT)")
+    install_device_versions(conn)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _version(conn, device_type, device_id):
+    row = conn.execute(
+        "SELECT version FROM device_versions WHERE device_type = ? AND device_id = ?",
+        (device_type, device_id)
+    ).fetchone()
+    return row[0] if row else None
+
+
+class TestDeviceVersions:
+    """Test version bumps and the in-process version cache."""
+
+    def test_triggers_bump_on_write(self, db_path):
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO devices (id, product_name) VALUES (1, 'A')")
+        imported = _version(conn, "iodd", 1)
+        assert imported is not None
+        assert _version(conn, "eds", 1) is None
+
+        conn.execute("UPDATE devices SET product_name = 'B' WHERE id = 1")
+        updated = _version(conn, "iodd", 1)
+        conn.execute("DELETE FROM devices WHERE id = 1")
+        assert imported < updated < _version(conn, "iodd", 1)
+        conn.close()
+
+    def test_cache_sees_other_connections(self, db_path):
+        versions = DeviceVersions(db_path)
+        assert versions.get("eds", 7) == 0
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO eds_files (id, product_name) VALUES (7, 'X')")
+        conn.commit()
+        assert versions.get("eds", 7) == _version(conn, "eds", 7)
+        conn.close()
+        versions.close()
+
+
+class TestConditionalGet:
+    """Test ETag handling for device detail paths."""
+
+    @pytest.fixture
+    def client(self, db_path):
+        app = FastAPI()
+        calls = []
+
+        @app.get("/api/iodd/{device_id}/parameters")
+        def parameters(device_id: int):
+            calls.append(device_id)
+            return [{"name": "p1"}]
+
+        @app.get("/api/iodd")
+        def devices():
+            return []
+
+        app.add_middleware(
+            ConditionalGetMiddleware, versions=DeviceVersions(db_path), app_version="test", max_age=30
+        )
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO devices (id, product_name) VALUES (1, 'A')")
+        conn.commit()
+        conn.close()
+        return TestClient(app), calls
+
+    def test_not_modified_skips_handler(self, client, db_path):
+        client, calls = client
+        response = client.get("/api/iodd/1/parameters")
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "public, max-age=30, must-revalidate"
+
+        cached = client.get("/api/iodd/1/parameters", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert calls == [1]
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("DELETE FROM devices WHERE id = 1")
+        conn.commit()
+        conn.close()
+        assert client.get("/api/iodd/1/parameters", headers={"If-None-Match": etag}).status_code == 200
+
+    def test_lists_are_not_tagged(self, client):
+        client, _ = client
+        assert "etag" not in client.get("/api/iodd").headers
+
+    def test_helpers(self):
+        assert match_device_path("/api/eds/12/assemblies") == ("eds", 12)
+        assert match_device_path("/api/iodd/reset") is None
+        assert etag_matches('"a", W/"iodd-1-5-x"', 'W/"iodd-1-5-x"')
+        assert not etag_matches('W/"iodd-1-4-x"', 'W/"iodd-1-5-x"')
@@ -0,0 +1,130 @@
+"""
+Unit Tests for the Index Audit (src/utils/index_audit.py)
+=========================================================
+
+Tests that lookups are extracted from SQL literals, that foreign keys and
+lookups without an index are reported (and indexed ones are not), and that
+full scans and the generated migration come out right.
+"""
+
+import sqlite3
+
+import pytest
+
+from src.utils.index_audit import (
+    Query,
+    extract_queries,
+    full_scans,
+    lookup_patterns,
+    missing_indexes,
+    render_migration,
+)
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript("""
+        CREATE TABLE devices (id INTEGER PRIMARY KEY, vendor_id INTEGER, product_name TEXT);
+        CREATE TABLE iodd_text (
+            id INTEGER PRIMARY KEY,
+            device_id INTEGER REFERENCES devices(id),
+            text_id TEXT, text_value TEXT, language_code TEXT
+        );
+        CREATE TABLE parameters (
+            id INTEGER PRIMARY KEY,
+            device_id INTEGER REFERENCES devices(id),
+            name TEXT, xml_content TEXT
+        );
+        CREATE INDEX idx_parameters_device ON parameters(device_id);
+    """)
+    yield conn
+    conn.close()
+
+
+def test_lookup_patterns_equality_and_covering():
+    sql = "SELECT text_id FROM iodd_text WHERE device_id = ? AND text_value = ?"
+    assert lookup_patterns(sql) == [("iodd_text", ("device_id", "text_value"), ("text_id",))]
+
+
+def test_lookup_patterns_literal_equality():
+    sql = "SELECT version FROM device_versions WHERE device_type = 'iodd' AND device_id = ? AND flag = 1"
+    assert lookup_patterns(sql) == [("device_versions", ("device_type", "device_id", "flag"), ("version",))]
+
+
+def test_lookup_patterns_wide_select_is_not_covered():
+    sql = "SELECT * FROM parameters p WHERE p.device_id = ? ORDER BY p.id"
+    assert lookup_patterns(sql) == [("parameters", ("device_id",), ())]
+
+
+def test_lookup_patterns_join():
+    sql = "SELECT d.id FROM devices d JOIN iodd_text t ON t.device_id = d.id WHERE d.vendor_id = ?"
+    assert lookup_patterns(sql) == [("iodd_text", ("device_id",), ())]
+
+
+def test_missing_indexes(conn):
+    queries = [
+        Query("SELECT text_id FROM iodd_text WHERE device_id = ? AND text_value = ?", "a.py:1"),
+        Query("SELECT xml_content FROM parameters WHERE device_id = ?", "a.py:2"),
+        Query("SELECT product_name FROM devices WHERE id = ?", "a.py:3"),
+    ]
+    candidates = missing_indexes(conn, queries)
+
+    # Payload columns are neither searched by nor covered; the foreign key on
+    # device_id is served by the wider lookup index
+    assert [(c.table, c.columns) for c in candidates] == [("iodd_text", ("device_id", "text_id"))]
+    assert candidates[0].uses == 2
+    assert "foreign key -> devices" in candidates[0].reasons
+
+
+def test_literal_lookup_on_primary_key(conn):
+    conn.execute("""
+        CREATE TABLE device_versions (
+            device_type TEXT NOT NULL, device_id INTEGER NOT NULL, version INTEGER,
+            PRIMARY KEY (device_type, device_id)
+        )
+    """)
+    queries = [Query("SELECT version FROM device_versions WHERE device_type = 'iodd' AND device_id = ?", "a.py:1")]
+    assert [c for c in missing_indexes(conn, queries) if c.table == "device_versions"] == []
+
+
+def test_missing_indexes_after_indexing(conn):
+    conn.execute("CREATE INDEX idx_text ON iodd_text(device_id, text_value)")
+    queries = [Query("SELECT text_id FROM iodd_text WHERE text_value = ? AND device_id = ?", "a.py:1")]
+    assert missing_indexes(conn, queries) == []
+
+
+def test_full_scans(conn):
+    queries = [
+        Query("SELECT * FROM iodd_text WHERE text_value = ?", "a.py:1"),
+        Query("SELECT * FROM iodd_text WHERE text_value = ?", "b.py:1"),
+        Query("SELECT * FROM parameters WHERE device_id = ?", "a.py:2"),
+        Query("SELECT * FROM missing_table", "a.py:3"),
+    ]
+    scans = full_scans(conn, queries)
+
+    assert len(scans) == 1
+    occurrences, query, details = scans[0]
+    assert occurrences == 2
+    assert details == ["SCAN iodd_text"]
+
+
+def test_extract_queries_skips_fstrings(tmp_path):
+    source = tmp_path / "module.py"
+    source.write_text(
+        'A = "SELECT id FROM devices WHERE vendor_id = ?"\n'
+        'B = f"SELECT id FROM {table} WHERE id = ?"\n'
+        'C = "not sql"\n'
+    )
+    queries = extract_queries([source], root=tmp_path)
+    assert [(q.sql, q.location) for q in queries] == [
+        ("SELECT id FROM devices WHERE vendor_id = ?", "module.py:1")
+    ]
+
+
+def test_render_migration(conn):
+    candidates = missing_indexes(conn, [])
+    source = render_migration(candidates, "100", "099", "2026-01-01")
+    compile(source, "100_migration.py", "exec")
+    assert "revision = '100'" in source
+    assert "idx_iodd_text_device_id" in source
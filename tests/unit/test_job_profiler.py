@@ -0,0 +1,197 @@
+"""
+Unit Tests for Job Profiling (src/utils/job_profiler.py)
+========================================================
+
+Tests the stack sampler, speedscope/collapsed export, arming, retention,
+the admin profile routes and profiling of flagged Celery tasks.
+"""
+
+import asyncio
+import inspect
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.routes import admin_routes
+from src.utils.job_profiler import JobProfiles, SamplingProfiler, collapsed_stacks, profiled, to_speedscope
+
+
+def busy_leaf(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += 1
+    return total
+
+
+def busy_job(seconds=0.15):
+    return busy_leaf(seconds)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobProfiles(str(tmp_path / "profiles"), retention=2)
+
+
+class TestSamplingProfiler:
+    """Test sampling and export."""
+
+    def test_samples_the_attached_thread(self):
+        profiler = SamplingProfiler(interval=0.002)
+        profiler.attach()
+        profiler.start()
+        busy_job()
+        profiler.stop()
+
+        assert profiler.samples > 10
+        document = to_speedscope(profiler, "test", {"job": "test"})
+        assert document["$schema"].startswith("https://www.speedscope.app/")
+        (profile,) = document["profiles"]
+        assert profile["type"] == "sampled"
+        assert len(profile["samples"]) == len(profile["weights"])
+        # Weights account for the wall time of the run
+        assert profile["endValue"] == pytest.approx(profiler.duration * 1000, rel=0.25)
+
+        names = [frame["name"] for frame in document["shared"]["frames"]]
+        leaf_time = sum(
+            weight for stack, weight in zip(profile["samples"], profile["weights"])
+            if names[stack[-1]] == "busy_leaf" and names[stack[-2]] == "busy_job"
+        )
+        assert leaf_time > profile["endValue"] * 0.8
+
+    def test_collapsed_stacks(self):
+        profiler = SamplingProfiler(interval=0.002)
+        profiler.attach()
+        profiler.start()
+        busy_job(0.05)
+        profiler.stop()
+
+        lines = collapsed_stacks(to_speedscope(profiler, "test")).splitlines()
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert any("busy_job (" in line and ";busy_leaf (" in line for line in lines)
+
+
+class TestJobProfiles:
+    """Test arming, storage and retention."""
+
+    def test_profiles_only_armed_runs(self, store):
+        with profiled("pqa.daily", store=store) as profiler:
+            assert profiler is None
+        assert store.list() == []
+
+        store.arm("pqa.daily", runs=2)
+        for _ in range(3):
+            with profiled("pqa.daily", store=store, devices=3):
+                busy_job(0.02)
+        assert store.armed() == {}
+
+        profiles = store.list()
+        assert len(profiles) == 2
+        assert {entry["job"] for entry in profiles} == {"pqa.daily"}
+        metadata = store.load(profiles[0]["profile_id"])["metadata"]
+        assert metadata["job"] == "pqa.daily"
+        assert metadata["devices"] == 3
+        assert metadata["status"] == "completed"
+
+    def test_enabled_flag_retention_and_failures(self, store):
+        for _ in range(3):
+            with profiled("pqa.analyze_all", enabled=True, store=store):
+                busy_job(0.01)
+        assert len(store.list()) == 2
+
+        with pytest.raises(RuntimeError):
+            with profiled("pqa.analyze_all", enabled=True, store=store):
+                raise RuntimeError("boom")
+        latest = store.load(store.list()[0]["profile_id"])["metadata"]
+        assert latest["status"] == "failed"
+        assert latest["error"] == "boom"
+
+    def test_rejects_unknown_jobs_and_paths(self, store):
+        with pytest.raises(ValueError):
+            store.arm("nonexistent.job")
+        store.arm("src.tasks.iodd_tasks.parse_iodd_file")
+        assert store.path("../secrets") is None
+        assert store.path("missing") is None
+
+    def test_decorates_async_functions(self, store):
+        @profiled("eds.import", store=store)
+        async def upload(file_name: str, size: int = 0):
+            busy_job(0.02)
+            return file_name
+
+        assert list(inspect.signature(upload).parameters) == ["file_name", "size"]
+        store.arm("eds.import")
+        assert asyncio.run(upload("device.eds")) == "device.eds"
+        assert asyncio.run(upload("device.eds")) == "device.eds"
+        assert len(store.list()) == 1
+
+
+@pytest.fixture
+def admin_client(store, monkeypatch):
+    monkeypatch.setattr(admin_routes, "job_profiles", store)
+    app = FastAPI()
+    app.include_router(admin_routes.router)
+    return TestClient(app)
+
+
+class TestProfileRoutes:
+    """Test the admin profiling endpoints."""
+
+    def test_arm_list_and_download(self, admin_client, store):
+        assert admin_client.post("/api/admin/profiling/arm", params={"job": "bogus"}).status_code == 400
+        response = admin_client.post("/api/admin/profiling/arm", params={"job": "iodd.import", "runs": 2})
+        assert response.json()["armed_runs"] == 2
+        jobs = {job["job"]: job for job in admin_client.get("/api/admin/profiling").json()["jobs"]}
+        assert jobs["iodd.import"]["armed_runs"] == 2
+        assert jobs["pqa.daily"]["armed_runs"] == 0
+
+        with profiled("iodd.import", store=store):
+            busy_job(0.02)
+        assert admin_client.delete("/api/admin/profiling/arm/iodd.import").status_code == 200
+        assert admin_client.delete("/api/admin/profiling/arm/iodd.import").status_code == 404
+
+        (entry,) = admin_client.get("/api/admin/profiles").json()["profiles"]
+        profile_id = entry["profile_id"]
+        document = admin_client.get(f"/api/admin/profiles/{profile_id}").json()
+        assert document["metadata"]["job"] == "iodd.import"
+
+        folded = admin_client.get(f"/api/admin/profiles/{profile_id}", params={"format": "collapsed"})
+        assert folded.status_code == 200
+        assert "busy_leaf (" in folded.text
+
+        assert admin_client.delete(f"/api/admin/profiles/{profile_id}").status_code == 200
+        assert admin_client.get(f"/api/admin/profiles/{profile_id}").status_code == 404
+
+
+class TestCeleryTaskProfiles:
+    """Test profiling of flagged Celery tasks."""
+
+    def test_flags_armed_tasks_and_profiles_them(self, store, monkeypatch):
+        from src import celery_app as celery_module
+
+        monkeypatch.setattr(celery_module, "job_profiles", store)
+        monkeypatch.setattr("src.utils.job_profiler.job_profiles", store)
+
+        store.arm("src.tasks.test.busy")
+        headers = {}
+        celery_module._request_profile(sender="src.tasks.test.busy", headers=headers)
+        assert headers[celery_module.PROFILE_HEADER] is True
+        other = {}
+        celery_module._request_profile(sender="src.tasks.test.busy", headers=other)
+        assert celery_module.PROFILE_HEADER not in other
+
+        @celery_module.celery_app.task(name="src.tasks.test.busy")
+        def busy():
+            return busy_job(0.02)
+
+        busy.apply(headers=headers)
+        busy.apply()
+        (entry,) = store.list()
+        metadata = store.load(entry["profile_id"])["metadata"]
+        assert metadata["job"] == "src.tasks.test.busy"
+        assert metadata["status"] == "success"
+        assert celery_module._task_profiles == {}
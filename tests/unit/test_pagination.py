@@ -0,0 +1,134 @@
+"""
+Unit Tests for Keyset Pagination and Response Compression
+=========================================================
+
+Tests cursor paging over SQLite queries (src/utils/pagination.py) and the
+brotli/gzip response middleware (src/compression.py).
+"""
+
+import gzip
+import sqlite3
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, Response
+from fastapi.testclient import TestClient
+
+from src.compression import CompressionMiddleware, _Compressor, select_encoding
+from src.utils.pagination import PageParams, decode_cursor, encode_cursor, fetch_page, project
+
+SORT_FIELDS = {"name": "name", "id": "id"}
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE things (id INTEGER PRIMARY KEY, name TEXT, kind TEXT)")
+    # Duplicate names exercise the id tiebreak
+    conn.executemany(
+        "INSERT INTO things (name, kind) VALUES (?, ?)",
+        [(f"thing-{i // 2:02d}", "even" if i % 2 == 0 else "odd") for i in range(25)],
+    )
+    yield conn
+    conn.close()
+
+
+def _page(limit=None, sort="name", order="asc", after=None, include_total=False):
+    return PageParams(limit=limit, sort=sort, order=order, after=after, fields=None, include_total=include_total)
+
+
+class TestFetchPage:
+    """Test keyset pages over a base query."""
+
+    @pytest.mark.parametrize("order", ["asc", "desc"])
+    def test_pages_cover_all_rows_once(self, conn, order):
+        seen = []
+        after = None
+        while True:
+            rows, next_cursor, _ = fetch_page(
+                conn, "SELECT id, name FROM things", [], _page(7, order=order, after=after), SORT_FIELDS
+            )
+            seen.extend(row["id"] for row in rows)
+            if next_cursor is None:
+                break
+            after = decode_cursor(next_cursor, "name", order)
+
+        expected = [row[0] for row in conn.execute(
+            f"SELECT id FROM things ORDER BY name {order}, id {order}"
+        )]
+        assert seen == expected
+
+    def test_filters_and_total(self, conn):
+        rows, next_cursor, total = fetch_page(
+            conn, "SELECT id, name FROM things WHERE kind = ?", ["odd"],
+            _page(5, include_total=True), SORT_FIELDS
+        )
+        assert len(rows) == 5
+        assert next_cursor is not None
+        assert total == 12
+        assert set(rows[0]) == {"id", "name"}
+
+    def test_unpaginated(self, conn):
+        rows, next_cursor, total = fetch_page(conn, "SELECT id, name FROM things", [], _page(), SORT_FIELDS)
+        assert len(rows) == 25
+        assert next_cursor is None
+        assert total is None
+
+    def test_cursor_for_other_sort_rejected(self):
+        cursor = encode_cursor("name", "asc", "thing-01", 3)
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor(cursor, "id", "asc")
+        assert exc.value.status_code == 400
+        with pytest.raises(HTTPException):
+            decode_cursor("not-a-cursor", "name", "asc")
+
+    def test_project(self):
+        items = [{"id": 1, "name": "a", "kind": "x"}]
+        assert project(items, ["id", "kind"]) == [{"id": 1, "kind": "x"}]
+        with pytest.raises(HTTPException):
+            project(items, ["missing"])
+
+
+class TestCompressionMiddleware:
+    """Test response compression negotiation and thresholds."""
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+        @app.get("/big")
+        def big():
+            return PlainTextResponse("x" * 5000)
+
+        @app.get("/small")
+        def small():
+            return PlainTextResponse("tiny")
+
+        @app.get("/zip")
+        def archive():
+            return Response(b"PK" + b"\0" * 5000, media_type="application/zip")
+
+        return TestClient(app)
+
+    def test_select_encoding(self):
+        assert select_encoding("gzip, deflate") == "gzip"
+        assert select_encoding("gzip;q=0, identity") is None
+        assert select_encoding("") is None
+
+    def test_large_response_gzipped(self, client):
+        response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.text == "x" * 5000
+
+    def test_small_and_compressed_types_pass_through(self, client):
+        assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+        response = client.get("/zip", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert len(response.content) == 5002
+
+    def test_gzip_payload_is_valid(self):
+        compressor = _Compressor("gzip", 6, 4)
+        data = compressor.compress(b"abc" * 100, final=False) + compressor.compress(b"def", final=True)
+        assert gzip.decompress(data) == b"abc" * 100 + b"def"
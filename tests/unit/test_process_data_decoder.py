@@ -0,0 +1,186 @@
+"""
+Unit Tests for the Process Data Decoder (services/common/process_data_decoder.py)
+=================================================================================
+
+Tests plan compilation from IODD ProcessData definitions and vectorized
+decoding of raw IO-Link frames.
+"""
+
+import struct
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from services.common.process_data_decoder import (
+    DecoderCache,
+    compile_plan,
+    select_definition,
+)
+
+
+SENSOR_PD = {
+    "pd_id": "PDin_Distance",
+    "name": "Process Data In",
+    "direction": "input",
+    "bit_length": 48,
+    "data_type": "RecordT",
+    "record_items": [
+        {"subindex": 1, "name": "Distance", "bit_offset": 32, "bit_length": 16, "data_type": "UIntegerT"},
+        {"subindex": 2, "name": "Temperature", "bit_offset": 20, "bit_length": 12, "data_type": "IntegerT"},
+        {"subindex": 3, "name": "Counter", "bit_offset": 2, "bit_length": 18, "data_type": "UIntegerT"},
+        {"subindex": 4, "name": "Q2", "bit_offset": 1, "bit_length": 1, "data_type": "BooleanT"},
+        {"subindex": 5, "name": "Q1", "bit_offset": 0, "bit_length": 1, "data_type": "BooleanT"},
+    ],
+}
+
+
+def _frame(distance, temperature, counter, q2, q1):
+    value = (distance << 32) | ((temperature & 0xFFF) << 20) | (counter << 2) | (q2 << 1) | q1
+    return value.to_bytes(6, "big")
+
+
+class TestCompilePlan:
+    """Test plan compilation."""
+
+    def test_frame_size_and_fields(self):
+        plan = compile_plan(SENSOR_PD)
+        assert plan.frame_bytes == 6
+        assert [f.name for f in plan.fields] == ["Distance", "Temperature", "Counter", "Q2", "Q1"]
+
+    def test_aligned_field_uses_dtype_view(self):
+        plan = compile_plan(SENSOR_PD)
+        distance = plan.fields[0]
+        assert (distance.byte_start, distance.byte_end) == (0, 2)
+        assert distance.view_dtype == ">u2"
+
+    def test_item_outside_frame_rejected(self):
+        definition = {
+            "pd_id": "bad", "bit_length": 8,
+            "record_items": [{"name": "x", "bit_offset": 4, "bit_length": 8, "data_type": "UIntegerT"}],
+        }
+        with pytest.raises(ValueError):
+            compile_plan(definition)
+
+    def test_plain_process_data_without_record_items(self):
+        plan = compile_plan({"pd_id": "PDin", "name": "Level", "bit_length": 16, "data_type": "IntegerT"})
+        assert plan.decode(struct.pack(">h", -300))["Level"].tolist() == [-300]
+
+
+class TestDecode:
+    """Test batch decoding of raw frames."""
+
+    def test_decode_batch(self):
+        plan = compile_plan(SENSOR_PD)
+        frames = [_frame(1234, -5, 77, 0, 1), _frame(65535, 2047, 262143, 1, 0)]
+
+        columns = plan.decode(frames)
+
+        assert columns["Distance"].tolist() == [1234, 65535]
+        assert columns["Temperature"].tolist() == [-5, 2047]
+        assert columns["Counter"].tolist() == [77, 262143]
+        assert columns["Q1"].tolist() == [True, False]
+        assert columns["Q2"].tolist() == [False, True]
+
+    def test_decode_concatenated_bytes_matches_list(self):
+        plan = compile_plan(SENSOR_PD)
+        frames = [_frame(i, -i, i * 3, i % 2, (i + 1) % 2) for i in range(50)]
+        assert plan.decode_records(b"".join(frames)) == plan.decode_records(frames)
+
+    def test_unaligned_float(self):
+        definition = {
+            "pd_id": "f", "bit_length": 40,
+            "record_items": [
+                {"name": "Value", "bit_offset": 4, "bit_length": 32, "data_type": "Float32T"},
+                {"name": "Status", "bit_offset": 0, "bit_length": 4, "data_type": "IntegerT"},
+            ],
+        }
+        raw = int.from_bytes(struct.pack(">f", -2.25), "big") << 4 | 0xF
+        columns = compile_plan(definition).decode(raw.to_bytes(5, "big"))
+        assert columns["Value"].tolist() == [-2.25]
+        assert columns["Status"].tolist() == [-1]
+
+    def test_string_field(self):
+        definition = {
+            "pd_id": "s", "bit_length": 32,
+            "record_items": [{"name": "Code", "bit_offset": 0, "bit_length": 32, "data_type": "StringT"}],
+        }
+        assert compile_plan(definition).decode(b"AB\x00\x00")["Code"].tolist() == ["AB"]
+
+    def test_wrong_frame_length_rejected(self):
+        plan = compile_plan(SENSOR_PD)
+        with pytest.raises(ValueError):
+            plan.decode(b"\x00" * 7)
+
+
+class TestVariantsAndCache:
+    """Test conditional process data selection and plan caching."""
+
+    DEFINITIONS = [
+        {"pd_id": "PDin_A", "direction": "input", "bit_length": 8, "data_type": "UIntegerT"},
+        {"pd_id": "PDin_B", "direction": "input", "bit_length": 16, "data_type": "UIntegerT"},
+        {"pd_id": "PDout", "direction": "output", "bit_length": 8, "data_type": "UIntegerT"},
+    ]
+    CONDITIONS = [{"pd_id": "PDin_B", "condition_variable_id": "V_Mode", "condition_value": "1"}]
+
+    def test_select_by_variant(self):
+        assert select_definition(self.DEFINITIONS, "input", None, self.CONDITIONS)["pd_id"] == "PDin_A"
+        assert select_definition(self.DEFINITIONS, "input", "1", self.CONDITIONS)["pd_id"] == "PDin_B"
+        assert select_definition(self.DEFINITIONS, "output")["pd_id"] == "PDout"
+
+    def test_cache_loads_each_device_once(self):
+        calls = []
+
+        def loader(device_id):
+            calls.append(device_id)
+            return self.DEFINITIONS, self.CONDITIONS
+
+        cache = DecoderCache(loader)
+        plan = cache.get(7)
+        assert cache.get(7) is plan
+        assert cache.get(7, "input", "1").pd_id == "PDin_B"
+        assert calls == [7]
+
+        cache.invalidate(7)
+        cache.get(7)
+        assert calls == [7, 7]
+
+    def test_failed_load_is_cached(self):
+        def loader(device_id):
+            raise ConnectionError("catalog unavailable")
+
+        cache = DecoderCache(loader)
+        assert cache.get(1) is None
+        assert cache.get_stats()["devices"] == 1
+
+    def test_non_blocking_get_loads_in_background(self):
+        release = threading.Event()
+        calls = []
+
+        def loader(device_id):
+            calls.append(threading.current_thread().name)
+            release.wait(5)
+            return self.DEFINITIONS, self.CONDITIONS
+
+        cache = DecoderCache(loader, ttl=0.05)
+        assert cache.get(7, wait=False) is None
+        assert cache.is_loading(7)
+        assert cache.prefetch(7) is False  # already queued
+        release.set()
+
+        deadline = time.time() + 5
+        while cache.is_loading(7) and time.time() < deadline:
+            time.sleep(0.01)
+        plan = cache.get(7, wait=False)
+        assert plan.pd_id == "PDin_A"
+        assert calls[0].startswith("pd-definitions")
+
+        # Expired plans are served while they are reloaded
+        time.sleep(0.06)
+        assert cache.get(7, wait=False) is plan
+        deadline = time.time() + 5
+        while len(calls) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(calls) == 2
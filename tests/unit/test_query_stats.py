@@ -0,0 +1,140 @@
+"""
+Unit Tests for Per-Request Query Statistics
+===========================================
+
+Tests the instrumented sqlite3 connections and the Server-Timing /
+Prometheus / slow-request reporting middleware (src/query_stats.py).
+"""
+
+import logging
+import sqlite3
+
+import pytest
+from fastapi import BackgroundTasks, FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from src import query_stats
+from src.query_stats import InstrumentedConnection, QueryStats, QueryStatsMiddleware
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "stats.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany("INSERT INTO items (name) VALUES (?)", [(f"item {i}",) for i in range(10)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def recording():
+    stats = QueryStats()
+    token = query_stats._current.set(stats)
+    yield stats
+    query_stats._current.reset(token)
+
+
+class TestInstrumentedConnection:
+    """Test counting on instrumented connections."""
+
+    def test_counts_queries_rows_and_statements(self, db_path, recording):
+        conn = sqlite3.connect(db_path, factory=InstrumentedConnection)
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM items WHERE id = ?", (1,))
+        assert cursor.fetchone() is not None
+        for item_id in (2, 3):
+            conn.execute("SELECT * FROM items WHERE id = ?", (item_id,)).fetchall()
+        assert len(list(conn.execute("SELECT * FROM items"))) == 10
+        conn.close()
+
+        assert recording.queries == 4
+        assert recording.rows == 13
+        assert recording.seconds > 0
+        executions, rows, _ = recording.statements["SELECT * FROM items WHERE id = ?"]
+        assert (executions, rows) == (3, 3)
+
+    def test_passes_through_outside_a_request(self, db_path):
+        conn = sqlite3.connect(db_path, factory=InstrumentedConnection)
+        conn.row_factory = sqlite3.Row
+        assert conn.execute("SELECT name FROM items WHERE id = 1").fetchone()["name"] == "item 0"
+        conn.close()
+
+    def test_install_respects_caller_factory(self, db_path, monkeypatch):
+        monkeypatch.setattr(sqlite3, "connect", sqlite3.connect)
+        query_stats.install()
+        try:
+            assert isinstance(sqlite3.connect(db_path), InstrumentedConnection)
+            assert type(sqlite3.connect(db_path, factory=sqlite3.Connection)) is sqlite3.Connection
+        finally:
+            query_stats.uninstall()
+        assert type(sqlite3.connect(db_path)) is sqlite3.Connection
+
+
+@pytest.fixture
+def make_client(db_path, monkeypatch):
+    # Restore whatever sqlite3.connect was (src.api installs the wrapper too)
+    monkeypatch.setattr(sqlite3, "connect", sqlite3.connect)
+
+    def make(slow_request_ms=10_000):
+        app = FastAPI()
+
+        def query(n):
+            conn = sqlite3.connect(db_path)
+            try:
+                for item_id in range(1, n + 1):
+                    conn.execute("SELECT name FROM items WHERE id = ?", (item_id,)).fetchone()
+            finally:
+                conn.close()
+
+        @app.get("/items/{count}")
+        def items(count: int, background_tasks: BackgroundTasks):
+            query(count)
+            background_tasks.add_task(query, 5)
+            return {"count": count}
+
+        app.add_middleware(QueryStatsMiddleware, slow_request_ms=slow_request_ms)
+        return TestClient(app)
+
+    query_stats.install()
+    return make
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client()
+
+
+def _sample(name, route):
+    return REGISTRY.get_sample_value(name, {"method": "GET", "route": route})
+
+
+class TestQueryStatsMiddleware:
+    """Test per-request reporting."""
+
+    def test_server_timing_header(self, client):
+        response = client.get("/items/3")
+        assert response.status_code == 200
+        timing = response.headers["server-timing"]
+        assert timing.startswith("db;dur=")
+        assert 'desc="3 queries, 3 rows"' in timing
+        assert "app;dur=" in timing
+
+    def test_histograms_are_labelled_by_route_template(self, client):
+        before = _sample("http_request_db_queries_count", "/items/{count}") or 0
+        before_sum = _sample("http_request_db_queries_sum", "/items/{count}") or 0
+        client.get("/items/2")
+        client.get("/items/4")
+        assert _sample("http_request_db_queries_count", "/items/{count}") == before + 2
+        # Background task queries are not attributed to the request
+        assert _sample("http_request_db_queries_sum", "/items/{count}") == before_sum + 6
+
+    def test_slow_requests_log_breakdown(self, make_client, caplog):
+        with caplog.at_level(logging.WARNING, logger="src.query_stats"):
+            make_client(slow_request_ms=0).get("/items/3")
+        message = "\n".join(record.getMessage() for record in caplog.records)
+        assert "Slow request GET /items/{count}" in message
+        assert "3 queries" in message
+        assert "3x" in message and "SELECT name FROM items WHERE id = ?" in message
@@ -0,0 +1,180 @@
+"""
+Unit Tests for Read Routing (src/utils/read_replica.py, src/utils/db_health.py)
+===============================================================================
+
+Tests read-only connections, the replica refresh and fallback, the
+background integrity checks and the routes that use them.
+"""
+
+import os
+import sqlite3
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.database import get_read_connection
+from src.routes import admin_routes, pqa_routes
+from src.utils import read_replica as read_replica_module
+from src.utils.db_health import IntegrityChecks
+from src.utils.read_replica import ReadReplica, get_analytics_connection
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "greenstack.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript("""
+        CREATE TABLE devices (id INTEGER PRIMARY KEY, product_name TEXT);
+        CREATE TABLE iodd_assets (id INTEGER PRIMARY KEY, device_id INTEGER REFERENCES devices(id));
+        CREATE TABLE pqa_quality_metrics (
+            id INTEGER PRIMARY KEY, device_id INTEGER, overall_score REAL, passed_threshold INTEGER,
+            critical_data_loss INTEGER, analysis_timestamp TEXT, file_type TEXT
+        );
+        INSERT INTO devices (product_name) VALUES ('Sensor');
+        INSERT INTO pqa_quality_metrics (device_id, overall_score, passed_threshold, critical_data_loss,
+                                         analysis_timestamp, file_type)
+        VALUES (1, 95.0, 1, 0, '2025-01-01 00:00:00', 'IODD');
+    """)
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def replica(db_path, tmp_path, monkeypatch):
+    replica = ReadReplica(str(tmp_path / "replica" / "greenstack.db"), interval=60, max_age=60,
+                          db_path=lambda: db_path)
+    monkeypatch.setattr(read_replica_module, "read_replica", replica)
+    monkeypatch.setattr(read_replica_module, "get_db_path", lambda: db_path)
+    return replica
+
+
+def count_metrics(conn):
+    return conn.execute("SELECT COUNT(*) FROM pqa_quality_metrics").fetchone()[0]
+
+
+class TestReadConnections:
+    """Test read-only connections."""
+
+    def test_read_only_and_not_blocked_by_writers(self, db_path):
+        writer = sqlite3.connect(db_path)
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute("INSERT INTO devices (product_name) VALUES ('Pending')")
+
+        reader = get_read_connection(db_path, timeout=0.1)
+        try:
+            assert reader.execute("SELECT COUNT(*) FROM devices").fetchone()[0] == 1
+            with pytest.raises(sqlite3.OperationalError):
+                reader.execute("DELETE FROM devices")
+        finally:
+            reader.close()
+            writer.rollback()
+            writer.close()
+
+
+class TestReadReplica:
+    """Test replica refresh and routing."""
+
+    def test_disabled_without_path(self, db_path, monkeypatch):
+        monkeypatch.setattr(read_replica_module, "read_replica", ReadReplica(""))
+        monkeypatch.setattr(read_replica_module, "get_db_path", lambda: db_path)
+        assert read_replica_module.read_replica.status()["enabled"] is False
+        with pytest.raises(RuntimeError):
+            read_replica_module.read_replica.refresh()
+        conn = get_analytics_connection()
+        assert count_metrics(conn) == 1
+        conn.close()
+
+    def test_reads_fresh_replica_and_falls_back_when_stale(self, db_path, replica):
+        assert replica.fresh_path() is None
+        assert replica.refresh()["status"] == "completed"
+        assert replica.fresh_path() == replica.path
+
+        writer = sqlite3.connect(db_path)
+        writer.execute("INSERT INTO pqa_quality_metrics (device_id, overall_score) VALUES (2, 50)")
+        writer.commit()
+        writer.close()
+
+        conn = get_analytics_connection()
+        assert count_metrics(conn) == 1  # replica lags until the next refresh
+        conn.close()
+        conn = get_analytics_connection(use_replica=False)
+        assert count_metrics(conn) == 2
+        conn.close()
+
+        old = time.time() - 120
+        os.utime(replica.path, (old, old))
+        assert replica.status()["in_use"] is False
+        conn = get_analytics_connection()
+        assert count_metrics(conn) == 2
+        conn.close()
+
+    def test_background_refresh(self, replica):
+        replica.start()
+        try:
+            deadline = time.time() + 5
+            while replica.fresh_path() is None and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            replica.stop()
+        assert replica.status()["last_refresh"]["status"] == "completed"
+
+
+class TestIntegrityChecks:
+    """Test background integrity checks."""
+
+    def test_caches_results_and_invalidates(self, db_path):
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO iodd_assets (device_id) VALUES (99)")
+        conn.commit()
+        conn.close()
+
+        checks = IntegrityChecks(max_age=60, db_path=lambda: db_path)
+        assert checks.ensure_fresh() is True
+        assert checks.wait(5)
+        result = checks.result()
+        assert result["integrity"] == "ok"
+        assert result["foreign_key_violation_count"] == 1
+        assert result["foreign_key_violations"][0][:3] == ("iodd_assets", 1, "devices")
+        assert checks.ensure_fresh() is False
+
+        checks.invalidate()
+        assert checks.status()["stale"] is True
+
+
+@pytest.fixture
+def client(db_path, replica, monkeypatch):
+    monkeypatch.setattr(admin_routes, "get_read_connection", lambda: get_read_connection(db_path))
+    monkeypatch.setattr(admin_routes, "get_db_path", lambda: db_path)
+    monkeypatch.setattr(admin_routes, "integrity_checks", IntegrityChecks(db_path=lambda: db_path))
+    monkeypatch.setattr(admin_routes, "read_replica", replica)
+    app = FastAPI()
+    app.include_router(admin_routes.router)
+    app.include_router(pqa_routes.router)
+    return TestClient(app)
+
+
+class TestRoutes:
+    """Test the health, replica and dashboard routes."""
+
+    def test_database_health_uses_background_check(self, client):
+        health = client.get("/api/admin/stats/database-health").json()
+        assert health["integrity"] == "ok"
+        assert health["foreign_key_violations"] == 0
+        assert health["integrity_checked_at"] is not None
+
+        status = client.get("/api/admin/database/integrity-check").json()
+        assert status["result"]["integrity"] == "ok"
+        assert status["stale"] is False
+
+    def test_replica_refresh_and_dashboard(self, client, replica):
+        assert client.get("/api/admin/database/replica").json()["in_use"] is False
+        assert client.post("/api/admin/database/replica/refresh").status_code == 200
+        assert client.get("/api/admin/database/replica").json()["in_use"] is True
+
+        summary = client.get("/api/pqa/dashboard/summary").json()
+        assert summary["total_analyses"] == 1
+        assert summary["passed_analyses"] == 1
@@ -0,0 +1,131 @@
+"""
+Unit Tests for the Service Status Sampler (src/utils/service_monitor.py)
+========================================================================
+
+Tests PID resolution (PID file, cached PID liveness, throttled process
+scans), config reloads on file changes and inline sampling without the
+background thread. The test process itself plays the managed service.
+"""
+
+import json
+import os
+import time
+
+import psutil
+import pytest
+
+from src.utils import service_monitor as monitor_module
+from src.utils.service_monitor import ServiceMonitor
+
+SELF_NAME = psutil.Process().name()
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "services.json"
+    path.write_text(json.dumps({
+        "self": {"name": "Self", "port": 1, "process_name": SELF_NAME, "executable": "python3",
+                 "config_file": None},
+        "absent": {"name": "Absent", "port": 2, "process_name": "no-such-process-xyz", "executable": "no-such-exe",
+                   "config_file": str(tmp_path / "missing.conf")},
+    }))
+    return path
+
+
+@pytest.fixture
+def monitor(config_file):
+    return ServiceMonitor(lambda: json.loads(config_file.read_text()), config_file, interval=60, scan_interval=60)
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    calls = []
+    process_iter = psutil.process_iter
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return process_iter(*args, **kwargs)
+
+    monkeypatch.setattr(monitor_module.psutil, "process_iter", counting)
+    return calls
+
+
+def test_refresh_samples_services(monitor):
+    services = monitor.refresh()["services"]
+
+    assert services["self"]["pid"] is not None
+    assert services["absent"]["pid"] is None
+    assert services["absent"]["executable_found"] is False
+    assert services["absent"]["config_valid"] is False
+    assert services["self"]["config_valid"] is True
+
+
+def test_running_services_are_tracked_without_rescanning(monitor, config_file, scans):
+    config = json.loads(config_file.read_text())
+    del config["absent"]
+    config_file.write_text(json.dumps(config))
+
+    first = monitor.refresh()["services"]["self"]["pid"]
+    assert len(scans) == 1
+    # The cached PID is verified instead of walking the process table again
+    assert monitor.refresh(force_scan=True)["services"]["self"]["pid"] == first
+    assert len(scans) == 1
+
+
+def test_process_scans_are_throttled(monitor, scans):
+    monitor.refresh()
+    monitor.refresh()
+    assert len(scans) == 1
+    monitor.refresh(force_scan=True)
+    assert len(scans) == 2
+
+
+def test_pid_file(monitor, config_file, tmp_path, scans):
+    pid_file = tmp_path / "self.pid"
+    pid_file.write_text(str(os.getpid()))
+    config = json.loads(config_file.read_text())
+    config["self"]["pid_file"] = str(pid_file)
+    del config["absent"]
+    config_file.write_text(json.dumps(config))
+
+    assert monitor.refresh()["services"]["self"]["pid"] == os.getpid()
+    assert scans == []
+
+
+def test_recycled_pid_is_not_alive(monitor):
+    pid = os.getpid()
+    started = psutil.Process(pid).create_time()
+    assert monitor._alive(pid, SELF_NAME, started) == started
+    assert monitor._alive(pid, SELF_NAME, started - 100) is None
+    assert monitor._alive(pid, "no-such-process-xyz") is None
+
+
+def test_config_reloaded_when_file_changes(monitor, config_file):
+    assert set(monitor.config()) == {"self", "absent"}
+
+    config = json.loads(config_file.read_text())
+    del config["absent"]
+    config_file.write_text(json.dumps(config))
+    os.utime(config_file, ns=(time.time_ns() + 10**9, time.time_ns() + 10**9))
+
+    assert set(monitor.config()) == {"self"}
+
+
+def test_snapshot_samples_inline_only_when_stale(monitor):
+    first = monitor.snapshot()
+    assert first["sampled_at"] > 0
+    assert monitor.snapshot() is first
+
+
+def test_background_thread(config_file):
+    monitor = ServiceMonitor(lambda: json.loads(config_file.read_text()), config_file, interval=0.05)
+    monitor.start()
+    try:
+        deadline = time.time() + 5
+        while monitor.snapshot()["sampled_at"] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        assert monitor.running
+        assert "self" in monitor.snapshot()["services"]
+    finally:
+        monitor.stop()
+    assert not monitor.running
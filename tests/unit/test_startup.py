@@ -0,0 +1,87 @@
+"""
+Unit Tests for API Cold Start
+=============================
+
+Tests that optional subsystems and routers are not imported by
+``import src.api`` and that the PQA startup analysis waits for readiness.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from src.utils.pqa_scheduler import PQAScheduler
+from src.utils.redis_probe import redis_reachable
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_optional_subsystems_are_not_imported_at_startup(tmp_path):
+    env = {k: v for k, v in os.environ.items() if k not in ("OTEL_ENABLED", "SENTRY_DSN")}
+    env["PYTHONPATH"] = str(ROOT)
+    code = (
+        "import sys, src.api\n"
+        "deferred = ('sqlalchemy', 'pyarrow', 'sentry_sdk', 'opentelemetry.exporter',"
+        " 'opentelemetry.instrumentation', 'paho.mqtt', 'psutil', 'redis')\n"
+        "print(sorted({d for d in deferred for m in sys.modules if m == d or m.startswith(d + '.')}))\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env,
+                          capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert proc.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_optional_routers_are_included_once():
+    from src.api import app, include_optional_routers
+
+    include_optional_routers()
+    include_optional_routers()
+    paths = [route.path for route in app.routes]
+    assert paths.count("/ws/mqtt") == 1
+    assert "/api/telemetry/{device_id}/history" in paths
+    assert "/api/mqtt/messages" in paths
+
+
+def test_redis_probe_does_not_import_the_client():
+    with socket.socket() as server:
+        server.bind(("127.0.0.1", 0))
+        server.listen(1)
+        port = server.getsockname()[1]
+        assert redis_reachable(f"redis://127.0.0.1:{port}/0")
+    assert not redis_reachable(f"redis://127.0.0.1:{port}/0", timeout=0.5)
+    assert redis_reachable("unix:///tmp/redis.sock")
+
+
+def _scheduler(tmp_path, **kwargs):
+    return PQAScheduler(str(tmp_path / "test.db"), enabled=False, **kwargs)
+
+
+def test_startup_analysis_waits_for_readiness(tmp_path):
+    scheduler = _scheduler(tmp_path, startup_delay=0, ready_timeout=30)
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(scheduler._wait_for_readiness()))
+    waiter.start()
+
+    time.sleep(0.2)
+    assert waiter.is_alive()
+    scheduler.notify_ready()
+    waiter.join(timeout=5)
+    assert result == [True]
+
+
+def test_startup_analysis_runs_without_readiness_probe(tmp_path):
+    scheduler = _scheduler(tmp_path, startup_delay=0, ready_timeout=0.1)
+    assert scheduler._wait_for_readiness() is True
+
+
+def test_stop_cancels_deferred_startup_analysis(tmp_path):
+    scheduler = _scheduler(tmp_path, startup_delay=30, ready_timeout=30)
+    scheduler.notify_ready()
+    threading.Timer(0.1, scheduler._stop_flag.set).start()
+    started = time.monotonic()
+    assert scheduler._wait_for_readiness() is False
+    assert time.monotonic() - started < 5
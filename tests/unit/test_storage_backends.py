@@ -0,0 +1,95 @@
+"""
+Unit Tests for Storage Backends (src/storage/backends.py)
+=========================================================
+
+Tests backend selection, statement translation and COPY encoding. The
+savers on a live PostgreSQL server are covered by
+tests/postgres/test_postgres_storage.py.
+"""
+
+import sqlite3
+
+from src import config
+from src.greenstack import default_database
+from src.storage import StorageManager
+from src.storage.backends import (
+    PostgresBackend, SQLiteBackend, _converter, _parse_insert, _translate, copy_text, get_backend, psycopg2_url
+)
+from src.storage.text import TextSaver
+
+
+class TestBackendSelection:
+    """Test picking a backend from a path or URL."""
+
+    def test_sqlite_paths_and_urls(self, tmp_path):
+        assert isinstance(get_backend("greenstack.db"), SQLiteBackend)
+        assert get_backend("sqlite:///data/greenstack.db").db_path == "data/greenstack.db"
+        assert isinstance(StorageManager(str(tmp_path / "x.db")).backend, SQLiteBackend)
+
+    def test_postgres_backends_are_shared_per_url(self):
+        url = "postgresql://user:secret@db/greenstack"
+        backend = get_backend(url)
+        assert isinstance(backend, PostgresBackend)
+        assert get_backend(url) is backend
+        assert get_backend(url + "_other") is not backend
+        assert psycopg2_url(url) == "postgresql+psycopg2://user:secret@db/greenstack"
+        assert psycopg2_url("postgresql+psycopg2://db/x") == "postgresql+psycopg2://db/x"
+
+    def test_default_database_from_config(self, monkeypatch):
+        monkeypatch.setattr(config, "DATABASE_URL", "sqlite:////data/iodd_manager.db")
+        assert default_database() == "greenstack.db"
+        monkeypatch.setattr(config, "DATABASE_URL", "postgresql://user@db/greenstack")
+        assert default_database() == "postgresql://user@db/greenstack"
+
+
+class TestStatements:
+    """Test placeholder translation and INSERT parsing."""
+
+    def test_translate(self):
+        assert _translate("SELECT id FROM t WHERE a = ? AND b LIKE '%x'") == \
+            "SELECT id FROM t WHERE a = %s AND b LIKE '%%x'"
+
+    def test_parse_insert(self):
+        table, columns, values = _parse_insert("""
+            INSERT INTO iodd_text (device_id, text_id, language_code)
+            VALUES (?, ?, ?)
+        """)
+        assert (table, columns, values) == ("iodd_text", ("device_id", "text_id", "language_code"), ("?", "?", "?"))
+        assert _parse_insert("INSERT INTO t (a, b) VALUES (?, CURRENT_TIMESTAMP)")[2] == ("?", "CURRENT_TIMESTAMP")
+        assert _parse_insert("DELETE FROM t WHERE device_id = ?") is None
+
+
+class TestCopyEncoding:
+    """Test values in COPY text format and column coercion."""
+
+    def test_copy_text(self):
+        assert copy_text(None) == "\\N"
+        assert copy_text(True) == "t"
+        assert copy_text(3) == "3"
+        assert copy_text("a\tb\nc\\d") == "a\\tb\\nc\\\\d"
+        assert copy_text(b"\x00\xff") == "\\\\x00ff"
+
+    def test_converters(self):
+        assert _converter("boolean")(1) is True
+        assert _converter("boolean")(None) is None
+        assert _converter("integer")(True) == 1
+        assert _converter("text")(b"caf\xc3\xa9") == "café"
+        assert _converter("bytea")("abc") == b"abc"
+        assert _converter("timestamp without time zone") is None
+
+
+class TestSQLiteBackend:
+    """Test that savers keep sqlite3 behaviour by default."""
+
+    def test_savers_on_sqlite(self, tmp_path):
+        backend = get_backend(str(tmp_path / "test.db"))
+        conn = backend.connect()
+        conn.execute("CREATE TABLE iodd_text (id INTEGER PRIMARY KEY, device_id INTEGER, text_id TEXT,"
+                     " language_code TEXT, text_value TEXT, xml_order INTEGER, language_order INTEGER)")
+        cursor = conn.cursor()
+        saver = TextSaver(cursor, backend)
+        saver.save(1, {"TI_A": {"en": "A", "de": "B"}})
+        assert backend.execute(cursor, "INSERT INTO iodd_text (device_id) VALUES (?)", (2,)) == 3
+        assert isinstance(conn, sqlite3.Connection)
+        assert conn.execute("SELECT COUNT(*) FROM iodd_text").fetchone()[0] == 3
+        conn.close()
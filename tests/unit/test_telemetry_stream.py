@@ -0,0 +1,198 @@
+"""
+Unit Tests for Telemetry Streams (services/common/telemetry_stream.py)
+======================================================================
+
+Tests appending and trimming the Redis telemetry streams, consumer-group
+acknowledgement and replay, the bridge → InfluxDB path over the shared log
+and the history routes (src/routes/telemetry_routes.py). Redis is emulated
+with fakeredis.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+fakeredis = pytest.importorskip("fakeredis")
+
+SERVICES = Path(__file__).parent.parent.parent / "services"
+for path in (SERVICES, SERVICES / "influx-ingestion", SERVICES / "mqtt-bridge"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from common import telemetry_stream  # noqa: E402
+from common.telemetry_stream import (  # noqa: E402
+    TELEMETRY_STREAM, StreamConsumer, append_telemetry, decode_entry, device_stream_key
+)
+from src.routes import telemetry_routes  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def append(client, device_id, data):
+    pipe = client.pipeline(transaction=False)
+    append_telemetry(pipe, device_id, data)
+    pipe.execute()
+
+
+def consume(consumer, expected, handler=None):
+    """Run a consumer until it has handled ``expected`` entries"""
+    stop = threading.Event()
+    seen = []
+
+    def handle(device_id, payload):
+        seen.append((device_id, payload))
+        if handler:
+            handler(device_id, payload)
+        if len(seen) >= expected:
+            stop.set()
+
+    thread = threading.Thread(target=consumer.run, args=(handle, stop), daemon=True)
+    thread.start()
+    thread.join(5)
+    stop.set()
+    thread.join(5)
+    assert not thread.is_alive()
+    return seen
+
+
+class TestAppendTelemetry:
+    """Test writing telemetry to the shared log and per-device streams."""
+
+    def test_append_to_both_streams(self, client):
+        append(client, "d1", {"temperature": 21.5, "timestamp": "2024-01-01T00:00:00"})
+
+        expected = ("d1", {"temperature": 21.5, "timestamp": "2024-01-01T00:00:00"})
+        for key in (TELEMETRY_STREAM, device_stream_key("d1")):
+            (_, fields), = client.xrange(key)
+            assert decode_entry(fields) == expected
+
+    def test_streams_are_capped(self, client, monkeypatch):
+        monkeypatch.setattr(telemetry_stream, "TELEMETRY_LOG_MAXLEN", 50)
+        monkeypatch.setattr(telemetry_stream, "TELEMETRY_DEVICE_MAXLEN", 10)
+        for i in range(300):
+            append(client, "d1", {"value": i})
+
+        # Approximate trimming may keep a little more than MAXLEN, never less
+        assert 50 <= client.xlen(TELEMETRY_STREAM) < 300
+        assert 10 <= client.xlen(device_stream_key("d1")) < 300
+        _, fields = client.xrevrange(device_stream_key("d1"), count=1)[0]
+        assert decode_entry(fields)[1] == {"value": 299}
+
+
+class TestStreamConsumer:
+    """Test consumer-group delivery, acknowledgement and replay."""
+
+    def test_entries_are_acknowledged(self, client):
+        consumer = StreamConsumer(client, group="influx-ingestion", consumer="c1", block_ms=10)
+        consumer.ensure_group("0")
+        for i in range(3):
+            append(client, f"d{i}", {"value": i})
+
+        seen = consume(consumer, 3)
+        assert [device_id for device_id, _ in seen] == ["d0", "d1", "d2"]
+        assert client.xpending(TELEMETRY_STREAM, "influx-ingestion")["pending"] == 0
+        assert consumer.get_stats()["processed"] == 3
+
+    def test_unacknowledged_entries_are_replayed_first(self, client):
+        consumer = StreamConsumer(client, group="device-shadow", consumer="c1", block_ms=10)
+        consumer.ensure_group("0")
+        append(client, "d1", {"value": 1})
+        append(client, "d1", {"value": 2})
+
+        # A previous run read the first entry and crashed before acknowledging it
+        client.xreadgroup("device-shadow", "c1", {TELEMETRY_STREAM: ">"}, count=1)
+        assert client.xpending(TELEMETRY_STREAM, "device-shadow")["pending"] == 1
+
+        seen = consume(consumer, 2)
+        assert [payload["value"] for _, payload in seen] == [1, 2]
+        assert client.xpending(TELEMETRY_STREAM, "device-shadow")["pending"] == 0
+
+    def test_groups_see_every_entry_and_poison_entries_are_acked(self, client):
+        for group in ("influx-ingestion", "device-shadow"):
+            StreamConsumer(client, group=group).ensure_group("0")
+        append(client, "d1", {"value": 1})
+        append(client, "d2", {"value": 2})
+
+        def fail_on_d1(device_id, payload):
+            if device_id == "d1":
+                raise ValueError("bad payload")
+
+        influx = StreamConsumer(client, group="influx-ingestion", consumer="c1", block_ms=10)
+        shadow = StreamConsumer(client, group="device-shadow", consumer="c1", block_ms=10)
+        assert len(consume(influx, 2, fail_on_d1)) == 2
+        assert len(consume(shadow, 2)) == 2
+        for group in ("influx-ingestion", "device-shadow"):
+            assert client.xpending(TELEMETRY_STREAM, group)["pending"] == 0
+
+
+class TestBridgeToInflux:
+    """Test telemetry from the bridge is written to InfluxDB at the device's time."""
+
+    def test_device_timestamp_is_kept(self, client, monkeypatch):
+        pytest.importorskip("paho.mqtt")
+        pytest.importorskip("influxdb_client")
+        import bridge
+        import ingest
+        from batch_writer import BatchingWriter
+        from common.circuit_breaker import CircuitBreaker
+
+        monkeypatch.setattr(bridge, "redis_client", client)
+        bridge.redis_breaker.reset()
+        consumer = StreamConsumer(client, group="influx-ingestion", consumer="c1", block_ms=10)
+        consumer.ensure_group("0")
+
+        bridge.handle_telemetry("d1", {"temperature": 21.5, "timestamp": "2024-01-01T00:00:00Z"})
+        bridge.handle_telemetry("d2", {"parameter": "pressure", "value": 2, "unit": "bar"})
+
+        _, payload = decode_entry(client.xrange(TELEMETRY_STREAM)[0][1])
+        assert payload["device_timestamp"] == "2024-01-01T00:00:00Z"
+        assert payload["timestamp"] != payload["device_timestamp"]
+
+        bodies = []
+        writer = BatchingWriter(bodies.append, CircuitBreaker("test-influx"))
+        monkeypatch.setattr(ingest, "batch_writer", writer)
+        consume(consumer, 2, ingest.write_to_influxdb)
+        writer.flush()
+
+        lines = "\n".join(bodies).splitlines()
+        assert lines[0] == "device_telemetry,device_id=d1,parameter=temperature value=21.5 1704067200000000000"
+        # No device timestamp: stored at the bridge's receive time
+        assert lines[1].startswith("device_telemetry,device_id=d2,parameter=pressure,unit=bar value=2.0 ")
+        assert len(lines) == 2
+
+
+class TestHistoryRoutes:
+    """Test time-range queries over the per-device streams."""
+
+    @pytest.fixture
+    def api(self, client, monkeypatch):
+        monkeypatch.setattr(telemetry_routes, "_redis_client", client)
+        for i, ms in enumerate((1704067200000, 1704067260000, 1704067320000)):
+            client.xadd(device_stream_key("d1"), {"device_id": "d1", "data": f'{{"value": {i}}}'}, id=f"{ms}-0")
+        app = FastAPI()
+        app.include_router(telemetry_routes.router)
+        return TestClient(app)
+
+    def test_time_range_and_paging(self, api):
+        page = api.get("/api/telemetry/d1/history", params={"start": "2024-01-01T00:01:00Z", "count": 1}).json()
+        assert [entry["data"] for entry in page["entries"]] == [{"value": 1}]
+        assert page["entries"][0]["received_at"] == "2024-01-01T00:01:00+00:00"
+        assert page["next"] == "(1704067260000-0"
+
+        page = api.get("/api/telemetry/d1/history", params={"start": page["next"]}).json()
+        assert [entry["data"] for entry in page["entries"]] == [{"value": 2}]
+        assert page["next"] is None
+
+    def test_descending_and_invalid_bounds(self, api):
+        page = api.get("/api/telemetry/d1/history", params={"order": "desc", "end": "1704067260000"}).json()
+        assert [entry["data"]["value"] for entry in page["entries"]] == [1, 0]
+
+        assert api.get("/api/telemetry/d1/history", params={"start": "yesterday"}).status_code == 400
+        assert api.get("/api/telemetry/unknown/history").json()["count"] == 0
@@ -0,0 +1,76 @@
+"""
+Unit Tests for the Streaming ZIP Writer (src/utils/zip_stream.py)
+=================================================================
+
+Tests that archives generated chunk by chunk are valid ZIP files and that
+entry contents are read lazily from files and SQLite BLOBs.
+"""
+
+import io
+import os
+import sqlite3
+import zipfile
+
+from src.utils.zip_stream import ZipStream, content_disposition
+
+
+def _read(archive):
+    return zipfile.ZipFile(io.BytesIO(b"".join(archive)))
+
+
+class TestZipStream:
+    """Test streamed archive generation."""
+
+    def test_entries_round_trip(self, tmp_path):
+        path = tmp_path / "manual.txt"
+        path.write_bytes(b"line\n" * 50000)
+
+        archive = ZipStream(chunk_size=4096)
+        archive.add("metadata.json", '{"id": 1}')
+        archive.add_file("docs/manual.txt", str(path))
+
+        zf = _read(archive)
+        assert zf.testzip() is None
+        assert zf.read("metadata.json") == b'{"id": 1}'
+        assert zf.read("docs/manual.txt") == path.read_bytes()
+
+    def test_output_is_chunked(self):
+        archive = ZipStream(chunk_size=1024)
+        archive.add("random.bin", os.urandom(50000))
+        chunks = list(archive)
+        assert len(chunks) > 1
+        assert max(len(c) for c in chunks[:-1]) < 50000
+
+    def test_compressed_assets_are_stored(self):
+        archive = ZipStream()
+        archive.add("icon.png", b"\x89PNG" + b"\x00" * 1000)
+        archive.add("device.xml", "<IODevice/>" * 100)
+
+        zf = _read(archive)
+        assert zf.getinfo("icon.png").compress_type == zipfile.ZIP_STORED
+        assert zf.getinfo("device.xml").compress_type == zipfile.ZIP_DEFLATED
+
+        stored = ZipStream(store_only=True)
+        stored.add("device.xml", "<IODevice/>")
+        assert _read(stored).getinfo("device.xml").compress_type == zipfile.ZIP_STORED
+
+    def test_blob_entries(self, tmp_path):
+        db_path = str(tmp_path / "assets.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE assets (id INTEGER PRIMARY KEY, content BLOB)")
+        conn.execute("INSERT INTO assets VALUES (1, ?)", (os.urandom(200000),))
+        conn.execute("INSERT INTO assets VALUES (2, ?)", ("<xml/>",))
+        conn.commit()
+        blob = conn.execute("SELECT content FROM assets WHERE id = 1").fetchone()[0]
+        conn.close()
+
+        archive = ZipStream(chunk_size=8192)
+        archive.add_blob("a.bin", db_path, "assets", "content", 1, size=len(blob))
+        archive.add_blob("b.xml", db_path, "assets", "content", 2)
+
+        zf = _read(archive)
+        assert zf.read("a.bin") == blob
+        assert zf.read("b.xml") == b"<xml/>"
+
+    def test_content_disposition_quotes_filename(self):
+        assert content_disposition('My "Device".zip') == 'attachment; filename="My Device.zip"'